@@ -12,7 +12,6 @@ import os
 import sys
 import traceback
 from pathlib import Path
-import customtkinter as ctk
 
 # Configurar codificación UTF-8 para evitar errores con emojis en Windows
 if sys.platform == 'win32':
@@ -34,100 +33,54 @@ if sys.platform == 'win32':
             # Si todo falla, simplemente continuar sin reconfigurar
             pass
 
-# Intentar importar tkinterdnd2 para drag & drop
-try:
-    import tkinterdnd2 as tkdnd
-    DND_AVAILABLE = True
-except ImportError:
-    DND_AVAILABLE = False
-
-# Importar módulos
-from modules.gui import WallpaperChangerGUI
+# La interfaz (customtkinter, tkinterdnd2, modules.gui) se importa dentro de
+# main(): el camino --add-wallpaper solo necesita la capa de configuración
 
 
 def add_wallpaper_from_context_menu(file_path):
     """Agrega un archivo a la lista de fondos desde el menú contextual"""
-    try:
-        from modules.config_manager import ConfigManager
-        from modules.video_wallpaper import VideoWallpaperEngine
-        
-        # Verificar que el archivo existe
-        if not os.path.exists(file_path):
-            show_context_message("Error", f"El archivo no existe:\n{file_path}")
-            return False
-        
-        # Verificar extensión
-        ext = Path(file_path).suffix.lower()
-        valid_extensions = {'.jpg', '.jpeg', '.png', '.bmp', '.mp4', '.avi', '.mov', '.wmv', '.mkv', '.flv', '.webm', '.m4v'}
-        
-        if ext not in valid_extensions:
-            show_context_message("Formato No Soportado", f"Formato de archivo no soportado: {ext}")
-            return False
-        
-        # Cargar configuración
-        config = ConfigManager()
-        wallpapers = config.get("wallpapers", [])
-        
-        # Verificar si ya existe
-        if file_path in wallpapers:
-            show_context_message("Ya Existe", f"El archivo ya está en la lista de fondos:\n{os.path.basename(file_path)}")
-            return False
-        
-        # Agregar archivo
-        wallpapers.append(file_path)
-        config.set("wallpapers", wallpapers)
-        config.save_config()
-        
-        # Determinar tipo
-        video_engine = VideoWallpaperEngine()
-        file_type = "[Video]" if video_engine.is_video_file(file_path) else "[Imagen]"
-        
-        show_context_message("Agregado Exitosamente", 
-                    f"{file_type} agregado a la lista de fondos:\n\n"
-                    f"{os.path.basename(file_path)}\n\n"
-                    f"Total de archivos: {len(wallpapers)}")
-        
-        return True
-        
-    except Exception as e:
-        show_context_message("Error", f"Error agregando archivo:\n{str(e)}")
-        return False
+    from modules import cli
+    return cli.main(["--add-wallpaper", file_path]) == 0
 
 def show_context_message(title, message):
     """Muestra un mensaje al usuario desde el contexto"""
-    try:
-        import tkinter as tk
-        from tkinter import messagebox
-        
-        # Crear ventana temporal
-        root = tk.Tk()
-        root.withdraw()  # Ocultar ventana principal
-        root.attributes('-topmost', True)  # Mantener al frente
-        
-        # Mostrar mensaje
-        messagebox.showinfo(title, message)
-        
-        root.destroy()
-        
-    except Exception:
-        # Fallback: usar print si no hay GUI disponible
-        print(f"{title}: {message}")
+    from modules.cli import show_message
+    show_message(title, message)
 
 def main():
     """Función principal de la aplicación"""
     try:
         # Verificar si se está ejecutando desde menú contextual
-        if len(sys.argv) > 1 and sys.argv[1] == "--add-wallpaper":
-            if len(sys.argv) > 2:
-                file_path = sys.argv[2]
-                success = add_wallpaper_from_context_menu(file_path)
-                sys.exit(0 if success else 1)
+        if len(sys.argv) > 1 and sys.argv[1] in ("--add-wallpaper", "--control"):
+            from modules import cli
+            sys.exit(cli.main(sys.argv[1:]))
+        
+        # Solo el motor, sin Tk (kioscos y escritorios virtuales)
+        if len(sys.argv) > 1 and sys.argv[1] == "--daemon":
+            from modules import daemon
+            sys.exit(daemon.main(sys.argv[1:]))
+        
+        # Instancia única: si ya hay una abierta, mostrarla y salir
+        from modules.instance_server import CMD_SHOW, send_command
+        shown = send_command(CMD_SHOW)
+        if shown is not None:
+            if shown is False:
+                print("[INFO] El motor se ejecuta en modo --daemon (sin ventana)")
             else:
-                print("[ERROR] No se especifico archivo")
-                sys.exit(1)
+                print("[INFO] La aplicacion ya esta en ejecucion")
+            sys.exit(0)
         
         # Ejecución normal de la aplicación
         print("[INFO] Iniciando aplicacion...")
+        import customtkinter as ctk
+        from modules.gui import WallpaperChangerGUI
+        
+        # Intentar importar tkinterdnd2 para drag & drop
+        try:
+            import tkinterdnd2 as tkdnd
+            DND_AVAILABLE = True
+        except ImportError:
+            DND_AVAILABLE = False
         
         # Crear ventana principal con soporte de drag & drop
         print("[INFO] Creando ventana principal...")
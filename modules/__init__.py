@@ -33,29 +33,38 @@ def safe_print(*args, **kwargs):
             for arg in safe_args:
                 sys.stdout.buffer.write(str(arg).encode('utf-8', errors='replace') + b'\n')
 
-# Importaciones principales
-from .wallpaper_engine import WallpaperEngine
-from .video_wallpaper import VideoWallpaperEngine
-from .config_manager import ConfigManager
-from .gui import WallpaperChangerGUI
-from .startup_manager import StartupManager
-
-# Importar system tray de forma opcional
-try:
-    from .system_tray import SystemTrayManager
-    _system_tray_available = True
-except ImportError:
-    SystemTrayManager = None
-    _system_tray_available = False
+# Exportaciones perezosas: importar el paquete (por ejemplo, para el menú
+# contextual) no carga customtkinter, PIL ni el motor de video
+_EXPORTS = {
+    'WallpaperEngine': '.wallpaper_engine',
+    'VideoWallpaperEngine': '.video_wallpaper',
+    'ConfigManager': '.config_manager',
+    'WallpaperChangerGUI': '.gui',
+    'StartupManager': '.startup_manager',
+    'SystemTrayManager': '.system_tray',
+}
 
 __all__ = [
     'WallpaperEngine',
     'VideoWallpaperEngine', 
     'ConfigManager',
     'WallpaperChangerGUI',
-    'StartupManager'
+    'StartupManager',
+    'SystemTrayManager'
 ]
 
-# Solo agregar SystemTrayManager si está disponible
-if _system_tray_available:
-    __all__.append('SystemTrayManager')
+
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    import importlib
+    try:
+        value = getattr(importlib.import_module(module_name, __name__), name)
+    except ImportError:
+        if name != 'SystemTrayManager':
+            raise
+        # System tray opcional (pystray no instalado)
+        value = None
+    globals()[name] = value
+    return value
@@ -0,0 +1,168 @@
+"""
+Módulo de línea de comandos
+Camino rápido para el menú contextual: si la aplicación ya está abierta le
+envía las rutas; si no, solo carga la capa de configuración (sin
+customtkinter, PIL, OpenCV ni el motor de video). También envía las órdenes
+de control del modo --daemon
+"""
+
+import os
+import sys
+from typing import List, NamedTuple, Optional
+
+from .config_manager import ConfigManager
+from .instance_server import CMD_ADD, send_command
+from .media_library import get_media_kind
+
+
+# Espera máxima por la respuesta de una orden de control (un cambio puede
+# tener que extraer la portada de un video)
+CONTROL_TIMEOUT = 35.0
+
+
+class AddResult(NamedTuple):
+    """Resultado de agregar archivos a la lista de fondos"""
+    added: List[str]
+    duplicates: List[str]
+    missing: List[str]
+    unsupported: List[str]
+    total: int
+
+
+def add_wallpapers(paths: List[str], config: Optional[ConfigManager] = None) -> AddResult:
+    """
+    Agrega archivos a la lista de fondos con una sola escritura
+
+    Args:
+        paths: Rutas de imágenes o videos
+        config: Gestor de configuración. Si es None, usa el de por defecto
+
+    Returns:
+        AddResult con lo agregado, lo repetido y lo rechazado
+    """
+    missing, unsupported, candidates = [], [], []
+    for path in paths:
+        path = os.path.abspath(path)
+        if not os.path.exists(path):
+            missing.append(path)
+        elif get_media_kind(path) is None:
+            unsupported.append(path)
+        else:
+            candidates.append(path)
+
+    if config is None:
+        config = ConfigManager(write_behind=False)
+    added = config.add_wallpapers(candidates) if candidates else []
+    if added:
+        config.save_config()
+        config.flush()
+    added_set = set(added)
+    duplicates = [path for path in candidates if path not in added_set]
+    return AddResult(added, duplicates, missing, unsupported, config.count_wallpapers())
+
+
+def describe(result: AddResult) -> tuple:
+    """
+    Título y mensaje para mostrar al usuario
+
+    Returns:
+        Tupla (título, mensaje)
+    """
+    if result.missing and not (result.added or result.duplicates or result.unsupported):
+        return "Error", "El archivo no existe:\n" + "\n".join(result.missing)
+    if result.unsupported and not (result.added or result.duplicates):
+        ext = os.path.splitext(result.unsupported[0])[1].lower()
+        return "Formato No Soportado", f"Formato de archivo no soportado: {ext}"
+    if not result.added:
+        names = "\n".join(os.path.basename(path) for path in result.duplicates)
+        return "Ya Existe", f"El archivo ya está en la lista de fondos:\n{names}"
+
+    if len(result.added) == 1:
+        kind = "[Video]" if get_media_kind(result.added[0]) == "video" else "[Imagen]"
+        lines = [f"{kind} agregado a la lista de fondos:", "", os.path.basename(result.added[0])]
+    else:
+        lines = [f"{len(result.added)} archivos agregados a la lista de fondos"]
+    skipped = len(result.duplicates) + len(result.missing) + len(result.unsupported)
+    if skipped:
+        lines.append(f"({skipped} omitidos)")
+    lines += ["", f"Total de archivos: {result.total}"]
+    return "Agregado Exitosamente", "\n".join(lines)
+
+
+def show_message(title: str, message: str) -> None:
+    """Muestra un mensaje con tkinter (sin customtkinter) o por consola"""
+    try:
+        import tkinter as tk
+        from tkinter import messagebox
+
+        root = tk.Tk()
+        root.withdraw()
+        root.attributes('-topmost', True)
+        messagebox.showinfo(title, message)
+        root.destroy()
+    except Exception:
+        # Sin interfaz gráfica disponible
+        print(f"{title}: {message}")
+
+
+def control(command: str) -> int:
+    """
+    Envía una orden de control (`change_now`, `reload`, `status`, `quit`) a la
+    instancia en ejecución, normalmente un `--daemon`
+
+    Returns:
+        Código de salida (0 si la instancia respondió)
+    """
+    import json
+
+    reply = send_command(command, timeout=CONTROL_TIMEOUT)
+    if reply is None:
+        print(f"[ERROR] Ninguna instancia atendio la orden: {command}")
+        return 1
+    print(json.dumps(reply, ensure_ascii=False, indent=2) if isinstance(reply, dict) else reply)
+    return 0 if reply is not False else 1
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Punto de entrada de `--add-wallpaper <archivo> [archivo ...] [--quiet]` y
+    de `--control <orden>`
+
+    Args:
+        argv: Argumentos sin el nombre del programa. Si es None, usa sys.argv
+
+    Returns:
+        Código de salida (0 si se agregó algo)
+    """
+    args = list(sys.argv[1:] if argv is None else argv)
+    if args[:1] == ["--control"]:
+        if len(args) < 2:
+            print("[ERROR] No se especifico la orden")
+            return 1
+        return control(args[1])
+
+    quiet = "--quiet" in args
+    paths = [arg for arg in args if arg not in ("--add-wallpaper", "--quiet")]
+    if not paths:
+        print("[ERROR] No se especifico archivo")
+        return 1
+
+    # La instancia en ejecución agrupa, guarda y actualiza su lista
+    forwarded = send_command(CMD_ADD, [os.path.abspath(path) for path in paths])
+    if forwarded is not None:
+        print(f"[INFO] {forwarded} archivo(s) enviados a la aplicacion en ejecucion")
+        return 0
+
+    try:
+        result = add_wallpapers(paths)
+    except Exception as e:
+        title, message = "Error", f"Error agregando archivo:\n{e}"
+        result = None
+    else:
+        title, message = describe(result)
+
+    if quiet:
+        print(f"{title}: {message}")
+    else:
+        show_message(title, message)
+    return 0 if result is not None and result.added else 1
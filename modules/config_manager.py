@@ -3,27 +3,77 @@ Módulo de gestión de configuración
 Maneja la carga, guardado y validación de la configuración
 """
 
+import atexit
 import json
+import os
+import threading
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Callable, Iterable, List, Set
+
+from .runtime_state import RuntimeStateStore
+
+
+def get_cache_dir(name: str) -> Path:
+    """
+    Devuelve (y crea si hace falta) un subdirectorio de caché de la aplicación
+    
+    Args:
+        name: Nombre del subdirectorio (por ejemplo "media_index")
+        
+    Returns:
+        Ruta del directorio de caché
+    """
+    cache_dir = Path.home() / ".wallpaper_changer_cache" / name
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    return cache_dir
 
 
 class ConfigManager:
     """Gestiona la configuración de la aplicación"""
     
-    def __init__(self, config_file: Optional[Path] = None):
+    # Ventana de agrupación de escrituras en modo write-behind (segundos)
+    WRITE_DELAY_SECONDS = 0.5
+    
+    # Claves que cambian en cada rotación: viven en el almacén de estado, no en el JSON
+    RUNTIME_KEYS = frozenset(RuntimeStateStore.KEYS)
+    
+    # Claves que pasan al almacén SQLite cuando storage_backend == "sqlite"
+    PLAYLIST_KEYS = frozenset({"wallpapers", "weekday_playlists"})
+    MAIN_PLAYLIST = "wallpapers"
+    
+    def __init__(self, config_file: Optional[Path] = None, write_behind: bool = True):
         """
         Inicializa el gestor de configuración
         
         Args:
             config_file: Ruta al archivo de configuración. Si es None, usa la ubicación por defecto
+            write_behind: Si es True, save_config agrupa las escrituras y las hace
+                en segundo plano; flush() fuerza la escritura pendiente
         """
         if config_file is None:
             self.config_file = Path.home() / "wallpaper_changer_config.json"
         else:
-            self.config_file = config_file
+            self.config_file = Path(config_file)
         
+        self.write_behind = write_behind
+        self.writes = 0
+        self.listeners: List[Callable[[], None]] = []
+        self._dirty_keys: Set[str] = set()
+        self._write_timer: Optional[threading.Timer] = None
+        self._lock = threading.RLock()
         self.config = self.load_config()
+        self.runtime_state = RuntimeStateStore(self.config_file.with_suffix(".state"))
+        self._migrate_runtime_state()
+        
+        # Índice para detectar duplicados en O(1) con el backend JSON
+        self._wallpaper_index: Optional[Set[str]] = None
+        self.playlist_store = None
+        if self.config.get("storage_backend") == "sqlite":
+            self._open_playlist_store()
+        
+        if self.write_behind:
+            # No perder cambios pendientes al salir
+            atexit.register(self.flush)
     
     def get_default_config(self) -> Dict[str, Any]:
         """Retorna la configuración por defecto"""
@@ -54,8 +104,46 @@ class ConfigManager:
                 "6": {"use_folder": False, "folder": None, "wallpapers": []}
             },
             "weekday_rotation_minutes": 30,
-            "last_change": None,
-            "current_index": 0
+            # "event": planificador por eventos, "polling": verificación cada segundo (legacy)
+            "scheduler_mode": "event",
+            # Intervalo de sondeo de carpetas donde no hay inotify (segundos)
+            "folder_poll_seconds": 5,
+            # "json": listas dentro de este archivo, "sqlite": listas en <config>.db
+            "storage_backend": "json",
+            # Tamaño máximo de la caché de miniaturas en disco (MB)
+            "thumbnail_cache_mb": 64,
+            # Minutos con la ventana oculta en la bandeja antes de destruir la
+            # interfaz (se reconstruye al mostrarla; 0 = nunca)
+            "ui_teardown_minutes": 10,
+            # Video animado: "fill", "fit" o "stretch"
+            "video_fit_mode": "fill",
+            # Escalado de video: "fast", "balanced" o "quality"
+            "video_scaling_quality": "balanced",
+            # Caché de bucles decodificados en disco (MB, 0 = desactivada); solo
+            # se cachean los videos que caben enteros a resolución de pantalla
+            "video_loop_cache_mb": 0,
+            # Portada para el fondo estático de videos: "variance" (la muestra más
+            # variada) o "position" (fotograma en video_poster_position, 0.0 - 1.0)
+            "video_poster_strategy": "variance",
+            "video_poster_position": 0.1,
+            # Política de reproducción: pausar con el escritorio tapado o la sesión
+            # bloqueada; con batería "low_fps", "pause", "poster" o "play"; bajar a
+            # video_low_fps cuando la CPU supera video_cpu_threshold (%)
+            "video_policy_enabled": True,
+            "video_policy_seconds": 2,
+            "video_on_battery": "low_fps",
+            "video_low_fps": 10,
+            "video_cpu_threshold": 85,
+            # Cómo se aplica el fondo: "auto", "windows", "gnome", "feh", "swaybg"
+            # o "recording" (solo registra, para pruebas sin escritorio)
+            "desktop_backend": "auto",
+            # Segundos antes de cada cambio en que se prepara el próximo fondo (0 = sin precarga)
+            "prefetch_seconds": 15,
+            # Ajuste de las imágenes a la pantalla: "fill" (recorta), "fit" (bandas) o "center"
+            "wallpaper_fit_mode": "fill",
+            # Formato de la caché de imágenes normalizadas ("jpeg" o "bmp") y su límite
+            "display_cache_format": "jpeg",
+            "display_cache_mb": 256
         }
     
     def load_config(self) -> Dict[str, Any]:
@@ -72,29 +160,308 @@ class ConfigManager:
         
         return default_config
     
+    def _migrate_runtime_state(self) -> None:
+        """Saca el estado de ejecución del JSON (configuraciones antiguas) y lo pasa al almacén"""
+        legacy = {key: self.config.pop(key) for key in self.RUNTIME_KEYS if key in self.config}
+        if not self.runtime_state.exists:
+            values = {key: value for key, value in legacy.items() if value is not None}
+            if values:
+                self.runtime_state.update(values)
+        if legacy:
+            # Reescribir el JSON sin esas claves en el próximo guardado
+            self._dirty_keys.update(legacy)
+    
+    def _open_playlist_store(self) -> None:
+        """Abre el almacén SQLite y migra las listas del JSON la primera vez"""
+        try:
+            from .playlist_store import PlaylistStore
+            store = PlaylistStore(self.config_file.with_suffix(".db"))
+        except Exception as e:
+            print(f"⚠️ Almacén SQLite no disponible, usando JSON: {e}")
+            return
+        
+        legacy = {key: self.config.pop(key) for key in self.PLAYLIST_KEYS if key in self.config}
+        self.playlist_store = store
+        if store.get_meta("migrated_from_json") is None:
+            if legacy.get("wallpapers"):
+                store.set_items(self.MAIN_PLAYLIST, legacy["wallpapers"])
+            if legacy.get("weekday_playlists"):
+                self._set_weekday_playlists(legacy["weekday_playlists"])
+            store.set_meta("migrated_from_json", "1")
+            # Reescribir el JSON sin las listas en el próximo guardado
+            self._dirty_keys.update(legacy)
+            print("📦 Listas de fondos migradas a SQLite")
+    
+    @staticmethod
+    def _day_playlist(day: str) -> str:
+        """Nombre de la playlist de un día en el almacén SQLite"""
+        return f"day:{day}"
+    
+    def _get_weekday_playlists(self) -> Dict[str, Dict[str, Any]]:
+        """Reconstruye weekday_playlists desde el almacén SQLite"""
+        playlists = {}
+        for i in range(7):
+            name = self._day_playlist(str(i))
+            data = self.playlist_store.get_playlist_options(name)
+            data["images"] = self.playlist_store.get_items(name)
+            playlists[str(i)] = data
+        return playlists
+    
+    def _set_weekday_playlists(self, playlists: Dict[str, Dict[str, Any]]) -> None:
+        """Guarda weekday_playlists en el almacén SQLite"""
+        for day, data in (playlists or {}).items():
+            data = data or {}
+            # La GUI guarda la lista del día como "images"
+            items = data.get("images") or data.get("wallpapers") or []
+            self.playlist_store.set_playlist(self._day_playlist(day), data.get("use_folder", False),
+                                             data.get("folder"), items)
+    
+    def _get_wallpaper_index(self) -> Set[str]:
+        """Conjunto de rutas de la lista manual (backend JSON)"""
+        if self._wallpaper_index is None:
+            self._wallpaper_index = set(self.config.get("wallpapers") or [])
+        return self._wallpaper_index
+    
+    def add_wallpapers(self, paths: Iterable[str]) -> List[str]:
+        """
+        Agrega archivos a la lista manual ignorando los que ya están
+        
+        Args:
+            paths: Rutas a agregar (en orden)
+            
+        Returns:
+            Rutas que realmente se agregaron
+        """
+        if self.playlist_store is not None:
+            return self.playlist_store.add_items(self.MAIN_PLAYLIST, paths)
+        
+        added = []
+        with self._lock:
+            index = self._get_wallpaper_index()
+            wallpapers = self.config.setdefault("wallpapers", [])
+            for path in paths:
+                if path not in index:
+                    index.add(path)
+                    wallpapers.append(path)
+                    added.append(path)
+            if added:
+                self._dirty_keys.add("wallpapers")
+        return added
+    
+    def remove_wallpapers(self, paths: Iterable[str]) -> List[str]:
+        """
+        Quita archivos de la lista manual
+        
+        Args:
+            paths: Rutas a quitar
+            
+        Returns:
+            Rutas que estaban en la lista
+        """
+        paths = list(paths)
+        if self.playlist_store is not None:
+            return self.playlist_store.remove_items(self.MAIN_PLAYLIST, paths)
+        
+        with self._lock:
+            index = self._get_wallpaper_index()
+            removed = {path for path in paths if path in index}
+            if removed:
+                index.difference_update(removed)
+                self.config["wallpapers"] = [w for w in self.config.get("wallpapers", [])
+                                             if w not in removed]
+                self._dirty_keys.add("wallpapers")
+        return [path for path in paths if path in removed]
+    
+    def has_wallpaper(self, path: str) -> bool:
+        """Comprueba si un archivo está en la lista manual"""
+        if self.playlist_store is not None:
+            return self.playlist_store.contains(self.MAIN_PLAYLIST, path)
+        with self._lock:
+            return path in self._get_wallpaper_index()
+    
+    def count_wallpapers(self) -> int:
+        """Número de archivos de la lista manual"""
+        if self.playlist_store is not None:
+            return self.playlist_store.count(self.MAIN_PLAYLIST)
+        return len(self.config.get("wallpapers") or [])
+    
+    def get_wallpapers_page(self, offset: int = 0, limit: Optional[int] = None) -> List[str]:
+        """
+        Obtiene una página de la lista manual
+        
+        Args:
+            offset: Posición del primer elemento
+            limit: Máximo de elementos (None = hasta el final)
+            
+        Returns:
+            Lista de rutas
+        """
+        if self.playlist_store is not None:
+            return self.playlist_store.get_page(self.MAIN_PLAYLIST, offset, limit)
+        wallpapers = self.config.get("wallpapers") or []
+        end = None if limit is None else offset + limit
+        return list(wallpapers[offset:end])
+    
     def save_config(self) -> bool:
         """
         Guarda la configuración en el archivo JSON
         
+        En modo write-behind solo programa la escritura: los cambios que
+        lleguen dentro de la ventana se escriben juntos en una sola vez.
+        
+        Returns:
+            True si se guardó (o programó) correctamente, False en caso contrario
+        """
+        if self.write_behind:
+            with self._lock:
+                if self._dirty_keys and self._write_timer is None:
+                    self._write_timer = threading.Timer(self.WRITE_DELAY_SECONDS, self.flush)
+                    self._write_timer.daemon = True
+                    self._write_timer.start()
+            self.notify_listeners()
+            return True
+        
+        with self._lock:
+            success = self._write_config()
+        if success:
+            self.notify_listeners()
+        return success
+    
+    def flush(self) -> bool:
+        """
+        Escribe inmediatamente los cambios pendientes (usar al cerrar)
+        
         Returns:
-            True si se guardó correctamente, False en caso contrario
+            True si no quedaron cambios sin escribir
         """
+        with self._lock:
+            if self._write_timer is not None:
+                self._write_timer.cancel()
+                self._write_timer = None
+            if not self._dirty_keys:
+                return True
+            return self._write_config()
+    
+    def reload(self) -> None:
+        """
+        Vuelve a leer el JSON (editado a mano o por otra herramienta) y avisa a
+        los oyentes. Los cambios propios pendientes se escriben antes
+        """
+        self.flush()
+        with self._lock:
+            config = self.load_config()
+            for key in self.RUNTIME_KEYS:
+                config.pop(key, None)
+            if self.playlist_store is not None:
+                for key in self.PLAYLIST_KEYS:
+                    config.pop(key, None)
+            self.config = config
+            self._wallpaper_index = None
+        self.notify_listeners()
+    
+    def _write_config(self) -> bool:
+        """
+        Escribe el JSON de forma atómica: archivo temporal + fsync + rename
+        
+        Returns:
+            True si se escribió correctamente
+        """
+        temp_file = self.config_file.with_name(f".{self.config_file.name}.tmp")
         try:
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                json.dump(self.config, f, indent=4, ensure_ascii=False)
+            data = json.dumps(self.config, indent=4, ensure_ascii=False)
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_file, self.config_file)
+            self._fsync_dir()
+            self._dirty_keys.clear()
+            self.writes += 1
             return True
         except Exception as e:
             print(f"Error guardando configuración: {e}")
+            try:
+                temp_file.unlink()
+            except OSError:
+                pass
             return False
     
+    def _fsync_dir(self) -> None:
+        """Sincroniza el directorio para que el rename sobreviva a un corte de energía"""
+        if os.name != 'posix':
+            return
+        try:
+            fd = os.open(self.config_file.parent, os.O_RDONLY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+        except OSError:
+            pass
+    
+    def add_listener(self, callback: Callable[[], None]) -> None:
+        """
+        Registra una función que se llama cada vez que se guarda la configuración
+        
+        Args:
+            callback: Función sin argumentos
+        """
+        if callback not in self.listeners:
+            self.listeners.append(callback)
+    
+    def remove_listener(self, callback: Callable[[], None]) -> None:
+        """Elimina una función registrada con add_listener"""
+        if callback in self.listeners:
+            self.listeners.remove(callback)
+    
+    def notify_listeners(self) -> None:
+        """Notifica a los oyentes que la configuración cambió"""
+        for callback in list(self.listeners):
+            try:
+                callback()
+            except Exception as e:
+                print(f"Error notificando cambio de configuración: {e}")
+    
     def get(self, key: str, default: Any = None) -> Any:
         """Obtiene un valor de la configuración"""
+        if key in self.RUNTIME_KEYS:
+            value = self.runtime_state.get(key)
+            return default if value is None else value
+        if self.playlist_store is not None and key in self.PLAYLIST_KEYS:
+            if key == "weekday_playlists":
+                return self._get_weekday_playlists()
+            return self.playlist_store.get_items(self.MAIN_PLAYLIST)
         return self.config.get(key, default)
     
     def set(self, key: str, value: Any) -> None:
         """Establece un valor en la configuración"""
-        self.config[key] = value
+        if key in self.RUNTIME_KEYS:
+            # Escritura O(1) en el almacén de estado; el JSON no se toca
+            self.runtime_state.set(key, value)
+            return
+        if self.playlist_store is not None and key in self.PLAYLIST_KEYS:
+            if key == "weekday_playlists":
+                self._set_weekday_playlists(value)
+            else:
+                self.playlist_store.set_items(self.MAIN_PLAYLIST, value or [])
+            return
+        with self._lock:
+            self.config[key] = value
+            self._dirty_keys.add(key)
+            if key == "wallpapers":
+                self._wallpaper_index = None
     
     def update(self, updates: Dict[str, Any]) -> None:
         """Actualiza múltiples valores de la configuración"""
-        self.config.update(updates)
+        runtime = {key: value for key, value in updates.items() if key in self.RUNTIME_KEYS}
+        if runtime:
+            self.runtime_state.update(runtime)
+        config_updates = {key: value for key, value in updates.items() if key not in self.RUNTIME_KEYS}
+        if self.playlist_store is not None:
+            for key in self.PLAYLIST_KEYS & set(config_updates):
+                self.set(key, config_updates.pop(key))
+        with self._lock:
+            self.config.update(config_updates)
+            self._dirty_keys.update(config_updates)
+            if "wallpapers" in config_updates:
+                self._wallpaper_index = None
@@ -0,0 +1,158 @@
+"""
+Módulo del contador regresivo
+Publica el tiempo restante hasta el próximo cambio solo a consumidores visibles
+"""
+
+import threading
+from typing import Callable, List, Optional
+
+
+def format_remaining(minutes: int, seconds: int) -> str:
+    """
+    Texto del tiempo restante: solo minutos mientras falte más de uno (el
+    contador solo publica una vez por minuto) y segundos en el último
+
+    Returns:
+        Por ejemplo "5m" o "42s"
+    """
+    return f"{minutes}m" if minutes > 0 else f"{seconds}s"
+
+
+class CountdownPublisher:
+    """Publicador del contador con frecuencia adaptativa e independiente del motor"""
+
+    # Granularidad que necesita cada suscriptor
+    GRANULARITY_SECONDS = "seconds"
+    GRANULARITY_MINUTES = "minutes"
+
+    def __init__(self, get_seconds_remaining: Callable[[], Optional[int]]):
+        """
+        Inicializa el publicador
+
+        Args:
+            get_seconds_remaining: Función que devuelve los segundos hasta el
+                próximo cambio o None si no aplica (por ejemplo, modo días)
+        """
+        self.get_seconds_remaining = get_seconds_remaining
+        self.running = False
+        self.thread = None
+        self.ticks = 0
+        self._subscribers: List[dict] = []
+        self._condition = threading.Condition()
+        self._refresh_requested = False
+
+    def subscribe(self, callback: Callable[[int, int], None],
+                  is_active: Optional[Callable[[], bool]] = None,
+                  granularity: str = GRANULARITY_SECONDS) -> None:
+        """
+        Registra un consumidor del contador
+
+        Args:
+            callback: Función que recibe (minutos, segundos)
+            is_active: Función que indica si el consumidor está visible.
+                Si es None, se considera siempre visible
+            granularity: GRANULARITY_SECONDS o GRANULARITY_MINUTES
+        """
+        with self._condition:
+            self._subscribers = [s for s in self._subscribers if s["callback"] != callback]
+            self._subscribers.append({
+                "callback": callback,
+                "is_active": is_active,
+                "granularity": granularity
+            })
+            self._refresh_requested = True
+            self._condition.notify_all()
+
+    def unsubscribe(self, callback: Callable[[int, int], None]) -> None:
+        """Elimina un consumidor registrado con subscribe"""
+        with self._condition:
+            self._subscribers = [s for s in self._subscribers if s["callback"] != callback]
+
+    def refresh(self) -> None:
+        """
+        Despierta el publicador: cambió la visibilidad de un consumidor
+        o la fecha del próximo cambio
+        """
+        with self._condition:
+            self._refresh_requested = True
+            self._condition.notify_all()
+
+    def start(self) -> None:
+        """Inicia el hilo del contador"""
+        if self.running:
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self._loop, daemon=True)
+        self.thread.start()
+
+    def stop(self) -> None:
+        """Detiene el hilo del contador"""
+        with self._condition:
+            self.running = False
+            self._condition.notify_all()
+        if self.thread:
+            self.thread.join(timeout=2)
+
+    def _active_subscribers(self) -> List[dict]:
+        """Devuelve los suscriptores cuyo consumidor está visible"""
+        active = []
+        for sub in list(self._subscribers):
+            try:
+                if sub["is_active"] is None or sub["is_active"]():
+                    active.append(sub)
+            except Exception:
+                pass
+        return active
+
+    @classmethod
+    def next_interval(cls, seconds_remaining: int, granularities: List[str]) -> float:
+        """
+        Calcula cuánto esperar hasta el siguiente tick
+
+        1 Hz en el último minuto si algún consumidor muestra segundos;
+        en otro caso, alineado al siguiente minuto entero.
+
+        Args:
+            seconds_remaining: Segundos hasta el próximo cambio
+            granularities: Granularidades de los consumidores activos
+
+        Returns:
+            Segundos de espera
+        """
+        if seconds_remaining <= 0:
+            return 1
+        if seconds_remaining <= 60:
+            # 60 ya cuenta como último minuto: el siguiente tick muestra 59 s
+            if cls.GRANULARITY_SECONDS in granularities:
+                return 1
+            return seconds_remaining
+        # Despertar justo al entrar en el minuto siguiente (120 -> 60, 61 -> 60)
+        return (seconds_remaining - 1) % 60 + 1
+
+    def _loop(self) -> None:
+        """Loop del contador: solo despierta mientras hay consumidores visibles"""
+        while self.running:
+            active = self._active_subscribers()
+            seconds_remaining = self.get_seconds_remaining() if active else None
+
+            if seconds_remaining is not None:
+                minutes, seconds = divmod(seconds_remaining, 60)
+                for sub in active:
+                    try:
+                        sub["callback"](minutes, seconds)
+                    except Exception:
+                        # Un consumidor con errores no debe detener el contador
+                        pass
+                self.ticks += 1
+                timeout = self.next_interval(
+                    seconds_remaining, [s["granularity"] for s in active])
+            else:
+                # Nadie mira o no hay contador: dormir hasta un refresh
+                timeout = None
+
+            with self._condition:
+                if not self.running:
+                    break
+                if not self._refresh_requested:
+                    self._condition.wait(timeout)
+                self._refresh_requested = False
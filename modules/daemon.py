@@ -0,0 +1,217 @@
+"""
+Módulo del modo daemon
+Ejecuta solo el motor de fondos (configuración, planificador y, si se pide, el
+icono de bandeja) sin Tk ni CustomTkinter, para equipos que nunca abren la
+ventana de configuración. Se controla por el canal de instancia única
+"""
+
+import queue
+import signal
+import sys
+import threading
+from typing import Callable, List, Optional
+
+from .cli import add_wallpapers, describe
+from .config_manager import ConfigManager
+from .instance_server import (CMD_CHANGE_NOW, CMD_QUIT, CMD_RELOAD, CMD_SHOW, CMD_STATUS,
+                              InstanceServer)
+from .wallpaper_engine import WallpaperEngine
+
+
+class EngineDaemon:
+    """Motor de fondos sin interfaz con un bucle de eventos propio en el hilo principal"""
+
+    # Espera máxima de una orden que se ejecuta en el hilo principal
+    CALL_TIMEOUT = 30.0
+
+    def __init__(self, config_manager: Optional[ConfigManager] = None, tray: bool = False,
+                 address: Optional[str] = None, authkey: Optional[bytes] = None):
+        """
+        Args:
+            config_manager: Gestor de configuración. Si es None, usa el de por defecto
+            tray: Si es True, muestra el icono de bandeja (carga pystray y PIL)
+            address: Dirección del canal de control. Si es None, la del usuario actual
+            authkey: Clave del canal. Si es None, la del usuario actual
+        """
+        self.config_manager = config_manager or ConfigManager()
+        self.wallpaper_engine = WallpaperEngine(self.config_manager)
+        self.use_tray = tray
+        self.tray_manager = None
+        self.instance_server = InstanceServer(
+            on_add=lambda paths: self.after(0, self.add_paths, paths),
+            handlers={
+                CMD_CHANGE_NOW: lambda _payload: self.call(self.change_now),
+                CMD_RELOAD: lambda _payload: self.call(self.reload),
+                CMD_STATUS: lambda _payload: self.get_status(),
+                # Sin ventana: el cliente sabe que ya hay una instancia
+                CMD_SHOW: lambda _payload: False,
+                CMD_QUIT: lambda _payload: self.after(0, self.quit) or True,
+            },
+            address=address, authkey=authkey)
+        self._calls: "queue.Queue" = queue.Queue()
+        self.running = False
+
+    # Interfaz mínima de root que usan SystemTrayManager y los hilos del motor
+
+    def after(self, delay_ms: int, func: Callable, *args) -> None:
+        """Ejecuta func(*args) en el hilo principal tras delay_ms milisegundos"""
+        if delay_ms <= 0:
+            self._calls.put((func, args))
+            return
+        timer = threading.Timer(delay_ms / 1000, self._calls.put, args=((func, args),))
+        timer.daemon = True
+        timer.start()
+
+    def withdraw(self) -> None:
+        """No hay ventana que ocultar"""
+
+    def call(self, func: Callable, *args):
+        """
+        Ejecuta func(*args) en el hilo principal y espera su resultado
+
+        Returns:
+            Resultado de func o None si no terminó a tiempo
+        """
+        done = threading.Event()
+        result: List[object] = [None]
+
+        def run():
+            try:
+                result[0] = func(*args)
+            finally:
+                done.set()
+
+        self.after(0, run)
+        done.wait(self.CALL_TIMEOUT)
+        return result[0]
+
+    # Ciclo de vida
+
+    def start(self) -> bool:
+        """
+        Abre el canal de control e inicia el motor
+
+        Returns:
+            False si ya hay otra instancia en ejecución
+        """
+        if not self.instance_server.start():
+            return False
+        self.running = True
+        self.wallpaper_engine.start_monitoring()
+        if self.use_tray:
+            self.setup_system_tray()
+        return True
+
+    def run(self) -> int:
+        """
+        Atiende las llamadas hasta quit() o una señal de terminación
+
+        Returns:
+            Código de salida
+        """
+        if not self.start():
+            print("[INFO] La aplicacion ya esta en ejecucion")
+            return 1
+        if threading.current_thread() is threading.main_thread():
+            for name in ("SIGTERM", "SIGINT"):
+                if hasattr(signal, name):
+                    signal.signal(getattr(signal, name), lambda *_args: self.quit())
+        print("[INFO] Motor de fondos en modo daemon")
+
+        while self.running:
+            try:
+                # Con tiempo de espera para que las señales se atiendan también en Windows
+                func, args = self._calls.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            try:
+                func(*args)
+            except Exception as e:
+                print(f"Error en el daemon: {e}")
+
+        self.shutdown()
+        return 0
+
+    def quit(self) -> None:
+        """Termina el bucle de run()"""
+        self.running = False
+
+    def shutdown(self) -> None:
+        """Detiene el canal, el motor y la bandeja y escribe la configuración"""
+        self.instance_server.stop()
+        self.wallpaper_engine.stop_monitoring()
+        self.config_manager.flush()
+        if self.tray_manager:
+            self.tray_manager.stop()
+
+    # Órdenes
+
+    def change_now(self) -> bool:
+        """Cambia el fondo en el momento (el motor lo serializa con la fecha límite)"""
+        return self.wallpaper_engine.change_wallpaper()
+
+    def reload(self) -> bool:
+        """Vuelve a leer la configuración; el planificador recalcula la fecha límite"""
+        self.config_manager.reload()
+        return True
+
+    def get_status(self) -> dict:
+        """Estado del motor para `--control status`"""
+        return {
+            "mode": self.config_manager.get("mode", "time"),
+            "wallpapers": self.config_manager.count_wallpapers(),
+            "seconds_to_next_change": self.wallpaper_engine.get_time_until_next_change(),
+            "apply": self.wallpaper_engine.get_apply_stats(),
+        }
+
+    def add_paths(self, paths: List[str]) -> None:
+        """Agrega las rutas recibidas por el canal (menú contextual)"""
+        title, message = describe(add_wallpapers(paths, self.config_manager))
+        print(f"{title}: {message}")
+        if self.tray_manager:
+            try:
+                self.tray_manager.notify(title, message)
+            except Exception:
+                pass
+
+    # Bandeja
+
+    def setup_system_tray(self) -> None:
+        """Muestra el icono de bandeja si pystray está disponible"""
+        try:
+            from .system_tray import SystemTrayManager
+        except Exception as e:
+            # pystray también falla al importarse si no hay sesión gráfica
+            print(f"[ADVERTENCIA] Bandeja no disponible: {e}")
+            return
+        self.tray_manager = SystemTrayManager(
+            root=self,
+            on_show=self.show_window,
+            on_change_now=self.change_now,
+            on_quit=self.quit)
+        self.tray_manager.setup()
+        self.wallpaper_engine.countdown.subscribe(
+            self.tray_manager.update_countdown,
+            is_active=self.tray_manager.is_visible,
+            granularity="minutes")
+
+    def show_window(self) -> None:
+        """En modo daemon no hay ventana de configuración"""
+        if self.tray_manager:
+            self.tray_manager.notify(
+                "Modo daemon",
+                "Cierre el daemon y abra la aplicación para cambiar la configuración.")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Punto de entrada de `--daemon [--tray]`
+
+    Args:
+        argv: Argumentos sin el nombre del programa. Si es None, usa sys.argv
+
+    Returns:
+        Código de salida
+    """
+    args = list(sys.argv[1:] if argv is None else argv)
+    return EngineDaemon(tray="--tray" in args).run()
@@ -0,0 +1,315 @@
+"""
+Módulo de backends de escritorio
+Aplica imágenes como fondo en cada plataforma y mide cuánto tarda cada cambio
+"""
+
+import ctypes
+import json
+import math
+import os
+import shutil
+import subprocess
+import sys
+import time
+from collections import deque
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+
+class DesktopBackend:
+    """Interfaz común: apply() pone una imagen de fondo y clear() deja un fondo liso"""
+
+    name = "base"
+
+    def __init__(self, history: int = 512):
+        """
+        Args:
+            history: Tiempos de aplicación que se guardan para las estadísticas
+        """
+        self.latencies = deque(maxlen=history)
+        self.failures = 0
+
+    def apply(self, image_path: str) -> bool:
+        """
+        Aplica una imagen como fondo y registra la latencia
+
+        Args:
+            image_path: Ruta absoluta de la imagen
+
+        Returns:
+            True si el sistema aceptó el cambio
+        """
+        return self._timed(self._apply, image_path)
+
+    def clear(self) -> bool:
+        """Quita la imagen de fondo (color liso)"""
+        return self._timed(self._clear)
+
+    def _timed(self, func, *args) -> bool:
+        start = time.perf_counter()
+        try:
+            ok = bool(func(*args))
+        except Exception as e:
+            print(f"❌ Error del backend de escritorio ({self.name}): {e}")
+            ok = False
+        self.latencies.append(time.perf_counter() - start)
+        if not ok:
+            self.failures += 1
+        return ok
+
+    def _apply(self, image_path: str) -> bool:
+        raise NotImplementedError
+
+    def _clear(self) -> bool:
+        return self._apply("")
+
+    def screen_size(self) -> Optional[Tuple[int, int]]:
+        """(ancho, alto) de la pantalla principal o None si no se puede saber"""
+        return None
+
+    def latency_stats(self) -> Dict[str, float]:
+        """
+        Distribución de latencias de las últimas aplicaciones
+
+        Returns:
+            Diccionario con count, failures, mean_ms, p50_ms, p95_ms y max_ms
+        """
+        samples = sorted(self.latencies)
+        if not samples:
+            return {"count": 0, "failures": self.failures, "mean_ms": 0.0,
+                    "p50_ms": 0.0, "p95_ms": 0.0, "max_ms": 0.0}
+
+        def percentile(p: float) -> float:
+            # Rango más cercano
+            index = max(0, min(len(samples) - 1, math.ceil(p * len(samples)) - 1))
+            return samples[index] * 1000
+
+        return {
+            "count": len(samples),
+            "failures": self.failures,
+            "mean_ms": sum(samples) / len(samples) * 1000,
+            "p50_ms": percentile(0.50),
+            "p95_ms": percentile(0.95),
+            "max_ms": samples[-1] * 1000,
+        }
+
+
+class WindowsSPIBackend(DesktopBackend):
+    """SystemParametersInfoW(SPI_SETDESKWALLPAPER)"""
+
+    name = "windows"
+    SPI_SETDESKWALLPAPER = 20
+    SPIF_UPDATEINIFILE_SENDCHANGE = 3
+
+    def screen_size(self) -> Optional[Tuple[int, int]]:
+        try:
+            user32 = ctypes.windll.user32
+            return user32.GetSystemMetrics(0), user32.GetSystemMetrics(1)  # SM_CXSCREEN, SM_CYSCREEN
+        except Exception:
+            return None
+
+    def _apply(self, image_path: str) -> bool:
+        return bool(ctypes.windll.user32.SystemParametersInfoW(
+            self.SPI_SETDESKWALLPAPER, 0, image_path, self.SPIF_UPDATEINIFILE_SENDCHANGE))
+
+
+class CommandBackend(DesktopBackend):
+    """Backend que ejecuta herramientas externas"""
+
+    timeout = 10
+
+    def _run(self, command: List[str]) -> bool:
+        result = subprocess.run(command, capture_output=True, timeout=self.timeout)
+        if result.returncode != 0:
+            print(f"⚠️ {command[0]} devolvió {result.returncode}: "
+                  f"{result.stderr.decode(errors='replace').strip()}")
+        return result.returncode == 0
+
+    def screen_size(self) -> Optional[Tuple[int, int]]:
+        # "Screen 0: minimum 8 x 8, current 1920 x 1080, maximum ..."
+        if not shutil.which("xrandr"):
+            return None
+        try:
+            result = subprocess.run(["xrandr", "--current"], capture_output=True,
+                                    timeout=self.timeout)
+            header = result.stdout.decode(errors="replace").split("\n", 1)[0]
+            width, _x, height = header.split("current ", 1)[1].split(",", 1)[0].split()
+            return int(width), int(height)
+        except (OSError, subprocess.SubprocessError, IndexError, ValueError):
+            return None
+
+
+class GnomeBackend(CommandBackend):
+    """gsettings (GNOME, también el tema oscuro)"""
+
+    name = "gnome"
+    SCHEMA = "org.gnome.desktop.background"
+    # Ajuste al aplicar; clear() lo cambia a "none"
+    PICTURE_OPTIONS = "zoom"
+
+    def _apply(self, image_path: str) -> bool:
+        # as_uri() escapa espacios, "#" y caracteres no ASCII
+        uri = Path(os.path.abspath(image_path)).as_uri() if image_path else ""
+        ok = self._run(["gsettings", "set", self.SCHEMA, "picture-uri", uri])
+        # Tras un clear() el fondo seguiría oculto
+        ok = self._run(["gsettings", "set", self.SCHEMA, "picture-options",
+                        self.PICTURE_OPTIONS]) and ok
+        # picture-uri-dark no existe antes de GNOME 42: no es un error
+        self._run_optional(["gsettings", "set", self.SCHEMA, "picture-uri-dark", uri])
+        return ok
+
+    def _clear(self) -> bool:
+        return self._run(["gsettings", "set", self.SCHEMA, "picture-options", "none"])
+
+    def _run_optional(self, command: List[str]) -> None:
+        subprocess.run(command, capture_output=True, timeout=self.timeout)
+
+
+class FehBackend(CommandBackend):
+    """feh (gestores de ventanas X11)"""
+
+    name = "feh"
+
+    def _apply(self, image_path: str) -> bool:
+        return self._run(["feh", "--no-fehbg", "--bg-fill", image_path])
+
+    def _clear(self) -> bool:
+        return self._run(["xsetroot", "-solid", "black"]) if shutil.which("xsetroot") else False
+
+
+class SwaybgBackend(DesktopBackend):
+    """
+    swaybg (Wayland/wlroots). swaybg no avisa cuando termina de pintar: el
+    proceso anterior se cierra cuando el nuevo lleva SETTLE_SECONDS en marcha
+    """
+
+    name = "swaybg"
+    SETTLE_SECONDS = 0.3
+    timeout = 10
+
+    def __init__(self, history: int = 512):
+        super().__init__(history)
+        self.process: Optional[subprocess.Popen] = None
+
+    def screen_size(self) -> Optional[Tuple[int, int]]:
+        # Modo de la primera salida activa según swaymsg (píxeles físicos)
+        if not shutil.which("swaymsg"):
+            return None
+        try:
+            result = subprocess.run(["swaymsg", "-r", "-t", "get_outputs"],
+                                    capture_output=True, timeout=self.timeout)
+            outputs = json.loads(result.stdout.decode(errors="replace") or "[]")
+            for output in outputs:
+                mode = output.get("current_mode") or {}
+                if output.get("active") and mode.get("width") and mode.get("height"):
+                    return int(mode["width"]), int(mode["height"])
+        except (OSError, subprocess.SubprocessError, ValueError, AttributeError, TypeError):
+            pass
+        return None
+
+    def _spawn(self, args: List[str]) -> bool:
+        previous = self.process
+        process = subprocess.Popen(["swaybg"] + args, stdout=subprocess.DEVNULL,
+                                   stderr=subprocess.DEVNULL)
+        try:
+            process.wait(timeout=self.SETTLE_SECONDS)
+        except subprocess.TimeoutExpired:
+            # Sigue en marcha: ya puede reemplazar al anterior sin dejar un fotograma vacío
+            self.process = process
+            if previous is not None:
+                previous.terminate()
+            return True
+        # Terminó enseguida (ruta inválida, sin compositor): se conserva el anterior
+        return False
+
+    def _apply(self, image_path: str) -> bool:
+        return self._spawn(["-m", "fill", "-i", image_path])
+
+    def _clear(self) -> bool:
+        return self._spawn(["-c", "#000000"])
+
+
+class RecordingBackend(DesktopBackend):
+    """Backend en memoria para pruebas y mediciones sin escritorio"""
+
+    name = "recording"
+
+    def __init__(self, history: int = 512, delay: float = 0.0, fail: bool = False,
+                 size: Optional[Tuple[int, int]] = None):
+        """
+        Args:
+            delay: Segundos simulados por aplicación
+            fail: Si es True, todas las aplicaciones fallan
+            size: Tamaño de pantalla simulado
+        """
+        super().__init__(history)
+        self.delay = delay
+        self.fail = fail
+        self.size = size
+        self.calls: List[Tuple[str, str]] = []  # (acción, ruta)
+
+    def screen_size(self) -> Optional[Tuple[int, int]]:
+        return self.size
+
+    @property
+    def current(self) -> Optional[str]:
+        """Última imagen aplicada ("" tras clear()) o None si no hubo cambios"""
+        return self.calls[-1][1] if self.calls else None
+
+    def _apply(self, image_path: str) -> bool:
+        if self.delay:
+            time.sleep(self.delay)
+        if self.fail:
+            return False
+        self.calls.append(("apply", image_path))
+        return True
+
+    def _clear(self) -> bool:
+        if self.fail:
+            return False
+        self.calls.append(("clear", ""))
+        return True
+
+
+BACKENDS = {
+    "windows": WindowsSPIBackend,
+    "gnome": GnomeBackend,
+    "feh": FehBackend,
+    "swaybg": SwaybgBackend,
+    "recording": RecordingBackend,
+}
+
+
+def detect_backend_name() -> str:
+    """Elige el backend adecuado para el escritorio actual"""
+    if sys.platform == "win32":
+        return "windows"
+    desktop = os.environ.get("XDG_CURRENT_DESKTOP", "").lower()
+    if "gnome" in desktop or "unity" in desktop or "budgie" in desktop:
+        return "gnome"
+    if os.environ.get("WAYLAND_DISPLAY") and shutil.which("swaybg"):
+        return "swaybg"
+    if os.environ.get("DISPLAY") and shutil.which("feh"):
+        return "feh"
+    return "recording"
+
+
+def create_backend(name: str = "auto") -> DesktopBackend:
+    """
+    Crea un backend de escritorio
+
+    Args:
+        name: "auto", "windows", "gnome", "feh", "swaybg" o "recording"
+
+    Returns:
+        Instancia del backend (recording si no hay escritorio compatible)
+    """
+    if name in (None, "", "auto"):
+        name = detect_backend_name()
+        if name == "recording":
+            print("⚠️ No se detectó un escritorio compatible: los cambios solo se registran")
+    backend_class = BACKENDS.get(name)
+    if backend_class is None:
+        print(f"⚠️ Backend de escritorio desconocido: {name}, usando detección automática")
+        return create_backend("auto")
+    return backend_class()
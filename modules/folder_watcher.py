@@ -0,0 +1,388 @@
+"""
+Módulo de vigilancia de carpetas
+Detecta altas, bajas y renombrados en las carpetas de fondos y los agrupa
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from .media_library import get_media_kind
+
+
+# Evento de un backend: (carpeta, nombre). Nombre None = reescanear la carpeta
+WatchEvent = Tuple[str, Optional[str]]
+
+
+class PollingBackend:
+    """Backend portátil: compara el mtime de cada carpeta y solo lista las que cambiaron"""
+
+    name = "polling"
+
+    def __init__(self, poll_seconds: float = 5.0):
+        """
+        Args:
+            poll_seconds: Intervalo entre comprobaciones
+        """
+        self.poll_seconds = poll_seconds
+        self._folders: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+
+    @staticmethod
+    def _snapshot(folder: str) -> Optional[dict]:
+        """Lee mtime y nombres de medios de una carpeta"""
+        try:
+            dir_mtime = os.stat(folder).st_mtime_ns
+            with os.scandir(folder) as it:
+                names = {item.name for item in it if get_media_kind(item.name)}
+            return {"mtime": dir_mtime, "names": names}
+        except OSError:
+            return None
+
+    def add(self, folder: str) -> bool:
+        with self._lock:
+            if folder not in self._folders:
+                self._folders[folder] = self._snapshot(folder)
+        return True
+
+    def remove(self, folder: str) -> None:
+        with self._lock:
+            self._folders.pop(folder, None)
+
+    def read_events(self, timeout: Optional[float]) -> List[WatchEvent]:
+        """Espera hasta el siguiente sondeo y devuelve los nombres que cambiaron"""
+        wait = self.poll_seconds if timeout is None else min(timeout, self.poll_seconds)
+        if self._wake.wait(wait):
+            self._wake.clear()
+            return []
+
+        events: List[WatchEvent] = []
+        with self._lock:
+            folders = list(self._folders.items())
+        for folder, previous in folders:
+            try:
+                dir_mtime = os.stat(folder).st_mtime_ns
+            except OSError:
+                if previous is not None:
+                    events.append((folder, None))
+                    with self._lock:
+                        self._folders[folder] = None
+                continue
+            if previous is not None and previous["mtime"] == dir_mtime:
+                continue
+
+            current = self._snapshot(folder)
+            with self._lock:
+                if folder in self._folders:
+                    self._folders[folder] = current
+            if previous is None or current is None:
+                events.append((folder, None))
+                continue
+            for name in previous["names"] ^ current["names"]:
+                events.append((folder, name))
+        return events
+
+    def wake(self) -> None:
+        self._wake.set()
+
+    def close(self) -> None:
+        self.wake()
+
+
+class InotifyBackend:
+    """Backend para Linux basado en inotify (vía ctypes, sin dependencias)"""
+
+    name = "inotify"
+
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_DELETE_SELF = 0x00000400
+    IN_MOVE_SELF = 0x00000800
+    IN_Q_OVERFLOW = 0x00004000
+    IN_IGNORED = 0x00008000
+    IN_NONBLOCK = 0o4000
+    IN_CLOEXEC = 0o2000000
+
+    WATCH_MASK = (IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE |
+                  IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF)
+    EVENT_HEADER = struct.Struct("iIII")
+
+    def __init__(self):
+        libc_name = ctypes.util.find_library("c") or "libc.so.6"
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        self._fd = self._libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 falló")
+        self._wake_r, self._wake_w = os.pipe()
+        self._by_wd: Dict[int, str] = {}
+        self._by_folder: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def add(self, folder: str) -> bool:
+        with self._lock:
+            if folder in self._by_folder:
+                return True
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(folder), self.WATCH_MASK)
+            if wd < 0:
+                return False
+            self._by_wd[wd] = folder
+            self._by_folder[folder] = wd
+            return True
+
+    def remove(self, folder: str) -> None:
+        with self._lock:
+            wd = self._by_folder.pop(folder, None)
+            if wd is not None:
+                self._by_wd.pop(wd, None)
+                self._libc.inotify_rm_watch(self._fd, wd)
+
+    def read_events(self, timeout: Optional[float]) -> List[WatchEvent]:
+        """Bloquea hasta que haya eventos (o hasta timeout) y los decodifica"""
+        ready, _, _ = select.select([self._fd, self._wake_r], [], [], timeout)
+        if self._wake_r in ready:
+            os.read(self._wake_r, 64)
+        if self._fd not in ready:
+            return []
+
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+
+        events: List[WatchEvent] = []
+        offset = 0
+        header_size = self.EVENT_HEADER.size
+        while offset + header_size <= len(data):
+            wd, mask, _cookie, length = self.EVENT_HEADER.unpack_from(data, offset)
+            raw_name = data[offset + header_size:offset + header_size + length]
+            offset += header_size + length
+
+            if mask & self.IN_Q_OVERFLOW:
+                # Se perdieron eventos: reescanear todas las carpetas
+                with self._lock:
+                    events.extend((folder, None) for folder in self._by_folder)
+                continue
+
+            with self._lock:
+                folder = self._by_wd.get(wd)
+            if folder is None:
+                continue
+
+            if mask & (self.IN_DELETE_SELF | self.IN_MOVE_SELF | self.IN_IGNORED):
+                # El kernel quitó la vigilancia (o sigue a la carpeta movida):
+                # se olvida para que add() pueda volver a crearla
+                with self._lock:
+                    self._by_wd.pop(wd, None)
+                    if self._by_folder.get(folder) == wd:
+                        del self._by_folder[folder]
+                if mask & self.IN_MOVE_SELF:
+                    self._libc.inotify_rm_watch(self._fd, wd)
+                events.append((folder, None))
+                continue
+
+            name = os.fsdecode(raw_name.rstrip(b"\0"))
+            if name and get_media_kind(name):
+                events.append((folder, name))
+        return events
+
+    def wake(self) -> None:
+        try:
+            os.write(self._wake_w, b"x")
+        except OSError:
+            pass
+
+    def close(self) -> None:
+        self.wake()
+        for fd in (self._fd, self._wake_r, self._wake_w):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+
+def create_watch_backend(poll_seconds: float = 5.0):
+    """
+    Crea el backend de vigilancia más adecuado para el sistema
+
+    Args:
+        poll_seconds: Intervalo del backend de sondeo (fuera de Linux)
+
+    Returns:
+        InotifyBackend en Linux o PollingBackend en otro caso
+    """
+    if sys.platform.startswith("linux"):
+        try:
+            return InotifyBackend()
+        except Exception as e:
+            print(f"⚠️ inotify no disponible, usando sondeo: {e}")
+    return PollingBackend(poll_seconds)
+
+
+class FolderWatcher:
+    """Vigila carpetas y entrega ráfagas de cambios agrupadas por carpeta"""
+
+    def __init__(self, on_changes: Callable[[str, Optional[Set[str]]], None],
+                 debounce_seconds: float = 0.5, poll_seconds: float = 5.0,
+                 backend=None):
+        """
+        Inicializa el vigilante
+
+        Args:
+            on_changes: Función que recibe (carpeta, nombres). Nombres None
+                significa que hay que reescanear la carpeta completa
+            debounce_seconds: Ventana sin eventos antes de entregar una ráfaga
+            poll_seconds: Intervalo del backend de sondeo
+            backend: Backend a usar. Si es None, se elige según el sistema
+        """
+        self.on_changes = on_changes
+        self.debounce_seconds = debounce_seconds
+        self.poll_seconds = poll_seconds
+        self.backend = backend
+        self.running = False
+        self.thread = None
+        self.folders: Set[str] = set()
+        # Carpetas vigiladas que desaparecieron: se reintenta add() cada sondeo
+        self._lost: Set[str] = set()
+        self._lock = threading.Lock()
+
+    def set_folders(self, folders: Iterable[str]) -> None:
+        """
+        Define el conjunto de carpetas vigiladas
+
+        Args:
+            folders: Carpetas a vigilar (las inexistentes se ignoran)
+        """
+        wanted = {f for f in folders if f and os.path.isdir(f)}
+        with self._lock:
+            removed = self.folders - wanted
+            added = wanted - self.folders
+            self.folders = wanted
+            self._lost &= wanted
+            backend = self.backend
+        if backend is None:
+            return
+        for folder in removed:
+            backend.remove(folder)
+        for folder in added:
+            if not backend.add(folder):
+                print(f"⚠️ No se pudo vigilar la carpeta: {folder}")
+
+    def start(self) -> None:
+        """Inicia el hilo de vigilancia"""
+        if self.running:
+            return
+        if self.backend is None:
+            self.backend = create_watch_backend(self.poll_seconds)
+        for folder in list(self.folders):
+            self.backend.add(folder)
+        self.running = True
+        self.thread = threading.Thread(target=self._loop, daemon=True)
+        self.thread.start()
+
+    def stop(self) -> None:
+        """Detiene el hilo de vigilancia"""
+        self.running = False
+        if self.backend is not None:
+            self.backend.wake()
+        if self.thread:
+            self.thread.join(timeout=2)
+        if self.backend is not None:
+            self.backend.close()
+            self.backend = None
+
+    def _rewatch(self, folders: Iterable[str]) -> List[str]:
+        """
+        Vuelve a vigilar carpetas borradas, movidas o recreadas
+
+        Args:
+            folders: Carpetas cuya vigilancia pudo perderse
+
+        Returns:
+            Carpetas que habían desaparecido y vuelven a existir (hay que reescanearlas)
+        """
+        recovered = []
+        for folder in folders:
+            with self._lock:
+                if folder not in self.folders:
+                    self._lost.discard(folder)
+                    continue
+            if os.path.isdir(folder) and self.backend.add(folder):
+                with self._lock:
+                    was_lost = folder in self._lost
+                    self._lost.discard(folder)
+                if was_lost:
+                    recovered.append(folder)
+            else:
+                with self._lock:
+                    self._lost.add(folder)
+        return recovered
+
+    def _flush(self, pending: Dict[str, Optional[Set[str]]]) -> None:
+        """Entrega los cambios acumulados"""
+        for folder, names in pending.items():
+            try:
+                self.on_changes(folder, names)
+            except Exception as e:
+                print(f"Error procesando cambios de carpeta: {e}")
+
+    def _loop(self) -> None:
+        """Acumula eventos y los entrega tras la ventana de debounce"""
+        pending: Dict[str, Optional[Set[str]]] = {}
+        first_event = last_event = 0.0
+        # Una ráfaga continua se entrega igualmente pasado este tiempo
+        max_delay = max(2.0, self.debounce_seconds * 10)
+
+        while self.running:
+            timeout = None
+            if pending:
+                now = time.monotonic()
+                timeout = max(0.0, min(self.debounce_seconds - (now - last_event),
+                                       max_delay - (now - first_event)))
+            with self._lock:
+                lost = set(self._lost)
+            if lost:
+                timeout = self.poll_seconds if timeout is None else min(timeout, self.poll_seconds)
+
+            try:
+                events = self.backend.read_events(timeout)
+            except Exception as e:
+                print(f"Error leyendo eventos de carpeta: {e}")
+                events = []
+                time.sleep(self.poll_seconds)
+
+            if not self.running:
+                break
+
+            rescans = {folder for folder, name in events if name is None}
+            if rescans or lost:
+                events.extend((folder, None) for folder in self._rewatch(rescans | lost))
+
+            for folder, name in events:
+                if name is None:
+                    pending[folder] = None
+                elif folder not in pending:
+                    pending[folder] = {name}
+                elif pending[folder] is not None:
+                    pending[folder].add(name)
+            now = time.monotonic()
+            if events:
+                if not pending or last_event == 0.0:
+                    first_event = now
+                last_event = now
+            if not pending:
+                first_event = last_event = 0.0
+            elif (now - last_event >= self.debounce_seconds or
+                  now - first_event >= max_delay):
+                batch, pending = pending, {}
+                first_event = last_event = 0.0
+                self._flush(batch)
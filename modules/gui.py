@@ -3,7 +3,10 @@ Módulo de interfaz gráfica
 Maneja toda la interfaz de usuario con CustomTkinter
 """
 
+import gc
 import os
+import sys
+import threading
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 import customtkinter as ctk
@@ -18,6 +21,7 @@ except ImportError:
     DARKDETECT_AVAILABLE = False
 
 from .config_manager import ConfigManager
+from .countdown import format_remaining
 from .wallpaper_engine import WallpaperEngine
 # Importar system tray de forma opcional
 try:
@@ -33,12 +37,26 @@ try:
 except ImportError:
     SIMPLE_TRAY_AVAILABLE = False
 from .startup_manager import StartupManager
+from .cli import add_wallpapers, describe
+from .instance_server import CMD_SHOW, InstanceServer
 from .drag_drop_handler import DragDropHandler
+from .path_status import PathStatusChecker
+from .thumbnail_cache import ThumbnailCache
+from .wallpaper_list import ThumbnailImages, VirtualWallpaperList, WallpaperListModel
 
 
 class WallpaperChangerGUI:
     """Interfaz gráfica principal de la aplicación"""
 
+    # Miniaturas mostradas en el resumen de cada día
+    WEEKDAY_THUMBNAILS = 4
+
+    # Pestañas (se construyen la primera vez que se seleccionan)
+    TAB_GENERAL = "⚙️ General"
+    TAB_TIME = "⏰ Modo Tiempo"
+    TAB_WEEKDAY = "📅 Modo Días"
+    TAB_STARTUP = "🚀 Inicio Automático"
+
     def __init__(self, root: ctk.CTk):
         """
         Inicializa la interfaz gráfica
@@ -85,13 +103,31 @@ class WallpaperChangerGUI:
         self.config_manager = ConfigManager()
         self.wallpaper_engine = WallpaperEngine(self.config_manager)
         self.tray_manager = None
-
-        # Configurar UI
-        self.setup_ui()
-        self.load_current_config()
-
-        # Configurar callback del contador
-        self.wallpaper_engine.set_countdown_callback(self.update_countdown)
+        # Miniaturas generadas en segundo plano y guardadas en disco
+        self.thumbnails = ThumbnailCache(
+            max_bytes=int(self.config_manager.get("thumbnail_cache_mb", 64)) * 1024 * 1024,
+            post=lambda fn: self.root.after(0, fn))
+
+        # Configurar UI (si arranca oculta en la bandeja, se construye al mostrarla)
+        self.ui_built = False
+        self._ui_attrs = set()
+        self._teardown_job = None
+        # Sobrevive al desmontaje: una lectura lanzada antes no se confunde con una nueva
+        self.wallpaper_list_generation = 0
+        if not ('--minimized' in sys.argv and self.get_teardown_ms()):
+            self.build_ui()
+
+        # Suscribir el contador: solo se actualiza mientras la ventana está visible
+        self.window_visible = '--minimized' not in sys.argv
+        self.wallpaper_engine.countdown.subscribe(
+            self.update_countdown, is_active=lambda: self.window_visible)
+        self.root.bind('<Map>', self.on_window_map, add='+')
+        self.root.bind('<Unmap>', self.on_window_unmap, add='+')
+
+        # Cambios en carpetas vigiladas (llegan desde el hilo del vigilante)
+        self.wallpaper_engine.add_media_listener(
+            lambda folder, added, removed: self.root.after(
+                0, self.on_media_changed, folder, added, removed))
 
         # Iniciar servicios
         self.wallpaper_engine.start_monitoring()
@@ -99,6 +135,13 @@ class WallpaperChangerGUI:
         # Configurar bandeja del sistema PRIMERO (antes de cualquier otra cosa)
         self.setup_system_tray()
 
+        # Instancia única: las invocaciones del menú contextual envían aquí sus archivos
+        self.instance_server = InstanceServer(
+            on_add=lambda paths: self.root.after(0, self.add_paths_from_instance, paths),
+            handlers={CMD_SHOW: lambda _payload: self.show_window() or True})
+        if not self.instance_server.start():
+            self.instance_server = None
+
         # IMPORTANTE: Configurar protocolo de cierre DESPUÉS de setup_system_tray
         # Esto asegura que cuando se cierre la ventana, se minimice a la bandeja
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
@@ -106,6 +149,7 @@ class WallpaperChangerGUI:
         # Iniciar minimizado si se especifica
         if len(sys.argv) > 1 and '--minimized' in sys.argv:
             self.root.withdraw()  # Ocultar ventana al inicio
+            self.schedule_teardown()
 
     def setup_window_icon(self) -> None:
         """Configura el icono de la ventana"""
@@ -176,27 +220,76 @@ class WallpaperChangerGUI:
     def setup_ui(self) -> None:
         """Configura la interfaz de usuario"""
         # Frame principal
-        main_frame = ctk.CTkFrame(self.root, fg_color="transparent")
-        main_frame.pack(fill='both', expand=True, padx=15, pady=15)
+        self.main_frame = ctk.CTkFrame(self.root, fg_color="transparent")
+        self.main_frame.pack(fill='both', expand=True, padx=15, pady=15)
 
         # Header
-        self.setup_header(main_frame)
+        self.setup_header(self.main_frame)
 
         # Tabview
-        self.tabview = ctk.CTkTabview(main_frame)
+        self.tabview = ctk.CTkTabview(self.main_frame, command=self.on_tab_selected)
         self.tabview.pack(fill='both', expand=True)
 
-        # Crear pestañas
-        self.tabview.add("⚙️ General")
-        self.tabview.add("⏰ Modo Tiempo")
-        self.tabview.add("📅 Modo Días")
-        self.tabview.add("🚀 Inicio Automático")
+        # Crear pestañas vacías
+        self.tab_builders = {
+            self.TAB_GENERAL: self.setup_general_tab,
+            self.TAB_TIME: self.setup_time_tab,
+            self.TAB_WEEKDAY: self.setup_weekday_tab,
+            self.TAB_STARTUP: self.setup_startup_tab,
+        }
+        for name in self.tab_builders:
+            self.tabview.add(name)
+        self.built_tabs = set()
+
+        # Solo se llena la pestaña visible (modo y estado); el resto al seleccionarla
+        self.ensure_tab(self.tabview.get())
+
+    def on_tab_selected(self) -> None:
+        """Construye la pestaña seleccionada si es la primera vez que se abre"""
+        self.ensure_tab(self.tabview.get())
+
+    def ensure_tab(self, name: str) -> None:
+        """
+        Construye una pestaña y carga en ella la configuración (una sola vez)
 
-        # Configurar cada pestaña
-        self.setup_general_tab(self.tabview.tab("⚙️ General"))
-        self.setup_time_tab(self.tabview.tab("⏰ Modo Tiempo"))
-        self.setup_weekday_tab(self.tabview.tab("📅 Modo Días"))
-        self.setup_startup_tab(self.tabview.tab("🚀 Inicio Automático"))
+        Args:
+            name: Nombre de la pestaña
+        """
+        builder = self.tab_builders.get(name)
+        if builder is None or name in self.built_tabs:
+            return
+        self.built_tabs.add(name)
+        before = set(vars(self))
+        builder(self.tabview.tab(name))
+        if self.ui_built:
+            # Se suelta junto con el resto de la interfaz al desmontarla
+            self._ui_attrs |= set(vars(self)) - before
+
+    def is_tab_built(self, name: str) -> bool:
+        """Indica si una pestaña ya tiene sus widgets"""
+        return name in getattr(self, "built_tabs", ())
+
+    def run_in_background(self, work, done) -> None:
+        """
+        Ejecuta work() en un hilo y entrega su resultado a done() en el hilo de Tk
+
+        Args:
+            work: Función sin argumentos (lectura de listas o carpetas)
+            done: Recibe el resultado; no se llama si la interfaz se desmontó
+        """
+        def run():
+            try:
+                result = work()
+            except Exception as e:
+                print(f"Error en tarea de fondo: {e}")
+                return
+            try:
+                self.root.after(0, lambda: self.ui_built and done(result))
+            except (RuntimeError, tk.TclError):
+                # La ventana fue cerrada
+                pass
+
+        threading.Thread(target=run, daemon=True).start()
 
     def setup_header(self, parent) -> None:
         """Configura el header con título y selector de tema"""
@@ -303,7 +396,15 @@ class WallpaperChangerGUI:
         )
         self.countdown_label.pack(anchor='w', padx=15, pady=(0, 15))
 
-        self.update_status()
+        # Deshabilitar el cambio manual en modo días
+        if self.config_manager.get("mode") == "weekday":
+            self.change_now_button.configure(state="disabled")
+
+        if self.config_manager.get("use_folder", False):
+            # Contar la carpeta no retrasa el primer pintado de la ventana
+            self.run_in_background(self.wallpaper_engine.get_folder_counts, self.update_status)
+        else:
+            self.update_status()
 
     def setup_time_tab(self, parent) -> None:
         """Configura la pestaña de modo tiempo"""
@@ -389,7 +490,6 @@ class WallpaperChangerGUI:
             text=""
         )
         self.folder_info_label.pack(anchor='w', padx=15, pady=(0, 15))
-        self.update_folder_info()
 
         # Contenedor principal con scroll
         main_scroll_frame = ctk.CTkScrollableFrame(parent)
@@ -411,13 +511,28 @@ class WallpaperChangerGUI:
             wallpapers_frame, fg_color="transparent")
         self.drop_zone_frame.pack(fill='x', padx=15, pady=(0, 10))
 
-        # Frame para lista de wallpapers (sin scroll propio, usa el principal)
+        # Frame para lista de wallpapers (virtualizada: solo se dibujan las filas visibles)
         self.wallpapers_list_frame = ctk.CTkFrame(wallpapers_frame)
         self.wallpapers_list_frame.pack(
             fill='both', expand=True, padx=15, pady=(0, 10))
 
-        # Configurar drag & drop después de que la ventana esté lista
-        self.root.after(500, self.setup_working_drag_drop)
+        self.wallpaper_list_model = WallpaperListModel(
+            self.wallpaper_engine.video_engine.is_video_file)
+        # La existencia de cada archivo se comprueba fuera del hilo de la interfaz
+        self.path_status = PathStatusChecker(
+            post=lambda fn: self.root.after(0, fn))
+        self.wallpaper_list_view = VirtualWallpaperList(
+            self.wallpapers_list_frame,
+            self.wallpaper_list_model,
+            on_remove=self.remove_wallpaper_by_path,
+            height=300,
+            status_checker=self.path_status,
+            thumbnails=self.thumbnails
+        )
+        self.wallpaper_list_view.pack(fill='both', expand=True, padx=5, pady=5)
+
+        # Zona de archivos cuando la pestaña ya está dibujada
+        self.root.after_idle(self.setup_working_drag_drop)
 
         # Botones
         btn_frame = ctk.CTkFrame(wallpapers_frame, fg_color="transparent")
@@ -437,6 +552,9 @@ class WallpaperChangerGUI:
             width=120
         ).pack(side='left', padx=5)
 
+        # La lista (y el conteo de la carpeta) se leen en segundo plano
+        self.refresh_wallpaper_list()
+
     def setup_weekday_tab(self, parent) -> None:
         """Configura la pestaña de días de la semana con scroll"""
         # Contenedor con scroll para evitar que los elementos se salgan de la ventana
@@ -462,6 +580,9 @@ class WallpaperChangerGUI:
         self.weekday_folder_entries = {}
         self.weekday_summary_labels = {}
         self.weekday_selected_images = {}
+        self.weekday_thumb_labels = {}
+        self.weekday_previews = {}
+        self.weekday_thumb_images = ThumbnailImages(self.thumbnails.size)
 
         for i, day in enumerate(days):
             dkey = str(i)
@@ -496,6 +617,15 @@ class WallpaperChangerGUI:
             self.weekday_summary_labels[dkey] = ctk.CTkLabel(actions, text="0 imágenes")
             self.weekday_summary_labels[dkey].pack(side='left')
 
+            # Miniaturas de las primeras imágenes del día
+            thumbs_frame = ctk.CTkFrame(actions, fg_color="transparent")
+            thumbs_frame.pack(side='left', padx=(10, 0))
+            self.weekday_thumb_labels[dkey] = [
+                ctk.CTkLabel(thumbs_frame, text="", width=self.thumbnails.size[0],
+                             image=self.weekday_thumb_images.placeholder)
+                for _ in range(self.WEEKDAY_THUMBNAILS)
+            ]
+
         # Botón guardar al final (puede quedar dentro del scroll)
         ctk.CTkButton(
             scroll,
@@ -505,6 +635,8 @@ class WallpaperChangerGUI:
             font=ctk.CTkFont(size=14, weight="bold")
         ).pack(pady=15)
 
+        self.load_weekday_config()
+
     def setup_startup_tab(self, parent) -> None:
         """Configura la pestaña de inicio automático"""
         info_frame = ctk.CTkFrame(parent)
@@ -556,7 +688,23 @@ class WallpaperChangerGUI:
     # Métodos de eventos y acciones
 
     def load_current_config(self) -> None:
-        """Carga la configuración actual en la interfaz"""
+        """Vuelve a cargar la configuración en las pestañas ya construidas"""
+        if self.is_tab_built(self.TAB_WEEKDAY):
+            self.load_weekday_config()
+
+        # Configurar estado del botón
+        if self.is_tab_built(self.TAB_GENERAL):
+            if self.config_manager.get("mode") == "weekday":
+                self.change_now_button.configure(state="disabled")
+            else:
+                self.change_now_button.configure(state="normal")
+
+        # Cargar lista de fondos (modo tiempo)
+        if self.is_tab_built(self.TAB_TIME):
+            self.refresh_wallpaper_list()
+
+    def load_weekday_config(self) -> None:
+        """Carga las playlists por día en la pestaña de días"""
         # Rotación intra-día
         rotation = self.config_manager.get("weekday_rotation_minutes", 30)
         if hasattr(self, "weekday_rotation_var"):
@@ -597,16 +745,7 @@ class WallpaperChangerGUI:
             if hasattr(self, "weekday_selected_images"):
                 self.weekday_selected_images[key] = images
             if hasattr(self, "weekday_summary_labels") and key in self.weekday_summary_labels:
-                self.weekday_summary_labels[key].configure(text=f"{len(images)} imágenes")
-
-        # Configurar estado inicial del botón
-        if self.config_manager.get("mode") == "weekday":
-            self.change_now_button.configure(state="disabled")
-        else:
-            self.change_now_button.configure(state="normal")
-
-        # Cargar lista de fondos (modo tiempo)
-        self.refresh_wallpaper_list()
+                self.update_day_summary(key)
 
     def on_mode_change(self) -> None:
         """Maneja el cambio de modo"""
@@ -614,6 +753,10 @@ class WallpaperChangerGUI:
         self.config_manager.save_config()
         self.update_status()
 
+        # El contador solo se publica en modo tiempo
+        if self.mode_var.get() != "time":
+            self.countdown_label.configure(text="")
+
         # Deshabilitar botón en modo días
         if self.mode_var.get() == "weekday":
             self.change_now_button.configure(state="disabled")
@@ -649,7 +792,6 @@ class WallpaperChangerGUI:
 
         print(f"📁 Archivos seleccionados: {len(files)}")
 
-        wallpapers = self.config_manager.get("wallpapers", [])
         added_files = []
 
         for file in files:
@@ -663,8 +805,7 @@ class WallpaperChangerGUI:
             is_video = self.wallpaper_engine.video_engine.is_video_file(file)
             print(f"   ¿Es video?: {is_video}")
 
-            if file not in wallpapers:
-                wallpapers.append(file)
+            if self.config_manager.add_wallpapers([file]):
                 added_files.append(file)
                 # Determinar tipo de archivo
                 file_type = "🎬 Video" if is_video else "🖼️ Imagen"
@@ -673,19 +814,10 @@ class WallpaperChangerGUI:
                 print(f"  ⚠️ Ya existe: {os.path.basename(file)}")
 
         if added_files:
-            self.config_manager.set("wallpapers", wallpapers)
             self.config_manager.save_config()
 
-            # Forzar actualización inmediata
-            print("💾 Configuración guardada, refrescando lista...")
-
-            def force_refresh():
-                # Recargar configuración para asegurar que esté actualizada
-                self.config_manager.load_config()
-                self.refresh_wallpaper_list()
-                print("🔄 Lista actualizada forzosamente")
-
-            self.root.after(100, force_refresh)
+            # Solo se agregan las filas nuevas a la lista mostrada
+            self.apply_manual_list_diff(added=added_files)
 
             # Mostrar mensaje de confirmación
             image_count = sum(
@@ -703,6 +835,25 @@ class WallpaperChangerGUI:
             messagebox.showinfo(
                 "Sin Cambios", "Todos los archivos seleccionados ya están en la lista.")
 
+    def add_paths_from_instance(self, paths: list) -> None:
+        """
+        Agrega un lote de archivos recibido de otra invocación (menú contextual)
+
+        Args:
+            paths: Rutas ya agrupadas y sin repetidos por el servidor de instancia
+        """
+        result = add_wallpapers(paths, self.config_manager)
+        if result.added:
+            # Solo se agregan las filas nuevas a la lista mostrada
+            self.apply_manual_list_diff(added=result.added)
+        title, message = describe(result)
+        print(f"📥 {title}: {len(result.added)} de {len(paths)} archivo(s)")
+        if self.tray_manager:
+            try:
+                self.tray_manager.notify(title, message)
+            except Exception:
+                pass
+
     def remove_wallpaper(self) -> None:
         """Elimina el fondo seleccionado - No disponible en textbox"""
         messagebox.showinfo(
@@ -729,24 +880,26 @@ class WallpaperChangerGUI:
         self.config_manager.set("use_folder", self.use_folder_var.get())
         self.config_manager.set("current_index", 0)
         self.config_manager.save_config()
-        self.update_folder_info()
+        # La lista y el conteo de la carpeta llegan juntos desde segundo plano
         self.refresh_wallpaper_list()
 
         mode_text = "carpeta" if self.use_folder_var.get() else "lista manual"
         messagebox.showinfo("Modo Cambiado", f"Ahora se usará: {mode_text}")
 
-    def update_folder_info(self) -> None:
-        """Actualiza la información de la carpeta"""
-        if self.config_manager.get("use_folder", False):
-            media_files = self.wallpaper_engine.get_media_from_folder()
-            videos = [
-                f for f in media_files if self.wallpaper_engine.video_engine.is_video_file(f)]
-            images = [
-                f for f in media_files if not self.wallpaper_engine.video_engine.is_video_file(f)]
+    def update_folder_info(self, folder_counts=None) -> None:
+        """
+        Actualiza la información de la carpeta
 
-            total_count = len(media_files)
-            image_count = len(images)
-            video_count = len(videos)
+        Args:
+            folder_counts: (imágenes, videos) ya contados o None para contarlos ahora
+        """
+        if not self.is_tab_built(self.TAB_TIME):
+            return
+        if folder_counts is None and self.config_manager.get("wallpaper_folder"):
+            folder_counts = self.wallpaper_engine.get_folder_counts()
+        if self.config_manager.get("use_folder", False):
+            image_count, video_count = folder_counts or (0, 0)
+            total_count = image_count + video_count
 
             self.folder_info_label.configure(
                 text=f"✓ Modo carpeta activo - {total_count} archivo(s): {image_count} imagen(es), {video_count} video(s)",
@@ -754,15 +907,8 @@ class WallpaperChangerGUI:
             )
         else:
             if self.config_manager.get("wallpaper_folder"):
-                media_files = self.wallpaper_engine.get_media_from_folder()
-                videos = [
-                    f for f in media_files if self.wallpaper_engine.video_engine.is_video_file(f)]
-                images = [
-                    f for f in media_files if not self.wallpaper_engine.video_engine.is_video_file(f)]
-
-                total_count = len(media_files)
-                image_count = len(images)
-                video_count = len(videos)
+                image_count, video_count = folder_counts
+                total_count = image_count + video_count
 
                 self.folder_info_label.configure(
                     text=f"Carpeta configurada - {total_count} archivo(s): {image_count} imagen(es), {video_count} video(s) (modo desactivado)",
@@ -774,161 +920,107 @@ class WallpaperChangerGUI:
                     text_color="gray"
                 )
 
-    def refresh_wallpaper_list(self) -> None:
-        """Refresca la lista de fondos mostrada con botones reales"""
-        # Limpiar frame anterior
-        for widget in self.wallpapers_list_frame.winfo_children():
-            widget.destroy()
-
-        # Crear frame interno con scroll para la lista de archivos
-        inner_scroll_frame = ctk.CTkScrollableFrame(
-            self.wallpapers_list_frame,
-            height=300,
-            label_text="Archivos en la Lista"
-        )
-        inner_scroll_frame.pack(fill='both', expand=True, padx=5, pady=5)
-
-        wallpapers = self.wallpaper_engine.get_wallpaper_list()
-        print(f"🔄 Refrescando lista: {len(wallpapers)} archivo(s)")
-
-        if wallpapers:
-            # Separar imágenes y videos
-            images = []
-            videos = []
-
-            print(f"🔍 Analizando {len(wallpapers)} archivos:")
-            for wallpaper in wallpapers:
-                # Verificar si el archivo existe
-                if not os.path.exists(wallpaper):
-                    print(
-                        f"⚠️ Archivo no encontrado: {os.path.basename(wallpaper)}")
-                    # Aún así agregarlo para que el usuario pueda eliminarlo
-
-                filename = os.path.basename(wallpaper)
-                ext = Path(wallpaper).suffix.lower()
-                is_video = self.wallpaper_engine.video_engine.is_video_file(
-                    wallpaper)
+    def refresh_folder_info(self) -> None:
+        """Cuenta la carpeta en segundo plano y actualiza su información y el estado"""
+        folder = self.config_manager.get("wallpaper_folder")
 
-                print(f"  {filename} ({ext}) -> Video: {is_video}")
+        def show(folder_counts) -> None:
+            self.update_folder_info(folder_counts)
+            self.update_status(folder_counts)
 
-                if is_video:
-                    videos.append(wallpaper)
-                else:
-                    images.append(wallpaper)
-
-            # Mostrar resumen
-            total_count = len(wallpapers)
-            image_count = len(images)
-            video_count = len(videos)
-
-            print(
-                f"📊 Resultado: {total_count} total = {image_count} imágenes + {video_count} videos")
-
-            # Verificar que no se pierdan archivos
-            if (image_count + video_count) != total_count:
-                print(
-                    f"⚠️ ERROR: Se perdieron archivos! {total_count} != {image_count + video_count}")
-                # Mostrar todos los archivos sin separar
-                print("📋 Lista completa de archivos:")
-                for i, wallpaper in enumerate(wallpapers):
-                    print(f"  {i+1}. {os.path.basename(wallpaper)}")
-
-                # Usar todos como imágenes si hay problema de detección
-                images = wallpapers
-                videos = []
-                image_count = len(images)
-                video_count = 0
-                print("🔧 Usando todos los archivos como imágenes para evitar pérdida")
-
-            # Etiqueta de resumen
-            summary_label = ctk.CTkLabel(
-                inner_scroll_frame,
-                text=f"📊 Total: {total_count} archivo(s) - 🖼️ {image_count} imágenes, 🎬 {video_count} videos",
-                font=ctk.CTkFont(size=12, weight="bold")
-            )
-            summary_label.pack(pady=(0, 10))
-
-            # Mostrar videos primero
-            if videos:
-                video_label = ctk.CTkLabel(
-                    inner_scroll_frame,
-                    text="🎬 VIDEOS:",
-                    font=ctk.CTkFont(size=14, weight="bold"),
-                    text_color="#4CAF50"
-                )
-                video_label.pack(anchor='w', pady=(10, 5))
-
-                for video_path in videos:
-                    self.create_file_item(video_path, "🎬", inner_scroll_frame)
-
-            # Mostrar imágenes después
-            if images:
-                image_label = ctk.CTkLabel(
-                    inner_scroll_frame,
-                    text="🖼️ IMÁGENES:",
-                    font=ctk.CTkFont(size=14, weight="bold"),
-                    text_color="#2196F3"
-                )
-                image_label.pack(anchor='w', pady=(10, 5))
+        if not folder:
+            show((0, 0))
+            return
+        self.run_in_background(lambda: self.wallpaper_engine.get_folder_counts(folder), show)
 
-                for image_path in images:
-                    self.create_file_item(image_path, "🖼️", inner_scroll_frame)
+    def on_media_changed(self, folder: str, added: list, removed: list) -> None:
+        """
+        Refleja en la interfaz los cambios detectados en una carpeta vigilada
 
-            print(
-                f"📊 Lista mostrada: {image_count} imágenes, {video_count} videos")
-        else:
-            print("  Lista vacía, mostrando mensaje de ayuda")
-            # Mostrar mensaje cuando esté vacío
-            empty_label = ctk.CTkLabel(
-                inner_scroll_frame,
-                text="📋 Lista vacía\n\n💡 Usa los botones de arriba para agregar archivos:\n• 📁 Zona de Archivos\n• 📂 Seleccionar Carpeta\n• ➕ Agregar Imagen/Video",
-                font=ctk.CTkFont(size=12),
-                justify="center"
-            )
-            empty_label.pack(expand=True, pady=20)
+        Args:
+            folder: Carpeta que cambió
+            added: Rutas agregadas
+            removed: Rutas eliminadas
+        """
+        if not self.ui_built:
+            # Sin interfaz: la lista se lee completa al reconstruirla
+            return
+        try:
+            configured = self.config_manager.get("wallpaper_folder")
+            if not configured or os.path.normcase(os.path.abspath(configured)) != \
+                    os.path.normcase(os.path.abspath(folder)):
+                return
 
-        self.update_folder_info()
+            print(f"📁 Carpeta actualizada: +{len(added)} / -{len(removed)}")
+            if self.config_manager.get("use_folder", False):
+                # Solo se agregan/quitan las filas afectadas
+                self.apply_wallpaper_list_diff(added, removed)
+            self.refresh_folder_info()
+        except tk.TclError:
+            # La ventana fue cerrada
+            pass
 
-    def create_file_item(self, file_path: str, icon: str, parent_frame=None):
-        """Crea un elemento de archivo con botón de eliminar"""
-        if parent_frame is None:
-            parent_frame = self.wallpapers_list_frame
+    def refresh_wallpaper_list(self) -> None:
+        """
+        Recarga la lista de fondos mostrada. La lista y el conteo de la carpeta se
+        leen en segundo plano; luego solo se redibujan las filas visibles
+        """
+        if not self.is_tab_built(self.TAB_TIME):
+            return
+        self.wallpaper_list_generation += 1
+        generation = self.wallpaper_list_generation
+        folder = self.config_manager.get("wallpaper_folder")
+        use_folder = self.config_manager.get("use_folder", False)
+        manual = None
+        if not use_folder and self.config_manager.playlist_store is None:
+            # La lista del JSON se modifica en este hilo: el hilo de fondo recibe una copia
+            manual = list(self.config_manager.get("wallpapers") or [])
+
+        def scan():
+            counts = self.wallpaper_engine.get_folder_counts(folder) if folder else None
+            if manual is not None:
+                wallpapers = manual
+            elif use_folder:
+                wallpapers = self.wallpaper_engine.get_media_from_folder(folder)
+            else:
+                wallpapers = self.config_manager.get_wallpapers_page(0)
+            return generation, wallpapers, counts
 
-        filename = os.path.basename(file_path)
+        self.run_in_background(scan, self.show_wallpaper_list)
 
-        # Verificar si el archivo existe
-        exists = os.path.exists(file_path)
-        status_icon = "✅" if exists else "❌"
+    def show_wallpaper_list(self, scan_result) -> None:
+        """Muestra el resultado de refresh_wallpaper_list si sigue siendo el último"""
+        generation, wallpapers, folder_counts = scan_result
+        if not self.is_tab_built(self.TAB_TIME) or generation != self.wallpaper_list_generation:
+            return
+        print(f"🔄 Refrescando lista: {len(wallpapers)} archivo(s)")
 
-        # Frame para cada archivo
-        item_frame = ctk.CTkFrame(parent_frame, fg_color="transparent")
-        item_frame.pack(fill='x', pady=2)
+        self.wallpaper_list_model.set_items(wallpapers)
+        self.wallpaper_list_view.refresh()
+        self.update_folder_info(folder_counts)
 
-        # Etiqueta con el archivo
-        display_text = f"{status_icon} {icon} {filename}"
-        text_color = "white" if exists else "gray"
+    def apply_wallpaper_list_diff(self, added=(), removed=()) -> None:
+        """
+        Aplica altas y bajas a la lista mostrada sin reconstruirla
 
-        file_label = ctk.CTkLabel(
-            item_frame,
-            text=display_text,
-            font=ctk.CTkFont(size=11),
-            anchor="w",
-            text_color=text_color
-        )
-        file_label.pack(side='left', fill='x', expand=True, padx=(5, 0))
-
-        # Botón de eliminar
-        delete_btn = ctk.CTkButton(
-            item_frame,
-            text="🗑️",
-            width=30,
-            height=25,
-            font=ctk.CTkFont(size=12),
-            fg_color="#d32f2f",
-            hover_color="#f44336",
-            command=lambda: self.remove_wallpaper_by_path(file_path)
-        )
-        delete_btn.pack(side='right', padx=(5, 0))
+        Args:
+            added: Rutas agregadas
+            removed: Rutas eliminadas
+        """
+        if not self.is_tab_built(self.TAB_TIME):
+            # La lista se lee completa cuando se abra la pestaña
+            return
+        self.path_status.invalidate(list(added) + list(removed))
+        self.thumbnails.invalidate(list(added) + list(removed))
+        self.wallpaper_list_model.remove(removed)
+        self.wallpaper_list_model.add(added)
+        self.wallpaper_list_view.refresh()
+
+    def apply_manual_list_diff(self, added=(), removed=()) -> None:
+        """Aplica cambios de la lista manual a la vista si es la que se muestra"""
+        if not self.ui_built or self.config_manager.get("use_folder", False):
+            return
+        self.apply_wallpaper_list_diff(added, removed)
 
     def remove_wallpaper_by_path(self, file_path: str):
         """Elimina un wallpaper por su ruta completa"""
@@ -945,22 +1037,13 @@ class WallpaperChangerGUI:
             )
 
             if result:
-                wallpapers = self.config_manager.get("wallpapers", [])
-
-                if file_path in wallpapers:
-                    wallpapers.remove(file_path)
-
+                if self.config_manager.remove_wallpapers([file_path]):
                     # Guardar configuración
-                    self.config_manager.set("wallpapers", wallpapers)
                     self.config_manager.save_config()
 
                     # Actualizar lista
-                    def force_refresh():
-                        self.config_manager.load_config()
-                        self.refresh_wallpaper_list()
-                        print(f"🗑️ Eliminado: {filename}")
-
-                    self.root.after(100, force_refresh)
+                    self.apply_manual_list_diff(removed=[file_path])
+                    print(f"🗑️ Eliminado: {filename}")
 
                     msgbox.showinfo("Eliminado", f"✅ Se eliminó: {filename}")
                 else:
@@ -976,8 +1059,58 @@ class WallpaperChangerGUI:
         self.update_day_summary(day)
 
     def update_day_summary(self, day: str) -> None:
-        count = len(self.weekday_selected_images.get(day, []))
-        self.weekday_summary_labels[day].configure(text=f"{count} imágenes")
+        images = self.weekday_selected_images.get(day, [])
+        self.weekday_summary_labels[day].configure(text=f"{len(images)} imágenes")
+
+        # Miniaturas: de la carpeta si el día usa carpeta, si no de la lista
+        if self.weekday_use_folder_vars[day].get():
+            folder = self.weekday_folder_entries[day].get().strip()
+            if folder:
+                # Leer la carpeta puede tardar: se hace fuera del hilo de Tk
+                self.run_in_background(
+                    lambda: self.wallpaper_engine.media_library.get_paths(folder, "image"),
+                    lambda paths: self.show_day_preview(day, paths, folder))
+                return
+            images = []
+        self.show_day_preview(day, images)
+
+    def show_day_preview(self, day: str, paths: list, folder: Optional[str] = None) -> None:
+        """
+        Pide las miniaturas del resumen de un día y muestra las que ya existen
+
+        Args:
+            day: Día ("0" = lunes)
+            paths: Imágenes del día (solo se usan las primeras)
+            folder: Carpeta de la que se leyeron o None si vienen de la lista
+        """
+        if not self.is_tab_built(self.TAB_WEEKDAY):
+            return
+        if folder is not None and (not self.weekday_use_folder_vars[day].get() or
+                                   self.weekday_folder_entries[day].get().strip() != folder):
+            # El día cambió de origen mientras se leía la carpeta
+            return
+        preview = paths[:self.WEEKDAY_THUMBNAILS]
+        self.weekday_previews[day] = preview
+
+        missing = [path for path in preview if self.thumbnails.get(path) is None]
+        if missing:
+            self.thumbnails.request(missing, lambda _results, d=day: self.show_day_thumbnails(d))
+        self.show_day_thumbnails(day)
+
+    def show_day_thumbnails(self, day: str) -> None:
+        """Muestra en el resumen del día las miniaturas ya disponibles"""
+        try:
+            preview = self.weekday_previews.get(day, [])
+            for i, label in enumerate(self.weekday_thumb_labels[day]):
+                if i < len(preview):
+                    thumb_file = self.thumbnails.get(preview[i])
+                    label.configure(image=self.weekday_thumb_images.get(thumb_file))
+                    label.pack(side='left', padx=2)
+                else:
+                    label.pack_forget()
+        except (tk.TclError, AttributeError):
+            # La ventana fue cerrada o la interfaz se desmontó
+            pass
 
     def select_weekday_folder(self, day: str) -> None:
         """Selecciona una carpeta de imágenes para un día"""
@@ -1031,8 +1164,18 @@ class WallpaperChangerGUI:
         messagebox.showinfo("Guardado", "Configuración de días guardada correctamente")
 
     def change_now(self) -> None:
-        """Cambia el fondo inmediatamente"""
-        if self.wallpaper_engine.change_wallpaper():
+        """Cambia el fondo inmediatamente (normalizar y aplicar no bloquean Tk)"""
+        self.run_in_background(self.wallpaper_engine.change_wallpaper,
+                               self.show_change_result)
+
+    def show_change_result(self, changed: bool) -> None:
+        """
+        Informa del resultado de "cambiar ahora"
+
+        Args:
+            changed: True si el fondo se cambió
+        """
+        if changed:
             messagebox.showinfo(
                 "Éxito", "Fondo de pantalla cambiado correctamente")
             self.update_status()
@@ -1040,8 +1183,13 @@ class WallpaperChangerGUI:
             messagebox.showerror(
                 "Error", "No se pudo cambiar el fondo de pantalla")
 
-    def update_status(self) -> None:
-        """Actualiza el estado mostrado"""
+    def update_status(self, folder_counts=None) -> None:
+        """
+        Actualiza el estado mostrado
+
+        Args:
+            folder_counts: (imágenes, videos) ya contados o None para contarlos ahora
+        """
         mode = "Tiempo" if self.config_manager.get(
             "mode") == "time" else "Días de la semana"
         last_change = self.config_manager.get("last_change", "Nunca")
@@ -1056,12 +1204,12 @@ class WallpaperChangerGUI:
         # Información adicional
         if self.config_manager.get("mode") == "time":
             if self.config_manager.get("use_folder", False):
-                media_files = self.wallpaper_engine.get_media_from_folder()
-                media_count = len(media_files)
+                if folder_counts is None:
+                    folder_counts = self.wallpaper_engine.get_folder_counts()
+                media_count = sum(folder_counts)
                 source = f"Carpeta ({media_count} archivo(s))"
             else:
-                media_files = self.config_manager.get("wallpapers", [])
-                media_count = len(media_files)
+                media_count = self.config_manager.count_wallpapers()
                 source = f"Lista manual ({media_count} archivo(s))"
             status_text = f"Modo actual: {mode}\nFuente: {source}\nÚltimo cambio: {last_change}"
         else:
@@ -1079,15 +1227,12 @@ class WallpaperChangerGUI:
         """
         try:
             # Verificar que la ventana aún existe
-            if not hasattr(self, 'root') or not self.root.winfo_exists():
+            if not hasattr(self, 'root') or not self.root.winfo_exists() or not self.ui_built:
                 return
 
             # Actualizar en la interfaz
             if self.config_manager.get("mode") == "time":
-                if minutes > 0:
-                    countdown_text = f"⏰ Próximo cambio en: {minutes}m {seconds}s"
-                else:
-                    countdown_text = f"⏰ Próximo cambio en: {seconds}s"
+                countdown_text = f"⏰ Próximo cambio en: {format_remaining(minutes, seconds)}"
 
                 # Usar after para actualizar desde el thread principal de forma segura
                 try:
@@ -1107,9 +1252,29 @@ class WallpaperChangerGUI:
             # Silenciar errores de threading al cerrar la aplicación
             pass
 
-        # Actualizar en el system tray
-        if self.tray_manager:
-            self.tray_manager.update_countdown(minutes, seconds)
+    def set_window_visible(self, visible: bool) -> None:
+        """
+        Registra si la ventana está visible y despierta al contador
+
+        Args:
+            visible: True si la ventana se muestra en pantalla
+        """
+        if self.window_visible != visible:
+            self.window_visible = visible
+            self.wallpaper_engine.countdown.refresh()
+
+    def on_window_map(self, event) -> None:
+        """La ventana principal se mostró (deiconify/restaurar)"""
+        if event.widget is self.root:
+            if not self.ui_built:
+                self.cancel_teardown()
+                self.build_ui()
+            self.set_window_visible(True)
+
+    def on_window_unmap(self, event) -> None:
+        """La ventana principal se ocultó o minimizó"""
+        if event.widget is self.root:
+            self.set_window_visible(False)
 
     def enable_startup(self) -> None:
         """Habilita el inicio automático"""
@@ -1147,6 +1312,11 @@ class WallpaperChangerGUI:
             )
             # Iniciar el icono UNA SOLA VEZ al inicio
             self.tray_manager.setup()
+            # El tooltip solo necesita granularidad de minutos
+            self.wallpaper_engine.countdown.subscribe(
+                self.tray_manager.update_countdown,
+                is_active=self.tray_manager.is_visible,
+                granularity="minutes")
             print("✅ System tray iniciado al arranque")
         elif 'SIMPLE_TRAY_AVAILABLE' in globals() and SIMPLE_TRAY_AVAILABLE:
             # Fallback cuando pystray no está disponible o falla la importación
@@ -1176,6 +1346,10 @@ class WallpaperChangerGUI:
 
     def _show_window(self) -> None:
         """Método auxiliar para mostrar ventana"""
+        self.cancel_teardown()
+        if not self.ui_built:
+            self.build_ui()
+        self.set_window_visible(True)
         self.root.deiconify()
         self.root.lift()
         self.root.focus_force()
@@ -1183,6 +1357,8 @@ class WallpaperChangerGUI:
     def hide_window(self) -> None:
         """Oculta la ventana principal"""
         self.root.withdraw()
+        self.set_window_visible(False)
+        self.schedule_teardown()
         # Asegurar visibilidad del icono en la bandeja si el gestor lo soporta
         if self.tray_manager and hasattr(self.tray_manager, 'set_visible'):
             try:
@@ -1190,11 +1366,68 @@ class WallpaperChangerGUI:
             except Exception:
                 pass
 
+    # Desmontaje de la interfaz mientras vive en la bandeja
+
+    def build_ui(self) -> None:
+        """Construye la ventana de configuración a partir de la configuración guardada"""
+        before = set(vars(self))
+        # Cada pestaña carga su parte de la configuración al construirse
+        self.setup_ui()
+        self.ui_built = True
+        # Todo lo que cuelga de la interfaz se suelta al desmontarla
+        self._ui_attrs = set(vars(self)) - before
+
+    def get_teardown_ms(self) -> int:
+        """Milisegundos con la ventana oculta antes de desmontarla (0 = nunca)"""
+        try:
+            minutes = float(self.config_manager.get("ui_teardown_minutes", 10))
+        except (TypeError, ValueError):
+            return 0
+        return max(0, int(minutes * 60 * 1000))
+
+    def schedule_teardown(self) -> None:
+        """Programa el desmontaje de la interfaz si la ventana sigue oculta"""
+        self.cancel_teardown()
+        delay = self.get_teardown_ms()
+        if delay and self.ui_built:
+            self._teardown_job = self.root.after(delay, self.teardown_ui)
+
+    def cancel_teardown(self) -> None:
+        """Cancela un desmontaje programado"""
+        if self._teardown_job is not None:
+            try:
+                self.root.after_cancel(self._teardown_job)
+            except tk.TclError:
+                pass
+            self._teardown_job = None
+
+    def teardown_ui(self) -> None:
+        """
+        Destruye los widgets de configuración (lista, días, zona de archivos).
+        El motor, la bandeja y el canal de instancia siguen funcionando
+        """
+        self._teardown_job = None
+        if not self.ui_built or self.window_visible or self.root.state() != "withdrawn":
+            return
+        if self.is_tab_built(self.TAB_TIME):
+            self.path_status.shutdown()
+        self.ui_built = False
+        # Los hilos de miniaturas se vuelven a crear con la próxima petición
+        self.thumbnails.shutdown()
+        self.thumbnails.invalidate()
+        self.main_frame.destroy()
+        for name in self._ui_attrs:
+            self.__dict__.pop(name, None)
+        self._ui_attrs = set()
+        gc.collect()
+        print("🧹 Interfaz liberada; la aplicación sigue en la bandeja")
+
     def change_now_from_tray(self, icon=None, item=None) -> None:
         """Cambia el fondo desde la bandeja"""
         if self.config_manager.get("mode") == "weekday":
             return
 
+        # Corre en el hilo de la bandeja; el motor serializa con la fecha límite
         if self.wallpaper_engine.change_wallpaper():
             if self.tray_manager:
                 self.tray_manager.notify(
@@ -1204,7 +1437,15 @@ class WallpaperChangerGUI:
 
     def quit_app(self, icon=None, item=None) -> None:
         """Cierra completamente la aplicación"""
+        if self.instance_server:
+            self.instance_server.stop()
         self.wallpaper_engine.stop_monitoring()
+        # Escribir cambios de configuración pendientes (write-behind)
+        self.config_manager.flush()
+        self.cancel_teardown()
+        if self.is_tab_built(self.TAB_TIME):
+            self.path_status.shutdown()
+        self.thumbnails.shutdown()
         if self.tray_manager:
             self.tray_manager.stop()
         self.root.after(0, self.root.destroy)
@@ -1331,18 +1572,12 @@ class WallpaperChangerGUI:
 
                 if media_files:
                     # Agregar todos los archivos
-                    wallpapers = self.config_manager.get("wallpapers", [])
-                    added_count = 0
-
-                    for file_path in media_files:
-                        if file_path not in wallpapers:
-                            wallpapers.append(file_path)
-                            added_count += 1
+                    added_files = self.config_manager.add_wallpapers(media_files)
+                    added_count = len(added_files)
 
                     if added_count > 0:
-                        self.config_manager.set("wallpapers", wallpapers)
                         self.config_manager.save_config()
-                        self.refresh_wallpaper_list()
+                        self.apply_manual_list_diff(added=added_files)
 
                         messagebox.showinfo(
                             "Carpeta Agregada",
@@ -1625,13 +1860,8 @@ class WallpaperChangerGUI:
                 self.config_manager.set("wallpapers", [])
                 self.config_manager.save_config()
 
-                # Forzar actualización
-                def force_refresh():
-                    self.config_manager.load_config()
-                    self.refresh_wallpaper_list()
-                    print("🗑️ Lista limpiada completamente")
-
-                self.root.after(100, force_refresh)
+                self.refresh_wallpaper_list()
+                print("🗑️ Lista limpiada completamente")
 
                 msgbox.showinfo(
                     "Lista Limpiada", "✅ Se eliminaron todos los archivos de la lista.")
@@ -1645,26 +1875,17 @@ class WallpaperChangerGUI:
         try:
             wallpapers = self.config_manager.get("wallpapers", [])
 
-            # Buscar y eliminar archivo
-            removed = False
-            for i, wallpaper in enumerate(wallpapers):
-                if os.path.basename(wallpaper) == filename:
-                    wallpapers.pop(i)
-                    removed = True
-                    break
+            # Buscar archivo
+            match = next((w for w in wallpapers if os.path.basename(w) == filename), None)
+            removed = bool(match and self.config_manager.remove_wallpapers([match]))
 
             if removed:
                 # Guardar configuración
-                self.config_manager.set("wallpapers", wallpapers)
                 self.config_manager.save_config()
 
                 # Actualizar lista
-                def force_refresh():
-                    self.config_manager.load_config()
-                    self.refresh_wallpaper_list()
-                    print(f"🗑️ Eliminado: {filename}")
-
-                self.root.after(100, force_refresh)
+                self.apply_manual_list_diff(removed=[match])
+                print(f"🗑️ Eliminado: {filename}")
 
                 messagebox.showinfo("Archivo Eliminado",
                                     f"✅ Se eliminó: {filename}")
@@ -2390,9 +2611,7 @@ class WallpaperChangerGUI:
         if not files:
             return
 
-        # Obtener lista actual de fondos
-        wallpapers = self.config_manager.get("wallpapers", [])
-        added_files = []
+        candidates = []
         invalid_files = []
 
         # Extensiones válidas
@@ -2410,18 +2629,17 @@ class WallpaperChangerGUI:
                 file_ext = Path(file_path).suffix.lower()
 
                 if file_ext in valid_extensions:
-                    # Agregar si no está ya en la lista
-                    if file_path not in wallpapers:
-                        wallpapers.append(file_path)
-                        added_files.append(file_path)
+                    candidates.append(file_path)
                 else:
                     invalid_files.append(file_path)
 
+        # Agregar los que no estén ya en la lista (deduplicación indexada)
+        added_files = self.config_manager.add_wallpapers(candidates)
+
         # Guardar cambios si se agregaron archivos
         if added_files:
-            self.config_manager.set("wallpapers", wallpapers)
             self.config_manager.save_config()
-            self.refresh_wallpaper_list()
+            self.apply_manual_list_diff(added=added_files)
 
             # Mostrar mensaje de éxito
             file_count = len(added_files)
@@ -0,0 +1,198 @@
+"""
+Módulo de normalización de imágenes
+Escala y recorta cada fondo a la resolución de la pantalla, quita los metadatos
+y guarda el resultado en una caché en disco (ruta + mtime + resolución) para
+que el sistema reciba siempre una imagen del tamaño justo
+"""
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Tuple
+
+from .config_manager import get_cache_dir
+
+
+class ImageNormalizer:
+    """Caché de imágenes listas para la pantalla con expulsión LRU y límite de tamaño"""
+
+    MODES = ("fill", "fit", "center")
+    FORMATS = {"jpeg": ".jpg", "bmp": ".bmp"}
+    BACKGROUND = (0, 0, 0)
+    JPEG_QUALITY = 92
+
+    def __init__(self, cache_dir: Optional[Path] = None, mode: str = "fill",
+                 fmt: str = "jpeg", max_bytes: int = 256 * 1024 * 1024):
+        """
+        Args:
+            cache_dir: Carpeta de la caché. Si es None, usa la caché por defecto
+            mode: "fill" (cubre y recorta), "fit" (cabe entera con bandas) o
+                "center" (tamaño original centrado)
+            fmt: "jpeg" o "bmp" (sin compresión: el sistema no tiene que decodificar)
+            max_bytes: Tamaño máximo de la caché en disco
+        """
+        if cache_dir is None:
+            cache_dir = get_cache_dir("display")
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.mode = mode if mode in self.MODES else "fill"
+        self.fmt = fmt if fmt in self.FORMATS else "jpeg"
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.generated = 0
+        self.evicted = 0
+        # nombre de archivo -> bytes, en orden LRU
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self._total_bytes = 0
+        # Archivo que está puesto como fondo: nunca se expulsa
+        self.applied: Optional[str] = None
+        self._lock = threading.Lock()
+        self._load_entries()
+
+    def _load_entries(self) -> None:
+        """Reconstruye el orden LRU a partir del mtime de los archivos de la caché"""
+        files = []
+        try:
+            with os.scandir(self.cache_dir) as it:
+                for item in it:
+                    if item.name.endswith(".tmp"):
+                        try:
+                            os.remove(item.path)
+                        except OSError:
+                            pass
+                    elif item.is_file():
+                        st = item.stat()
+                        files.append((st.st_mtime, item.name, st.st_size))
+        except OSError:
+            return
+        for _mtime, name, size in sorted(files):
+            self._entries[name] = size
+            self._total_bytes += size
+
+    def key(self, path: str, st: os.stat_result, size: Tuple[int, int]) -> str:
+        """Nombre del archivo normalizado para una versión de la imagen y una resolución"""
+        raw = (f"{os.path.abspath(path)}\0{st.st_mtime_ns}\0{st.st_size}\0"
+               f"{size[0]}x{size[1]}\0{self.mode}")
+        return hashlib.sha1(raw.encode("utf-8", "surrogatepass")).hexdigest() + self.FORMATS[self.fmt]
+
+    def normalize(self, path: str, size: Tuple[int, int]) -> Optional[str]:
+        """
+        Devuelve la versión de la imagen a la resolución de la pantalla
+
+        Args:
+            path: Ruta de la imagen original
+            size: (ancho, alto) de la pantalla
+
+        Returns:
+            Ruta del archivo normalizado o None si no se pudo generar
+        """
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        name = self.key(path, st, size)
+        target = self.cache_dir / name
+
+        with self._lock:
+            hit = name in self._entries
+            if hit:
+                self._entries.move_to_end(name)
+        if hit and target.exists():
+            self.hits += 1
+            try:
+                # Persistir el orden LRU entre sesiones
+                os.utime(target)
+            except OSError:
+                pass
+            return str(target)
+
+        try:
+            image = self._render(path, size)
+            temp_path = target.with_suffix(".tmp")
+            if self.fmt == "bmp":
+                image.save(temp_path, "BMP")
+            else:
+                image.save(temp_path, "JPEG", quality=self.JPEG_QUALITY)
+            os.replace(temp_path, target)
+            file_size = target.stat().st_size
+        except Exception as e:
+            print(f"⚠️ No se pudo normalizar {os.path.basename(path)}: {e}")
+            return None
+        self.generated += 1
+
+        with self._lock:
+            self._total_bytes += file_size - self._entries.pop(name, 0)
+            self._entries[name] = file_size
+            self._evict(keep=name)
+        return str(target)
+
+    def pin(self, image_path: str) -> None:
+        """
+        Marca el archivo aplicado como fondo para que la expulsión no lo borre
+
+        Args:
+            image_path: Imagen que se aplicó (si no es de esta caché, no se protege nada)
+        """
+        path = Path(image_path)
+        with self._lock:
+            self.applied = path.name if path.parent == self.cache_dir else None
+
+    def _render(self, path: str, size: Tuple[int, int]):
+        """Compone la imagen sobre un lienzo nuevo del tamaño de la pantalla (sin metadatos)"""
+        from PIL import Image, ImageOps
+
+        width, height = size
+        with Image.open(path) as image:
+            # La orientación EXIF se aplica antes de perder los metadatos
+            swapped = image.getexif().get(0x0112, 1) in (5, 6, 7, 8)
+            src_w, src_h = (image.height, image.width) if swapped else image.size
+            if self.mode == "fill":
+                scale = max(width / src_w, height / src_h)
+            elif self.mode == "fit":
+                scale = min(width / src_w, height / src_h)
+            else:
+                scale = 1.0
+            scaled = (max(1, round(src_w * scale)), max(1, round(src_h * scale)))
+
+            if image.format == "JPEG" and scale < 1.0:
+                # El decodificador JPEG escala en el dominio DCT (1/2, 1/4, 1/8)
+                draft = (scaled[1], scaled[0]) if swapped else scaled
+                image.draft("RGB", draft)
+            image = ImageOps.exif_transpose(image)
+            if image.mode in ("RGBA", "LA", "P"):
+                image = image.convert("RGBA")
+                flat = Image.new("RGB", image.size, self.BACKGROUND)
+                flat.paste(image, mask=image.getchannel("A"))
+                image = flat
+            else:
+                image = image.convert("RGB")
+            if image.size != scaled:
+                image = image.resize(scaled, Image.Resampling.LANCZOS)
+
+        canvas = Image.new("RGB", size, self.BACKGROUND)
+        # Centrado; en "fill" y "center" lo que sobresale queda recortado
+        canvas.paste(image, ((width - scaled[0]) // 2, (height - scaled[1]) // 2))
+        return canvas
+
+    def _evict(self, keep: str) -> None:
+        """
+        Elimina las imágenes menos usadas hasta respetar max_bytes (con el lock tomado)
+
+        Args:
+            keep: Imagen recién generada; tampoco se expulsa la aplicada (pin)
+        """
+        protected = {keep, self.applied}
+        for name in list(self._entries):
+            if self._total_bytes <= self.max_bytes:
+                break
+            if name in protected:
+                continue
+            size = self._entries.pop(name)
+            self._total_bytes -= size
+            self.evicted += 1
+            try:
+                os.remove(self.cache_dir / name)
+            except OSError:
+                pass
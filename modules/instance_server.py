@@ -0,0 +1,255 @@
+"""
+Módulo de instancia única
+La instancia en ejecución escucha en un canal local (socket Unix o tubería con
+nombre en Windows); las invocaciones del menú contextual le envían sus rutas y
+terminan, y el servidor agrupa las ráfagas en una sola escritura
+"""
+
+import getpass
+import os
+import sys
+import threading
+from typing import Callable, Dict, List, Optional
+
+from .config_manager import get_cache_dir
+
+
+# Órdenes que entiende la instancia en ejecución
+CMD_ADD = "add"
+CMD_SHOW = "show"
+CMD_PING = "ping"
+# Órdenes de control del modo --daemon
+CMD_CHANGE_NOW = "change_now"
+CMD_RELOAD = "reload"
+CMD_STATUS = "status"
+CMD_QUIT = "quit"
+
+
+def default_address() -> str:
+    """Dirección del canal de la instancia del usuario actual"""
+    if sys.platform == "win32":
+        try:
+            user = getpass.getuser()
+        except Exception:
+            user = "default"
+        return r"\\.\pipe\wallpaper_changer-" + "".join(c for c in user if c.isalnum())
+    return str(get_cache_dir("ipc") / "instance.sock")
+
+
+def get_authkey() -> bytes:
+    """
+    Clave compartida por las instancias del usuario (se crea la primera vez)
+
+    Returns:
+        Clave de autenticación para multiprocessing.connection
+    """
+    key_path = get_cache_dir("ipc") / "authkey"
+    try:
+        fd = os.open(key_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except FileExistsError:
+        with open(key_path, "rb") as f:
+            key = f.read()
+        if key:
+            return key
+        fd = os.open(key_path, os.O_WRONLY | os.O_TRUNC)
+    key = os.urandom(32)
+    with os.fdopen(fd, "wb") as f:
+        f.write(key)
+    return key
+
+
+def send_command(command: str, payload=None, address: Optional[str] = None,
+                 authkey: Optional[bytes] = None, timeout: float = 2.0):
+    """
+    Envía una orden a la instancia en ejecución
+
+    Args:
+        command: CMD_ADD, CMD_SHOW, CMD_PING u otra orden registrada
+        payload: Datos de la orden (por ejemplo, la lista de rutas)
+        address: Dirección del canal. Si es None, la del usuario actual
+        authkey: Clave compartida. Si es None, la del usuario actual
+        timeout: Segundos máximos esperando la respuesta
+
+    Returns:
+        Respuesta de la instancia o None si no hay ninguna escuchando
+    """
+    from multiprocessing import AuthenticationError
+    from multiprocessing.connection import Client
+
+    if address is None:
+        address = default_address()
+    if sys.platform != "win32" and not os.path.exists(address):
+        return None
+    try:
+        conn = Client(address, authkey=authkey or get_authkey())
+    except (OSError, EOFError, AuthenticationError):
+        return None
+    try:
+        conn.send((command, payload))
+        if not conn.poll(timeout):
+            return None
+        status, result = conn.recv()
+        return result if status == "ok" else None
+    except (OSError, EOFError):
+        return None
+    finally:
+        conn.close()
+
+
+class InstanceServer:
+    """Canal de la instancia en ejecución"""
+
+    # Ventana en la que se agrupan las rutas de varias invocaciones
+    COALESCE_SECONDS = 0.3
+    # Espera máxima por el mensaje de un cliente ya conectado
+    CLIENT_TIMEOUT = 2.0
+
+    def __init__(self, on_add: Callable[[List[str]], None],
+                 handlers: Optional[Dict[str, Callable[[object], object]]] = None,
+                 address: Optional[str] = None, authkey: Optional[bytes] = None,
+                 coalesce_seconds: Optional[float] = None):
+        """
+        Args:
+            on_add: Recibe cada lote de rutas agregadas, sin repetidos. Se llama
+                desde un hilo del servidor
+            handlers: Funciones por orden; reciben el payload y su resultado se
+                devuelve al cliente. Se llaman desde el hilo del servidor
+            address: Dirección del canal. Si es None, la del usuario actual
+            authkey: Clave compartida. Si es None, la del usuario actual
+            coalesce_seconds: Ventana de agrupación de CMD_ADD
+        """
+        self.on_add = on_add
+        self.handlers: Dict[str, Callable[[object], object]] = dict(handlers or {})
+        self.address = address or default_address()
+        self.authkey = authkey
+        self.coalesce_seconds = (self.COALESCE_SECONDS if coalesce_seconds is None
+                                 else coalesce_seconds)
+        self.batches = 0
+        self.listener = None
+        self.thread: Optional[threading.Thread] = None
+        self.running = False
+        self._pending: List[str] = []
+        self._timer: Optional[threading.Timer] = None
+        self._lock = threading.Lock()
+
+    def start(self) -> bool:
+        """
+        Empieza a escuchar
+
+        Returns:
+            False si ya hay otra instancia escuchando en la dirección
+        """
+        from multiprocessing.connection import Listener
+
+        if self.authkey is None:
+            self.authkey = get_authkey()
+        if sys.platform != "win32" and os.path.exists(self.address):
+            if send_command(CMD_PING, address=self.address, authkey=self.authkey) is not None:
+                return False
+            # Socket de una instancia que terminó sin limpiarlo
+            try:
+                os.remove(self.address)
+            except OSError:
+                pass
+        try:
+            self.listener = Listener(self.address, authkey=self.authkey)
+        except OSError as e:
+            print(f"⚠️ No se pudo abrir el canal de instancia única: {e}")
+            return False
+
+        self.running = True
+        self.thread = threading.Thread(target=self._serve, name="instance-server", daemon=True)
+        self.thread.start()
+        return True
+
+    def _serve(self) -> None:
+        """Atiende conexiones una a una (cada cliente envía una orden y se va)"""
+        from multiprocessing import AuthenticationError
+
+        while self.running:
+            try:
+                conn = self.listener.accept()
+            except AuthenticationError:
+                continue
+            except (OSError, EOFError):
+                if not self.running:
+                    break
+                continue
+            try:
+                if conn.poll(self.CLIENT_TIMEOUT):
+                    command, payload = conn.recv()
+                    conn.send(self._dispatch(command, payload))
+            except (OSError, EOFError, ValueError, TypeError):
+                pass
+            finally:
+                conn.close()
+
+    def _dispatch(self, command: str, payload) -> tuple:
+        """Ejecuta una orden y devuelve (estado, resultado)"""
+        if command == CMD_PING:
+            return "ok", True
+        if command == CMD_ADD:
+            paths = [str(path) for path in payload or []]
+            self._queue_add(paths)
+            return "ok", len(paths)
+        handler = self.handlers.get(command)
+        if handler is None:
+            return "error", f"Orden desconocida: {command}"
+        try:
+            return "ok", handler(payload)
+        except Exception as e:
+            print(f"Error atendiendo la orden {command}: {e}")
+            return "error", str(e)
+
+    def _queue_add(self, paths: List[str]) -> None:
+        """Acumula rutas y programa su entrega al cerrar la ventana de agrupación"""
+        with self._lock:
+            self._pending.extend(paths)
+            if self._timer is None:
+                self._timer = threading.Timer(self.coalesce_seconds, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self) -> None:
+        """Entrega ya las rutas pendientes (un solo lote sin repetidos)"""
+        with self._lock:
+            paths, self._pending = self._pending, []
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        paths = list(dict.fromkeys(paths))
+        if not paths:
+            return
+        self.batches += 1
+        try:
+            self.on_add(paths)
+        except Exception as e:
+            print(f"Error agregando archivos recibidos: {e}")
+
+    def stop(self) -> None:
+        """Deja de escuchar y entrega lo pendiente"""
+        if not self.running:
+            return
+        self.running = False
+        self._wake()
+        try:
+            self.listener.close()
+        except OSError:
+            pass
+        if self.thread is not None:
+            self.thread.join(timeout=2)
+        self.flush()
+
+    def _wake(self) -> None:
+        """Despierta accept() con una conexión sin autenticar (no espera respuesta)"""
+        try:
+            if sys.platform == "win32":
+                with open(self.address, "r+b"):
+                    pass
+            else:
+                import socket
+                with socket.socket(socket.AF_UNIX) as sock:
+                    sock.settimeout(0.5)
+                    sock.connect(self.address)
+        except OSError:
+            pass
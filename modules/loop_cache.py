@@ -0,0 +1,279 @@
+"""
+Módulo de caché de bucles de video
+Guarda los fotogramas ya escalados de videos cortos en un archivo mapeado en
+memoria para que las siguientes vueltas no necesiten decodificar
+"""
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Tuple
+
+from .config_manager import get_cache_dir
+
+
+class LoopClip:
+    """Lector de fotogramas cacheados con la interfaz de cv2.VideoCapture que usa FrameDecoder"""
+
+    def __init__(self, frames, fps: float):
+        """
+        Args:
+            frames: Array (fotogramas, alto, ancho, 3) RGB, normalmente np.memmap
+            fps: Velocidad del video original
+        """
+        self.frames = frames
+        self.fps = fps
+        self.position = 0
+
+    def isOpened(self) -> bool:
+        return self.frames is not None
+
+    def get(self, prop: int) -> float:
+        # 5 == cv2.CAP_PROP_FPS, 7 == cv2.CAP_PROP_FRAME_COUNT
+        if prop == 5:
+            return self.fps
+        if prop == 7:
+            return float(len(self.frames))
+        return 0.0
+
+    def read(self):
+        if self.frames is None or self.position >= len(self.frames):
+            return False, None
+        frame = self.frames[self.position]
+        self.position += 1
+        return True, frame
+
+    def grab(self) -> bool:
+        if self.frames is None or self.position >= len(self.frames):
+            return False
+        self.position += 1
+        return True
+
+    def set(self, prop: int, value: float) -> bool:
+        # 1 == cv2.CAP_PROP_POS_FRAMES
+        if prop == 1:
+            self.position = int(value)
+            return True
+        return False
+
+    def release(self) -> None:
+        # El mapa se libera cuando no quedan vistas vivas en la cola
+        self.frames = None
+
+
+class LoopRecorder:
+    """Escribe los fotogramas de la primera vuelta en un archivo temporal de la caché"""
+
+    def __init__(self, cache: "LoopFrameCache", name: str, fps: float, frame_count: int,
+                 size: Tuple[int, int]):
+        import numpy as np
+
+        self.cache = cache
+        self.name = name
+        self.fps = fps
+        self.frame_count = frame_count
+        self.size = size
+        self.written = 0
+        self.temp_path = cache.cache_dir / (name + ".tmp")
+        self._frames = np.memmap(self.temp_path, dtype=np.uint8, mode="w+",
+                                 shape=(frame_count, size[1], size[0], 3))
+
+    def add(self, image) -> bool:
+        """
+        Copia un fotograma ya escalado
+
+        Returns:
+            False si el video tiene más fotogramas de los previstos (se aborta)
+        """
+        if self._frames is None:
+            return False
+        if self.written >= self.frame_count or image.shape != self._frames.shape[1:]:
+            self.abort()
+            return False
+        self._frames[self.written] = image
+        self.written += 1
+        return True
+
+    def finish(self) -> Optional[LoopClip]:
+        """
+        Cierra el archivo y lo registra en la caché
+
+        Returns:
+            LoopClip listo para reproducir o None si la grabación no sirve
+        """
+        if self._frames is None or self.written == 0:
+            self.abort()
+            return None
+        frames, self._frames = self._frames, None
+        frames.flush()
+        del frames
+        # CAP_PROP_FRAME_COUNT es aproximado en algunos contenedores
+        frame_bytes = self.size[0] * self.size[1] * 3
+        if self.written < self.frame_count:
+            os.truncate(self.temp_path, self.written * frame_bytes)
+        return self.cache._commit(self)
+
+    def abort(self) -> None:
+        """Descarta la grabación"""
+        self._frames = None
+        try:
+            os.remove(self.temp_path)
+        except OSError:
+            pass
+
+
+class LoopFrameCache:
+    """Caché en disco de bucles decodificados con límite de tamaño y expulsión LRU"""
+
+    def __init__(self, cache_dir: Optional[Path] = None, max_bytes: int = 0):
+        """
+        Args:
+            cache_dir: Carpeta de la caché. Si es None, usa la caché por defecto
+            max_bytes: Tamaño máximo total; un video solo se cachea si cabe entero.
+                0 desactiva la caché
+        """
+        if cache_dir is None:
+            cache_dir = get_cache_dir("video_loops")
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.evicted = 0
+        # nombre base -> bytes de fotogramas, en orden LRU
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self._load_entries()
+
+    def _load_entries(self) -> None:
+        """Reconstruye el orden LRU a partir del mtime de los archivos de la caché"""
+        files = []
+        try:
+            with os.scandir(self.cache_dir) as it:
+                for item in it:
+                    if item.name.endswith(".tmp"):
+                        # Grabación interrumpida en una sesión anterior
+                        try:
+                            os.remove(item.path)
+                        except OSError:
+                            pass
+                    elif item.name.endswith(".rgb"):
+                        st = item.stat()
+                        files.append((st.st_mtime, item.name[:-4], st.st_size))
+        except OSError:
+            return
+        for _mtime, name, size in sorted(files):
+            self._entries[name] = size
+            self._total_bytes += size
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def key(self, path: str, st: os.stat_result, size: Tuple[int, int], variant: str = "") -> str:
+        """Nombre base de los archivos de un video a una resolución y modo de escalado"""
+        raw = f"{os.path.abspath(path)}\0{st.st_mtime_ns}\0{st.st_size}\0{size[0]}x{size[1]}\0{variant}"
+        return hashlib.sha1(raw.encode("utf-8", "surrogatepass")).hexdigest()
+
+    def open(self, path: str, size: Tuple[int, int], variant: str = "") -> Optional[LoopClip]:
+        """
+        Abre un bucle cacheado
+
+        Returns:
+            LoopClip o None si no está en la caché
+        """
+        if not self.enabled:
+            return None
+        try:
+            name = self.key(path, os.stat(path), size, variant)
+        except OSError:
+            return None
+        with self._lock:
+            if name not in self._entries:
+                return None
+            self._entries.move_to_end(name)
+
+        clip = self._map(name, size)
+        if clip is None:
+            with self._lock:
+                self._total_bytes -= self._entries.pop(name, 0)
+            return None
+        self.hits += 1
+        try:
+            os.utime(self.cache_dir / (name + ".rgb"))
+        except OSError:
+            pass
+        return clip
+
+    def _map(self, name: str, size: Tuple[int, int]) -> Optional[LoopClip]:
+        """Mapea en memoria el archivo de fotogramas (solo lectura)"""
+        import numpy as np
+
+        try:
+            with open(self.cache_dir / (name + ".json"), "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            frames = np.memmap(self.cache_dir / (name + ".rgb"), dtype=np.uint8, mode="r",
+                               shape=(meta["frames"], size[1], size[0], 3))
+        except (OSError, ValueError, KeyError):
+            return None
+        return LoopClip(frames, meta["fps"])
+
+    def recorder(self, path: str, size: Tuple[int, int], fps: float, frame_count: int,
+                 variant: str = "") -> Optional[LoopRecorder]:
+        """
+        Prepara la grabación de la primera vuelta de un video
+
+        Returns:
+            LoopRecorder o None si la caché está desactivada o el video no cabe
+        """
+        if not self.enabled or frame_count <= 0:
+            return None
+        if frame_count * size[0] * size[1] * 3 > self.max_bytes:
+            return None
+        try:
+            name = self.key(path, os.stat(path), size, variant)
+            return LoopRecorder(self, name, fps, frame_count, size)
+        except (OSError, ImportError) as e:
+            print(f"⚠️ Caché de bucle no disponible: {e}")
+            return None
+
+    def _commit(self, recorder: LoopRecorder) -> Optional[LoopClip]:
+        """Publica una grabación terminada y aplica el límite de tamaño"""
+        name = recorder.name
+        data_path = self.cache_dir / (name + ".rgb")
+        meta_path = self.cache_dir / (name + ".json")
+        try:
+            with open(meta_path, "w", encoding="utf-8") as f:
+                json.dump({"fps": recorder.fps, "frames": recorder.written}, f)
+            os.replace(recorder.temp_path, data_path)
+            size = data_path.stat().st_size
+        except OSError as e:
+            print(f"⚠️ No se pudo guardar el bucle: {e}")
+            recorder.abort()
+            return None
+
+        with self._lock:
+            self._total_bytes += size - self._entries.pop(name, 0)
+            self._entries[name] = size
+            self._evict(keep=name)
+        print(f"💾 Bucle de video cacheado ({recorder.written} fotogramas)")
+        return self._map(name, recorder.size)
+
+    def _evict(self, keep: str) -> None:
+        """Elimina los bucles menos usados hasta respetar max_bytes (con el lock tomado)"""
+        while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+            name, size = next(iter(self._entries.items()))
+            if name == keep:
+                self._entries.move_to_end(name)
+                continue
+            del self._entries[name]
+            self._total_bytes -= size
+            self.evicted += 1
+            for suffix in (".rgb", ".json"):
+                try:
+                    os.remove(self.cache_dir / (name + suffix))
+                except OSError:
+                    pass
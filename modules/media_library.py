@@ -0,0 +1,369 @@
+"""
+Módulo de la biblioteca de medios
+Índice persistente e incremental de las carpetas de fondos
+"""
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from .config_manager import get_cache_dir
+
+
+# Extensiones válidas para imágenes y videos
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.bmp'}
+VIDEO_EXTENSIONS = {'.mp4', '.avi', '.mov', '.wmv', '.mkv', '.flv', '.webm', '.m4v'}
+MEDIA_EXTENSIONS = IMAGE_EXTENSIONS | VIDEO_EXTENSIONS
+
+
+def get_media_kind(file_path: str) -> Optional[str]:
+    """
+    Determina el tipo de medio según la extensión
+
+    Args:
+        file_path: Ruta o nombre del archivo
+
+    Returns:
+        "image", "video" o None si no es un medio soportado
+    """
+    ext = os.path.splitext(file_path)[1].lower()
+    if ext in IMAGE_EXTENSIONS:
+        return "image"
+    if ext in VIDEO_EXTENSIONS:
+        return "video"
+    return None
+
+
+class MediaEntry(NamedTuple):
+    """Entrada del índice de una carpeta"""
+    path: str
+    kind: str
+    size: int
+    mtime: float
+
+
+class MediaLibrary:
+    """Índice de medios por carpeta que solo se reescanea si cambia el mtime del directorio"""
+
+    INDEX_VERSION = 1
+    # Las escrituras del índice que lleguen dentro de esta ventana se agrupan
+    SAVE_DELAY_SECONDS = 2.0
+
+    def __init__(self, index_file: Optional[Path] = None):
+        """
+        Inicializa la biblioteca
+
+        Args:
+            index_file: Archivo donde persistir el índice. Si es None, usa la caché por defecto
+        """
+        if index_file is None:
+            index_file = get_cache_dir("media_index") / "index.json"
+        self.index_file = Path(index_file)
+        self.scans = 0
+        self.writes = 0
+        self._folders: Dict[str, dict] = {}
+        self._lock = threading.RLock()
+        # Serializa las escrituras del archivo sin bloquear las consultas
+        self._save_lock = threading.Lock()
+        self._dirty = False
+        self._save_timer: Optional[threading.Timer] = None
+        self._load()
+
+    @staticmethod
+    def _folder_key(folder_path: str) -> str:
+        """Normaliza la ruta de una carpeta para usarla como clave"""
+        return os.path.normcase(os.path.abspath(folder_path))
+
+    def _load(self) -> None:
+        """Carga el índice persistido (si existe y es de esta versión)"""
+        if not self.index_file.exists():
+            return
+        try:
+            with open(self.index_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get("version") != self.INDEX_VERSION:
+                return
+            for key, folder_data in data.get("folders", {}).items():
+                entries = {}
+                for name, kind, size, mtime in folder_data.get("entries", []):
+                    entries[name] = (kind, size, mtime)
+                self._folders[key] = self._make_folder(
+                    folder_data["folder"], folder_data["dir_mtime"], entries)
+        except Exception as e:
+            print(f"Error cargando índice de medios: {e}")
+            self._folders = {}
+
+    def save(self) -> bool:
+        """
+        Persiste el índice de forma atómica
+
+        Returns:
+            True si se guardó correctamente
+        """
+        with self._save_lock:
+            # La copia se toma bajo el cerrojo; la escritura del JSON, fuera de él
+            with self._lock:
+                self._dirty = False
+                data = {
+                    "version": self.INDEX_VERSION,
+                    "folders": {
+                        key: {
+                            "folder": folder["folder"],
+                            "dir_mtime": folder["dir_mtime"],
+                            "entries": [[name, *info] for name, info in folder["entries"].items()]
+                        }
+                        for key, folder in self._folders.items()
+                    }
+                }
+            try:
+                temp_file = self.index_file.with_suffix(".tmp")
+                with open(temp_file, 'w', encoding='utf-8') as f:
+                    json.dump(data, f, ensure_ascii=False)
+                os.replace(temp_file, self.index_file)
+                self.writes += 1
+                return True
+            except Exception as e:
+                print(f"Error guardando índice de medios: {e}")
+                with self._lock:
+                    self._dirty = True
+                return False
+
+    def _schedule_save(self) -> None:
+        """Marca el índice como modificado y programa una única escritura diferida"""
+        with self._lock:
+            self._dirty = True
+            if self._save_timer is None:
+                self._save_timer = threading.Timer(self.SAVE_DELAY_SECONDS, self.flush)
+                self._save_timer.daemon = True
+                self._save_timer.start()
+
+    def flush(self) -> bool:
+        """
+        Escribe inmediatamente los cambios pendientes del índice (usar al cerrar)
+
+        Returns:
+            True si no quedaron cambios sin escribir
+        """
+        with self._lock:
+            if self._save_timer is not None:
+                self._save_timer.cancel()
+                self._save_timer = None
+            if not self._dirty:
+                return True
+        return self.save()
+
+    @staticmethod
+    def _make_folder(folder_path: str, dir_mtime: int, entries: Dict[str, tuple]) -> dict:
+        """Crea la estructura interna de una carpeta con sus contadores"""
+        counts = {"image": 0, "video": 0}
+        for kind, _size, _mtime in entries.values():
+            counts[kind] = counts.get(kind, 0) + 1
+        return {
+            "folder": folder_path,
+            "dir_mtime": dir_mtime,
+            "entries": entries,
+            "counts": counts,
+            "sorted": {}
+        }
+
+    def _scan(self, folder_path: str, dir_mtime: int, previous: Optional[dict]) -> dict:
+        """
+        Escanea una carpeta reutilizando las entradas ya conocidas
+
+        Solo se hace stat de los archivos nuevos. Se llama sin el cerrojo.
+        """
+        known = previous["entries"] if previous else {}
+        entries = {}
+        try:
+            with os.scandir(folder_path) as it:
+                for item in it:
+                    kind = get_media_kind(item.name)
+                    if kind is None:
+                        continue
+                    info = known.get(item.name)
+                    if info is not None:
+                        entries[item.name] = info
+                        continue
+                    try:
+                        if not item.is_file():
+                            continue
+                        st = item.stat()
+                        entries[item.name] = (kind, st.st_size, st.st_mtime)
+                    except OSError:
+                        continue
+        except Exception as e:
+            print(f"Error leyendo carpeta: {e}")
+
+        return self._make_folder(folder_path, dir_mtime, entries)
+
+    def _get_folder(self, folder_path: Optional[str]) -> Optional[dict]:
+        """Devuelve el índice de la carpeta, reescaneando solo si cambió su mtime"""
+        if not folder_path:
+            return None
+        try:
+            dir_mtime = os.stat(folder_path).st_mtime_ns
+        except OSError:
+            return None
+
+        key = self._folder_key(folder_path)
+        with self._lock:
+            cached = self._folders.get(key)
+            if cached is not None and cached["dir_mtime"] == dir_mtime:
+                return cached
+
+        # El escaneo se hace sin el cerrojo: las demás carpetas siguen respondiendo
+        folder = self._scan(folder_path, dir_mtime, cached)
+
+        with self._lock:
+            self.scans += 1
+            current = self._folders.get(key)
+            if current is not None and current is not cached:
+                # Otro hilo actualizó la carpeta mientras tanto
+                return current
+            self._folders[key] = folder
+
+        self._schedule_save()
+        return folder
+
+    def get_paths(self, folder_path: Optional[str], kind: Optional[str] = None) -> List[str]:
+        """
+        Obtiene las rutas ordenadas de los medios de una carpeta
+
+        Args:
+            folder_path: Ruta de la carpeta
+            kind: "image", "video" o None para todos
+
+        Returns:
+            Lista ordenada de rutas
+        """
+        folder = self._get_folder(folder_path)
+        if folder is None:
+            return []
+
+        with self._lock:
+            cache_key = kind or "all"
+            paths = folder["sorted"].get(cache_key)
+            if paths is None:
+                base = folder["folder"]
+                paths = [
+                    os.path.join(base, name)
+                    for name in sorted(folder["entries"])
+                    if kind is None or folder["entries"][name][0] == kind
+                ]
+                folder["sorted"][cache_key] = paths
+            return list(paths)
+
+    def get_entries(self, folder_path: Optional[str]) -> List[MediaEntry]:
+        """
+        Obtiene las entradas (ruta, tipo, tamaño, mtime) de una carpeta
+
+        Args:
+            folder_path: Ruta de la carpeta
+
+        Returns:
+            Lista de MediaEntry ordenada por nombre
+        """
+        folder = self._get_folder(folder_path)
+        if folder is None:
+            return []
+
+        with self._lock:
+            base = folder["folder"]
+            return [
+                MediaEntry(os.path.join(base, name), *folder["entries"][name])
+                for name in sorted(folder["entries"])
+            ]
+
+    def count(self, folder_path: Optional[str], kind: Optional[str] = None) -> int:
+        """
+        Cuenta los medios de una carpeta en O(1) (tras el primer escaneo)
+
+        Args:
+            folder_path: Ruta de la carpeta
+            kind: "image", "video" o None para todos
+
+        Returns:
+            Número de archivos
+        """
+        folder = self._get_folder(folder_path)
+        if folder is None:
+            return 0
+
+        with self._lock:
+            if kind is None:
+                return len(folder["entries"])
+            return folder["counts"].get(kind, 0)
+
+    def apply_changes(self, folder_path: str, names: Iterable[str]) -> Tuple[List[str], List[str]]:
+        """
+        Aplica cambios puntuales a una carpeta ya indexada sin reescanearla
+
+        Cada nombre se resuelve contra el disco: si existe se agrega o
+        actualiza, si no existe se elimina.
+
+        Args:
+            folder_path: Ruta de la carpeta
+            names: Nombres de archivo que cambiaron
+
+        Returns:
+            Tupla (rutas agregadas, rutas eliminadas)
+        """
+        added: List[str] = []
+        removed: List[str] = []
+        key = self._folder_key(folder_path)
+
+        with self._lock:
+            folder = self._folders.get(key)
+            if folder is None:
+                # Aún no indexada: se escaneará en la próxima consulta
+                return added, removed
+
+            entries = folder["entries"]
+            counts = folder["counts"]
+            base = folder["folder"]
+            for name in names:
+                kind = get_media_kind(name)
+                if kind is None:
+                    continue
+                full_path = os.path.join(base, name)
+                try:
+                    st = os.stat(full_path)
+                    is_file = os.path.isfile(full_path)
+                except OSError:
+                    is_file = False
+
+                if is_file:
+                    if name not in entries:
+                        counts[kind] = counts.get(kind, 0) + 1
+                        added.append(full_path)
+                    entries[name] = (kind, st.st_size, st.st_mtime)
+                elif name in entries:
+                    old_kind = entries.pop(name)[0]
+                    counts[old_kind] = counts.get(old_kind, 1) - 1
+                    removed.append(full_path)
+
+            if added or removed:
+                folder["sorted"] = {}
+            try:
+                folder["dir_mtime"] = os.stat(folder_path).st_mtime_ns
+            except OSError:
+                pass
+
+        if added or removed:
+            self._schedule_save()
+        return added, removed
+
+    def invalidate(self, folder_path: Optional[str] = None) -> None:
+        """
+        Olvida el índice de una carpeta (o de todas) para forzar un reescaneo
+
+        Args:
+            folder_path: Ruta de la carpeta o None para todas
+        """
+        with self._lock:
+            if folder_path is None:
+                self._folders.clear()
+            else:
+                self._folders.pop(self._folder_key(folder_path), None)
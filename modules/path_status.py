@@ -0,0 +1,140 @@
+"""
+Módulo de comprobación de rutas en segundo plano
+Hace stat de los archivos de la lista fuera del hilo de la interfaz
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+
+class PathStatus(NamedTuple):
+    """Resultado de comprobar una ruta"""
+    exists: bool
+    size: int
+    mtime: float
+
+
+MISSING = PathStatus(False, 0, 0.0)
+
+
+class PathStatusChecker:
+    """Comprueba rutas por lotes en un pool de hilos y guarda los resultados con TTL"""
+
+    def __init__(self, post: Callable[[Callable[[], None]], None], max_workers: int = 4,
+                 ttl_seconds: float = 30.0, batch_size: int = 16):
+        """
+        Inicializa el comprobador
+
+        Args:
+            post: Función que ejecuta un callable en el hilo de la interfaz
+                (por ejemplo lambda fn: root.after(0, fn))
+            max_workers: Hilos del pool
+            ttl_seconds: Tiempo durante el que un resultado se considera válido
+            batch_size: Rutas por tarea; lotes pequeños evitan que una unidad
+                lenta retrase al resto
+        """
+        self.post = post
+        self.max_workers = max_workers
+        self.ttl_seconds = ttl_seconds
+        self.batch_size = batch_size
+        self.stats = 0
+        self._cache: Dict[str, Tuple[float, PathStatus]] = {}
+        self._pending: Set[str] = set()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def get(self, path: str) -> Optional[PathStatus]:
+        """
+        Devuelve el resultado en caché si sigue vigente
+
+        Returns:
+            PathStatus o None si hay que comprobar la ruta
+        """
+        with self._lock:
+            cached = self._cache.get(path)
+        if cached is None or time.monotonic() - cached[0] > self.ttl_seconds:
+            return None
+        return cached[1]
+
+    def request(self, paths: Iterable[str],
+                callback: Callable[[Dict[str, PathStatus]], None]) -> int:
+        """
+        Programa la comprobación de las rutas sin resultado vigente
+
+        Las rutas que ya están en curso no se vuelven a programar: su resultado
+        llega al callback de la petición que las programó.
+
+        Args:
+            paths: Rutas a comprobar
+            callback: Recibe {ruta: PathStatus} en el hilo de la interfaz, una vez por lote
+
+        Returns:
+            Número de rutas programadas
+        """
+        todo: List[str] = []
+        with self._lock:
+            now = time.monotonic()
+            for path in paths:
+                if path in self._pending:
+                    continue
+                cached = self._cache.get(path)
+                if cached is not None and now - cached[0] <= self.ttl_seconds:
+                    continue
+                self._pending.add(path)
+                todo.append(path)
+            if todo and self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                    thread_name_prefix="path-status")
+            executor = self._executor
+
+        for i in range(0, len(todo), self.batch_size):
+            executor.submit(self._check_batch, todo[i:i + self.batch_size], callback)
+        return len(todo)
+
+    def _check_batch(self, batch: List[str],
+                     callback: Callable[[Dict[str, PathStatus]], None]) -> None:
+        """Hace stat de un lote (en un hilo del pool) y publica el resultado"""
+        results: Dict[str, PathStatus] = {}
+        for path in batch:
+            try:
+                st = os.stat(path)
+                results[path] = PathStatus(True, st.st_size, st.st_mtime)
+            except (OSError, ValueError):
+                results[path] = MISSING
+
+        now = time.monotonic()
+        with self._lock:
+            self.stats += len(batch)
+            for path, status in results.items():
+                self._cache[path] = (now, status)
+            self._pending.difference_update(batch)
+
+        try:
+            self.post(lambda: callback(results))
+        except Exception as e:
+            # La ventana puede haberse cerrado mientras tanto
+            print(f"Error publicando estado de archivos: {e}")
+
+    def invalidate(self, paths: Optional[Iterable[str]] = None) -> None:
+        """
+        Olvida resultados para forzar una nueva comprobación
+
+        Args:
+            paths: Rutas a olvidar o None para todas
+        """
+        with self._lock:
+            if paths is None:
+                self._cache.clear()
+            else:
+                for path in paths:
+                    self._cache.pop(path, None)
+
+    def shutdown(self) -> None:
+        """Detiene el pool sin esperar a las tareas en curso"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
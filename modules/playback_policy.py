@@ -0,0 +1,328 @@
+"""
+Módulo de política de reproducción de video
+Decide si el fondo animado se reproduce, baja de FPS, se pausa o se congela en
+su portada según señales del sistema (escritorio visible, sesión bloqueada,
+batería y carga de CPU)
+"""
+
+import ctypes
+import glob
+import os
+import sys
+import time
+from typing import Dict, NamedTuple, Optional
+
+
+ACTION_PLAY = "play"
+ACTION_LOW_FPS = "low_fps"
+ACTION_PAUSE = "pause"
+ACTION_POSTER = "poster"
+ACTIONS = (ACTION_PLAY, ACTION_LOW_FPS, ACTION_PAUSE, ACTION_POSTER)
+
+
+class PlaybackDecision(NamedTuple):
+    """Acción a aplicar al reproductor"""
+    action: str
+    fps: Optional[float]    # Límite de FPS (solo en ACTION_LOW_FPS)
+    reason: str
+
+
+class SignalProvider:
+    """Fuente de una señal; read() devuelve None si no se puede saber"""
+
+    name = "signal"
+
+    def read(self):
+        return None
+
+
+class StaticProvider(SignalProvider):
+    """Valor fijo (plataformas sin implementación y pruebas)"""
+
+    def __init__(self, name: str, value=None):
+        self.name = name
+        self.value = value
+
+    def read(self):
+        return self.value
+
+
+class WindowsDesktopVisibleProvider(SignalProvider):
+    """False si la ventana en primer plano cubre todo su monitor (maximizada o pantalla completa)"""
+
+    name = "desktop_visible"
+
+    def read(self) -> Optional[bool]:
+        try:
+            from ctypes import wintypes
+            user32 = ctypes.windll.user32
+            hwnd = user32.GetForegroundWindow()
+            if not hwnd:
+                return True
+            class_name = ctypes.create_unicode_buffer(64)
+            user32.GetClassNameW(hwnd, class_name, 64)
+            if class_name.value in ("Progman", "WorkerW", "Shell_TrayWnd"):
+                return True
+            if user32.IsIconic(hwnd):
+                return True
+
+            class MONITORINFO(ctypes.Structure):
+                _fields_ = [("cbSize", wintypes.DWORD), ("rcMonitor", wintypes.RECT),
+                            ("rcWork", wintypes.RECT), ("dwFlags", wintypes.DWORD)]
+
+            rect = wintypes.RECT()
+            user32.GetWindowRect(hwnd, ctypes.byref(rect))
+            info = MONITORINFO()
+            info.cbSize = ctypes.sizeof(MONITORINFO)
+            monitor = user32.MonitorFromWindow(hwnd, 2)  # MONITOR_DEFAULTTONEAREST
+            if not user32.GetMonitorInfoW(monitor, ctypes.byref(info)):
+                return None
+            work = info.rcWork
+            covers = (rect.left <= work.left and rect.top <= work.top
+                      and rect.right >= work.right and rect.bottom >= work.bottom)
+            return not covers
+        except Exception:
+            return None
+
+
+class WindowsSessionLockedProvider(SignalProvider):
+    """True si la sesión está bloqueada (el escritorio de entrada no es accesible)"""
+
+    name = "session_locked"
+
+    def read(self) -> Optional[bool]:
+        try:
+            user32 = ctypes.windll.user32
+            DESKTOP_SWITCHDESKTOP = 0x0100
+            desktop = user32.OpenInputDesktop(0, False, DESKTOP_SWITCHDESKTOP)
+            if not desktop:
+                return True
+            try:
+                return not user32.SwitchDesktop(desktop)
+            finally:
+                user32.CloseDesktop(desktop)
+        except Exception:
+            return None
+
+
+class WindowsBatteryProvider(SignalProvider):
+    """True si el equipo funciona con batería"""
+
+    name = "on_battery"
+
+    def read(self) -> Optional[bool]:
+        try:
+            class SYSTEM_POWER_STATUS(ctypes.Structure):
+                _fields_ = [("ACLineStatus", ctypes.c_ubyte), ("BatteryFlag", ctypes.c_ubyte),
+                            ("BatteryLifePercent", ctypes.c_ubyte),
+                            ("SystemStatusFlag", ctypes.c_ubyte),
+                            ("BatteryLifeTime", ctypes.c_ulong),
+                            ("BatteryFullLifeTime", ctypes.c_ulong)]
+
+            status = SYSTEM_POWER_STATUS()
+            if not ctypes.windll.kernel32.GetSystemPowerStatus(ctypes.byref(status)):
+                return None
+            if status.ACLineStatus == 255:  # Desconocido
+                return None
+            return status.ACLineStatus == 0
+        except Exception:
+            return None
+
+
+class LinuxBatteryProvider(SignalProvider):
+    """True si ninguna fuente de red está conectada (/sys/class/power_supply)"""
+
+    name = "on_battery"
+
+    def __init__(self, root: str = "/sys/class/power_supply"):
+        self.root = root
+
+    def read(self) -> Optional[bool]:
+        mains_seen = False
+        battery_seen = False
+        for supply in glob.glob(os.path.join(self.root, "*")):
+            try:
+                with open(os.path.join(supply, "type"), "r") as f:
+                    kind = f.read().strip()
+                if kind == "Mains":
+                    mains_seen = True
+                    with open(os.path.join(supply, "online"), "r") as f:
+                        if f.read().strip() == "1":
+                            return False
+                elif kind == "Battery":
+                    battery_seen = True
+            except OSError:
+                continue
+        if not battery_seen:
+            # Sobremesa
+            return False
+        return True if mains_seen else None
+
+
+class CpuLoadProvider(SignalProvider):
+    """Carga de CPU (0.0 - 1.0) entre dos lecturas consecutivas"""
+
+    name = "cpu_load"
+
+    def __init__(self, stat_file: str = "/proc/stat"):
+        self.stat_file = stat_file
+        self._last = None
+
+    def _times(self):
+        """(ocioso, total) acumulados del sistema"""
+        if sys.platform == "win32":
+            from ctypes import wintypes
+            idle, kernel, user = wintypes.FILETIME(), wintypes.FILETIME(), wintypes.FILETIME()
+            if not ctypes.windll.kernel32.GetSystemTimes(ctypes.byref(idle), ctypes.byref(kernel),
+                                                         ctypes.byref(user)):
+                return None
+            to_int = lambda ft: (ft.dwHighDateTime << 32) | ft.dwLowDateTime
+            # El tiempo de kernel incluye el ocioso
+            return to_int(idle), to_int(kernel) + to_int(user)
+        try:
+            with open(self.stat_file, "r") as f:
+                fields = [int(v) for v in f.readline().split()[1:]]
+        except (OSError, ValueError):
+            return None
+        idle = fields[3] + (fields[4] if len(fields) > 4 else 0)  # idle + iowait
+        return idle, sum(fields)
+
+    def read(self) -> Optional[float]:
+        times = self._times()
+        if times is None:
+            return None
+        last, self._last = self._last, times
+        if last is None:
+            return None
+        idle = times[0] - last[0]
+        total = times[1] - last[1]
+        if total <= 0:
+            return None
+        return max(0.0, min(1.0, 1.0 - idle / total))
+
+
+def default_providers() -> Dict[str, SignalProvider]:
+    """Proveedores disponibles en esta plataforma (el resto devuelve None)"""
+    if sys.platform == "win32":
+        return {
+            "desktop_visible": WindowsDesktopVisibleProvider(),
+            "session_locked": WindowsSessionLockedProvider(),
+            "on_battery": WindowsBatteryProvider(),
+            "cpu_load": CpuLoadProvider(),
+        }
+    return {
+        "desktop_visible": StaticProvider("desktop_visible"),
+        "session_locked": StaticProvider("session_locked"),
+        "on_battery": LinuxBatteryProvider(),
+        "cpu_load": CpuLoadProvider(),
+    }
+
+
+class PlaybackPolicy:
+    """Combina las señales en una decisión de reproducción"""
+
+    CPU_HYSTERESIS = 0.15
+
+    def __init__(self, providers: Optional[Dict[str, SignalProvider]] = None,
+                 on_battery_action: str = ACTION_LOW_FPS, low_fps: float = 10.0,
+                 cpu_threshold: float = 0.85, covered_action: str = ACTION_PAUSE):
+        """
+        Args:
+            providers: Proveedores por nombre (desktop_visible, session_locked,
+                on_battery, cpu_load). Si es None, usa default_providers()
+            on_battery_action: Acción con batería
+            low_fps: FPS máximos en ACTION_LOW_FPS
+            cpu_threshold: Carga de CPU (0.0 - 1.0) a partir de la que se baja de FPS
+            covered_action: Acción con el escritorio tapado o la sesión bloqueada
+        """
+        self.providers = default_providers() if providers is None else providers
+        self.on_battery_action = on_battery_action if on_battery_action in ACTIONS else ACTION_LOW_FPS
+        self.low_fps = low_fps
+        self.cpu_threshold = cpu_threshold
+        self.covered_action = covered_action if covered_action in ACTIONS else ACTION_PAUSE
+        self.signals: Dict[str, object] = {}
+        self._cpu_throttled = False
+        # Última carga conocida (una lectura fallida no borra el motivo)
+        self._cpu_load: Optional[float] = None
+
+    @classmethod
+    def from_config(cls, config_manager, providers: Optional[Dict[str, SignalProvider]] = None):
+        """Crea la política con los ajustes video_* de la configuración"""
+        return cls(providers,
+                   on_battery_action=config_manager.get("video_on_battery", ACTION_LOW_FPS),
+                   low_fps=float(config_manager.get("video_low_fps", 10)),
+                   cpu_threshold=float(config_manager.get("video_cpu_threshold", 85)) / 100.0)
+
+    def read_signals(self) -> Dict[str, object]:
+        """Lee todos los proveedores (un fallo cuenta como desconocido)"""
+        signals = {}
+        for name, provider in self.providers.items():
+            try:
+                signals[name] = provider.read()
+            except Exception:
+                signals[name] = None
+        self.signals = signals
+        return signals
+
+    def decide(self, signals: Optional[Dict[str, object]] = None) -> PlaybackDecision:
+        """
+        Calcula la acción; las señales desconocidas (None) no restringen nada
+
+        Args:
+            signals: Señales ya leídas. Si es None, se leen ahora
+
+        Returns:
+            PlaybackDecision
+        """
+        if signals is None:
+            signals = self.read_signals()
+
+        if signals.get("session_locked") is True:
+            return PlaybackDecision(self.covered_action, None, "sesión bloqueada")
+        if signals.get("desktop_visible") is False:
+            return PlaybackDecision(self.covered_action, None, "escritorio tapado")
+
+        decision = PlaybackDecision(ACTION_PLAY, None, "")
+        if signals.get("on_battery") is True and self.on_battery_action != ACTION_PLAY:
+            decision = PlaybackDecision(self.on_battery_action, None, "con batería")
+
+        # Histéresis: el propio video suma carga, así que para volver a
+        # reproducir normal la CPU tiene que bajar claramente del umbral
+        cpu_load = signals.get("cpu_load")
+        if cpu_load is not None:
+            limit = self.cpu_threshold - (self.CPU_HYSTERESIS if self._cpu_throttled else 0.0)
+            self._cpu_throttled = cpu_load >= limit
+            self._cpu_load = cpu_load
+        if decision.action == ACTION_PLAY and self._cpu_throttled:
+            decision = PlaybackDecision(ACTION_LOW_FPS, None, f"CPU al {self._cpu_load:.0%}")
+
+        if decision.action == ACTION_LOW_FPS:
+            decision = decision._replace(fps=self.low_fps)
+        return decision
+
+
+class PolicyTimer:
+    """Evalúa la política cada cierto tiempo y avisa solo cuando cambia la decisión"""
+
+    def __init__(self, policy: PlaybackPolicy, interval_seconds: float = 2.0,
+                 clock=time.monotonic):
+        self.policy = policy
+        self.interval_seconds = interval_seconds
+        self.clock = clock
+        self.decision: Optional[PlaybackDecision] = None
+        self._next_check = 0.0
+
+    def poll(self) -> Optional[PlaybackDecision]:
+        """
+        Returns:
+            La nueva decisión si cambió desde la última evaluación, o None
+        """
+        now = self.clock()
+        if now < self._next_check:
+            return None
+        self._next_check = now + self.interval_seconds
+        decision = self.policy.decide()
+        if self.decision is not None and decision[:2] == self.decision[:2]:
+            return None
+        self.decision = decision
+        return decision
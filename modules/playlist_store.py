@@ -0,0 +1,289 @@
+"""
+Módulo de almacenamiento de playlists
+Backend SQLite opcional para listas de fondos muy grandes
+"""
+
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from .media_library import MediaEntry, get_media_kind
+
+
+class PlaylistStore:
+    """Playlists, playlists por día y metadatos de medios en SQLite"""
+
+    # 2: huecos de posiciones registrados en meta ("sparse:<playlist>")
+    SCHEMA_VERSION = 2
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS meta (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        );
+        CREATE TABLE IF NOT EXISTS playlists (
+            name TEXT PRIMARY KEY,
+            use_folder INTEGER NOT NULL DEFAULT 0,
+            folder TEXT
+        );
+        CREATE TABLE IF NOT EXISTS playlist_items (
+            playlist TEXT NOT NULL,
+            position INTEGER NOT NULL,
+            path TEXT NOT NULL,
+            PRIMARY KEY (playlist, path)
+        ) WITHOUT ROWID;
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_playlist_position
+            ON playlist_items (playlist, position);
+        CREATE TABLE IF NOT EXISTS media (
+            path TEXT PRIMARY KEY,
+            kind TEXT,
+            size INTEGER,
+            mtime REAL
+        ) WITHOUT ROWID;
+    """
+
+    def __init__(self, db_file: Path):
+        """
+        Abre (o crea) la base de datos
+
+        Args:
+            db_file: Ruta del archivo SQLite
+        """
+        self.db_file = Path(db_file)
+        self._lock = threading.RLock()
+        # playlist -> primera posición con hueco (por debajo, las posiciones son 0..n-1)
+        self._sparse: Dict[str, int] = {}
+        self._conn = sqlite3.connect(str(self.db_file), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._conn:
+            self._conn.executescript(self.SCHEMA)
+            self._conn.execute(
+                "INSERT OR IGNORE INTO meta (key, value) VALUES ('schema_version', ?)",
+                (str(self.SCHEMA_VERSION),))
+            row = self._conn.execute(
+                "SELECT value FROM meta WHERE key = 'schema_version'").fetchone()
+            if int(row[0]) < 2:
+                # Las versiones anteriores no registraban los huecos: se compactan al leer
+                for (playlist,) in self._conn.execute(
+                        "SELECT DISTINCT playlist FROM playlist_items").fetchall():
+                    self._mark_sparse(playlist, 0)
+            self._conn.execute(
+                "UPDATE meta SET value = ? WHERE key = 'schema_version'",
+                (str(self.SCHEMA_VERSION),))
+            for key, value in self._conn.execute(
+                    "SELECT key, value FROM meta WHERE key LIKE 'sparse:%'").fetchall():
+                self._sparse[key[len("sparse:"):]] = int(value)
+
+    def close(self) -> None:
+        """Cierra la conexión"""
+        with self._lock:
+            self._conn.close()
+
+    def get_meta(self, key: str) -> Optional[str]:
+        """Lee un valor de la tabla meta"""
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key: str, value: str) -> None:
+        """Escribe un valor en la tabla meta"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    @staticmethod
+    def _media_row(path: str) -> tuple:
+        """Metadatos de un archivo para la tabla media"""
+        try:
+            st = os.stat(path)
+            return path, get_media_kind(path), st.st_size, st.st_mtime
+        except OSError:
+            return path, get_media_kind(path), None, None
+
+    def _mark_sparse(self, playlist: str, position: int) -> None:
+        """Registra un hueco en una posición (dentro de una transacción abierta)"""
+        first = self._sparse.get(playlist)
+        if first is not None and first <= position:
+            return
+        self._sparse[playlist] = position
+        self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                           (f"sparse:{playlist}", str(position)))
+
+    def _clear_sparse(self, playlist: str) -> None:
+        """Olvida los huecos de una playlist (dentro de una transacción abierta)"""
+        if self._sparse.pop(playlist, None) is not None:
+            self._conn.execute("DELETE FROM meta WHERE key = ?", (f"sparse:{playlist}",))
+
+    def _compact(self, playlist: str) -> None:
+        """
+        Cierra los huecos de una playlist en una sola pasada
+
+        Solo se reescriben las filas a partir del primer hueco, y una vez por
+        tanda de eliminaciones. En orden ascendente cada fila baja a una
+        posición ya libre, así que el índice único no se viola.
+        """
+        first = self._sparse.get(playlist)
+        if first is None:
+            return
+        with self._conn:
+            rows = self._conn.execute(
+                "SELECT path, position FROM playlist_items WHERE playlist = ? AND position >= ? "
+                "ORDER BY position", (playlist, first)).fetchall()
+            self._conn.executemany(
+                "UPDATE playlist_items SET position = ? WHERE playlist = ? AND path = ?",
+                [(first + i, playlist, path) for i, (path, position) in enumerate(rows)
+                 if position != first + i])
+            self._clear_sparse(playlist)
+
+    def _add(self, playlist: str, paths: Iterable[str]) -> List[str]:
+        """
+        Inserta rutas al final de la playlist (dentro de una transacción abierta)
+
+        No hace stat de los archivos: el tamaño y el mtime se leen la primera
+        vez que se piden (get_media_info), fuera de la transacción.
+        """
+        self._conn.execute("INSERT OR IGNORE INTO playlists (name) VALUES (?)", (playlist,))
+        row = self._conn.execute(
+            "SELECT MAX(position) FROM playlist_items WHERE playlist = ?", (playlist,)).fetchone()
+        position = -1 if row[0] is None else row[0]
+
+        added = []
+        for path in paths:
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO playlist_items (playlist, position, path) VALUES (?, ?, ?)",
+                (playlist, position + 1, path))
+            if cursor.rowcount:
+                position += 1
+                added.append(path)
+        if added:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO media (path, kind, size, mtime) VALUES (?, ?, NULL, NULL)",
+                [(path, get_media_kind(path)) for path in added])
+        return added
+
+    def add_items(self, playlist: str, paths: Iterable[str]) -> List[str]:
+        """
+        Agrega rutas al final de una playlist, ignorando duplicados
+
+        Args:
+            playlist: Nombre de la playlist
+            paths: Rutas a agregar
+
+        Returns:
+            Rutas que realmente se agregaron
+        """
+        with self._lock, self._conn:
+            return self._add(playlist, paths)
+
+    def remove_items(self, playlist: str, paths: Iterable[str]) -> List[str]:
+        """
+        Elimina rutas de una playlist
+
+        Returns:
+            Rutas que estaban en la playlist
+        """
+        removed = []
+        with self._lock, self._conn:
+            for path in paths:
+                row = self._conn.execute(
+                    "SELECT position FROM playlist_items WHERE playlist = ? AND path = ?",
+                    (playlist, path)).fetchone()
+                if row is not None:
+                    self._conn.execute(
+                        "DELETE FROM playlist_items WHERE playlist = ? AND path = ?",
+                        (playlist, path))
+                    removed.append(path)
+                    # Las demás filas no se tocan: el hueco se cierra al paginar
+                    self._mark_sparse(playlist, row[0])
+        return removed
+
+    def set_items(self, playlist: str, paths: Iterable[str]) -> None:
+        """Reemplaza el contenido completo de una playlist"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM playlist_items WHERE playlist = ?", (playlist,))
+            self._clear_sparse(playlist)
+            self._add(playlist, paths)
+
+    def contains(self, playlist: str, path: str) -> bool:
+        """Comprueba si una ruta está en la playlist (búsqueda por índice)"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM playlist_items WHERE playlist = ? AND path = ?",
+                (playlist, path)).fetchone()
+        return row is not None
+
+    def count(self, playlist: str) -> int:
+        """Número de elementos de una playlist"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COUNT(*) FROM playlist_items WHERE playlist = ?", (playlist,)).fetchone()
+        return row[0]
+
+    def get_page(self, playlist: str, offset: int = 0, limit: Optional[int] = None) -> List[str]:
+        """
+        Obtiene una página de la playlist en orden de inserción
+
+        La página es un rango del índice (playlist, position) y no recorre los
+        elementos anteriores. Por debajo del primer hueco las posiciones son
+        0..n-1; si la página empieza más allá, antes se compacta la playlist.
+
+        Args:
+            playlist: Nombre de la playlist
+            offset: Posición del primer elemento
+            limit: Máximo de elementos (None = hasta el final)
+
+        Returns:
+            Lista de rutas
+        """
+        with self._lock:
+            first = self._sparse.get(playlist)
+            if first is not None and offset > first:
+                self._compact(playlist)
+            rows = self._conn.execute(
+                "SELECT path FROM playlist_items WHERE playlist = ? AND position >= ? "
+                "ORDER BY position LIMIT ?",
+                (playlist, offset, -1 if limit is None else limit)).fetchall()
+        return [row[0] for row in rows]
+
+    def get_items(self, playlist: str) -> List[str]:
+        """Obtiene la playlist completa"""
+        return self.get_page(playlist)
+
+    def get_playlist_options(self, playlist: str) -> Dict[str, object]:
+        """Obtiene use_folder y folder de una playlist"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT use_folder, folder FROM playlists WHERE name = ?", (playlist,)).fetchone()
+        if row is None:
+            return {"use_folder": False, "folder": None}
+        return {"use_folder": bool(row[0]), "folder": row[1]}
+
+    def set_playlist(self, playlist: str, use_folder: bool, folder: Optional[str],
+                     paths: Iterable[str]) -> None:
+        """Reemplaza opciones y contenido de una playlist en una sola transacción"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO playlists (name, use_folder, folder) VALUES (?, ?, ?)",
+                (playlist, int(bool(use_folder)), folder))
+            self._conn.execute("DELETE FROM playlist_items WHERE playlist = ?", (playlist,))
+            self._clear_sparse(playlist)
+            self._add(playlist, paths)
+
+    def get_media_info(self, path: str) -> Optional[MediaEntry]:
+        """Metadatos guardados de un medio (tipo, tamaño, mtime); los completa si faltan"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT path, kind, size, mtime FROM media WHERE path = ?", (path,)).fetchone()
+        if row is None:
+            return None
+        if row[2] is None:
+            row = self._media_row(path)
+            if row[2] is not None:
+                with self._lock, self._conn:
+                    self._conn.execute(
+                        "UPDATE media SET size = ?, mtime = ? WHERE path = ?",
+                        (row[2], row[3], path))
+        return MediaEntry(*row)
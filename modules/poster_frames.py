@@ -0,0 +1,170 @@
+"""
+Módulo de fotogramas de portada
+Extrae una imagen representativa de cada video para usarla como fondo estático
+y la guarda en una caché en disco (ruta + mtime)
+"""
+
+import hashlib
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+
+from .config_manager import get_cache_dir
+
+
+class PosterFrameCache:
+    """Elige y cachea el fotograma de portada de cada video"""
+
+    STRATEGIES = ("position", "variance")
+    JPEG_QUALITY = 95
+    # Lado mayor de la miniatura usada para medir la varianza
+    SAMPLE_SIZE = 160
+
+    def __init__(self, cache_dir: Optional[Path] = None, strategy: str = "variance",
+                 position: float = 0.1, samples: int = 5):
+        """
+        Args:
+            cache_dir: Carpeta de la caché. Si es None, usa la caché por defecto
+            strategy: "position" (fotograma en `position`) o "variance" (el más
+                variado entre `samples` muestras, evita fundidos a negro)
+            position: Posición relativa en el video (0.0 - 1.0)
+            samples: Muestras repartidas por el video en la estrategia "variance"
+        """
+        if cache_dir is None:
+            cache_dir = get_cache_dir("posters")
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.strategy = strategy if strategy in self.STRATEGIES else "variance"
+        self.position = min(max(float(position), 0.0), 1.0)
+        self.samples = max(1, samples)
+        self.hits = 0
+        self.extracted = 0
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+
+    def key(self, path: str, st: os.stat_result) -> str:
+        """Nombre del archivo de portada para una versión concreta del video"""
+        raw = (f"{os.path.abspath(path)}\0{st.st_mtime_ns}\0{st.st_size}\0"
+               f"{self.strategy}\0{self.position}\0{self.samples}")
+        return hashlib.sha1(raw.encode("utf-8", "surrogatepass")).hexdigest() + ".jpg"
+
+    def get(self, video_path: str) -> Optional[str]:
+        """
+        Devuelve la portada del video, extrayéndola solo si no está en la caché
+
+        Args:
+            video_path: Ruta del video
+
+        Returns:
+            Ruta de la imagen o None si no se pudo extraer
+        """
+        try:
+            name = self.key(video_path, os.stat(video_path))
+        except OSError:
+            return None
+        poster_path = self.cache_dir / name
+        if poster_path.exists():
+            self.hits += 1
+            return str(poster_path)
+
+        # Una sola extracción por video aunque varias rotaciones coincidan
+        with self._locks_guard:
+            lock = self._locks.setdefault(name, threading.Lock())
+        try:
+            with lock:
+                if poster_path.exists():
+                    self.hits += 1
+                    return str(poster_path)
+                frame = self._extract(video_path)
+                if frame is None or not self._write(frame, poster_path):
+                    return None
+                self.extracted += 1
+                return str(poster_path)
+        finally:
+            with self._locks_guard:
+                self._locks.pop(name, None)
+
+    def _write(self, frame, poster_path: Path) -> bool:
+        """Guarda el fotograma en un temporal único y lo publica con un renombrado atómico"""
+        import cv2
+
+        fd, temp_path = tempfile.mkstemp(suffix=".jpg", dir=self.cache_dir)
+        os.close(fd)
+        try:
+            if not cv2.imwrite(temp_path, frame, [cv2.IMWRITE_JPEG_QUALITY, self.JPEG_QUALITY]):
+                raise OSError("cv2.imwrite falló")
+            os.replace(temp_path, poster_path)
+            return True
+        except OSError as e:
+            print(f"❌ No se pudo guardar la portada: {e}")
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            return False
+
+    def _extract(self, video_path: str):
+        """Abre el video una vez y devuelve el fotograma elegido (BGR) o None"""
+        try:
+            import cv2
+        except ImportError:
+            print("❌ OpenCV no disponible para procesar video")
+            return None
+
+        cap = cv2.VideoCapture(video_path)
+        try:
+            if not cap.isOpened():
+                print("❌ No se pudo abrir el video con OpenCV")
+                return None
+            frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+            if frame_count <= 1:
+                ok, frame = cap.read()
+                return frame if ok else None
+
+            if self.strategy == "position":
+                positions = [self.position]
+            else:
+                # Muestras centradas en tramos iguales (nunca el primer fotograma)
+                positions = [(i + 0.5) / self.samples for i in range(self.samples)]
+
+            best, best_score = None, -1.0
+            for position in positions:
+                frame = self._read_at(cap, min(int(frame_count * position), frame_count - 1))
+                if frame is None:
+                    continue
+                if len(positions) == 1:
+                    return frame
+                score = self._score(frame)
+                if score > best_score:
+                    best, best_score = frame, score
+
+            if best is None:
+                # Algunos contenedores no permiten buscar: usar el principio
+                cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                ok, best = cap.read()
+                return best if ok else None
+            return best
+        finally:
+            cap.release()
+
+    def _read_at(self, cap, frame_index: int):
+        """Busca un fotograma (OpenCV decodifica desde el fotograma clave previo)"""
+        import cv2
+
+        cap.set(cv2.CAP_PROP_POS_FRAMES, frame_index)
+        ok, frame = cap.read()
+        return frame if ok else None
+
+    def _score(self, frame) -> float:
+        """Varianza de luminancia sobre una versión reducida del fotograma"""
+        import cv2
+
+        h, w = frame.shape[:2]
+        scale = self.SAMPLE_SIZE / max(h, w)
+        if scale < 1.0:
+            frame = cv2.resize(frame, (max(1, int(w * scale)), max(1, int(h * scale))),
+                               interpolation=cv2.INTER_AREA)
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        return float(gray.var())
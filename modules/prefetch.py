@@ -0,0 +1,151 @@
+"""
+Módulo de precarga del próximo fondo
+Unos segundos antes del cambio resuelve el siguiente fondo, comprueba que
+existe y deja en la caché local una imagen ya normalizada a la pantalla, de
+modo que en la fecha límite solo queda aplicarla
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, NamedTuple, Optional, Tuple
+
+from .image_normalizer import ImageNormalizer
+
+
+class PreparedWallpaper(NamedTuple):
+    """Fondo listo para aplicar"""
+    source: str                 # Ruta absoluta del medio original
+    image_path: str             # Imagen que se aplica
+    stamp: Tuple[int, int]      # (mtime_ns, tamaño) del original al prepararlo
+    seconds: float              # Tiempo que costó prepararlo
+
+
+class WallpaperPrefetcher:
+    """Prepara fondos (portada de video + normalización) y guarda el próximo listo"""
+
+    def __init__(self, prepare_video: Callable[[str], Optional[str]],
+                 is_video: Callable[[str], bool],
+                 screen_size: Callable[[], Optional[Tuple[int, int]]] = lambda: None,
+                 normalizer: Optional[ImageNormalizer] = None, keep: int = 4):
+        """
+        Args:
+            prepare_video: Devuelve la imagen estática de un video (portada)
+            is_video: Indica si una ruta es un video
+            screen_size: Devuelve (ancho, alto) de la pantalla o None si no se sabe
+            normalizer: Caché de imágenes a la resolución de la pantalla. Si es
+                None, se usa la caché por defecto
+            keep: Fondos preparados que se recuerdan en memoria
+        """
+        self.prepare_video = prepare_video
+        self.is_video = is_video
+        self.screen_size = screen_size
+        self.normalizer = normalizer or ImageNormalizer()
+        self.keep = max(1, keep)
+        self.hits = 0
+        self.misses = 0
+        # ruta original -> fondo preparado, en orden LRU
+        self._ready: "OrderedDict[str, PreparedWallpaper]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def set_normalizer(self, normalizer: ImageNormalizer) -> None:
+        """Cambia la normalización y olvida lo preparado con la anterior"""
+        with self._lock:
+            # La caché nueva comparte carpeta: el fondo aplicado sigue protegido
+            if normalizer.applied is None:
+                normalizer.applied = self.normalizer.applied
+            self.normalizer = normalizer
+            self._ready.clear()
+
+    def prepare(self, media_path: str) -> Optional[str]:
+        """
+        Resuelve la imagen que se aplica para un medio (sin recordarla)
+
+        Args:
+            media_path: Ruta de la imagen o video
+
+        Returns:
+            Imagen normalizada, la original si no se puede normalizar o None si
+            el video no tiene imagen
+        """
+        source = os.path.abspath(media_path)
+        if self.is_video(source):
+            image_source = self.prepare_video(source)
+            if image_source is None:
+                return None
+        else:
+            image_source = source
+
+        size = self.screen_size()
+        if not size:
+            return image_source
+        return self.normalizer.normalize(image_source, size) or image_source
+
+    def prefetch(self, media_path: str) -> Optional[PreparedWallpaper]:
+        """
+        Prepara un fondo para aplicarlo más tarde
+
+        Args:
+            media_path: Ruta de la imagen o video
+
+        Returns:
+            PreparedWallpaper o None si el medio no existe o no se pudo preparar
+        """
+        source = os.path.abspath(media_path)
+        start = time.perf_counter()
+        try:
+            st = os.stat(source)
+        except OSError:
+            print(f"⚠️ El próximo fondo no existe: {source}")
+            return None
+
+        with self._lock:
+            prepared = self._ready.get(source)
+        if (prepared is not None and prepared.stamp == (st.st_mtime_ns, st.st_size)
+                and os.path.exists(prepared.image_path)):
+            return prepared
+
+        try:
+            image_path = self.prepare(source)
+        except Exception as e:
+            print(f"⚠️ No se pudo precargar {os.path.basename(source)}: {e}")
+            return None
+        if image_path is None:
+            return None
+
+        prepared = PreparedWallpaper(source, image_path, (st.st_mtime_ns, st.st_size),
+                                     time.perf_counter() - start)
+        with self._lock:
+            self._ready.pop(source, None)
+            self._ready[source] = prepared
+            while len(self._ready) > self.keep:
+                self._ready.popitem(last=False)
+        return prepared
+
+    def take(self, media_path: str) -> Optional[str]:
+        """
+        Devuelve la imagen preparada de un medio si sigue siendo válida
+
+        Args:
+            media_path: Ruta de la imagen o video
+
+        Returns:
+            Ruta de la imagen lista o None si no hay una preparada
+        """
+        source = os.path.abspath(media_path)
+        with self._lock:
+            prepared = self._ready.get(source)
+        if prepared is not None:
+            try:
+                st = os.stat(source)
+                if (prepared.stamp == (st.st_mtime_ns, st.st_size)
+                        and os.path.exists(prepared.image_path)):
+                    self.hits += 1
+                    return prepared.image_path
+            except OSError:
+                pass
+            with self._lock:
+                self._ready.pop(source, None)
+        self.misses += 1
+        return None
@@ -0,0 +1,141 @@
+"""
+Módulo de estado de ejecución
+Guarda el estado que cambia en cada rotación (índice actual y último cambio)
+en un archivo binario pequeño y de tamaño fijo, separado de la configuración
+"""
+
+import os
+import struct
+import threading
+import zlib
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+
+class RuntimeStateStore:
+    """Registro binario de tamaño fijo con current_index y last_change"""
+
+    MAGIC = b"WCRS"
+    VERSION = 1
+    # magic, versión, relleno, current_index, last_change (µs desde 1970, hora local)
+    RECORD = struct.Struct("<4sB3xqq")
+    CHECKSUM = struct.Struct("<I")
+    SIZE = RECORD.size + CHECKSUM.size
+
+    KEYS = ("current_index", "last_change")
+
+    _NO_DATE = -(2 ** 63)
+    _EPOCH = datetime(1970, 1, 1)
+
+    def __init__(self, state_file: Path):
+        """
+        Inicializa el almacén
+
+        Args:
+            state_file: Ruta del archivo binario de estado
+        """
+        self.state_file = Path(state_file)
+        self.writes = 0
+        self._values: Dict[str, Any] = {"current_index": 0, "last_change": None}
+        self._lock = threading.Lock()
+        self.exists = self._load()
+
+    @classmethod
+    def _encode_date(cls, value: Optional[str]) -> int:
+        """Convierte un ISO 8601 en microsegundos (exacto, sin zona horaria)"""
+        if not value:
+            return cls._NO_DATE
+        try:
+            dt = datetime.fromisoformat(value).replace(tzinfo=None)
+        except (TypeError, ValueError):
+            return cls._NO_DATE
+        return (dt - cls._EPOCH) // timedelta(microseconds=1)
+
+    @classmethod
+    def _decode_date(cls, value: int) -> Optional[str]:
+        """Convierte microsegundos en ISO 8601"""
+        if value == cls._NO_DATE:
+            return None
+        return (cls._EPOCH + timedelta(microseconds=value)).isoformat()
+
+    def _load(self) -> bool:
+        """
+        Lee el registro del disco
+
+        Returns:
+            True si había un registro válido
+        """
+        try:
+            with open(self.state_file, 'rb') as f:
+                data = f.read(self.SIZE)
+        except OSError:
+            return False
+
+        if len(data) != self.SIZE:
+            return False
+        record = data[:self.RECORD.size]
+        (checksum,) = self.CHECKSUM.unpack(data[self.RECORD.size:])
+        if zlib.crc32(record) != checksum:
+            print("⚠️ Estado de ejecución dañado, usando valores por defecto")
+            return False
+
+        magic, version, current_index, last_change = self.RECORD.unpack(record)
+        if magic != self.MAGIC or version != self.VERSION:
+            return False
+
+        self._values["current_index"] = current_index
+        self._values["last_change"] = self._decode_date(last_change)
+        return True
+
+    def _write(self) -> bool:
+        """Sobrescribe el registro en su sitio: una sola escritura de tamaño fijo"""
+        record = self.RECORD.pack(
+            self.MAGIC, self.VERSION,
+            int(self._values["current_index"] or 0),
+            self._encode_date(self._values["last_change"]))
+        data = record + self.CHECKSUM.pack(zlib.crc32(record))
+        try:
+            fd = os.open(self.state_file, os.O_WRONLY | os.O_CREAT | getattr(os, "O_BINARY", 0), 0o644)
+            try:
+                os.write(fd, data)
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+            self.exists = True
+            self.writes += 1
+            return True
+        except OSError as e:
+            print(f"Error guardando estado de ejecución: {e}")
+            return False
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Obtiene un valor del estado"""
+        with self._lock:
+            return self._values.get(key, default)
+
+    def set(self, key: str, value: Any) -> bool:
+        """
+        Establece un valor y lo persiste de inmediato (coste O(1))
+
+        Args:
+            key: "current_index" o "last_change"
+            value: Nuevo valor
+
+        Returns:
+            True si se guardó correctamente
+        """
+        if key not in self.KEYS:
+            raise KeyError(key)
+        with self._lock:
+            self._values[key] = value
+            return self._write()
+
+    def update(self, values: Dict[str, Any]) -> bool:
+        """Establece varios valores con una sola escritura"""
+        with self._lock:
+            for key, value in values.items():
+                if key not in self.KEYS:
+                    raise KeyError(key)
+                self._values[key] = value
+            return self._write()
@@ -0,0 +1,176 @@
+"""
+Módulo del planificador de cambios
+Calcula el próximo cambio de fondo una sola vez y duerme hasta ese momento
+"""
+
+import threading
+from datetime import datetime, timedelta
+from typing import Callable, List, Optional
+
+from .config_manager import ConfigManager
+
+
+class ChangeScheduler:
+    """Planificador por eventos para el motor de fondos"""
+
+    # Tope de espera para tolerar cambios de hora del sistema o suspensión
+    MAX_SLEEP_SECONDS = 3600
+    # Espera antes de reintentar cuando un cambio no se pudo aplicar
+    RETRY_SECONDS = 60
+
+    # Motivos por los que termina una espera
+    WAKE_DEADLINE = "deadline"
+    WAKE_CHANGE_NOW = "change_now"
+    WAKE_CONFIG = "config"
+    WAKE_STOP = "stop"
+
+    def __init__(self, config_manager: ConfigManager,
+                 get_weekday_items: Callable[[str], List[str]]):
+        """
+        Inicializa el planificador
+
+        Args:
+            config_manager: Instancia del gestor de configuración
+            get_weekday_items: Función que devuelve los fondos de un día ("0"-"6")
+        """
+        self.config_manager = config_manager
+        self.get_weekday_items = get_weekday_items
+        self.next_change: Optional[datetime] = None
+        self.wakeups = 0
+        self._condition = threading.Condition()
+        self._config_changed = False
+        self._change_requested = False
+        self._stopped = False
+
+    def reset(self) -> None:
+        """Limpia las señales pendientes antes de iniciar un nuevo ciclo"""
+        with self._condition:
+            self._config_changed = False
+            self._change_requested = False
+            self._stopped = False
+            self.wakeups = 0
+
+    def _get_last_change(self) -> Optional[datetime]:
+        """Devuelve el último cambio como datetime o None si no es válido"""
+        last_change = self.config_manager.get("last_change")
+        if not last_change:
+            return None
+        try:
+            return datetime.fromisoformat(last_change)
+        except (TypeError, ValueError):
+            return None
+
+    def compute_next_change(self, now: Optional[datetime] = None) -> Optional[datetime]:
+        """
+        Calcula el momento del próximo cambio según la configuración
+
+        Args:
+            now: Momento de referencia. Si es None, usa la hora actual
+
+        Returns:
+            Fecha y hora del próximo cambio o None si el modo no lo define
+        """
+        if now is None:
+            now = datetime.now()
+
+        mode = self.config_manager.get("mode", "time")
+        last_change_dt = self._get_last_change()
+
+        if mode == "time":
+            if last_change_dt is None:
+                next_change = now
+            else:
+                interval = timedelta(minutes=self.config_manager.get("interval_minutes", 30))
+                next_change = last_change_dt + interval
+
+        elif mode == "weekday":
+            next_midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+
+            # Sin cambio previo o cambio de día: cambiar ya
+            if last_change_dt is None or last_change_dt.date() != now.date():
+                next_change = now
+            else:
+                items = self.get_weekday_items(str(now.weekday()))
+                if not items:
+                    # Comportamiento legacy: un cambio por día
+                    next_change = next_midnight
+                else:
+                    rotation = self.config_manager.get("weekday_rotation_minutes", 30)
+                    rotation = rotation if isinstance(rotation, int) and rotation > 0 else 30
+
+                    midnight = datetime.combine(now.date(), datetime.min.time())
+                    current_slice = int((now - midnight).total_seconds() // 60) // rotation
+                    last_slice = int((last_change_dt - midnight).total_seconds() // 60) // rotation
+
+                    if current_slice != last_slice:
+                        next_change = now
+                    else:
+                        slice_end = midnight + timedelta(minutes=(current_slice + 1) * rotation)
+                        next_change = min(slice_end, next_midnight)
+        else:
+            next_change = None
+
+        self.next_change = next_change
+        return next_change
+
+    def defer(self, now: Optional[datetime] = None) -> datetime:
+        """
+        Pospone el próximo intento tras un cambio fallido
+
+        Returns:
+            Nueva fecha del próximo intento
+        """
+        if now is None:
+            now = datetime.now()
+        self.next_change = now + timedelta(seconds=self.RETRY_SECONDS)
+        return self.next_change
+
+    def wait(self, deadline: Optional[datetime]) -> str:
+        """
+        Duerme hasta la fecha límite o hasta recibir una señal
+
+        Args:
+            deadline: Momento del próximo cambio. None espera solo señales
+
+        Returns:
+            Motivo del despertar (WAKE_*)
+        """
+        with self._condition:
+            while True:
+                if self._stopped:
+                    return self.WAKE_STOP
+                if self._change_requested:
+                    self._change_requested = False
+                    self._config_changed = False
+                    return self.WAKE_CHANGE_NOW
+                if self._config_changed:
+                    self._config_changed = False
+                    return self.WAKE_CONFIG
+
+                timeout = self.MAX_SLEEP_SECONDS
+                if deadline is not None:
+                    remaining = (deadline - datetime.now()).total_seconds()
+                    if remaining <= 0:
+                        return self.WAKE_DEADLINE
+                    timeout = min(timeout, remaining)
+
+                self._condition.wait(timeout)
+                self.wakeups += 1
+
+    def notify_config_changed(self) -> None:
+        """Despierta el planificador para recalcular la fecha límite"""
+        with self._condition:
+            self._config_changed = True
+            self._condition.notify_all()
+
+    def request_change(self) -> None:
+        """Solicita un cambio de fondo inmediato"""
+        with self._condition:
+            self._change_requested = True
+            self._condition.notify_all()
+
+    def stop(self) -> None:
+        """Detiene cualquier espera en curso"""
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
@@ -4,6 +4,8 @@ from PIL import Image as PILImage
 from PIL import ImageDraw
 import os
 
+from .countdown import format_remaining
+
 
 class SystemTrayManager:
     def __init__(self, root, on_show, on_change_now, on_quit):
@@ -13,6 +15,7 @@ class SystemTrayManager:
         self.on_quit = on_quit
         self.icon = None
         self.base_title = "Cambiador de Fondo"
+        self.last_title = None
 
     def create_icon_image(self):
         try:
@@ -154,19 +157,24 @@ class SystemTrayManager:
         if self.icon:
             self.icon.title = text
 
+    def is_visible(self) -> bool:
+        """Indica si el icono está en la bandeja (el tooltip puede consultarse)"""
+        return self.icon is not None
+
     def update_countdown(self, minutes: int, seconds: int):
         """
         Actualiza el título del icono con el tiempo restante.
-        Llama mediante root.after para evitar problemas de threading.
+        Solo reescribe el título si el texto cambió.
         """
         if not self.icon:
             return
 
         try:
-            if minutes > 0:
-                text = f"{self.base_title} — Próximo cambio: {minutes}m {seconds}s"
-            else:
-                text = f"{self.base_title} — Próximo cambio: {seconds}s"
+            text = f"{self.base_title} — Próximo cambio: {format_remaining(minutes, seconds)}"
+
+            if text == self.last_title:
+                return
+            self.last_title = text
 
             def do_update():
                 try:
@@ -180,5 +188,5 @@ class SystemTrayManager:
                 # Si root no está disponible, intentamos directamente
                 do_update()
         except Exception:
-            # Evitar que un fallo en bandeja detenga el hilo del motor
+            # Evitar que un fallo en bandeja detenga el hilo del contador
             pass
@@ -0,0 +1,285 @@
+"""
+Módulo de miniaturas
+Genera miniaturas de imágenes y videos en segundo plano y las guarda en una
+caché en disco direccionada por contenido (ruta + mtime + tamaño)
+"""
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Optional, Set, Tuple
+
+from .config_manager import get_cache_dir
+from .media_library import get_media_kind
+
+
+ThumbnailCallback = Callable[[Dict[str, Optional[str]]], None]
+
+
+class ThumbnailCache:
+    """Caché persistente de miniaturas con expulsión LRU y límite de tamaño"""
+
+    BACKGROUND = (32, 32, 32)
+    JPEG_QUALITY = 85
+
+    def __init__(self, cache_dir: Optional[Path] = None, size: Tuple[int, int] = (48, 27),
+                 max_bytes: int = 64 * 1024 * 1024, max_workers: int = 2,
+                 post: Optional[Callable[[Callable[[], None]], None]] = None):
+        """
+        Inicializa la caché
+
+        Args:
+            cache_dir: Carpeta de la caché. Si es None, usa la caché por defecto
+            size: Tamaño (ancho, alto) de las miniaturas
+            max_bytes: Tamaño máximo de la caché en disco
+            max_workers: Hilos que generan miniaturas
+            post: Función que ejecuta un callable en el hilo de la interfaz.
+                Si es None, los callbacks se llaman desde el hilo del pool
+        """
+        if cache_dir is None:
+            cache_dir = get_cache_dir("thumbnails")
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.size = size
+        self.max_bytes = max_bytes
+        self.max_workers = max_workers
+        self.post = post or (lambda fn: fn())
+        self.hits = 0
+        self.generated = 0
+        self.evicted = 0
+
+        # ruta original -> archivo de miniatura ("" si no se pudo generar)
+        self._resolved: Dict[str, str] = {}
+        self._pending: Set[str] = set()
+        # nombre de archivo de miniatura -> bytes, en orden LRU
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self._total_bytes = 0
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._load_entries()
+
+    def _load_entries(self) -> None:
+        """Reconstruye el orden LRU a partir del mtime de los archivos de la caché"""
+        files = []
+        try:
+            with os.scandir(self.cache_dir) as it:
+                for item in it:
+                    if item.name.endswith(".jpg"):
+                        st = item.stat()
+                        files.append((st.st_mtime, item.name, st.st_size))
+        except OSError:
+            return
+        for _mtime, name, size in sorted(files):
+            self._entries[name] = size
+            self._total_bytes += size
+
+    def key(self, path: str, st: os.stat_result) -> str:
+        """Nombre del archivo de miniatura para una versión concreta de un medio"""
+        raw = f"{os.path.abspath(path)}\0{st.st_mtime_ns}\0{st.st_size}\0{self.size[0]}x{self.size[1]}"
+        return hashlib.sha1(raw.encode("utf-8", "surrogatepass")).hexdigest() + ".jpg"
+
+    def get(self, path: str) -> Optional[str]:
+        """
+        Devuelve la miniatura ya resuelta en esta sesión (sin tocar el disco)
+
+        Returns:
+            Ruta del archivo de miniatura, "" si no se pudo generar o None si
+            hay que pedirla con request()
+        """
+        with self._lock:
+            return self._resolved.get(path)
+
+    def request(self, paths: Iterable[str], callback: ThumbnailCallback) -> int:
+        """
+        Programa la resolución (o generación) de miniaturas
+
+        Args:
+            paths: Rutas de los medios
+            callback: Recibe {ruta: archivo de miniatura o ""} por cada medio resuelto
+
+        Returns:
+            Número de medios programados
+        """
+        todo = []
+        with self._lock:
+            for path in paths:
+                if path in self._resolved or path in self._pending:
+                    continue
+                self._pending.add(path)
+                todo.append(path)
+            if todo and self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                    thread_name_prefix="thumbnails")
+            executor = self._executor
+
+        for path in todo:
+            executor.submit(self._resolve, path, callback)
+        return len(todo)
+
+    def _resolve(self, path: str, callback: ThumbnailCallback) -> None:
+        """Busca la miniatura en disco o la genera (en un hilo del pool)"""
+        thumb_file = ""
+        try:
+            thumb_file = self._lookup_or_generate(path)
+        except Exception as e:
+            print(f"⚠️ No se pudo generar miniatura de {os.path.basename(path)}: {e}")
+
+        with self._lock:
+            self._pending.discard(path)
+            self._resolved[path] = thumb_file
+
+        try:
+            self.post(lambda: callback({path: thumb_file}))
+        except Exception as e:
+            print(f"Error publicando miniatura: {e}")
+
+    def _lookup_or_generate(self, path: str) -> str:
+        """Devuelve la ruta de la miniatura, generándola si no está en la caché"""
+        st = os.stat(path)
+        name = self.key(path, st)
+        thumb_path = self.cache_dir / name
+
+        with self._lock:
+            hit = name in self._entries
+            if hit:
+                self._entries.move_to_end(name)
+        if hit and thumb_path.exists():
+            self.hits += 1
+            try:
+                # Persistir el orden LRU entre sesiones
+                os.utime(thumb_path)
+            except OSError:
+                pass
+            return str(thumb_path)
+
+        kind = get_media_kind(path)
+        if kind == "video":
+            image = self._render_video(path)
+        elif kind == "image":
+            image = self._render_image(path)
+        else:
+            return ""
+        if image is None:
+            return ""
+
+        temp_path = thumb_path.with_suffix(".tmp")
+        image.save(temp_path, "JPEG", quality=self.JPEG_QUALITY)
+        os.replace(temp_path, thumb_path)
+        self.generated += 1
+
+        with self._lock:
+            size = thumb_path.stat().st_size
+            self._total_bytes += size - self._entries.pop(name, 0)
+            self._entries[name] = size
+            self._evict(keep=name)
+        return str(thumb_path)
+
+    def _evict(self, keep: str) -> None:
+        """Elimina las miniaturas menos usadas hasta respetar max_bytes (con el lock tomado)"""
+        removed = set()
+        while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+            name, size = next(iter(self._entries.items()))
+            if name == keep:
+                self._entries.move_to_end(name)
+                continue
+            del self._entries[name]
+            self._total_bytes -= size
+            removed.add(name)
+            try:
+                os.remove(self.cache_dir / name)
+            except OSError:
+                pass
+        if removed:
+            self.evicted += len(removed)
+            for path, thumb in list(self._resolved.items()):
+                if thumb and os.path.basename(thumb) in removed:
+                    del self._resolved[path]
+
+    def _fit(self, image):
+        """Centra la imagen reducida sobre un lienzo del tamaño exacto de la miniatura"""
+        from PIL import Image
+
+        image.thumbnail(self.size, Image.Resampling.LANCZOS)
+        canvas = Image.new("RGB", self.size, self.BACKGROUND)
+        canvas.paste(image, ((self.size[0] - image.width) // 2, (self.size[1] - image.height) // 2))
+        return canvas
+
+    def _render_image(self, path: str):
+        """Reduce una imagen sin decodificarla a resolución completa cuando es posible"""
+        from PIL import Image
+
+        target_w, target_h = self.size[0] * 2, self.size[1] * 2
+        with Image.open(path) as image:
+            if image.format == "JPEG":
+                # El decodificador JPEG escala en el dominio DCT (1/2, 1/4, 1/8)
+                image.draft("RGB", (target_w, target_h))
+                image = image.convert("RGB")
+            else:
+                # reduce() no admite modos como P, 1 o I;16: se convierte antes
+                if image.mode in ("RGBA", "LA") or "transparency" in image.info:
+                    image = image.convert("RGBA")
+                else:
+                    image = image.convert("RGB")
+                factor = min(image.width // target_w, image.height // target_h)
+                if factor >= 2:
+                    image = image.reduce(factor)
+        if image.mode == "RGBA":
+            flat = Image.new("RGB", image.size, self.BACKGROUND)
+            flat.paste(image, mask=image.getchannel("A"))
+            image = flat
+        return self._fit(image)
+
+    def _render_video(self, path: str):
+        """Toma un solo fotograma del video (al 10% de su duración)"""
+        try:
+            import cv2
+            from PIL import Image
+        except ImportError:
+            print("❌ OpenCV no disponible para miniaturas de video")
+            return None
+
+        cap = cv2.VideoCapture(path)
+        try:
+            frame_count = cap.get(cv2.CAP_PROP_FRAME_COUNT)
+            if frame_count > 10:
+                cap.set(cv2.CAP_PROP_POS_FRAMES, int(frame_count * 0.1))
+            ok, frame = cap.read()
+            if not ok:
+                cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                ok, frame = cap.read()
+        finally:
+            cap.release()
+        if not ok:
+            return None
+
+        h, w = frame.shape[:2]
+        scale = min(self.size[0] * 2 / w, self.size[1] * 2 / h, 1.0)
+        if scale < 1.0:
+            frame = cv2.resize(frame, (max(1, int(w * scale)), max(1, int(h * scale))),
+                               interpolation=cv2.INTER_AREA)
+        frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        return self._fit(Image.fromarray(frame))
+
+    def invalidate(self, paths: Optional[Iterable[str]] = None) -> None:
+        """
+        Olvida las miniaturas resueltas para volver a consultarlas
+
+        Args:
+            paths: Rutas de medios o None para todas
+        """
+        with self._lock:
+            if paths is None:
+                self._resolved.clear()
+            else:
+                for path in paths:
+                    self._resolved.pop(path, None)
+
+    def shutdown(self) -> None:
+        """Detiene el pool sin esperar a las tareas en curso"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
@@ -0,0 +1,420 @@
+"""
+Módulo de reproducción de video por etapas
+Un hilo decodifica y escala fotogramas hacia una cola acotada; el presentador
+los muestra según un reloj monótono y descarta los que llegan tarde
+"""
+
+import queue
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, NamedTuple, Optional, Tuple
+
+
+class VideoFrame(NamedTuple):
+    """Fotograma listo para mostrar"""
+    index: int
+    pts: float      # Segundos desde el inicio de la reproducción
+    image: Any      # Fotograma ya escalado (formato según la transformación)
+
+
+class FrameGeometry(NamedTuple):
+    """Recorte de origen y colocación en destino, calculados una sola vez por video"""
+    crop: Tuple[int, int, int, int]     # x, y, ancho, alto en el fotograma original
+    scaled: Tuple[int, int]             # tamaño tras escalar
+    offset: Tuple[int, int]             # posición en el lienzo (bandas negras en "fit")
+
+
+def compute_geometry(source: Tuple[int, int], target: Tuple[int, int],
+                     mode: str = "fill") -> FrameGeometry:
+    """
+    Calcula cómo llevar un fotograma de tamaño source a target
+
+    Args:
+        source: (ancho, alto) del video
+        target: (ancho, alto) de la pantalla
+        mode: "fill" (recorta para cubrir), "fit" (bandas negras) o "stretch"
+
+    Returns:
+        FrameGeometry con recorte, tamaño escalado y desplazamiento
+    """
+    sw, sh = source
+    tw, th = target
+    if mode == "stretch":
+        return FrameGeometry((0, 0, sw, sh), (tw, th), (0, 0))
+    if mode == "fit":
+        scale = min(tw / sw, th / sh)
+        w, h = max(1, round(sw * scale)), max(1, round(sh * scale))
+        return FrameGeometry((0, 0, sw, sh), (w, h), ((tw - w) // 2, (th - h) // 2))
+    # fill: recortar el origen a la proporción de la pantalla
+    scale = max(tw / sw, th / sh)
+    cw, ch = min(sw, round(tw / scale)), min(sh, round(th / scale))
+    return FrameGeometry(((sw - cw) // 2, (sh - ch) // 2, cw, ch), (tw, th), (0, 0))
+
+
+class FrameScaler:
+    """Convierte BGR→RGB y escala con OpenCV sobre búferes reutilizados"""
+
+    # calidad -> (interpolación al reducir, interpolación al ampliar)
+    QUALITY_MODES = {
+        "fast": ("INTER_NEAREST", "INTER_NEAREST"),
+        "balanced": ("INTER_AREA", "INTER_LINEAR"),
+        "quality": ("INTER_AREA", "INTER_CUBIC"),
+    }
+
+    def __init__(self, target_size: Tuple[int, int], mode: str = "fill",
+                 quality: str = "balanced", buffers: int = 7):
+        """
+        Args:
+            target_size: (ancho, alto) de salida
+            mode: "fill", "fit" o "stretch"
+            quality: "fast", "balanced" o "quality"
+            buffers: Búferes de salida en rotación. Debe cubrir todos los
+                fotogramas vivos a la vez (cola + uno en cada etapa)
+        """
+        import cv2
+        import numpy as np
+
+        self._cv2 = cv2
+        self._np = np
+        self.target_size = target_size
+        self.mode = mode
+        down, up = self.QUALITY_MODES.get(quality, self.QUALITY_MODES["balanced"])
+        self._interp_down = getattr(cv2, down)
+        self._interp_up = getattr(cv2, up)
+        self._buffer_count = max(2, buffers)
+        self._source_size: Optional[Tuple[int, int]] = None
+        self.geometry: Optional[FrameGeometry] = None
+
+    def _prepare(self, source_size: Tuple[int, int]) -> None:
+        """Calcula la geometría y reserva los búferes para un tamaño de origen"""
+        np = self._np
+        tw, th = self.target_size
+        self._source_size = source_size
+        self.geometry = compute_geometry(source_size, self.target_size, self.mode)
+        x, y, cw, ch = self.geometry.crop
+        w, h = self.geometry.scaled
+        self._interp = self._interp_down if w * h < cw * ch else self._interp_up
+        # Convertir color en el lado con menos píxeles
+        self._convert_first = cw * ch < w * h
+        stage = (ch, cw, 3) if self._convert_first else (h, w, 3)
+        self._stage = np.empty(stage, dtype=np.uint8)
+        # En "fit" se escala a un búfer intermedio y se copia dentro del lienzo;
+        # las bandas negras se pintan una sola vez
+        self._scaled = np.empty((h, w, 3), dtype=np.uint8) if (w, h) != (tw, th) else None
+        self._outputs = [np.zeros((th, tw, 3), dtype=np.uint8) for _ in range(self._buffer_count)]
+        self._next = 0
+
+    def __call__(self, frame):
+        """
+        Escala un fotograma BGR de OpenCV
+
+        Returns:
+            Array RGB (alto, ancho, 3) de target_size. El búfer se reutiliza
+            tras `buffers` llamadas
+        """
+        cv2 = self._cv2
+        source_size = (frame.shape[1], frame.shape[0])
+        if source_size != self._source_size:
+            self._prepare(source_size)
+
+        x, y, cw, ch = self.geometry.crop
+        if (cw, ch) != source_size:
+            frame = frame[y:y + ch, x:x + cw]
+
+        out = self._outputs[self._next]
+        self._next = (self._next + 1) % len(self._outputs)
+        dst = out if self._scaled is None else self._scaled
+
+        if self._convert_first:
+            cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=self._stage)
+            cv2.resize(self._stage, self.geometry.scaled, dst=dst, interpolation=self._interp)
+        else:
+            cv2.resize(frame, self.geometry.scaled, dst=self._stage, interpolation=self._interp)
+            cv2.cvtColor(self._stage, cv2.COLOR_BGR2RGB, dst=dst)
+
+        if self._scaled is not None:
+            ox, oy = self.geometry.offset
+            w, h = self.geometry.scaled
+            out[oy:oy + h, ox:ox + w] = self._scaled
+        return out
+
+
+class FrameDecoder:
+    """Hilo que decodifica, transforma y encola fotogramas (con contrapresión)"""
+
+    def __init__(self, video_path: str, frames: "queue.Queue[VideoFrame]",
+                 transform: Optional[Callable[[Any], Any]], loop: bool = True,
+                 capture_factory: Optional[Callable[[str], Any]] = None,
+                 recorder_factory: Optional[Callable[[float, int], Any]] = None,
+                 start_frame: int = 0):
+        """
+        Args:
+            video_path: Ruta del video
+            frames: Cola acotada donde se dejan los fotogramas
+            transform: Función que recibe el fotograma BGR de OpenCV y devuelve
+                la imagen lista para presentar (conversión de color y escalado).
+                None si la captura ya entrega fotogramas listos
+            loop: Si es True, vuelve al principio al terminar
+            capture_factory: Función que abre el video (por defecto cv2.VideoCapture)
+            recorder_factory: Recibe (fps, fotogramas) y devuelve un grabador de la
+                primera vuelta (ver LoopRecorder) o None
+            start_frame: Fotograma inicial (la grabación solo se hace desde 0)
+        """
+        self.video_path = video_path
+        self.frames = frames
+        self.transform = transform
+        self.loop = loop
+        self.capture_factory = capture_factory
+        self.recorder_factory = recorder_factory
+        self.recorder = None
+        self.start_frame = start_frame
+        # Fotogramas que avanza cada lectura (>1 limita los FPS sin decodificar
+        # los intermedios); se puede cambiar en marcha
+        self.frame_step = 1
+        self.fps = 30.0
+        self.decoded = 0
+        self.error: Optional[str] = None
+        self.running = False
+        self.thread: Optional[threading.Thread] = None
+        self._opened = threading.Event()
+
+    def start(self, timeout: float = 5.0) -> bool:
+        """
+        Inicia el hilo y espera a que el video esté abierto
+
+        Returns:
+            True si el video se abrió correctamente
+        """
+        self.running = True
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+        self._opened.wait(timeout)
+        return self.error is None and self._opened.is_set()
+
+    def stop(self) -> None:
+        """Detiene el hilo (no espera a que termine el fotograma en curso)"""
+        self.running = False
+
+    def _open(self):
+        if self.capture_factory is not None:
+            return self.capture_factory(self.video_path)
+        import cv2
+        return cv2.VideoCapture(self.video_path)
+
+    def _put(self, frame: VideoFrame) -> bool:
+        """Encola bloqueando mientras la cola esté llena; False si se detuvo"""
+        while self.running:
+            try:
+                self.frames.put(frame, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _run(self) -> None:
+        try:
+            cap = self._open()
+        except Exception as e:
+            self.error = str(e)
+            self._opened.set()
+            return
+
+        try:
+            if not cap.isOpened():
+                self.error = f"No se pudo abrir video: {self.video_path}"
+                return
+            # 5 == cv2.CAP_PROP_FPS
+            fps = cap.get(5) or 30.0
+            self.fps = fps if 1.0 <= fps <= 240.0 else 30.0
+            if self.start_frame > 0:
+                # 1 == cv2.CAP_PROP_POS_FRAMES
+                cap.set(1, self.start_frame)
+            elif self.recorder_factory is not None and self.loop:
+                # 7 == cv2.CAP_PROP_FRAME_COUNT
+                self.recorder = self.recorder_factory(self.fps, int(cap.get(7)))
+            self._opened.set()
+
+            index = self.start_frame
+            empty_loops = 0
+            while self.running:
+                step = 1 if self.recorder is not None else self.frame_step
+                for _ in range(step - 1):
+                    # grab() avanza sin convertir el fotograma
+                    if not cap.grab():
+                        break
+                    index += 1
+                ret, raw = cap.read()
+                if not ret:
+                    if not self.loop or empty_loops > 1:
+                        break
+                    if self.recorder is not None:
+                        # Primera vuelta completa: seguir desde los fotogramas cacheados
+                        clip, self.recorder = self.recorder.finish(), None
+                        if clip is not None:
+                            cap.release()
+                            cap, self.transform = clip, None
+                            continue
+                    # 1 == cv2.CAP_PROP_POS_FRAMES; el índice sigue creciendo
+                    # para que los tiempos de presentación sean monótonos
+                    cap.set(1, 0)
+                    empty_loops += 1
+                    continue
+                empty_loops = 0
+
+                try:
+                    image = raw if self.transform is None else self.transform(raw)
+                except Exception as e:
+                    print(f"⚠️ Error procesando frame: {e}")
+                    index += 1
+                    continue
+
+                if self.recorder is not None and not self.recorder.add(image):
+                    self.recorder = None
+
+                if not self._put(VideoFrame(index, index / self.fps, image)):
+                    break
+                self.decoded += 1
+                index += 1
+        finally:
+            self._opened.set()
+            if self.recorder is not None:
+                self.recorder.abort()
+                self.recorder = None
+            cap.release()
+
+
+class FramePresenter:
+    """Elige el fotograma que toca según un reloj monótono y descarta los atrasados"""
+
+    def __init__(self, frames: "queue.Queue[VideoFrame]", fps: float,
+                 clock: Callable[[], float] = time.monotonic, window: int = 60):
+        """
+        Args:
+            frames: Cola de la que se leen los fotogramas
+            fps: Velocidad nominal del video
+            clock: Reloj monótono (inyectable para pruebas)
+            window: Fotogramas usados para medir los FPS reales
+        """
+        self.frames = frames
+        self.fps = fps
+        self.frame_interval = 1.0 / fps
+        self.clock = clock
+        self.start_time: Optional[float] = None
+        self.presented = 0
+        self.dropped = 0
+        self._pending: Optional[VideoFrame] = None
+        self._present_times = deque(maxlen=window)
+
+    def start(self, now: Optional[float] = None) -> None:
+        """Fija el instante que corresponde al fotograma con pts 0"""
+        self.start_time = self.clock() if now is None else now
+
+    def next_frame(self, now: Optional[float] = None) -> Optional[VideoFrame]:
+        """
+        Devuelve el fotograma más reciente cuyo momento ya llegó
+
+        Los fotogramas anteriores que también estaban vencidos se descartan.
+
+        Returns:
+            VideoFrame a mostrar o None si todavía no toca ninguno
+        """
+        now = self.clock() if now is None else now
+        if self.start_time is None:
+            self.start(now)
+        elapsed = now - self.start_time
+
+        chosen = None
+        while True:
+            if self._pending is None:
+                try:
+                    self._pending = self.frames.get_nowait()
+                except queue.Empty:
+                    break
+            if self._pending.pts > elapsed:
+                break
+            if chosen is not None:
+                self.dropped += 1
+            chosen, self._pending = self._pending, None
+
+        if chosen is not None:
+            self.presented += 1
+            self._present_times.append(now)
+        return chosen
+
+    def delay_until_next(self, now: Optional[float] = None) -> float:
+        """Segundos hasta que venza el siguiente fotograma conocido"""
+        now = self.clock() if now is None else now
+        if self._pending is None or self.start_time is None:
+            # Cola vacía: volver a mirar pronto
+            return self.frame_interval / 2
+        return max(0.0, self.start_time + self._pending.pts - now)
+
+    @property
+    def measured_fps(self) -> float:
+        """FPS realmente presentados (ventana deslizante)"""
+        if len(self._present_times) < 2:
+            return 0.0
+        span = self._present_times[-1] - self._present_times[0]
+        return (len(self._present_times) - 1) / span if span > 0 else 0.0
+
+
+class VideoPipeline:
+    """Une decodificador y presentador para un video"""
+
+    def __init__(self, video_path: str, transform: Optional[Callable[[Any], Any]],
+                 queue_size: int = 4, loop: bool = True,
+                 capture_factory: Optional[Callable[[str], Any]] = None,
+                 recorder_factory: Optional[Callable[[float, int], Any]] = None,
+                 start_frame: int = 0):
+        """
+        Args:
+            video_path: Ruta del video
+            transform: Conversión/escalado aplicada en el hilo decodificador
+            queue_size: Fotogramas preparados como máximo (limita la memoria)
+            loop: Reproducir en bucle
+            capture_factory: Función que abre el video (por defecto cv2.VideoCapture)
+            recorder_factory: Grabador de la primera vuelta (caché de bucles)
+            start_frame: Fotograma desde el que empezar (búsqueda)
+        """
+        self.frames: "queue.Queue[VideoFrame]" = queue.Queue(maxsize=queue_size)
+        self.decoder = FrameDecoder(video_path, self.frames, transform, loop,
+                                    capture_factory, recorder_factory, start_frame)
+        self.presenter: Optional[FramePresenter] = None
+
+    def start(self) -> bool:
+        """Abre el video y arranca la decodificación"""
+        if not self.decoder.start():
+            if self.decoder.error:
+                print(f"❌ {self.decoder.error}")
+            return False
+        self.presenter = FramePresenter(self.frames, self.decoder.fps)
+        # El primer fotograma tiene pts = start_frame / fps
+        self.presenter.start(self.presenter.clock() - self.decoder.start_frame / self.decoder.fps)
+        return True
+
+    def stop(self) -> None:
+        """Detiene la decodificación y vacía la cola"""
+        self.decoder.stop()
+        try:
+            while True:
+                self.frames.get_nowait()
+        except queue.Empty:
+            pass
+
+    def get_stats(self) -> Dict[str, float]:
+        """
+        Contadores de reproducción
+
+        Returns:
+            Diccionario con target_fps, fps, presented, dropped, decoded y queued
+        """
+        presenter = self.presenter
+        return {
+            "target_fps": self.decoder.fps,
+            "fps": presenter.measured_fps if presenter else 0.0,
+            "presented": presenter.presented if presenter else 0,
+            "dropped": presenter.dropped if presenter else 0,
+            "decoded": self.decoder.decoded,
+            "queued": self.frames.qsize(),
+        }
@@ -0,0 +1,336 @@
+"""
+Módulo del reproductor de video en un proceso aparte
+El proceso hijo decodifica, escala y marca el ritmo; los fotogramas llegan al
+proceso de la interfaz por memoria compartida y las órdenes viajan por un pipe
+"""
+
+import time
+from collections import deque
+from typing import Callable, Dict, Optional, Tuple
+
+
+# Órdenes del proceso principal al reproductor
+CMD_PLAY = "play"
+CMD_PAUSE = "pause"
+CMD_STOP = "stop"
+CMD_SEEK = "seek"
+CMD_SWAP = "swap"
+CMD_RELEASE = "release"
+CMD_MAX_FPS = "max_fps"
+
+# Mensajes del reproductor al proceso principal
+MSG_OPENED = "opened"
+MSG_ERROR = "error"
+MSG_FRAME = "frame"
+
+
+class VideoPlayerProcess:
+    """Controla el proceso reproductor y recibe sus fotogramas"""
+
+    def __init__(self, size: Tuple[int, int], fit_mode: str = "fill",
+                 quality: str = "balanced", loop_cache_mb: int = 0, slots: int = 3):
+        """
+        Args:
+            size: (ancho, alto) de salida, normalmente la pantalla
+            fit_mode: "fill", "fit" o "stretch"
+            quality: "fast", "balanced" o "quality"
+            loop_cache_mb: Tamaño de la caché de bucles (0 = desactivada)
+            slots: Fotogramas en memoria compartida; mientras la interfaz
+                tiene todos ocupados, el reproductor espera
+        """
+        self.size = size
+        self.settings = {"fit_mode": fit_mode, "quality": quality,
+                         "loop_cache_mb": loop_cache_mb}
+        self.slots = max(2, slots)
+        self.frame_bytes = size[0] * size[1] * 3
+        self.fps = 30.0
+        self.stats: Dict[str, float] = {}
+        self.process = None
+        self._conn = None
+        self._shm = None
+        self._buffers = []
+
+    def start(self) -> bool:
+        """
+        Crea la memoria compartida y lanza el proceso (sin video todavía)
+
+        Returns:
+            True si el proceso arrancó
+        """
+        import multiprocessing
+        from multiprocessing import shared_memory
+
+        import numpy as np
+
+        try:
+            self._shm = shared_memory.SharedMemory(create=True, size=self.frame_bytes * self.slots)
+            w, h = self.size
+            self._buffers = [np.ndarray((h, w, 3), dtype=np.uint8, buffer=self._shm.buf,
+                                        offset=i * self.frame_bytes)
+                             for i in range(self.slots)]
+
+            # spawn también en Linux: un fork con Tk en marcha no es seguro
+            ctx = multiprocessing.get_context("spawn")
+            self._conn, child_conn = ctx.Pipe()
+            self.process = ctx.Process(
+                target=_player_main,
+                args=(child_conn, self._shm.name, self.slots, self.size, self.settings),
+                name="video-player", daemon=True)
+            self.process.start()
+            child_conn.close()
+            return True
+        except Exception as e:
+            print(f"❌ No se pudo iniciar el reproductor de video: {e}")
+            self.stop()
+            return False
+
+    def is_alive(self) -> bool:
+        return self.process is not None and self.process.is_alive()
+
+    def _send(self, *message) -> bool:
+        if self._conn is None:
+            return False
+        try:
+            self._conn.send(message)
+            return True
+        except (OSError, EOFError, BrokenPipeError):
+            return False
+
+    def swap(self, video_path: str, timeout: float = 5.0) -> bool:
+        """
+        Cambia de video sin reiniciar el proceso
+
+        Returns:
+            True si el reproductor abrió el video antes de `timeout`
+        """
+        if not self._send(CMD_SWAP, video_path):
+            return False
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            message = self._recv(deadline - time.monotonic())
+            if message is None:
+                continue
+            if message[0] == MSG_OPENED and message[1] == video_path:
+                self.fps = message[2]
+                return True
+            if message[0] == MSG_ERROR:
+                print(f"❌ {message[1]}")
+                return False
+            if message[0] == MSG_FRAME:
+                # Fotograma del video anterior
+                self._send(CMD_RELEASE, message[1])
+        print("❌ El reproductor no respondió a tiempo")
+        return False
+
+    def play(self) -> bool:
+        """Reanuda la reproducción"""
+        return self._send(CMD_PLAY)
+
+    def pause(self) -> bool:
+        """Pausa la reproducción (el reproductor deja de decodificar al llenarse la cola)"""
+        return self._send(CMD_PAUSE)
+
+    def seek(self, seconds: float) -> bool:
+        """Salta a una posición del video actual"""
+        return self._send(CMD_SEEK, float(seconds))
+
+    def set_max_fps(self, fps: Optional[float]) -> bool:
+        """Limita los FPS (None = los del video); los fotogramas sobrantes no se decodifican"""
+        return self._send(CMD_MAX_FPS, float(fps or 0))
+
+    def _recv(self, timeout: float = 0.0):
+        """Lee un mensaje del reproductor o None"""
+        if self._conn is None:
+            return None
+        try:
+            if not self._conn.poll(max(0.0, timeout)):
+                return None
+            return self._conn.recv()
+        except (OSError, EOFError):
+            self._conn = None
+            return None
+
+    def present_latest(self, show: Callable[[object], None]) -> bool:
+        """
+        Muestra el fotograma más reciente recibido y libera el resto
+
+        Args:
+            show: Recibe el array RGB (alto, ancho, 3) en memoria compartida; debe
+                copiarlo (por ejemplo a un PhotoImage) antes de volver
+
+        Returns:
+            True si se mostró un fotograma
+        """
+        latest = None
+        while True:
+            message = self._recv()
+            if message is None:
+                break
+            if message[0] == MSG_FRAME:
+                if latest is not None:
+                    self._send(CMD_RELEASE, latest[1])
+                latest = message
+            elif message[0] == MSG_ERROR:
+                print(f"❌ {message[1]}")
+
+        if latest is None:
+            return False
+        _kind, slot, presented, dropped, decoded = latest
+        self.stats = {"target_fps": self.fps, "presented": presented,
+                      "dropped": dropped, "decoded": decoded}
+        try:
+            show(self._buffers[slot])
+        finally:
+            self._send(CMD_RELEASE, slot)
+        return True
+
+    @property
+    def poll_interval_ms(self) -> int:
+        """Cada cuánto debe la interfaz llamar a present_latest()"""
+        return max(1, int(500 / self.fps))
+
+    def get_stats(self) -> Dict[str, float]:
+        """
+        Contadores del reproductor
+
+        Returns:
+            Diccionario con target_fps, presented, dropped y decoded
+        """
+        return dict(self.stats) or {"target_fps": self.fps, "presented": 0,
+                                    "dropped": 0, "decoded": 0}
+
+    def stop(self, timeout: float = 2.0) -> None:
+        """Detiene el proceso y libera la memoria compartida"""
+        if self.process is not None:
+            self._send(CMD_STOP)
+            self.process.join(timeout)
+            if self.process.is_alive():
+                self.process.terminate()
+                self.process.join(timeout)
+            self.process = None
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+        self._buffers = []
+        if self._shm is not None:
+            try:
+                self._shm.close()
+                self._shm.unlink()
+            except (OSError, BufferError):
+                pass
+            self._shm = None
+
+
+def _open_pipeline(video_path: str, size: Tuple[int, int], settings: dict,
+                   loop_cache, start_frame: int = 0):
+    """Crea la canalización de decodificación del proceso reproductor"""
+    from .video_pipeline import FrameScaler, VideoPipeline
+
+    queue_size = 4
+    variant = f"{settings['fit_mode']}/{settings['quality']}"
+    clip = loop_cache.open(video_path, size, variant) if loop_cache else None
+    if clip is not None:
+        return VideoPipeline(video_path, None, queue_size=queue_size,
+                             capture_factory=lambda _path: clip, start_frame=start_frame)
+
+    scaler = FrameScaler(size, mode=settings["fit_mode"], quality=settings["quality"],
+                         buffers=queue_size + 3)
+    recorder_factory = None
+    if loop_cache is not None:
+        recorder_factory = lambda fps, count: loop_cache.recorder(
+            video_path, size, fps, count, variant)
+    return VideoPipeline(video_path, scaler, queue_size=queue_size,
+                         recorder_factory=recorder_factory, start_frame=start_frame)
+
+
+def _player_main(conn, shm_name: str, slots: int, size: Tuple[int, int], settings: dict) -> None:
+    """Bucle del proceso reproductor"""
+    from multiprocessing import shared_memory
+
+    import numpy as np
+
+    # El hijo comparte el resource tracker del proceso principal, que es quien
+    # hace unlink al parar
+    shm = shared_memory.SharedMemory(name=shm_name)
+    frame_bytes = size[0] * size[1] * 3
+    buffers = [np.ndarray((size[1], size[0], 3), dtype=np.uint8, buffer=shm.buf,
+                          offset=i * frame_bytes) for i in range(slots)]
+    free = deque(range(slots))
+
+    loop_cache = None
+    if settings.get("loop_cache_mb", 0) > 0:
+        from .loop_cache import LoopFrameCache
+        loop_cache = LoopFrameCache(max_bytes=settings["loop_cache_mb"] * 1024 * 1024)
+
+    pipeline = None
+    video_path = None
+    paused_at: Optional[float] = None  # Segundos reproducidos al pausar
+    max_fps = 0.0
+
+    def apply_max_fps():
+        if pipeline is not None:
+            fps = pipeline.decoder.fps
+            pipeline.decoder.frame_step = max(1, round(fps / max_fps)) if max_fps > 0 else 1
+
+    def open_video(path: str, start_frame: int = 0):
+        nonlocal pipeline
+        if pipeline is not None:
+            pipeline.stop()
+        pipeline = _open_pipeline(path, size, settings, loop_cache, start_frame)
+        if not pipeline.start():
+            pipeline = None
+            conn.send((MSG_ERROR, f"No se pudo abrir video: {path}"))
+            return False
+        apply_max_fps()
+        return True
+
+    try:
+        while True:
+            presenter = pipeline.presenter if pipeline is not None else None
+            playing = presenter is not None and paused_at is None
+            timeout = presenter.delay_until_next() if playing and free else 0.1
+
+            while conn.poll(timeout):
+                timeout = 0
+                command = conn.recv()
+                kind = command[0]
+                if kind == CMD_RELEASE:
+                    free.append(command[1])
+                elif kind == CMD_SWAP:
+                    video_path = command[1]
+                    if open_video(video_path):
+                        conn.send((MSG_OPENED, video_path, pipeline.decoder.fps))
+                elif kind == CMD_PAUSE and pipeline is not None and paused_at is None:
+                    paused_at = time.monotonic() - pipeline.presenter.start_time
+                elif kind == CMD_PLAY and pipeline is not None and paused_at is not None:
+                    pipeline.presenter.start(time.monotonic() - paused_at)
+                    paused_at = None
+                elif kind == CMD_SEEK and pipeline is not None:
+                    fps = pipeline.decoder.fps
+                    if paused_at is not None:
+                        paused_at = command[1]
+                    open_video(video_path, max(0, int(command[1] * fps)))
+                elif kind == CMD_MAX_FPS:
+                    max_fps = command[1]
+                    apply_max_fps()
+                elif kind == CMD_STOP:
+                    return
+
+            presenter = pipeline.presenter if pipeline is not None else None
+            if presenter is None or paused_at is not None or not free:
+                continue
+            frame = presenter.next_frame()
+            if frame is None:
+                continue
+            slot = free.popleft()
+            buffers[slot][...] = frame.image
+            stats = pipeline.get_stats()
+            conn.send((MSG_FRAME, slot, stats["presented"], stats["dropped"], stats["decoded"]))
+    except (EOFError, OSError, KeyboardInterrupt):
+        # El proceso principal se cerró
+        pass
+    finally:
+        if pipeline is not None:
+            pipeline.stop()
+        buffers.clear()
+        shm.close()
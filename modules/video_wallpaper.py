@@ -4,24 +4,56 @@ Utiliza Windows API para establecer videos como fondo animado
 """
 
 import os
-import ctypes
-import subprocess
-import threading
-import time
 from pathlib import Path
 from typing import Optional, List
-import winreg
+
+from .desktop_backend import DesktopBackend, create_backend
+from .playback_policy import (ACTION_LOW_FPS, ACTION_PAUSE, ACTION_PLAY, ACTION_POSTER,
+                              PlaybackDecision, PlaybackPolicy, PolicyTimer)
+from .poster_frames import PosterFrameCache
+from .video_player import VideoPlayerProcess
 
 
 class VideoWallpaperEngine:
     """Motor para establecer videos como fondos de pantalla en Windows"""
     
-    def __init__(self):
-        """Inicializa el motor de videos"""
-        self.current_video_process = None
+    def __init__(self, config_manager=None, desktop: Optional[DesktopBackend] = None):
+        """
+        Inicializa el motor de videos
+        
+        Args:
+            config_manager: Gestor de configuración (opcional) para los ajustes de escalado
+            desktop: Backend que aplica los fondos. Si es None, se elige según
+                "desktop_backend" en la configuración (por defecto, detección automática)
+        """
+        self.config_manager = config_manager
+        self.desktop = desktop or create_backend(self._get_setting("desktop_backend", "auto"))
         self.is_video_playing = False
         self.video_thread = None
+        self.video_player: Optional[VideoPlayerProcess] = None
+        self._present_job = None
+        self.current_video_path: Optional[str] = None
+        # Política de pausa/ahorro según el estado del sistema
+        self.policy_timer: Optional[PolicyTimer] = None
+        self.playback_decision: Optional[PlaybackDecision] = None
+        self._policy_job = None
+        self.poster_frames: Optional[PosterFrameCache] = None
         
+    def _get_setting(self, key: str, default):
+        """Lee un ajuste de la configuración si hay gestor"""
+        if self.config_manager is None:
+            return default
+        return self.config_manager.get(key, default)
+    
+    def _get_poster_frames(self) -> PosterFrameCache:
+        """Caché de portadas, creada con los ajustes actuales"""
+        strategy = self._get_setting("video_poster_strategy", "variance")
+        position = self._get_setting("video_poster_position", 0.1)
+        if (self.poster_frames is None or self.poster_frames.strategy != strategy
+                or self.poster_frames.position != position):
+            self.poster_frames = PosterFrameCache(strategy=strategy, position=position)
+        return self.poster_frames
+    
     def is_video_file(self, file_path: str) -> bool:
         """
         Verifica si un archivo es un video soportado
@@ -61,10 +93,59 @@ class VideoWallpaperEngine:
         
         return sorted(videos)
     
+    def prepare_video_wallpaper(self, video_path: str) -> Optional[str]:
+        """
+        Prepara la imagen estática de un video sin tocar el escritorio
+        
+        Args:
+            video_path: Ruta del video
+            
+        Returns:
+            Ruta de la imagen a aplicar (portada o placeholder) o None si falla
+        """
+        if not os.path.exists(video_path):
+            print(f"❌ El archivo de video no existe: {video_path}")
+            return None
+        
+        # Verificar que es un video
+        if not self.is_video_file(video_path):
+            print(f"❌ El archivo no es un video soportado: {video_path}")
+            return None
+        
+        try:
+            poster = self._get_poster_frames().get(video_path)
+        except Exception as e:
+            print(f"❌ Error procesando frame del video: {e}")
+            poster = None
+        if poster:
+            return poster
+        
+        print(f"⚠️ Falló extracción de frame, usando placeholder...")
+        return self._render_video_placeholder(video_path)
+    
+    def finish_swap(self, video_path: Optional[str] = None) -> None:
+        """
+        Completa un cambio de fondo ya aplicado al escritorio
+        
+        Suelta el video anterior sin restaurar el fondo por defecto (el nuevo
+        fondo ya está puesto) y registra el video nuevo, si lo hay.
+        
+        Args:
+            video_path: Video que acaba de quedar como fondo o None si es una imagen
+        """
+        if self.is_video_playing or self.video_player is not None:
+            self.stop_video_wallpaper(restore_default=False)
+        if video_path is not None:
+            self.is_video_playing = True
+            self.current_video_path = video_path
+    
     def set_video_wallpaper(self, video_path: str) -> bool:
         """
         Establece un video como fondo de pantalla (versión simplificada)
         
+        Prepara primero la imagen y hace una sola actualización del escritorio;
+        si algo falla, el fondo actual se queda como está.
+        
         Args:
             video_path: Ruta del video
             
@@ -72,36 +153,36 @@ class VideoWallpaperEngine:
             True si se estableció correctamente
         """
         try:
-            # Detener video anterior si existe
-            self.stop_video_wallpaper()
-            
-            if not os.path.exists(video_path):
-                print(f"❌ El archivo de video no existe: {video_path}")
-                return False
-            
-            # Verificar que es un video
-            if not self.is_video_file(video_path):
-                print(f"❌ El archivo no es un video soportado: {video_path}")
+            image_path = self.prepare_video_wallpaper(video_path)
+            if image_path is None:
                 return False
             
             print(f"🎬 Estableciendo video como fondo: {os.path.basename(video_path)}")
             
-            # Usar método simple: extraer frame del video como imagen
-            success = self._set_video_frame_as_wallpaper(video_path)
-            
-            if success:
-                self.is_video_playing = True
-                print(f"✅ Video establecido como fondo (frame estático): {os.path.basename(video_path)}")
-                return True
-            else:
-                print(f"⚠️ Falló extracción de frame, usando placeholder...")
-                # Fallback: crear imagen placeholder
-                return self._create_video_thumbnail_wallpaper(video_path)
+            if not self.apply_wallpaper_image(image_path):
+                print(f"❌ Error estableciendo frame como fondo")
+                return False
+            
+            self.finish_swap(video_path)
+            print(f"✅ Video establecido como fondo (frame estático): {os.path.basename(video_path)}")
+            return True
                 
         except Exception as e:
             print(f"❌ Error estableciendo video como fondo: {e}")
             return False
     
+    def apply_wallpaper_image(self, image_path: str) -> bool:
+        """
+        Aplica una imagen como fondo (la única actualización del escritorio de un cambio)
+        
+        Args:
+            image_path: Ruta de la imagen
+            
+        Returns:
+            True si el sistema aceptó el cambio
+        """
+        return self.desktop.apply(image_path)
+    
     def _start_animated_video_wallpaper(self, video_path: str) -> bool:
         """
         Inicia reproducción de video animado usando ventana transparente
@@ -113,14 +194,8 @@ class VideoWallpaperEngine:
             True si se inició correctamente
         """
         try:
-            import threading
             import tkinter as tk
-            import cv2
             from PIL import Image, ImageTk
-            import time
-            
-            # Detener video anterior
-            self.stop_video_wallpaper()
             
             # Crear ventana para video
             def create_video_window():
@@ -156,76 +231,32 @@ class VideoWallpaperEngine:
                     print(f"❌ Error creando ventana de video: {e}")
                     return False
             
-            # Crear ventana en el hilo principal
-            if not create_video_window():
-                return False
+            # Si ya hay un video animado, cambiar de video en el mismo
+            # reproductor y la misma ventana
+            reuse = (getattr(self, 'video_window', None) is not None
+                     and self.video_player is not None and self.video_player.is_alive())
+            if not reuse:
+                # La ventana nueva tapa el escritorio: no hace falta restaurarlo
+                self.stop_video_wallpaper(restore_default=False)
+                # Crear ventana en el hilo principal
+                if not create_video_window():
+                    return False
             
-            # Iniciar reproducción en hilo separado
-            def play_video():
-                try:
-                    cap = cv2.VideoCapture(video_path)
-                    
-                    if not cap.isOpened():
-                        print(f"❌ No se pudo abrir video: {video_path}")
-                        return
-                    
-                    # Obtener propiedades del video
-                    fps = cap.get(cv2.CAP_PROP_FPS) or 30
-                    frame_delay = 1.0 / fps
-                    
-                    print(f"🎬 Reproduciendo video a {fps} FPS")
-                    
-                    while self.is_video_playing and hasattr(self, 'video_window'):
-                        ret, frame = cap.read()
-                        
-                        if not ret:
-                            # Reiniciar video (loop)
-                            cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
-                            continue
-                        
-                        try:
-                            # Convertir frame de BGR a RGB
-                            frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                            
-                            # Redimensionar frame al tamaño de pantalla
-                            screen_width = self.video_window.winfo_screenwidth()
-                            screen_height = self.video_window.winfo_screenheight()
-                            
-                            # Crear imagen PIL
-                            pil_image = Image.fromarray(frame_rgb)
-                            pil_image = pil_image.resize((screen_width, screen_height), Image.Resampling.LANCZOS)
-                            
-                            # Convertir a PhotoImage
-                            photo = ImageTk.PhotoImage(pil_image)
-                            
-                            # Actualizar label en el hilo principal usando after()
-                            if hasattr(self, 'video_label') and self.video_label.winfo_exists():
-                                def update_frame():
-                                    try:
-                                        if hasattr(self, 'video_label') and self.video_label.winfo_exists():
-                                            self.video_label.configure(image=photo)
-                                            self.video_label.image = photo  # Mantener referencia
-                                    except:
-                                        pass
-                                
-                                # Programar actualización en el hilo principal
-                                self.video_window.after(0, update_frame)
-                            
-                        except Exception as e:
-                            print(f"⚠️ Error procesando frame: {e}")
-                        
-                        # Esperar según FPS
-                        time.sleep(frame_delay)
-                    
-                    cap.release()
-                    print("🛑 Reproducción de video terminada")
-                    
-                except Exception as e:
-                    print(f"❌ Error en reproducción de video: {e}")
+            screen_size = (self.video_window.winfo_screenwidth(),
+                           self.video_window.winfo_screenheight())
             
-            # Iniciar hilo de reproducción
-            self.video_thread = threading.Thread(target=play_video, daemon=True)
-            self.video_thread.start()
+            # Decodificación y escalado en otro proceso: la interfaz solo copia
+            # fotogramas RGB desde la memoria compartida
+            player = self._get_video_player(screen_size)
+            if player is None or not player.swap(video_path):
+                return False
+            print(f"🎬 Reproduciendo video a {player.fps:.1f} FPS")
+            
+            self.is_video_playing = True
+            self.current_video_path = video_path
+            if self._present_job is None:
+                self._present_job = self.video_window.after(0, self._present_video_frame)
+            self._start_playback_policy()
             
             return True
             
@@ -236,6 +267,141 @@ class VideoWallpaperEngine:
             print(f"❌ Error iniciando video animado: {e}")
             return False
     
+    def _get_video_player(self, screen_size) -> Optional[VideoPlayerProcess]:
+        """Reproductor en marcha con los ajustes actuales, lanzándolo si hace falta"""
+        settings = {
+            "fit_mode": self._get_setting("video_fit_mode", "fill"),
+            "quality": self._get_setting("video_scaling_quality", "balanced"),
+            "loop_cache_mb": int(self._get_setting("video_loop_cache_mb", 0) or 0),
+        }
+        player = self.video_player
+        if (player is not None and player.is_alive() and player.size == screen_size
+                and player.settings == settings):
+            return player
+        if player is not None:
+            player.stop()
+        self.video_player = VideoPlayerProcess(screen_size, **settings)
+        if not self.video_player.start():
+            self.video_player = None
+        return self.video_player
+    
+    def _present_video_frame(self):
+        """Muestra el último fotograma del reproductor (en el hilo de Tk)"""
+        import tkinter as tk
+        from PIL import Image, ImageTk
+        
+        window = getattr(self, 'video_window', None)
+        player = self.video_player
+        if not self.is_video_playing or window is None or player is None:
+            self._present_job = None
+            return
+        
+        def show(frame):
+            # PhotoImage copia los píxeles: el hueco se devuelve al reproductor
+            photo = ImageTk.PhotoImage(Image.fromarray(frame))
+            self.video_label.configure(image=photo)
+            self.video_label.image = photo  # Mantener referencia
+        
+        try:
+            player.present_latest(show)
+            self._present_job = window.after(player.poll_interval_ms, self._present_video_frame)
+        except tk.TclError:
+            # La ventana se cerró mientras tanto
+            self._present_job = None
+    
+    def _cancel_jobs(self) -> None:
+        """Cancela las llamadas programadas en la ventana (presentación y política)"""
+        import tkinter as tk
+        
+        window = getattr(self, 'video_window', None)
+        for name in ("_present_job", "_policy_job"):
+            job = getattr(self, name)
+            if job is not None and window is not None:
+                try:
+                    window.after_cancel(job)
+                except tk.TclError:
+                    # La ventana ya no existe
+                    pass
+            setattr(self, name, None)
+    
+    def _start_playback_policy(self):
+        """Programa la evaluación periódica de la política (si está activada)"""
+        if not self._get_setting("video_policy_enabled", True) or self._policy_job is not None:
+            return
+        if self.policy_timer is None:
+            policy = (PlaybackPolicy.from_config(self.config_manager)
+                      if self.config_manager is not None else PlaybackPolicy())
+            self.policy_timer = PolicyTimer(
+                policy, float(self._get_setting("video_policy_seconds", 2)))
+        else:
+            # Nuevo video: volver a aplicar la decisión vigente
+            self.policy_timer.decision = None
+        self._policy_job = self.video_window.after(0, self._check_playback_policy)
+    
+    def _check_playback_policy(self):
+        """Evalúa la política y aplica la decisión si cambió (en el hilo de Tk)"""
+        import tkinter as tk
+        
+        window = getattr(self, 'video_window', None)
+        if not self.is_video_playing or window is None or self.video_player is None:
+            self._policy_job = None
+            return
+        try:
+            decision = self.policy_timer.poll()
+            if decision is not None:
+                self.apply_playback_decision(decision)
+        except tk.TclError:
+            self._policy_job = None
+            return
+        except Exception as e:
+            # Un fallo puntual no debe detener la evaluación periódica
+            print(f"⚠️ Error evaluando la política de reproducción: {e}")
+        try:
+            interval_ms = int(self.policy_timer.interval_seconds * 1000)
+            self._policy_job = window.after(interval_ms, self._check_playback_policy)
+        except tk.TclError:
+            self._policy_job = None
+    
+    def apply_playback_decision(self, decision: PlaybackDecision) -> None:
+        """
+        Aplica una decisión de la política al reproductor
+        
+        Args:
+            decision: Reproducir, bajar FPS, pausar o congelar en la portada
+        """
+        player = self.video_player
+        if player is None:
+            return
+        if decision.reason:
+            print(f"🔋 Video: {decision.action} ({decision.reason})")
+        
+        if decision.action in (ACTION_PLAY, ACTION_LOW_FPS):
+            player.set_max_fps(decision.fps)
+            player.play()
+        elif decision.action == ACTION_PAUSE:
+            player.pause()
+        elif decision.action == ACTION_POSTER:
+            player.pause()
+            self._show_poster_frame()
+        self.playback_decision = decision
+    
+    def _show_poster_frame(self):
+        """Sustituye el último fotograma por la portada del video"""
+        try:
+            from PIL import Image, ImageOps, ImageTk
+            
+            poster = self._get_poster_frames().get(self.current_video_path or "")
+            if not poster or not self.video_label.winfo_exists():
+                return
+            size = (self.video_window.winfo_screenwidth(), self.video_window.winfo_screenheight())
+            with Image.open(poster) as image:
+                image = ImageOps.fit(image.convert("RGB"), size)
+            photo = ImageTk.PhotoImage(image)
+            self.video_label.configure(image=photo)
+            self.video_label.image = photo  # Mantener referencia
+        except Exception as e:
+            print(f"⚠️ No se pudo mostrar la portada: {e}")
+    
     def _send_window_to_back(self):
         """Envía la ventana de video al fondo (detrás de todas las ventanas)"""
         try:
@@ -262,79 +428,18 @@ class VideoWallpaperEngine:
         except Exception as e:
             print(f"⚠️ No se pudo enviar ventana al fondo: {e}")
     
-    def _set_video_frame_as_wallpaper(self, video_path: str) -> bool:
-        """
-        Extrae el primer frame del video y lo usa como fondo de pantalla
-        
-        Args:
-            video_path: Ruta del video
-            
-        Returns:
-            True si se estableció correctamente
-        """
-        try:
-            import cv2
-            import tempfile
-            import ctypes
-            
-            # Abrir video con OpenCV
-            cap = cv2.VideoCapture(video_path)
-            
-            if not cap.isOpened():
-                print(f"❌ No se pudo abrir el video con OpenCV")
-                return False
-            
-            # Leer primer frame
-            ret, frame = cap.read()
-            cap.release()
-            
-            if not ret:
-                print(f"❌ No se pudo leer frame del video")
-                return False
-            
-            # Guardar frame como imagen temporal
-            temp_dir = tempfile.gettempdir()
-            temp_image = os.path.join(temp_dir, "video_wallpaper_frame.jpg")
-            
-            # Guardar frame
-            cv2.imwrite(temp_image, frame)
-            
-            # Establecer como fondo de pantalla usando Windows API
-            SPI_SETDESKWALLPAPER = 20
-            result = ctypes.windll.user32.SystemParametersInfoW(
-                SPI_SETDESKWALLPAPER, 
-                0, 
-                temp_image, 
-                3  # SPIF_UPDATEINIFILE | SPIF_SENDCHANGE
-            )
-            
-            if result:
-                print(f"✅ Frame del video establecido como fondo")
-                return True
-            else:
-                print(f"❌ Error estableciendo frame como fondo")
-                return False
-                
-        except ImportError:
-            print(f"❌ OpenCV no disponible para procesar video")
-            return False
-        except Exception as e:
-            print(f"❌ Error procesando frame del video: {e}")
-            return False
-    
-    def _create_video_thumbnail_wallpaper(self, video_path: str) -> bool:
+    def _render_video_placeholder(self, video_path: str) -> Optional[str]:
         """
-        Crea una imagen thumbnail del video y la usa como fondo
+        Crea una imagen con la información del video (sin aplicarla)
         
         Args:
             video_path: Ruta del video
             
         Returns:
-            True si se estableció correctamente
+            Ruta de la imagen o None si falla
         """
         try:
-            import tempfile
-            import ctypes
+            import hashlib
             from PIL import Image, ImageDraw, ImageFont
             
             # Crear imagen con información del video
@@ -380,224 +485,23 @@ class VideoWallpaperEngine:
             x4 = (img_width - (bbox4[2] - bbox4[0])) // 2
             draw.text((x4, y_pos + 150), text4, fill='gray', font=font_small)
             
-            # Guardar imagen temporal
-            temp_dir = tempfile.gettempdir()
-            temp_image = os.path.join(temp_dir, "video_wallpaper_placeholder.jpg")
-            img.save(temp_image, "JPEG", quality=95)
-            
-            # Establecer como fondo de pantalla
-            SPI_SETDESKWALLPAPER = 20
-            result = ctypes.windll.user32.SystemParametersInfoW(
-                SPI_SETDESKWALLPAPER, 
-                0, 
-                temp_image, 
-                3  # SPIF_UPDATEINIFILE | SPIF_SENDCHANGE
-            )
-            
-            if result:
-                print(f"✅ Imagen placeholder del video establecida como fondo")
-                return True
-            else:
-                print(f"❌ Error estableciendo placeholder como fondo")
-                return False
+            # Guardar junto a las portadas, con un nombre por video
+            name = hashlib.sha1(video_name.encode("utf-8", "surrogatepass")).hexdigest()
+            placeholder = self._get_poster_frames().cache_dir / f"placeholder_{name}.jpg"
+            img.save(placeholder, "JPEG", quality=95)
+            return str(placeholder)
                 
         except Exception as e:
             print(f"❌ Error creando thumbnail del video: {e}")
-            return False
+            return None
     
-    def _set_video_as_wallpaper_wmp(self, video_path: str) -> bool:
+    def stop_video_wallpaper(self, restore_default: bool = True) -> bool:
         """
-        Método usando Windows Media Player para video como fondo
-        
-        Args:
-            video_path: Ruta del video
-            
-        Returns:
-            True si se estableció correctamente
-        """
-        try:
-            # Crear archivo HTML que reproduce el video en bucle
-            html_content = f"""
-            <!DOCTYPE html>
-            <html>
-            <head>
-                <style>
-                    body {{ margin: 0; padding: 0; overflow: hidden; }}
-                    video {{ width: 100vw; height: 100vh; object-fit: cover; }}
-                </style>
-            </head>
-            <body>
-                <video autoplay muted loop>
-                    <source src="file:///{video_path.replace(os.sep, '/')}" type="video/mp4">
-                </video>
-            </body>
-            </html>
-            """
-            
-            # Guardar HTML temporal
-            temp_html = os.path.join(os.path.dirname(video_path), "video_wallpaper.html")
-            with open(temp_html, 'w', encoding='utf-8') as f:
-                f.write(html_content)
-            
-            # Usar PowerShell para establecer como fondo activo
-            powershell_script = f"""
-            Add-Type -TypeDefinition @"
-                using System;
-                using System.Runtime.InteropServices;
-                public class Wallpaper {{
-                    [DllImport("user32.dll", CharSet=CharSet.Auto)]
-                    public static extern int SystemParametersInfo(int uAction, int uParam, string lpvParam, int fuWinIni);
-                }}
-"@
-            [Wallpaper]::SystemParametersInfo(20, 0, "{temp_html}", 3)
-            """
-            
-            # Ejecutar PowerShell
-            result = subprocess.run([
-                "powershell", "-Command", powershell_script
-            ], capture_output=True, text=True, creationflags=subprocess.CREATE_NO_WINDOW)
-            
-            return result.returncode == 0
-            
-        except Exception as e:
-            print(f"Error en método WMP: {e}")
-            return False
-    
-    def _set_video_as_wallpaper_alternative(self, video_path: str) -> bool:
-        """
-        Método alternativo usando reproductores externos
-        
-        Args:
-            video_path: Ruta del video
-            
-        Returns:
-            True si se estableció correctamente
-        """
-        try:
-            # Intentar con VLC en modo wallpaper
-            vlc_paths = [
-                r"C:\Program Files\VideoLAN\VLC\vlc.exe",
-                r"C:\Program Files (x86)\VideoLAN\VLC\vlc.exe"
-            ]
-            
-            for vlc_path in vlc_paths:
-                if os.path.exists(vlc_path):
-                    # Ejecutar VLC en modo wallpaper
-                    cmd = [
-                        vlc_path,
-                        video_path,
-                        "--intf", "dummy",
-                        "--loop",
-                        "--no-video-title-show",
-                        "--video-wallpaper"
-                    ]
-                    
-                    self.current_video_process = subprocess.Popen(
-                        cmd, 
-                        creationflags=subprocess.CREATE_NO_WINDOW
-                    )
-                    
-                    time.sleep(2)  # Esperar a que inicie
-                    
-                    if self.current_video_process.poll() is None:
-                        return True
-            
-            # Si VLC no está disponible, usar método de ventana transparente
-            return self._create_transparent_video_window(video_path)
-            
-        except Exception as e:
-            print(f"Error en método alternativo: {e}")
-            return False
-    
-    def _create_transparent_video_window(self, video_path: str) -> bool:
-        """
-        Crea una ventana transparente que reproduce el video como fondo
+        Detiene el video de fondo actual
         
         Args:
-            video_path: Ruta del video
-            
-        Returns:
-            True si se creó correctamente
-        """
-        try:
-            # Crear script Python para ventana de video
-            script_content = f"""
-import tkinter as tk
-import cv2
-from PIL import Image, ImageTk
-import threading
-import time
-
-class VideoWallpaper:
-    def __init__(self):
-        self.root = tk.Tk()
-        self.root.attributes('-fullscreen', True)
-        self.root.attributes('-topmost', False)
-        self.root.configure(bg='black')
-        self.root.overrideredirect(True)
-        
-        # Enviar ventana al fondo
-        self.root.lower()
-        
-        self.label = tk.Label(self.root, bg='black')
-        self.label.pack(fill=tk.BOTH, expand=True)
-        
-        self.cap = cv2.VideoCapture(r"{video_path}")
-        self.playing = True
-        
-        self.play_video()
-        self.root.mainloop()
-    
-    def play_video(self):
-        def video_loop():
-            while self.playing:
-                ret, frame = self.cap.read()
-                if not ret:
-                    self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)  # Reiniciar video
-                    continue
-                
-                # Redimensionar frame
-                height = self.root.winfo_screenheight()
-                width = self.root.winfo_screenwidth()
-                frame = cv2.resize(frame, (width, height))
-                
-                # Convertir a formato Tkinter
-                frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                img = Image.fromarray(frame)
-                photo = ImageTk.PhotoImage(img)
-                
-                # Actualizar label
-                self.label.configure(image=photo)
-                self.label.image = photo
-                
-                time.sleep(0.033)  # ~30 FPS
-        
-        thread = threading.Thread(target=video_loop, daemon=True)
-        thread.start()
-
-if __name__ == "__main__":
-    VideoWallpaper()
-"""
-            
-            # Guardar script temporal
-            script_path = os.path.join(os.path.dirname(video_path), "video_wallpaper_player.py")
-            with open(script_path, 'w', encoding='utf-8') as f:
-                f.write(script_content)
-            
-            # Ejecutar script
-            self.current_video_process = subprocess.Popen([
-                "python", script_path
-            ], creationflags=subprocess.CREATE_NO_WINDOW)
-            
-            return True
-            
-        except Exception as e:
-            print(f"Error creando ventana de video: {e}")
-            return False
-    
-    def stop_video_wallpaper(self) -> bool:
-        """
-        Detiene el video de fondo actual
+            restore_default: Si es False no se toca el escritorio (el llamador
+                ya aplicó otro fondo, ver finish_swap)
         
         Returns:
             True si se detuvo correctamente
@@ -607,6 +511,8 @@ if __name__ == "__main__":
             
             # Detener reproducción
             self.is_video_playing = False
+            # Sin esto, un arranque rápido dejaría dos bucles de presentación y de política
+            self._cancel_jobs()
             
             # Cerrar ventana de video si existe
             if hasattr(self, 'video_window') and self.video_window:
@@ -617,6 +523,13 @@ if __name__ == "__main__":
                 except:
                     pass
             
+            self.playback_decision = None
+            
+            # Detener el proceso reproductor del video animado
+            if self.video_player is not None:
+                self.video_player.stop()
+                self.video_player = None
+            
             # Detener hilo de video si existe
             if hasattr(self, 'video_thread') and self.video_thread:
                 try:
@@ -626,29 +539,11 @@ if __name__ == "__main__":
                 except:
                     pass
             
-            # Detener proceso de video si existe (método antiguo)
-            if self.current_video_process:
-                try:
-                    # Solicitar terminación y esperar un breve tiempo
-                    self.current_video_process.terminate()
-                    try:
-                        self.current_video_process.wait(timeout=2)
-                    except Exception:
-                        pass
-                    # Si sigue vivo, forzar cierre
-                    if self.current_video_process.poll() is None:
-                        try:
-                            self.current_video_process.kill()
-                        except Exception:
-                            pass
-                    print("✅ Proceso de video terminado")
-                except Exception:
-                    pass
-                finally:
-                    self.current_video_process = None
+            self.current_video_path = None
             
             # Restaurar fondo sólido
-            self._restore_default_wallpaper()
+            if restore_default:
+                self._restore_default_wallpaper()
             
             print("✅ Video de fondo detenido completamente")
             return True
@@ -659,17 +554,24 @@ if __name__ == "__main__":
     
     def _restore_default_wallpaper(self):
         """Restaura el fondo de pantalla por defecto"""
-        try:
-            # Establecer color sólido negro como fondo
-            SPI_SETDESKWALLPAPER = 20
-            ctypes.windll.user32.SystemParametersInfoW(
-                SPI_SETDESKWALLPAPER, 
-                0, 
-                "", 
-                3
-            )
-        except Exception as e:
-            print(f"Error restaurando fondo: {e}")
+        # Color sólido como fondo
+        if not self.desktop.clear():
+            print(f"Error restaurando fondo")
+    
+    def get_playback_stats(self) -> Optional[dict]:
+        """
+        Contadores del video animado en curso
+        
+        Returns:
+            Diccionario con target_fps, presented, dropped, decoded y la
+            acción de la política, o None si no hay reproducción animada
+        """
+        if self.video_player is None:
+            return None
+        stats = self.video_player.get_stats()
+        decision = self.playback_decision
+        stats["policy"] = decision.action if decision else ACTION_PLAY
+        return stats
     
     def is_playing(self) -> bool:
         """
@@ -678,7 +580,4 @@ if __name__ == "__main__":
         Returns:
             True si hay un video activo
         """
-        return self.is_video_playing and (
-            self.current_video_process is None or 
-            self.current_video_process.poll() is None
-        )
+        return self.is_video_playing
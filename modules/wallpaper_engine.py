@@ -4,20 +4,27 @@ Maneja la lógica de cambio de fondos de pantalla
 """
 
 import os
-import ctypes
 import threading
 import time
 from datetime import datetime, timedelta
-from pathlib import Path
-from typing import List, Optional, Callable
+from typing import Dict, List, Optional, Callable, Set, Tuple
 
 from .config_manager import ConfigManager
+from .countdown import CountdownPublisher
+from .folder_watcher import FolderWatcher
+from .image_normalizer import ImageNormalizer
+from .media_library import MediaLibrary
+from .prefetch import WallpaperPrefetcher
+from .scheduler import ChangeScheduler
 from .video_wallpaper import VideoWallpaperEngine
 
 
 class WallpaperEngine:
     """Motor para cambiar fondos de pantalla"""
     
+    # Segundos que se reutiliza la resolución leída (xrandr y swaymsg son procesos externos)
+    SCREEN_SIZE_TTL = 60.0
+    
     def __init__(self, config_manager: ConfigManager):
         """
         Inicializa el motor de fondos
@@ -29,12 +36,39 @@ class WallpaperEngine:
         self.running = False
         self.thread = None
         self.countdown_callback = None
-        self.video_engine = VideoWallpaperEngine()
+        self.video_engine = VideoWallpaperEngine(config_manager)
+        # Un solo cambio a la vez: "cambiar ahora" (GUI, bandeja, daemon) y la fecha límite
+        self._change_lock = threading.RLock()
+        # (backend, instante, resolución) de la última lectura de la pantalla
+        self._screen_size: Optional[Tuple[object, float, Optional[Tuple[int, int]]]] = None
+        # Normalización a la resolución de la pantalla y precarga del próximo fondo
+        self.prefetcher = WallpaperPrefetcher(
+            self.video_engine.prepare_video_wallpaper, self.video_engine.is_video_file,
+            screen_size=self.get_screen_size,
+            normalizer=self._create_normalizer())
+        self.config_manager.add_listener(self._update_normalizer)
+        self.media_library = MediaLibrary()
+        self.scheduler = ChangeScheduler(config_manager, self.get_weekday_items)
+        # Recalcular la próxima fecha límite cuando se guarda la configuración
+        self.config_manager.add_listener(self.scheduler.notify_config_changed)
+        # Contador regresivo desacoplado del hilo de decisión
+        self.countdown = CountdownPublisher(self.get_time_until_next_change)
+        # Vigilancia de carpetas: mantiene el índice al día sin reescanear
+        self.media_listeners: List[Callable[[str, List[str], List[str]], None]] = []
+        self.folder_watcher = FolderWatcher(
+            self._on_folder_changes,
+            poll_seconds=self.config_manager.get("folder_poll_seconds", 5))
+        self.config_manager.add_listener(self.sync_watched_folders)
     
     def set_wallpaper(self, media_path: str) -> bool:
         """
         Cambia el fondo de pantalla en Windows (imagen o video)
         
+        El cambio es transaccional: primero se prepara el nuevo fondo (portada
+        del video y normalización a la pantalla, o lo que dejó listo la
+        precarga), luego se actualiza el escritorio una sola vez y al final se
+        suelta el video anterior. Si la preparación falla, el fondo actual no se toca.
+        
         Args:
             media_path: Ruta a la imagen o video
             
@@ -43,31 +77,80 @@ class WallpaperEngine:
         """
         try:
             abs_path = os.path.abspath(media_path)
+            is_video = self.video_engine.is_video_file(abs_path)
             
-            # Verificar si es un video
-            if self.video_engine.is_video_file(abs_path):
-                # Detener cualquier video anterior
-                self.video_engine.stop_video_wallpaper()
-                # Establecer video como fondo
-                return self.video_engine.set_video_wallpaper(abs_path)
-            else:
-                # Detener video si hay uno reproduciéndose
-                if self.video_engine.is_playing():
-                    self.video_engine.stop_video_wallpaper()
-                
-                # Establecer imagen como fondo
-                SPI_SETDESKWALLPAPER = 20
-                ctypes.windll.user32.SystemParametersInfoW(
-                    SPI_SETDESKWALLPAPER, 
-                    0, 
-                    abs_path, 
-                    3  # SPIF_UPDATEINIFILE | SPIF_SENDCHANGE
-                )
-                return True
+            # 1. Preparar el nuevo fondo sin tocar el escritorio
+            image_path = self.prefetcher.take(abs_path) or self.prefetcher.prepare(abs_path)
+            if image_path is None:
+                return False
+            
+            # 2. Una sola actualización del escritorio
+            if not self.video_engine.apply_wallpaper_image(image_path):
+                return False
+            # La caché de normalización no puede borrar el fondo que está puesto
+            self.prefetcher.normalizer.pin(image_path)
+            
+            # 3. Soltar el video anterior sin restaurar el fondo por defecto
+            self.video_engine.finish_swap(abs_path if is_video else None)
+            return True
         except Exception as e:
             print(f"Error cambiando fondo: {e}")
             return False
     
+    def get_screen_size(self) -> Optional[Tuple[int, int]]:
+        """
+        Resolución de la pantalla para normalizar los fondos
+        
+        Se lee del backend del escritorio como mucho cada SCREEN_SIZE_TTL
+        segundos, o antes si cambia el backend o se llama a invalidate_screen_size().
+        
+        Returns:
+            (ancho, alto) o None si no se puede saber
+        """
+        desktop = self.video_engine.desktop
+        cached = self._screen_size
+        now = time.monotonic()
+        if cached is not None and cached[0] is desktop and now - cached[1] < self.SCREEN_SIZE_TTL:
+            return cached[2]
+        size = desktop.screen_size()
+        self._screen_size = (desktop, now, size)
+        return size
+    
+    def invalidate_screen_size(self) -> None:
+        """Olvida la resolución leída (cambió la configuración de pantallas)"""
+        self._screen_size = None
+    
+    def _get_normalizer_settings(self) -> Tuple[str, str, int]:
+        """(modo, formato, bytes máximos) de la normalización según la configuración"""
+        mode = self.config_manager.get("wallpaper_fit_mode", "fill")
+        fmt = self.config_manager.get("display_cache_format", "jpeg")
+        return (mode if mode in ImageNormalizer.MODES else "fill",
+                fmt if fmt in ImageNormalizer.FORMATS else "jpeg",
+                self.config_manager.get("display_cache_mb", 256) * 1024 * 1024)
+    
+    def _create_normalizer(self) -> ImageNormalizer:
+        """Crea la caché de normalización con los ajustes actuales"""
+        mode, fmt, max_bytes = self._get_normalizer_settings()
+        return ImageNormalizer(mode=mode, fmt=fmt, max_bytes=max_bytes)
+    
+    def _update_normalizer(self) -> None:
+        """Aplica cambios de los ajustes de normalización"""
+        normalizer = self.prefetcher.normalizer
+        mode, fmt, max_bytes = self._get_normalizer_settings()
+        if (mode, fmt) != (normalizer.mode, normalizer.fmt):
+            self.prefetcher.set_normalizer(self._create_normalizer())
+        else:
+            normalizer.max_bytes = max_bytes
+    
+    def get_apply_stats(self) -> Dict[str, float]:
+        """
+        Latencia de las actualizaciones del escritorio
+        
+        Returns:
+            Diccionario con count, failures, mean_ms, p50_ms, p95_ms y max_ms
+        """
+        return self.video_engine.desktop.latency_stats()
+    
     def get_media_from_folder(self, folder_path: Optional[str] = None) -> List[str]:
         """
         Obtiene todas las imágenes y videos de una carpeta
@@ -81,25 +164,8 @@ class WallpaperEngine:
         if folder_path is None:
             folder_path = self.config_manager.get("wallpaper_folder")
         
-        if not folder_path or not os.path.exists(folder_path):
-            return []
-        
-        # Extensiones válidas para imágenes y videos
-        image_extensions = {'.jpg', '.jpeg', '.png', '.bmp'}
-        video_extensions = {'.mp4', '.avi', '.mov', '.wmv', '.mkv', '.flv', '.webm', '.m4v'}
-        valid_extensions = image_extensions | video_extensions
-        
-        media_files = []
-        
-        try:
-            for file in os.listdir(folder_path):
-                if Path(file).suffix.lower() in valid_extensions:
-                    full_path = os.path.join(folder_path, file)
-                    media_files.append(full_path)
-        except Exception as e:
-            print(f"Error leyendo carpeta: {e}")
-        
-        return sorted(media_files)
+        # El índice solo vuelve a leer la carpeta si cambió su mtime
+        return self.media_library.get_paths(folder_path)
     
     def get_images_from_folder(self, folder_path: Optional[str] = None) -> List[str]:
         """
@@ -114,21 +180,74 @@ class WallpaperEngine:
         if folder_path is None:
             folder_path = self.config_manager.get("wallpaper_folder")
         
-        if not folder_path or not os.path.exists(folder_path):
-            return []
+        return self.media_library.get_paths(folder_path, kind="image")
+    
+    def get_folder_counts(self, folder_path: Optional[str] = None) -> Tuple[int, int]:
+        """
+        Cuenta imágenes y videos de una carpeta sin construir listas
+        
+        Args:
+            folder_path: Ruta de la carpeta. Si es None, usa la configurada
+            
+        Returns:
+            Tupla (imágenes, videos)
+        """
+        if folder_path is None:
+            folder_path = self.config_manager.get("wallpaper_folder")
+        
+        return (self.media_library.count(folder_path, "image"),
+                self.media_library.count(folder_path, "video"))
+    
+    def get_watched_folders(self) -> Set[str]:
+        """
+        Obtiene las carpetas configuradas que deben vigilarse
         
-        valid_extensions = {'.jpg', '.jpeg', '.png', '.bmp'}
-        images = []
+        Returns:
+            Carpeta de fondos y carpetas de playlists por día en modo carpeta
+        """
+        folders = set()
+        if self.config_manager.get("wallpaper_folder"):
+            folders.add(self.config_manager.get("wallpaper_folder"))
+        playlists = self.config_manager.get("weekday_playlists", {}) or {}
+        for day_conf in playlists.values():
+            if day_conf and day_conf.get("use_folder") and day_conf.get("folder"):
+                folders.add(day_conf["folder"])
+        return folders
+    
+    def sync_watched_folders(self) -> None:
+        """Actualiza las carpetas vigiladas según la configuración actual"""
+        self.folder_watcher.set_folders(self.get_watched_folders())
+    
+    def add_media_listener(self, callback: Callable[[str, List[str], List[str]], None]) -> None:
+        """
+        Registra una función que recibe los cambios detectados en carpetas
         
-        try:
-            for file in os.listdir(folder_path):
-                if Path(file).suffix.lower() in valid_extensions:
-                    full_path = os.path.join(folder_path, file)
-                    images.append(full_path)
-        except Exception as e:
-            print(f"Error leyendo carpeta: {e}")
+        Args:
+            callback: Función que recibe (carpeta, agregados, eliminados).
+                Se llama desde el hilo del vigilante
+        """
+        if callback not in self.media_listeners:
+            self.media_listeners.append(callback)
+    
+    def _on_folder_changes(self, folder: str, names: Optional[Set[str]]) -> None:
+        """Aplica al índice una ráfaga de cambios de una carpeta vigilada"""
+        if names is None:
+            # Eventos perdidos o carpeta movida: reescanear en la próxima consulta
+            self.media_library.invalidate(folder)
+            added, removed = [], []
+        else:
+            added, removed = self.media_library.apply_changes(folder, names)
+            if not added and not removed:
+                return
         
-        return sorted(images)
+        # Una playlist por día puede haber pasado de vacía a no vacía
+        self.scheduler.notify_config_changed()
+        
+        for callback in list(self.media_listeners):
+            try:
+                callback(folder, added, removed)
+            except Exception as e:
+                print(f"Error notificando cambios de carpeta: {e}")
     
     def get_wallpaper_list(self) -> List[str]:
         """
@@ -149,21 +268,82 @@ class WallpaperEngine:
         Returns:
             Ruta del siguiente fondo o None si no hay fondos
         """
-        wallpapers = self.get_wallpaper_list()
-        
-        if not wallpapers:
+        found = self._get_time_mode_item()
+        if found is None:
             return None
-        
-        current_index = self.config_manager.get("current_index", 0)
-        wallpaper = wallpapers[current_index]
+        wallpaper, current_index, total = found
         
         # Actualizar índice
-        new_index = (current_index + 1) % len(wallpapers)
+        new_index = (current_index + 1) % total
         self.config_manager.set("current_index", new_index)
         self.config_manager.save_config()
         
         return wallpaper
     
+    def _get_time_mode_item(self) -> Optional[Tuple[str, int, int]]:
+        """
+        Resuelve el fondo en la posición actual sin avanzar el índice
+        
+        Returns:
+            Tupla (fondo, índice, total) o None si no hay fondos
+        """
+        current_index = self.config_manager.get("current_index", 0)
+        
+        if self.config_manager.get("use_folder", False):
+            wallpapers = self.get_media_from_folder()
+            if not wallpapers:
+                return None
+            total = len(wallpapers)
+            current_index %= total
+            wallpaper = wallpapers[current_index]
+        else:
+            # Lista manual: solo se lee el elemento actual (paginado en el almacén)
+            total = self.config_manager.count_wallpapers()
+            if not total:
+                return None
+            current_index %= total
+            page = self.config_manager.get_wallpapers_page(current_index, 1)
+            if not page:
+                return None
+            wallpaper = page[0]
+        
+        return wallpaper, current_index, total
+    
+    def peek_next_wallpaper(self, at: Optional[datetime] = None) -> Optional[str]:
+        """
+        Resuelve el fondo del próximo cambio sin consumirlo
+        
+        Args:
+            at: Momento del cambio (modo día). Si es None, usa la hora actual
+            
+        Returns:
+            Ruta del fondo o None si no hay fondos
+        """
+        if self.config_manager.get("mode", "time") == "time":
+            found = self._get_time_mode_item()
+            return found[0] if found else None
+        return self.get_next_wallpaper_weekday_mode(at)
+    
+    def prefetch_next(self, at: Optional[datetime] = None) -> bool:
+        """
+        Deja preparado el fondo del próximo cambio en la caché local
+        
+        Args:
+            at: Momento del próximo cambio
+            
+        Returns:
+            True si el fondo quedó listo para aplicarse
+        """
+        wallpaper = self.peek_next_wallpaper(at)
+        if not wallpaper:
+            return False
+        prepared = self.prefetcher.prefetch(wallpaper)
+        if prepared is None:
+            return False
+        print(f"📦 Próximo fondo preparado en {prepared.seconds * 1000:.0f} ms: "
+              f"{os.path.basename(wallpaper)}")
+        return True
+    
     def get_wallpaper_for_today(self) -> Optional[str]:
         """
         Obtiene el fondo para el día actual
@@ -175,6 +355,24 @@ class WallpaperEngine:
         weekday_wallpapers = self.config_manager.get("weekday_wallpapers", {})
         return weekday_wallpapers.get(weekday)
     
+    def get_weekday_items(self, weekday: str) -> List[str]:
+        """
+        Obtiene la playlist configurada para un día
+        
+        Args:
+            weekday: Día de la semana ("0" = lunes ... "6" = domingo)
+            
+        Returns:
+            Lista de rutas de fondos del día (vacía si no hay playlist)
+        """
+        playlists = self.config_manager.get("weekday_playlists", {})
+        day_conf = playlists.get(weekday) or {"use_folder": False, "folder": None, "wallpapers": []}
+        
+        if day_conf.get("use_folder", False):
+            return self.get_images_from_folder(day_conf.get("folder"))
+        # La GUI guarda la lista del día como "images"
+        return day_conf.get("wallpapers") or day_conf.get("images") or []
+    
     def should_change_wallpaper(self) -> bool:
         """
         Determina si debe cambiar el fondo
@@ -196,13 +394,7 @@ class WallpaperEngine:
         elif mode == "weekday":
             # Si hay playlist por día, activar rotación intra-día
             weekday = str(datetime.now().weekday())
-            playlists = self.config_manager.get("weekday_playlists", {})
-            day_conf = playlists.get(weekday, {"use_folder": False, "folder": None, "wallpapers": []})
-            
-            if day_conf.get("use_folder", False):
-                items = self.get_images_from_folder(day_conf.get("folder"))
-            else:
-                items = day_conf.get("wallpapers", [])
+            items = self.get_weekday_items(weekday)
             
             last_change = self.config_manager.get("last_change")
             rotation = self.config_manager.get("weekday_rotation_minutes", 30)
@@ -249,20 +441,35 @@ class WallpaperEngine:
         Returns:
             True si se cambió correctamente, False en caso contrario
         """
-        mode = self.config_manager.get("mode", "time")
-        
-        if mode == "time":
-            wallpaper = self.get_next_wallpaper_time_mode()
-        else:
-            # En modo día, usar playlist si existe; si no, fondo único legacy
-            wallpaper = self.get_next_wallpaper_weekday_mode()
+        with self._change_lock:
+            mode = self.config_manager.get("mode", "time")
+            
+            if mode == "time":
+                wallpaper = self.get_next_wallpaper_time_mode()
+            else:
+                # En modo día, usar playlist si existe; si no, fondo único legacy
+                wallpaper = self.get_next_wallpaper_weekday_mode()
+            
+            if wallpaper and os.path.exists(wallpaper):
+                if self.set_wallpaper(wallpaper):
+                    self.config_manager.set("last_change", datetime.now().isoformat())
+                    self.config_manager.save_config()
+                    return True
+            return False
+    
+    def change_if_due(self) -> bool:
+        """
+        Cambia el fondo solo si el cambio sigue pendiente al obtener el turno.
+        Un "cambiar ahora" que coincide con la fecha límite ya la adelantó.
         
-        if wallpaper and os.path.exists(wallpaper):
-            if self.set_wallpaper(wallpaper):
-                self.config_manager.set("last_change", datetime.now().isoformat())
-                self.config_manager.save_config()
-                return True
-        return False
+        Returns:
+            True si se cambió el fondo, False si ya no tocaba o no se pudo
+        """
+        with self._change_lock:
+            next_change = self.scheduler.compute_next_change()
+            if next_change is None or next_change > datetime.now():
+                return False
+            return self.change_wallpaper()
     
     def get_time_until_next_change(self) -> Optional[int]:
         """
@@ -276,6 +483,11 @@ class WallpaperEngine:
         if mode != "time":
             return None
         
+        # Con el planificador activo, la fecha límite ya está calculada
+        next_change = self.scheduler.next_change
+        if self.running and next_change is not None:
+            return max(0, int((next_change - datetime.now()).total_seconds()))
+        
         last_change = self.config_manager.get("last_change")
         if not last_change:
             return 0
@@ -297,53 +509,108 @@ class WallpaperEngine:
         Args:
             callback: Función que recibe (minutos, segundos)
         """
+        if self.countdown_callback:
+            self.countdown.unsubscribe(self.countdown_callback)
         self.countdown_callback = callback
+        if callback:
+            self.countdown.subscribe(callback)
     
     def start_monitoring(self) -> None:
         """Inicia el monitoreo automático"""
         self.running = True
-        self.thread = threading.Thread(target=self._monitor_loop, daemon=True)
+        if self.config_manager.get("scheduler_mode", "event") == "polling":
+            target = self._monitor_loop
+        else:
+            self.scheduler.reset()
+            target = self._scheduled_loop
+        self.thread = threading.Thread(target=target, daemon=True)
         self.thread.start()
+        self.countdown.start()
+        self.sync_watched_folders()
+        self.folder_watcher.start()
     
     def stop_monitoring(self) -> None:
         """Detiene el monitoreo automático"""
         self.running = False
+        self.scheduler.stop()
+        self.countdown.stop()
+        self.folder_watcher.stop()
         if self.thread:
             self.thread.join(timeout=2)
+        self.media_library.flush()
         # Detener cualquier video que esté reproduciéndose
         if self.video_engine.is_playing():
             self.video_engine.stop_video_wallpaper()
     
     def _monitor_loop(self) -> None:
-        """Loop principal de monitoreo"""
+        """Loop legacy de monitoreo por sondeo (verifica cada segundo)"""
         while self.running:
             # Verificar si debe cambiar
-            if self.should_change_wallpaper():
-                self.change_wallpaper()
+            with self._change_lock:
+                due = self.should_change_wallpaper()
+                if due:
+                    self.change_wallpaper()
+            if due:
+                self.countdown.refresh()
+            
+            time.sleep(1)
+    
+    def request_change(self) -> None:
+        """Solicita al hilo del motor un cambio de fondo inmediato"""
+        self.scheduler.request_change()
+    
+    def _scheduled_loop(self) -> None:
+        """
+        Loop por eventos: calcula la fecha límite una vez y duerme hasta ella.
+        Solo despierta antes por cambios de configuración o "cambiar ahora".
+        """
+        scheduler = self.scheduler
+        next_change = scheduler.compute_next_change()
+        prefetched_for = None
+        
+        while self.running:
+            # Primero se despierta a la hora de la precarga, luego a la del cambio
+            prefetch_at = None
+            lead = self.config_manager.get("prefetch_seconds", 15)
+            if lead and next_change is not None and prefetched_for != next_change:
+                prefetch_at = next_change - timedelta(seconds=lead)
+            reason = scheduler.wait(prefetch_at or next_change)
+            
+            if reason == ChangeScheduler.WAKE_STOP or not self.running:
+                break
+            
+            if reason == ChangeScheduler.WAKE_DEADLINE and prefetch_at is not None:
+                prefetched_for = next_change
+                self.prefetch_next(next_change)
+                continue
             
-            # Actualizar contador si está en modo tiempo
-            if self.countdown_callback and self.config_manager.get("mode") == "time":
-                seconds_remaining = self.get_time_until_next_change()
-                if seconds_remaining is not None:
-                    minutes = seconds_remaining // 60
-                    seconds = seconds_remaining % 60
-                    self.countdown_callback(minutes, seconds)
+            if reason in (ChangeScheduler.WAKE_DEADLINE, ChangeScheduler.WAKE_CHANGE_NOW):
+                if reason == ChangeScheduler.WAKE_DEADLINE:
+                    changed = self.change_if_due()
+                else:
+                    changed = self.change_wallpaper()
+                next_change = scheduler.compute_next_change()
+                if not changed and next_change is not None and next_change <= datetime.now():
+                    # Sin fondos válidos: no reintentar en bucle
+                    next_change = scheduler.defer()
+            elif reason == ChangeScheduler.WAKE_CONFIG:
+                next_change = scheduler.compute_next_change()
             
-            time.sleep(1)  # Verificar cada segundo para el contador
+            # La fecha límite cambió: el contador debe recalcular su tick
+            self.countdown.refresh()
     
-    def get_next_wallpaper_weekday_mode(self) -> Optional[str]:
+    def get_next_wallpaper_weekday_mode(self, now: Optional[datetime] = None) -> Optional[str]:
         """
         Obtiene el fondo correcto para el día con rotación intra-día.
         Si no hay playlist para el día, usa el fondo único legacy.
-        """
-        weekday = str(datetime.now().weekday())
-        playlists = self.config_manager.get("weekday_playlists", {})
-        day_conf = playlists.get(weekday, {"use_folder": False, "folder": None, "wallpapers": []})
         
-        if day_conf.get("use_folder", False):
-            items = self.get_images_from_folder(day_conf.get("folder"))
-        else:
-            items = day_conf.get("wallpapers", [])
+        Args:
+            now: Momento para el que se resuelve el fondo. Si es None, la hora actual
+        """
+        if now is None:
+            now = datetime.now()
+        weekday = str(now.weekday())
+        items = self.get_weekday_items(weekday)
         
         if not items:
             # Fallback legacy
@@ -353,7 +620,6 @@ class WallpaperEngine:
         rotation = self.config_manager.get("weekday_rotation_minutes", 30)
         rotation = rotation if isinstance(rotation, int) and rotation > 0 else 30
         
-        now = datetime.now()
         midnight = datetime.combine(now.date(), datetime.min.time())
         elapsed_minutes = int((now - midnight).total_seconds() // 60)
         slice_index = (elapsed_minutes // rotation) % len(items)
@@ -0,0 +1,390 @@
+"""
+Módulo de la lista de fondos virtualizada
+Solo se crean los widgets de las filas visibles y se reutilizan al desplazarse
+"""
+
+import math
+import os
+import tkinter as tk
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import customtkinter as ctk
+from PIL import Image
+
+from .path_status import PathStatus, PathStatusChecker
+from .thumbnail_cache import ThumbnailCache
+
+
+# Tipos de fila
+ROW_HEADER = "header"
+ROW_ITEM = "item"
+
+Row = Tuple[str, str]
+
+
+class WallpaperListModel:
+    """Lista de fondos agrupada (videos primero, luego imágenes) con filas de encabezado"""
+
+    def __init__(self, is_video: Callable[[str], bool]):
+        """
+        Args:
+            is_video: Función que indica si una ruta es un video
+        """
+        self.is_video = is_video
+        self.videos: List[str] = []
+        self.images: List[str] = []
+        self._paths = set()
+
+    def set_items(self, paths: Iterable[str]) -> None:
+        """Reemplaza el contenido completo"""
+        self.videos = []
+        self.images = []
+        self._paths = set()
+        self.add(paths)
+
+    def add(self, paths: Iterable[str]) -> List[str]:
+        """
+        Agrega rutas al final de su sección
+
+        Returns:
+            Rutas que no estaban en el modelo
+        """
+        added = []
+        for path in paths:
+            if path in self._paths:
+                continue
+            self._paths.add(path)
+            (self.videos if self.is_video(path) else self.images).append(path)
+            added.append(path)
+        return added
+
+    def remove(self, paths: Iterable[str]) -> List[str]:
+        """
+        Quita rutas del modelo
+
+        Returns:
+            Rutas que estaban en el modelo
+        """
+        removed = [path for path in paths if path in self._paths]
+        if removed:
+            gone = set(removed)
+            self._paths -= gone
+            self.videos = [p for p in self.videos if p not in gone]
+            self.images = [p for p in self.images if p not in gone]
+        return removed
+
+    def __contains__(self, path: str) -> bool:
+        return path in self._paths
+
+    def _sections(self) -> List[Tuple[str, List[str]]]:
+        return [(kind, items) for kind, items in (("video", self.videos), ("image", self.images)) if items]
+
+    def __len__(self) -> int:
+        """Número de filas (encabezados incluidos)"""
+        return sum(len(items) + 1 for _kind, items in self._sections())
+
+    def row(self, index: int) -> Optional[Row]:
+        """
+        Obtiene la fila en la posición indicada en O(1)
+
+        Returns:
+            (ROW_HEADER, "video"|"image") o (ROW_ITEM, ruta); None si está fuera de rango
+        """
+        if index < 0:
+            return None
+        for kind, items in self._sections():
+            if index == 0:
+                return ROW_HEADER, kind
+            if index <= len(items):
+                return ROW_ITEM, items[index - 1]
+            index -= len(items) + 1
+        return None
+
+    def counts(self) -> Tuple[int, int, int]:
+        """(total, imágenes, videos)"""
+        return len(self._paths), len(self.images), len(self.videos)
+
+
+class ThumbnailImages:
+    """CTkImage en memoria para las miniaturas que se están mostrando (LRU pequeño)"""
+
+    def __init__(self, size: Tuple[int, int], capacity: int = 256):
+        """
+        Args:
+            size: Tamaño (ancho, alto) de las miniaturas
+            capacity: Máximo de imágenes cargadas a la vez
+        """
+        self.size = size
+        self.capacity = capacity
+        blank = Image.new("RGB", size, ThumbnailCache.BACKGROUND)
+        self.placeholder = ctk.CTkImage(light_image=blank, dark_image=blank, size=size)
+        self._images: "OrderedDict[str, ctk.CTkImage]" = OrderedDict()
+
+    def get(self, thumb_file: Optional[str]) -> ctk.CTkImage:
+        """Devuelve la imagen de una miniatura (o el marcador si aún no existe)"""
+        if not thumb_file:
+            return self.placeholder
+        image = self._images.get(thumb_file)
+        if image is not None:
+            self._images.move_to_end(thumb_file)
+            return image
+        try:
+            with Image.open(thumb_file) as pil_image:
+                pil_image.load()
+                loaded = pil_image.copy()
+        except OSError:
+            return self.placeholder
+        image = ctk.CTkImage(light_image=loaded, dark_image=loaded, size=self.size)
+        self._images[thumb_file] = image
+        if len(self._images) > self.capacity:
+            self._images.popitem(last=False)
+        return image
+
+
+class VirtualWallpaperList(ctk.CTkFrame):
+    """Vista de la lista que materializa solo las filas visibles"""
+
+    ROW_HEIGHT = 30
+    HEADERS = {
+        "video": ("🎬 VIDEOS:", "#4CAF50"),
+        "image": ("🖼️ IMÁGENES:", "#2196F3"),
+    }
+    ICONS = {"video": "🎬", "image": "🖼️"}
+    EMPTY_TEXT = ("📋 Lista vacía\n\n💡 Usa los botones de arriba para agregar archivos:\n"
+                  "• 📁 Zona de Archivos\n• 📂 Seleccionar Carpeta\n• ➕ Agregar Imagen/Video")
+
+    def __init__(self, master, model: WallpaperListModel, on_remove: Callable[[str], None],
+                 height: int = 300, status_checker: Optional[PathStatusChecker] = None,
+                 thumbnails: Optional[ThumbnailCache] = None, **kwargs):
+        """
+        Args:
+            master: Widget padre
+            model: Modelo con las filas a mostrar
+            on_remove: Función llamada con la ruta al pulsar el botón de eliminar
+            height: Alto visible de la lista en píxeles
+            status_checker: Comprobador asíncrono de rutas. Si es None, la
+                existencia se comprueba en el hilo de la interfaz
+            thumbnails: Caché de miniaturas. Si es None, no se muestran miniaturas
+        """
+        super().__init__(master, **kwargs)
+        self.model = model
+        self.on_remove = on_remove
+        self.status_checker = status_checker
+        self.thumbnails = thumbnails
+        self.thumbnail_images = ThumbnailImages(thumbnails.size) if thumbnails else None
+        self.offset = 0.0
+        self.rows: List[dict] = []
+        self.renders = 0
+        self.item_font = ctk.CTkFont(size=11)
+        self.header_font = ctk.CTkFont(size=14, weight="bold")
+
+        self.summary_label = ctk.CTkLabel(self, text="", font=ctk.CTkFont(size=12, weight="bold"))
+        self.summary_label.pack(pady=(5, 5))
+
+        container = ctk.CTkFrame(self, fg_color="transparent")
+        container.pack(fill='both', expand=True, padx=5, pady=(0, 5))
+
+        self.scrollbar = ctk.CTkScrollbar(container, command=self.yview)
+        self.scrollbar.pack(side='right', fill='y')
+
+        self.body = ctk.CTkFrame(container, height=height, fg_color="transparent")
+        self.body.pack(side='left', fill='both', expand=True)
+        self.body.pack_propagate(False)
+
+        self.empty_label = ctk.CTkLabel(self.body, text=self.EMPTY_TEXT,
+                                        font=ctk.CTkFont(size=12), justify="center")
+
+        self.body.bind("<Configure>", self._on_configure)
+        self._bind_wheel(self.body)
+
+    # --- Desplazamiento ---
+
+    def _bind_wheel(self, widget) -> None:
+        """Asocia la rueda del ratón (Windows/macOS y X11)"""
+        widget.bind("<MouseWheel>", self._on_wheel)
+        widget.bind("<Button-4>", lambda e: self._scroll_pixels(-3 * self.ROW_HEIGHT))
+        widget.bind("<Button-5>", lambda e: self._scroll_pixels(3 * self.ROW_HEIGHT))
+
+    def _on_wheel(self, event):
+        steps = -event.delta / 120 if abs(event.delta) >= 120 else -event.delta
+        self._scroll_pixels(steps * 3 * self.ROW_HEIGHT)
+        return "break"
+
+    def _viewport_height(self) -> int:
+        return max(1, self.body.winfo_height())
+
+    def _content_height(self) -> int:
+        return len(self.model) * self.ROW_HEIGHT
+
+    def _max_offset(self) -> float:
+        return max(0.0, self._content_height() - self._viewport_height())
+
+    def _scroll_pixels(self, delta: float) -> str:
+        self._set_offset(self.offset + delta)
+        return "break"
+
+    def _set_offset(self, offset: float) -> None:
+        offset = min(max(0.0, offset), self._max_offset())
+        if offset != self.offset:
+            self.offset = offset
+            self._render()
+
+    def yview(self, *args) -> None:
+        """Protocolo de desplazamiento de Tk para la barra de scroll"""
+        if not args:
+            return
+        if args[0] == "moveto":
+            self._set_offset(float(args[1]) * self._content_height())
+        elif args[0] == "scroll":
+            amount = int(args[1])
+            step = self._viewport_height() if args[2] == "pages" else self.ROW_HEIGHT
+            self._scroll_pixels(amount * step)
+
+    # --- Filas reutilizables ---
+
+    def _on_configure(self, _event=None) -> None:
+        """Ajusta el tamaño del pool de filas al alto visible"""
+        needed = math.ceil(self._viewport_height() / self.ROW_HEIGHT) + 1
+        while len(self.rows) < needed:
+            self.rows.append(self._create_row())
+        self._set_offset(self.offset)
+        self._render()
+
+    def _create_row(self) -> dict:
+        """Crea una fila del pool (se reutiliza para cualquier elemento)"""
+        frame = ctk.CTkFrame(self.body, fg_color="transparent", height=self.ROW_HEIGHT)
+        frame.pack_propagate(False)
+        label = ctk.CTkLabel(frame, text="", anchor="w", font=self.item_font)
+        label.pack(side='left', fill='x', expand=True, padx=(5, 0))
+        thumb = None
+        if self.thumbnail_images is not None:
+            thumb = ctk.CTkLabel(frame, text="", width=self.thumbnails.size[0],
+                                 image=self.thumbnail_images.placeholder)
+        button = ctk.CTkButton(frame, text="🗑️", width=30, height=25, font=ctk.CTkFont(size=12),
+                               fg_color="#d32f2f", hover_color="#f44336")
+        row = {"frame": frame, "label": label, "thumb": thumb, "button": button,
+               "content": None, "button_visible": False}
+        button.configure(command=lambda r=row: self._on_row_remove(r))
+        for widget in (frame, label, thumb):
+            if widget is not None:
+                self._bind_wheel(widget)
+        return row
+
+    def _on_row_remove(self, row: dict) -> None:
+        content = row["content"]
+        if content and content[0][0] == ROW_ITEM:
+            self.on_remove(content[0][1])
+
+    def _row_status(self, row: Row) -> Optional[PathStatus]:
+        """Estado de la ruta de una fila; None mientras se está comprobando"""
+        if row[0] != ROW_ITEM:
+            return None
+        if self.status_checker is None:
+            return PathStatus(os.path.exists(row[1]), 0, 0.0)
+        return self.status_checker.get(row[1])
+
+    def row_content(self, row: Row, status: Optional[PathStatus]) -> Tuple[str, str, bool]:
+        """Texto, color y si la fila es encabezado"""
+        kind, value = row
+        if kind == ROW_HEADER:
+            text, color = self.HEADERS[value]
+            return text, color, True
+        icon = self.ICONS["video" if self.model.is_video(value) else "image"]
+        if status is None:
+            return f"⏳ {icon} {os.path.basename(value)}", "gray", False
+        text = f"{'✅' if status.exists else '❌'} {icon} {os.path.basename(value)}"
+        return text, "white" if status.exists else "gray", False
+
+    def _fill_row(self, widget_row: dict, row: Row, status: Optional[PathStatus],
+                  thumb_file: Optional[str]) -> None:
+        """Actualiza los widgets de una fila solo si cambió su contenido"""
+        content = (row, status, thumb_file)
+        if widget_row["content"] == content:
+            return
+        text, color, is_header = self.row_content(row, status)
+        widget_row["label"].configure(text=text, text_color=color,
+                                      font=self.header_font if is_header else self.item_font)
+        thumb = widget_row["thumb"]
+        if is_header == widget_row["button_visible"]:
+            if is_header:
+                widget_row["button"].pack_forget()
+                if thumb is not None:
+                    thumb.pack_forget()
+            else:
+                widget_row["button"].pack(side='right', padx=(5, 0))
+                if thumb is not None:
+                    thumb.pack(side='left', padx=(5, 0), before=widget_row["label"])
+            widget_row["button_visible"] = not is_header
+        if thumb is not None and not is_header:
+            thumb.configure(image=self.thumbnail_images.get(thumb_file))
+        widget_row["content"] = content
+        self.renders += 1
+
+    def _render(self) -> None:
+        """Coloca las filas del pool sobre los elementos visibles"""
+        total_rows = len(self.model)
+        if total_rows == 0:
+            for widget_row in self.rows:
+                widget_row["frame"].place_forget()
+            self.empty_label.place(relx=0.5, rely=0.5, anchor="center")
+            self.scrollbar.set(0.0, 1.0)
+            return
+        self.empty_label.place_forget()
+
+        first = int(self.offset // self.ROW_HEIGHT)
+        unchecked = []
+        without_thumbnail = []
+        for k, widget_row in enumerate(self.rows):
+            index = first + k
+            row = self.model.row(index)
+            if row is None:
+                widget_row["frame"].place_forget()
+                continue
+            status = self._row_status(row)
+            thumb_file = None
+            if row[0] == ROW_ITEM:
+                if status is None:
+                    unchecked.append(row[1])
+                elif status.exists and self.thumbnails is not None:
+                    thumb_file = self.thumbnails.get(row[1])
+                    if thumb_file is None:
+                        without_thumbnail.append(row[1])
+            self._fill_row(widget_row, row, status, thumb_file)
+            # CustomTkinter no admite height en place(): el alto viene del constructor
+            widget_row["frame"].place(x=0, y=index * self.ROW_HEIGHT - self.offset, relwidth=1.0)
+
+        if unchecked:
+            self.status_checker.request(unchecked, self._on_results)
+        if without_thumbnail:
+            self.thumbnails.request(without_thumbnail, self._on_results)
+
+        content = self._content_height()
+        self.scrollbar.set(self.offset / content,
+                           min(1.0, (self.offset + self._viewport_height()) / content))
+
+    def _on_results(self, results: Dict[str, object]) -> None:
+        """Recibe (en el hilo de la interfaz) estados o miniaturas de un lote de rutas"""
+        try:
+            visible = any(widget_row["content"] and widget_row["content"][0][1] in results
+                          for widget_row in self.rows)
+            if visible:
+                self._render()
+        except tk.TclError:
+            # La vista fue destruida
+            pass
+
+    # --- API pública ---
+
+    def refresh(self) -> None:
+        """Vuelve a dibujar las filas visibles tras un cambio en el modelo (solo esas filas)"""
+        total, images, videos = self.model.counts()
+        if total:
+            self.summary_label.configure(
+                text=f"📊 Total: {total} archivo(s) - 🖼️ {images} imágenes, 🎬 {videos} videos")
+        else:
+            self.summary_label.configure(text="")
+        for widget_row in self.rows:
+            widget_row["content"] = None
+        self.offset = min(self.offset, self._max_offset())
+        self._render()
@@ -0,0 +1,104 @@
+"""
+Prueba del camino rápido --add-wallpaper (presupuesto de arranque)
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+# Agregar módulos al path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'modules'))
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# Tiempo máximo del proceso completo (intérprete incluido)
+STARTUP_BUDGET_SECONDS = 1.5
+
+HEAVY_MODULES = ("customtkinter", "modules.gui", "modules.video_wallpaper", "PIL", "cv2",
+                 "numpy", "pystray", "darkdetect", "tkinterdnd2")
+
+
+def _run(args, home):
+    env = dict(os.environ, HOME=home, USERPROFILE=home)
+    env.pop("PYTHONPATH", None)
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable] + args, cwd=ROOT, env=env,
+                            capture_output=True, text=True, timeout=30)
+    return result, time.perf_counter() - start
+
+
+def test_add_wallpaper_fast_path():
+    """main.py --add-wallpaper agrega sin cargar la interfaz y dentro del presupuesto"""
+    print("⚡ PRUEBA DE ARRANQUE RÁPIDO")
+    print("=" * 40)
+
+    home = tempfile.mkdtemp()
+    image = os.path.join(home, "a.jpg")
+    with open(image, "wb") as f:
+        f.write(b"\xff\xd8\xff\xd9")
+
+    result, elapsed = _run(["main.py", "--add-wallpaper", image, "--quiet"], home)
+    assert result.returncode == 0, result.stdout + result.stderr
+    with open(os.path.join(home, "wallpaper_changer_config.json"), encoding="utf-8") as f:
+        assert json.load(f)["wallpapers"] == [image]
+
+    # Repetido: no se agrega y el código de salida lo indica
+    result, _ = _run(["main.py", "--add-wallpaper", image, "--quiet"], home)
+    assert result.returncode == 1 and "Ya Existe" in result.stdout
+
+    print(f"⏱️ {elapsed * 1000:.0f} ms (presupuesto {STARTUP_BUDGET_SECONDS * 1000:.0f} ms)")
+    assert elapsed < STARTUP_BUDGET_SECONDS
+
+
+def test_fast_path_import_graph():
+    """El paquete y la CLI no arrastran la interfaz ni las dependencias pesadas"""
+    print("\n📦 PRUEBA DEL GRAFO DE IMPORTACIÓN")
+    print("=" * 40)
+
+    code = ("import sys; import modules; from modules import cli; "
+            "print(','.join(sorted(sys.modules)))")
+    result, elapsed = _run(["-c", code], tempfile.mkdtemp())
+    assert result.returncode == 0, result.stderr
+    loaded = set(result.stdout.strip().split(","))
+    heavy = [name for name in HEAVY_MODULES if name in loaded]
+    assert not heavy, f"Importados en el camino rápido: {heavy}"
+    print(f"✅ {len(loaded)} módulos cargados en {elapsed * 1000:.0f} ms")
+
+
+def test_add_wallpapers_batch():
+    """Varios archivos se agregan con una sola escritura y se clasifican los rechazos"""
+    print("\n📋 PRUEBA DE LOTE")
+    print("=" * 40)
+
+    from pathlib import Path
+
+    from modules.cli import add_wallpapers, describe
+    from modules.config_manager import ConfigManager
+
+    folder = tempfile.mkdtemp()
+    files = []
+    for name in ("a.jpg", "b.mp4", "c.txt"):
+        path = os.path.join(folder, name)
+        open(path, "wb").close()
+        files.append(path)
+
+    config = ConfigManager(Path(folder) / "config.json", write_behind=False)
+    writes = config.writes
+    result = add_wallpapers(files + [files[0], os.path.join(folder, "missing.png")], config)
+    assert result.added == files[:2]
+    assert result.unsupported == [files[2]]
+    assert len(result.missing) == 1 and result.total == 2
+    assert config.writes - writes == 1
+    title, message = describe(result)
+    assert title == "Agregado Exitosamente" and "2 archivos" in message
+    print(f"✅ {message.splitlines()[0]}")
+
+
+if __name__ == "__main__":
+    test_add_wallpaper_fast_path()
+    test_fast_path_import_graph()
+    test_add_wallpapers_batch()
+    print(f"\n✅ Todas las pruebas pasaron")
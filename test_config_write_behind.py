@@ -0,0 +1,71 @@
+"""
+Prueba de la escritura diferida (write-behind) y atómica de la configuración
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Agregar módulos al path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'modules'))
+
+
+def test_saves_are_coalesced():
+    """Dos guardados seguidos producen una sola escritura"""
+    print("💾 PRUEBA DE ESCRITURAS AGRUPADAS")
+    print("=" * 40)
+
+    from modules.config_manager import ConfigManager
+
+    config_file = Path(tempfile.mkdtemp()) / "config.json"
+    config = ConfigManager(config_file)
+
+    config.set("interval_minutes", 3)
+    config.save_config()
+    config.set("mode", "weekday")
+    config.save_config()
+    assert config.writes == 0
+
+    time.sleep(ConfigManager.WRITE_DELAY_SECONDS + 0.5)
+    print(f"  Escrituras: {config.writes}")
+    assert config.writes == 1
+
+    with open(config_file, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    assert data["interval_minutes"] == 3
+    assert data["mode"] == "weekday"
+
+
+def test_flush_is_atomic():
+    """flush() escribe de inmediato y no deja archivos temporales"""
+    print("⚡ PRUEBA DE FLUSH ATÓMICO")
+    print("=" * 40)
+
+    from modules.config_manager import ConfigManager
+
+    folder = Path(tempfile.mkdtemp())
+    config_file = folder / "config.json"
+    config = ConfigManager(config_file)
+
+    config.set("interval_minutes", 5)
+    config.save_config()
+    assert config.flush()
+    assert config.writes == 1
+    assert not [name for name in os.listdir(folder) if name.endswith(".tmp")]
+
+    # Sin cambios pendientes no se vuelve a escribir
+    config.flush()
+    assert config.writes == 1
+
+    reloaded = ConfigManager(config_file)
+    assert reloaded.get("interval_minutes") == 5
+    print("  ✅ Configuración persistida")
+
+
+if __name__ == "__main__":
+    test_saves_are_coalesced()
+    test_flush_is_atomic()
+    print(f"\n✅ Todas las pruebas pasaron")
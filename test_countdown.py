@@ -0,0 +1,77 @@
+"""
+Prueba del publicador del contador regresivo (sin GUI)
+"""
+
+import os
+import sys
+import time
+
+# Agregar módulos al path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'modules'))
+
+
+def test_tick_interval_adapts():
+    """1 Hz en el último minuto, una vez por minuto en otro caso"""
+    print("⏱️ PRUEBA DE FRECUENCIA ADAPTATIVA")
+    print("=" * 40)
+
+    from modules.countdown import CountdownPublisher
+
+    seconds = [CountdownPublisher.GRANULARITY_SECONDS]
+    minutes = [CountdownPublisher.GRANULARITY_MINUTES]
+
+    assert CountdownPublisher.next_interval(45, seconds) == 1
+    assert CountdownPublisher.next_interval(45, minutes) == 45
+    assert CountdownPublisher.next_interval(125, seconds) == 5
+    assert CountdownPublisher.next_interval(120, seconds) == 60
+    assert CountdownPublisher.next_interval(60, seconds) == 1
+    assert CountdownPublisher.next_interval(61, seconds) == 1
+    assert CountdownPublisher.next_interval(60, minutes) == 60
+    print("  ✅ Intervalos correctos")
+
+
+def test_hidden_consumer_does_not_tick():
+    """Un consumidor oculto no recibe ticks hasta que vuelve a ser visible"""
+    print("🙈 PRUEBA DE CONSUMIDOR OCULTO")
+    print("=" * 40)
+
+    from modules.countdown import CountdownPublisher
+
+    received = []
+    visible = {"value": False}
+    publisher = CountdownPublisher(lambda: 30)
+    publisher.subscribe(lambda m, s: received.append((m, s)),
+                        is_active=lambda: visible["value"])
+    publisher.start()
+    try:
+        time.sleep(0.3)
+        assert received == []
+        assert publisher.ticks == 0
+
+        visible["value"] = True
+        publisher.refresh()
+        time.sleep(0.3)
+        print(f"  Ticks recibidos: {received}")
+        assert received and received[0] == (0, 30)
+    finally:
+        publisher.stop()
+
+
+def test_format_remaining():
+    """Por encima de un minuto no se muestran segundos (se publican una vez por minuto)"""
+    print("\n🔤 PRUEBA DEL TEXTO DEL CONTADOR")
+    print("=" * 40)
+
+    from modules.countdown import format_remaining
+
+    assert format_remaining(5, 23) == "5m"
+    assert format_remaining(1, 0) == "1m"
+    assert format_remaining(0, 42) == "42s"
+    print("✅ Minutos hasta el último minuto, luego segundos")
+
+
+if __name__ == "__main__":
+    test_tick_interval_adapts()
+    test_hidden_consumer_does_not_tick()
+    test_format_remaining()
+    print(f"\n✅ Todas las pruebas pasaron")
@@ -0,0 +1,177 @@
+"""
+Prueba del modo --daemon (motor sin Tk controlado por el canal de instancia única)
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+# Agregar módulos al path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'modules'))
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+GUI_MODULES = ("tkinter", "customtkinter", "modules.gui", "tkinterdnd2", "pystray")
+
+
+def _write_image(path):
+    from PIL import Image
+    Image.new("RGB", (64, 48), (10, 120, 200)).save(path, "JPEG")
+
+
+def test_daemon_import_graph():
+    """El daemon no carga Tk, CustomTkinter ni la bandeja"""
+    print("📦 PRUEBA DEL GRAFO DE IMPORTACIÓN DEL DAEMON")
+    print("=" * 40)
+
+    env = dict(os.environ, HOME=tempfile.mkdtemp())
+    env.pop("PYTHONPATH", None)
+    code = "import sys; import modules.daemon; print(','.join(sorted(sys.modules)))"
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env,
+                            capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
+    loaded = set(result.stdout.strip().split(","))
+    gui = [name for name in GUI_MODULES if name in loaded]
+    assert not gui, f"Importados en modo daemon: {gui}"
+    print(f"✅ {len(loaded)} módulos cargados, ninguno de interfaz")
+
+
+def test_daemon_commands():
+    """change_now, reload, status, add, show y quit llegan por el canal"""
+    print("\n🛰️ PRUEBA DE ÓRDENES DEL DAEMON")
+    print("=" * 40)
+
+    if sys.platform == "win32":
+        print("⚠️ Prueba con socket Unix, omitida en Windows")
+        return
+    try:
+        import PIL  # noqa: F401
+    except ImportError:
+        print("⚠️ PIL no disponible, prueba omitida")
+        return
+
+    from pathlib import Path
+
+    from modules.config_manager import ConfigManager
+    from modules.daemon import EngineDaemon
+    from modules.instance_server import (CMD_ADD, CMD_CHANGE_NOW, CMD_QUIT, CMD_RELOAD,
+                                         CMD_SHOW, CMD_STATUS, send_command)
+
+    folder = tempfile.mkdtemp()
+    images = [os.path.join(folder, f"{name}.jpg") for name in ("a", "b", "c")]
+    for image in images:
+        _write_image(image)
+
+    config_file = Path(folder) / "config.json"
+    config = ConfigManager(config_file)
+    config.set("desktop_backend", "recording")
+    config.set("wallpapers", images[:2])
+    config.set("interval_minutes", 30)
+    config.save_config()
+    config.flush()
+
+    address = os.path.join(folder, "daemon.sock")
+    daemon = EngineDaemon(config, address=address, authkey=b"prueba")
+    daemon.instance_server.coalesce_seconds = 0.05
+    exit_codes = []
+    thread = threading.Thread(target=lambda: exit_codes.append(daemon.run()))
+    thread.start()
+
+    def send(command, payload=None):
+        return send_command(command, payload, address=address, authkey=b"prueba", timeout=10)
+
+    try:
+        deadline = time.monotonic() + 5
+        while send(CMD_STATUS) is None and time.monotonic() < deadline:
+            time.sleep(0.05)
+        status = send(CMD_STATUS)
+        assert status["mode"] == "time" and status["wallpapers"] == 2
+
+        assert send(CMD_CHANGE_NOW) is True
+        desktop = daemon.wallpaper_engine.video_engine.desktop
+        assert desktop.current in [os.path.abspath(image) for image in images[:2]]
+
+        # Configuración editada por fuera del daemon
+        with open(config_file, encoding="utf-8") as f:
+            data = json.load(f)
+        data["interval_minutes"] = 5
+        with open(config_file, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        assert send(CMD_RELOAD) is True
+        assert config.get("interval_minutes") == 5
+        assert send(CMD_STATUS)["seconds_to_next_change"] <= 5 * 60
+
+        assert send(CMD_ADD, [images[2]]) == 1
+        deadline = time.monotonic() + 3
+        while config.count_wallpapers() < 3 and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert config.count_wallpapers() == 3
+
+        # Un arranque normal de la GUI no abre una segunda instancia
+        assert send(CMD_SHOW) is False
+        assert send(CMD_QUIT) is True
+        thread.join(5)
+    finally:
+        if thread.is_alive():
+            daemon.quit()
+            thread.join(5)
+
+    assert not thread.is_alive() and exit_codes == [0]
+    assert not os.path.exists(address)
+    print("✅ Órdenes atendidas y daemon detenido")
+
+
+def test_main_daemon_and_control():
+    """main.py --daemon se controla con main.py --control desde otro proceso"""
+    print("\n🖥️ PRUEBA DE main.py --daemon")
+    print("=" * 40)
+
+    if sys.platform == "win32":
+        print("⚠️ Prueba con socket Unix, omitida en Windows")
+        return
+
+    home = tempfile.mkdtemp()
+    with open(os.path.join(home, "wallpaper_changer_config.json"), "w", encoding="utf-8") as f:
+        json.dump({"desktop_backend": "recording"}, f)
+    env = dict(os.environ, HOME=home, USERPROFILE=home)
+    env.pop("PYTHONPATH", None)
+
+    def control(command):
+        return subprocess.run([sys.executable, "main.py", "--control", command], cwd=ROOT,
+                              env=env, capture_output=True, text=True, timeout=60)
+
+    daemon = subprocess.Popen([sys.executable, "main.py", "--daemon"], cwd=ROOT, env=env,
+                              stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+    try:
+        deadline = time.monotonic() + 20
+        result = control("status")
+        while result.returncode != 0 and time.monotonic() < deadline:
+            time.sleep(0.2)
+            result = control("status")
+        assert result.returncode == 0, result.stdout + result.stderr
+        assert json.loads(result.stdout)["wallpapers"] == 0
+
+        # Una segunda instancia no arranca
+        second = subprocess.run([sys.executable, "main.py", "--daemon"], cwd=ROOT, env=env,
+                                capture_output=True, text=True, timeout=60)
+        assert second.returncode == 1
+
+        assert control("quit").returncode == 0
+        assert daemon.wait(10) == 0
+    finally:
+        if daemon.poll() is None:
+            daemon.kill()
+            daemon.wait()
+    assert control("status").returncode == 1
+    print("✅ Daemon controlado desde la línea de comandos")
+
+
+if __name__ == "__main__":
+    test_daemon_import_graph()
+    test_daemon_commands()
+    test_main_daemon_and_control()
+    print(f"\n✅ Todas las pruebas pasaron")
@@ -0,0 +1,156 @@
+"""
+Prueba de los backends de escritorio y sus métricas (sin escritorio)
+"""
+
+import os
+import sys
+
+# Agregar módulos al path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'modules'))
+
+
+def test_recording_backend_and_latency():
+    """El backend en memoria registra los cambios y su latencia"""
+    print("🖥️ PRUEBA DEL BACKEND DE REGISTRO")
+    print("=" * 40)
+
+    from modules.desktop_backend import RecordingBackend
+
+    backend = RecordingBackend(delay=0.002)
+    assert backend.latency_stats()["count"] == 0
+    for name in ("a.jpg", "b.jpg", "c.jpg"):
+        assert backend.apply(name)
+    assert backend.clear()
+    assert backend.calls[-2] == ("apply", "c.jpg")
+    assert backend.current == ""
+
+    stats = backend.latency_stats()
+    assert stats["count"] == 4 and stats["failures"] == 0
+    assert stats["p95_ms"] >= stats["p50_ms"] >= 0
+    assert stats["max_ms"] >= 2.0
+
+    failing = RecordingBackend(fail=True)
+    assert not failing.apply("a.jpg")
+    assert failing.latency_stats()["failures"] == 1
+    print(f"✅ p50 {stats['p50_ms']:.1f} ms, p95 {stats['p95_ms']:.1f} ms")
+
+
+def test_percentiles():
+    """Percentiles por rango más cercano"""
+    print("\n📊 PRUEBA DE PERCENTILES")
+    print("=" * 40)
+
+    from modules.desktop_backend import DesktopBackend
+
+    backend = DesktopBackend()
+    backend.latencies.extend(i / 1000 for i in range(1, 101))
+    stats = backend.latency_stats()
+    assert round(stats["p50_ms"]) == 50
+    assert round(stats["p95_ms"]) == 95
+    assert round(stats["max_ms"]) == 100
+    print("✅ Percentiles correctos")
+
+
+def test_backend_errors_are_contained():
+    """Una excepción del backend cuenta como fallo y no se propaga"""
+    print("\n🧯 PRUEBA DE ERRORES")
+    print("=" * 40)
+
+    from modules.desktop_backend import DesktopBackend, create_backend
+
+    class Broken(DesktopBackend):
+        def _apply(self, image_path):
+            raise OSError("sin escritorio")
+
+    backend = Broken()
+    assert not backend.apply("a.jpg")
+    assert backend.failures == 1 and len(backend.latencies) == 1
+
+    assert create_backend("recording").name == "recording"
+    assert create_backend("feh").name == "feh"
+    print("✅ Errores contenidos")
+
+
+
+def test_gnome_backend_commands():
+    """gsettings recibe una URI escapada y el ajuste vuelve tras clear()"""
+    print("\n🐾 PRUEBA DEL BACKEND GNOME")
+    print("=" * 40)
+
+    from modules.desktop_backend import GnomeBackend
+
+    class FakeGnome(GnomeBackend):
+        def __init__(self):
+            super().__init__()
+            self.commands = []
+
+        def _run(self, command):
+            self.commands.append(command[3:])
+            return True
+
+        def _run_optional(self, command):
+            self.commands.append(command[3:])
+
+    backend = FakeGnome()
+    assert backend.clear()
+    assert backend.commands[-1] == ["picture-options", "none"]
+    assert backend.apply("/fotos/mis vacaciones #1/ñandú.jpg")
+    uri = "file:///fotos/mis%20vacaciones%20%231/%C3%B1and%C3%BA.jpg"
+    assert ["picture-uri", uri] in backend.commands
+    assert ["picture-options", "zoom"] in backend.commands
+    print("✅ URI escapada y picture-options restaurado")
+
+
+def test_swaybg_replaces_running_process():
+    """El swaybg anterior se cierra solo cuando el nuevo sigue en marcha"""
+    print("\n🌊 PRUEBA DEL BACKEND SWAYBG")
+    print("=" * 40)
+
+    if sys.platform == "win32":
+        print("⚠️ Prueba con scripts de shell, omitida en Windows")
+        return
+
+    import tempfile
+
+    from modules.desktop_backend import SwaybgBackend
+
+    bin_dir = tempfile.mkdtemp()
+    scripts = {
+        # Falla enseguida con "-i /no/existe", si no se queda pintando
+        "swaybg": '#!/bin/sh\ncase "$*" in *no/existe*) exit 1;; esac\nexec sleep 30\n',
+        "swaymsg": ('#!/bin/sh\necho \'[{"active": false, "current_mode": {}}, '
+                    '{"active": true, "current_mode": {"width": 2560, "height": 1440}}]\'\n'),
+    }
+    for name, content in scripts.items():
+        path = os.path.join(bin_dir, name)
+        with open(path, "w") as f:
+            f.write(content)
+        os.chmod(path, 0o755)
+
+    old_path = os.environ["PATH"]
+    os.environ["PATH"] = bin_dir + os.pathsep + old_path
+    backend = SwaybgBackend()
+    try:
+        assert backend.screen_size() == (2560, 1440)
+        assert backend.apply("/fotos/a.jpg")
+        first = backend.process
+        assert not backend.apply("/no/existe.jpg")
+        assert backend.process is first and first.poll() is None, \
+            "Un swaybg que falla no debe quitar el fondo actual"
+        assert backend.apply("/fotos/b.jpg")
+        assert first.wait(5) is not None and backend.process.poll() is None
+    finally:
+        os.environ["PATH"] = old_path
+        if backend.process is not None:
+            backend.process.terminate()
+            backend.process.wait()
+    print("✅ Reemplazo sin fotograma vacío y tamaño desde swaymsg")
+
+
+if __name__ == "__main__":
+    test_recording_backend_and_latency()
+    test_percentiles()
+    test_backend_errors_are_contained()
+    test_gnome_backend_commands()
+    test_swaybg_replaces_running_process()
+    print(f"\n✅ Todas las pruebas pasaron")
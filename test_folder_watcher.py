@@ -0,0 +1,141 @@
+"""
+Prueba del vigilante de carpetas con eventos agrupados (debounce)
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Agregar módulos al path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'modules'))
+
+
+def _touch(folder, name):
+    """Crea un archivo vacío"""
+    with open(os.path.join(folder, name), 'wb') as f:
+        f.write(b"x")
+
+
+def _wait_for(condition, timeout=5.0):
+    """Espera hasta que se cumpla la condición"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def _check_backend(backend):
+    """Una ráfaga de altas y un renombrado llegan en una sola entrega"""
+    from modules.folder_watcher import FolderWatcher
+
+    folder = tempfile.mkdtemp()
+    batches = []
+    watcher = FolderWatcher(lambda f, names: batches.append((f, names)),
+                            debounce_seconds=0.2, backend=backend)
+    watcher.set_folders([folder])
+    watcher.start()
+    try:
+        time.sleep(0.3)
+        for i in range(10):
+            _touch(folder, f"{i}.jpg")
+        _touch(folder, "notas.txt")
+        os.rename(os.path.join(folder, "0.jpg"), os.path.join(folder, "cero.png"))
+
+        assert _wait_for(lambda: batches)
+        time.sleep(0.5)
+        print(f"  Entregas: {len(batches)}")
+        assert len(batches) == 1
+        names = batches[0][1]
+        assert "cero.png" in names and "notas.txt" not in names
+    finally:
+        watcher.stop()
+
+
+def test_polling_backend():
+    """Backend de sondeo (Windows y otros sistemas)"""
+    print("🔁 PRUEBA DE VIGILANCIA POR SONDEO")
+    print("=" * 40)
+
+    from modules.folder_watcher import PollingBackend
+    _check_backend(PollingBackend(poll_seconds=0.1))
+
+
+def test_native_backend():
+    """Backend nativo del sistema (inotify en Linux)"""
+    print("👀 PRUEBA DE VIGILANCIA NATIVA")
+    print("=" * 40)
+
+    from modules.folder_watcher import create_watch_backend
+    backend = create_watch_backend(poll_seconds=0.1)
+    print(f"  Backend: {backend.name}")
+    _check_backend(backend)
+
+
+def test_recreated_folder():
+    """Una carpeta borrada y vuelta a crear se sigue vigilando"""
+    print("♻️ PRUEBA DE CARPETA RECREADA")
+    print("=" * 40)
+
+    from modules.folder_watcher import FolderWatcher, create_watch_backend
+
+    backend = create_watch_backend(poll_seconds=0.1)
+    print(f"  Backend: {backend.name}")
+    parent = tempfile.mkdtemp()
+    folder = os.path.join(parent, "fondos")
+    os.mkdir(folder)
+    batches = []
+    watcher = FolderWatcher(lambda f, names: batches.append((f, names)),
+                            debounce_seconds=0.1, poll_seconds=0.1, backend=backend)
+    watcher.set_folders([folder])
+    watcher.start()
+    try:
+        time.sleep(0.3)
+        shutil.rmtree(folder)
+        assert _wait_for(lambda: (folder, None) in batches)
+
+        os.mkdir(folder)
+        # Al recuperarse la carpeta se pide un reescaneo completo
+        assert _wait_for(lambda: batches.count((folder, None)) >= 2)
+        time.sleep(0.3)
+        batches.clear()
+        _touch(folder, "nuevo.jpg")
+        assert _wait_for(lambda: any(names and "nuevo.jpg" in names for _, names in batches))
+    finally:
+        watcher.stop()
+    print("✅ La carpeta recreada vuelve a notificar cambios")
+
+
+def test_library_updates_without_rescan():
+    """Los cambios se aplican al índice sin volver a leer la carpeta"""
+    print("📚 PRUEBA DE ACTUALIZACIÓN INCREMENTAL")
+    print("=" * 40)
+
+    from modules.media_library import MediaLibrary
+
+    folder = tempfile.mkdtemp()
+    _touch(folder, "a.jpg")
+    library = MediaLibrary(Path(tempfile.mkdtemp()) / "index.json")
+    assert library.count(folder) == 1
+
+    _touch(folder, "b.mp4")
+    os.remove(os.path.join(folder, "a.jpg"))
+    added, removed = library.apply_changes(folder, {"a.jpg", "b.mp4"})
+
+    assert [os.path.basename(p) for p in added] == ["b.mp4"]
+    assert [os.path.basename(p) for p in removed] == ["a.jpg"]
+    assert library.count(folder, "video") == 1
+    assert library.count(folder, "image") == 0
+    assert library.scans == 1
+
+
+if __name__ == "__main__":
+    test_polling_backend()
+    test_native_backend()
+    test_recreated_folder()
+    test_library_updates_without_rescan()
+    print(f"\n✅ Todas las pruebas pasaron")
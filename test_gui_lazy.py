@@ -0,0 +1,355 @@
+"""
+Prueba de la construcción diferida de la interfaz (pestañas bajo demanda,
+desmontaje, reconstrucción y lecturas de la lista en segundo plano)
+
+No dibuja widgets: la raíz, las pestañas y el motor se sustituyen por objetos
+mínimos y solo se ejercita la lógica de WallpaperChangerGUI.
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Agregar módulos al path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'modules'))
+
+
+class FakeRoot:
+    """Raíz que guarda las llamadas de after() para ejecutarlas a mano"""
+
+    def __init__(self):
+        self.calls = []
+        self.jobs = 0
+
+    def after(self, delay_ms, func=None, *args):
+        self.jobs += 1
+        self.calls.append((func, args))
+        return f"after#{self.jobs}"
+
+    def after_cancel(self, job):
+        pass
+
+    def state(self):
+        return "withdrawn"
+
+    def run_pending(self, count=0, timeout=5.0):
+        """Espera al menos count llamadas pendientes y las ejecuta"""
+        deadline = time.monotonic() + timeout
+        while len(self.calls) < count and time.monotonic() < deadline:
+            time.sleep(0.01)
+        calls, self.calls = self.calls, []
+        for func, args in calls:
+            func(*args)
+        return len(calls)
+
+
+class FakeWidget:
+    """Widget (o servicio) que solo recuerda lo que se le pidió"""
+
+    def __init__(self):
+        self.options = {}
+        self.destroyed = False
+        self.stopped = False
+
+    def configure(self, **options):
+        self.options.update(options)
+
+    def destroy(self):
+        self.destroyed = True
+
+    def refresh(self):
+        pass
+
+    def shutdown(self):
+        self.stopped = True
+
+    def invalidate(self, paths=None):
+        pass
+
+
+class FakeTabview:
+    """Tabview con la pestaña seleccionada fija"""
+
+    def __init__(self, current):
+        self.current = current
+
+    def get(self):
+        return self.current
+
+    def tab(self, name):
+        return name
+
+
+class FakeLibrary:
+    """Biblioteca de medios que recuerda desde qué hilo se leyó"""
+
+    def __init__(self):
+        self.threads = []
+
+    def get_paths(self, folder_path, kind=None):
+        import threading
+        self.threads.append(threading.current_thread())
+        return [os.path.join(folder_path, f"{i}.jpg") for i in range(10)]
+
+
+class FakeVar:
+    """BooleanVar/Entry mínimos"""
+
+    def __init__(self, value):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+
+class FakeThumbnails(FakeWidget):
+    """Caché de miniaturas vacía que anota las peticiones"""
+
+    def __init__(self):
+        super().__init__()
+        self.requested = []
+
+    def get(self, path):
+        return None
+
+    def request(self, paths, done):
+        self.requested.append(list(paths))
+
+
+class FakeEngine:
+    """Motor con una carpeta de 2 imágenes y 1 video"""
+
+    def __init__(self):
+        self.media_library = FakeLibrary()
+        self.change_threads = []
+
+    def change_wallpaper(self):
+        import threading
+        self.change_threads.append(threading.current_thread())
+        return True
+
+    def get_folder_counts(self, folder_path=None):
+        return 2, 1
+
+    def get_media_from_folder(self, folder_path=None):
+        return ["/fondos/a.jpg", "/fondos/b.jpg", "/fondos/c.mp4"]
+
+
+def _make_gui():
+    """Crea la GUI sin ventana; devuelve None si la interfaz no puede importarse"""
+    try:
+        from modules.gui import WallpaperChangerGUI
+        from modules.config_manager import ConfigManager
+        from modules.wallpaper_list import WallpaperListModel
+    except Exception as e:
+        # La interfaz necesita Windows (winreg) y una sesión gráfica (bandeja)
+        print(f"⚠️ Interfaz no disponible, prueba omitida: {e}")
+        return None, []
+
+    config_file = Path(tempfile.mkdtemp()) / "config.json"
+    with open(config_file, 'w', encoding='utf-8') as f:
+        json.dump({"wallpapers": ["/fondos/uno.jpg"]}, f)
+
+    gui = object.__new__(WallpaperChangerGUI)
+    # Lo que __init__ deja preparado antes de build_ui()
+    gui.root = FakeRoot()
+    gui.config_manager = ConfigManager(config_file, write_behind=False)
+    gui.wallpaper_engine = FakeEngine()
+    gui.thumbnails = FakeThumbnails()
+    gui.ui_built = False
+    gui._ui_attrs = set()
+    gui._teardown_job = None
+    gui.wallpaper_list_generation = 0
+    gui.window_visible = False
+    built = []
+
+    def setup_general_tab(parent):
+        built.append(parent)
+        gui.status_label = FakeWidget()
+
+    def setup_time_tab(parent):
+        built.append(parent)
+        gui.folder_info_label = FakeWidget()
+        gui.wallpaper_list_model = WallpaperListModel(lambda path: path.endswith(".mp4"))
+        gui.wallpaper_list_view = FakeWidget()
+        gui.path_status = FakeWidget()
+        gui.refresh_wallpaper_list()
+
+    def setup_ui():
+        gui.main_frame = FakeWidget()
+        gui.tabview = FakeTabview(gui.TAB_GENERAL)
+        gui.tab_builders = {gui.TAB_GENERAL: setup_general_tab, gui.TAB_TIME: setup_time_tab}
+        gui.built_tabs = set()
+        gui.ensure_tab(gui.tabview.get())
+
+    gui.setup_ui = setup_ui
+    return gui, built
+
+
+def test_lazy_tabs_and_teardown():
+    """Solo se construye la pestaña visible y el desmontaje suelta todo lo creado"""
+    print("🧱 PRUEBA DE PESTAÑAS DIFERIDAS Y DESMONTAJE")
+    print("=" * 40)
+
+    gui, built = _make_gui()
+    if gui is None:
+        return
+
+    gui.build_ui()
+    assert gui.ui_built and built == [gui.TAB_GENERAL]
+    assert gui.is_tab_built(gui.TAB_GENERAL) and not gui.is_tab_built(gui.TAB_TIME)
+    assert {"main_frame", "tabview", "built_tabs", "status_label"} <= gui._ui_attrs
+    assert not {"config_manager", "wallpaper_engine", "wallpaper_list_generation"} & gui._ui_attrs
+
+    # La pestaña de tiempo se construye al seleccionarla, una sola vez
+    gui.ensure_tab(gui.TAB_TIME)
+    gui.ensure_tab(gui.TAB_TIME)
+    assert built == [gui.TAB_GENERAL, gui.TAB_TIME]
+    assert {"wallpaper_list_model", "folder_info_label", "path_status"} <= gui._ui_attrs
+    assert gui.root.run_pending(1) == 1
+    assert gui.wallpaper_list_model.images == ["/fondos/uno.jpg"]
+
+    main_frame, path_status = gui.main_frame, gui.path_status
+    gui.teardown_ui()
+    assert not gui.ui_built and main_frame.destroyed and path_status.stopped
+    assert not hasattr(gui, "tabview") and not hasattr(gui, "wallpaper_list_model")
+    assert not gui.is_tab_built(gui.TAB_TIME)
+    assert gui._ui_attrs == set()
+
+    # Reconstruir vuelve a dejar diferida la pestaña de tiempo
+    gui.build_ui()
+    assert built[-1] == gui.TAB_GENERAL and not gui.is_tab_built(gui.TAB_TIME)
+    gui.ensure_tab(gui.TAB_TIME)
+    gui.root.run_pending(1)
+    assert gui.is_tab_built(gui.TAB_TIME)
+    assert gui.wallpaper_list_model.images == ["/fondos/uno.jpg"]
+    print("✅ Pestañas bajo demanda y desmontaje completo")
+
+
+def test_stale_refresh_is_discarded():
+    """Una lectura de la lista anterior a otra (o al desmontaje) no se muestra"""
+    print("\n🕰️ PRUEBA DE LECTURAS OBSOLETAS DE LA LISTA")
+    print("=" * 40)
+
+    gui, built = _make_gui()
+    if gui is None:
+        return
+
+    gui.build_ui()
+    gui.ensure_tab(gui.TAB_TIME)
+    gui.root.run_pending(1)
+
+    # Dos lecturas seguidas: solo cuenta la última aunque la primera termine después
+    gui.config_manager.set("wallpapers", ["/fondos/viejo.jpg"])
+    gui.refresh_wallpaper_list()
+    gui.config_manager.set("wallpapers", ["/fondos/nuevo.jpg"])
+    gui.refresh_wallpaper_list()
+    gui.root.run_pending(2)
+    assert gui.wallpaper_list_model.images == ["/fondos/nuevo.jpg"]
+
+    # La copia se toma al pedir la lectura, no cuando corre el hilo
+    live = gui.config_manager.get("wallpapers")
+    gui.refresh_wallpaper_list()
+    live.append("/fondos/tarde.jpg")
+    gui.root.run_pending(1)
+    assert gui.wallpaper_list_model.images == ["/fondos/nuevo.jpg"]
+
+    # Una lectura lanzada antes del desmontaje no llega a la interfaz reconstruida
+    gui.refresh_wallpaper_list()
+    stale = gui.wallpaper_list_generation
+    gui.teardown_ui()
+    gui.build_ui()
+    gui.ensure_tab(gui.TAB_TIME)
+    assert gui.wallpaper_list_generation > stale
+    gui.root.run_pending(2)
+    gui.show_wallpaper_list((stale, ["/fondos/obsoleto.jpg"], None))
+    assert gui.wallpaper_list_model.images == ["/fondos/nuevo.jpg", "/fondos/tarde.jpg"]
+    print("✅ Lecturas obsoletas descartadas")
+
+
+def test_day_preview_reads_folder_in_background():
+    """El resumen de un día con carpeta no lee la carpeta en el hilo de Tk"""
+    print("\n📅 PRUEBA DEL RESUMEN DE DÍA CON CARPETA")
+    print("=" * 40)
+
+    gui, built = _make_gui()
+    if gui is None:
+        return
+
+    import threading
+
+    gui.build_ui()
+    # Lo que deja setup_weekday_tab para el lunes
+    gui.built_tabs.add(gui.TAB_WEEKDAY)
+    gui.weekday_selected_images = {"0": []}
+    gui.weekday_summary_labels = {"0": FakeWidget()}
+    gui.weekday_use_folder_vars = {"0": FakeVar(True)}
+    gui.weekday_folder_entries = {"0": FakeVar("/fondos/lunes")}
+    gui.weekday_thumb_labels = {"0": []}
+    gui.weekday_thumb_images = {}
+    gui.weekday_previews = {}
+
+    gui.update_day_summary("0")
+    assert "0" not in gui.weekday_previews
+    gui.root.run_pending(1)
+    library = gui.wallpaper_engine.media_library
+    assert library.threads and threading.current_thread() not in library.threads
+    assert len(gui.weekday_previews["0"]) == gui.WEEKDAY_THUMBNAILS
+    assert gui.thumbnails.requested == [gui.weekday_previews["0"]]
+
+    # Si el día deja de usar la carpeta antes de terminar la lectura, se descarta
+    gui.update_day_summary("0")
+    gui.weekday_use_folder_vars["0"].value = False
+    gui.weekday_previews.clear()
+    gui.root.run_pending(1)
+    assert "0" not in gui.weekday_previews
+    print("✅ Carpeta leída en segundo plano")
+
+
+def test_change_now_runs_in_background():
+    """ "Cambiar ahora" aplica el fondo fuera del hilo de Tk y luego avisa"""
+    print("\n🔁 PRUEBA DE CAMBIAR AHORA EN SEGUNDO PLANO")
+    print("=" * 40)
+
+    gui, built = _make_gui()
+    if gui is None:
+        return
+
+    import threading
+    import modules.gui as gui_module
+
+    shown = []
+
+    class FakeMessagebox:
+        @staticmethod
+        def showinfo(title, message):
+            shown.append(title)
+
+        showerror = showinfo
+
+    gui.build_ui()
+    gui.update_status = lambda folder_counts=None: None
+    original = gui_module.messagebox
+    gui_module.messagebox = FakeMessagebox
+    try:
+        gui.change_now()
+        assert shown == []
+        gui.root.run_pending(1)
+    finally:
+        gui_module.messagebox = original
+
+    threads = gui.wallpaper_engine.change_threads
+    assert len(threads) == 1 and threads[0] is not threading.current_thread()
+    assert shown == ["Éxito"]
+    print("✅ Cambio aplicado en segundo plano")
+
+
+if __name__ == "__main__":
+    test_lazy_tabs_and_teardown()
+    test_stale_refresh_is_discarded()
+    test_day_preview_reads_folder_in_background()
+    test_change_now_runs_in_background()
+    print(f"\n✅ Todas las pruebas pasaron")
@@ -0,0 +1,141 @@
+"""
+Prueba de la normalización de imágenes a la resolución de la pantalla
+"""
+
+import os
+import sys
+import tempfile
+
+# Agregar módulos al path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'modules'))
+
+
+def test_modes_and_metadata():
+    """Cada modo entrega exactamente la resolución pedida y sin metadatos"""
+    print("🖼️ PRUEBA DE NORMALIZACIÓN")
+    print("=" * 40)
+
+    try:
+        from PIL import Image
+    except ImportError:
+        print("⚠️ PIL no disponible, prueba omitida")
+        return
+
+    from modules.image_normalizer import ImageNormalizer
+
+    folder = tempfile.mkdtemp()
+    source = os.path.join(folder, "photo.jpg")
+    # Foto apaisada guardada girada: la orientación EXIF 6 la pone vertical
+    image = Image.new("RGB", (400, 200), (200, 30, 30))
+    exif = Image.Exif()
+    exif[0x0112] = 6
+    exif[0x010F] = "Camara"
+    image.save(source, "JPEG", exif=exif.tobytes())
+
+    size = (120, 80)
+    for mode in ("fill", "fit", "center"):
+        normalizer = ImageNormalizer(os.path.join(folder, mode), mode=mode)
+        result = normalizer.normalize(source, size)
+        assert result is not None
+        with Image.open(result) as out:
+            assert out.size == size
+            assert not out.getexif(), "Los metadatos deben desaparecer"
+            if mode == "fit":
+                # Vertical dentro de apaisado: bandas negras a los lados
+                assert out.getpixel((2, 40))[0] < 20
+                assert out.getpixel((60, 40))[0] > 150
+            if mode == "fill":
+                assert out.getpixel((2, 40))[0] > 150
+        assert normalizer.normalize(source, size) == result
+        assert normalizer.hits == 1 and normalizer.generated == 1
+
+    bmp = ImageNormalizer(os.path.join(folder, "bmp"), fmt="bmp").normalize(source, size)
+    assert bmp.endswith(".bmp")
+
+    png = os.path.join(folder, "alpha.png")
+    Image.new("RGBA", (50, 50), (0, 255, 0, 0)).save(png)
+    result = ImageNormalizer(os.path.join(folder, "png")).normalize(png, size)
+    with Image.open(result) as out:
+        assert out.mode == "RGB" and out.getpixel((60, 40)) == (0, 0, 0)
+    print("✅ fill, fit y center correctos")
+
+
+def test_eviction_and_keys():
+    """La caché respeta su límite y distingue resolución y versión del original"""
+    print("\n🧹 PRUEBA DE EXPULSIÓN")
+    print("=" * 40)
+
+    try:
+        from PIL import Image
+    except ImportError:
+        print("⚠️ PIL no disponible, prueba omitida")
+        return
+
+    from modules.image_normalizer import ImageNormalizer
+
+    folder = tempfile.mkdtemp()
+    cache_dir = os.path.join(folder, "cache")
+    normalizer = ImageNormalizer(cache_dir, fmt="bmp", max_bytes=3 * 64 * 64 * 3 + 500)
+    sources = []
+    for i in range(5):
+        path = os.path.join(folder, f"{i}.png")
+        Image.new("RGB", (300, 300), (i * 40, 0, 0)).save(path)
+        sources.append(path)
+        assert normalizer.normalize(path, (64, 64)) is not None
+
+    assert normalizer.evicted == 2
+    assert len(os.listdir(cache_dir)) == 3
+    assert normalizer.normalize(sources[0], (64, 64)) is not None
+    assert normalizer.generated == 6, "Lo expulsado se vuelve a generar"
+
+    other = normalizer.normalize(sources[4], (32, 32))
+    assert other != normalizer.normalize(sources[4], (64, 64))
+    assert normalizer.normalize(os.path.join(folder, "missing.png"), (64, 64)) is None
+
+    # La siguiente sesión recupera el orden LRU desde disco
+    reopened = ImageNormalizer(cache_dir, fmt="bmp", max_bytes=normalizer.max_bytes)
+    assert len(reopened._entries) == len(os.listdir(cache_dir))
+    print(f"✅ {normalizer.evicted} expulsiones")
+
+
+def test_applied_image_is_not_evicted():
+    """El archivo puesto como fondo sobrevive aunque sea el menos usado"""
+    print("\n📌 PRUEBA DEL FONDO APLICADO")
+    print("=" * 40)
+
+    try:
+        from PIL import Image
+    except ImportError:
+        print("⚠️ PIL no disponible, prueba omitida")
+        return
+
+    from modules.image_normalizer import ImageNormalizer
+
+    folder = tempfile.mkdtemp()
+    cache_dir = os.path.join(folder, "cache")
+    normalizer = ImageNormalizer(cache_dir, fmt="bmp", max_bytes=2 * 64 * 64 * 3 + 500)
+    sources = []
+    for i in range(4):
+        path = os.path.join(folder, f"{i}.png")
+        Image.new("RGB", (300, 300), (0, i * 40, 0)).save(path)
+        sources.append(path)
+
+    applied = normalizer.normalize(sources[0], (64, 64))
+    normalizer.pin(applied)
+    for path in sources[1:]:
+        assert normalizer.normalize(path, (64, 64)) is not None
+    assert os.path.exists(applied)
+    assert normalizer.evicted == 2
+    assert len(os.listdir(cache_dir)) == 2
+
+    # Una imagen fuera de la caché no protege nada
+    normalizer.pin(sources[0])
+    assert normalizer.applied is None
+    print("✅ El fondo aplicado no se expulsa")
+
+
+if __name__ == "__main__":
+    test_modes_and_metadata()
+    test_eviction_and_keys()
+    test_applied_image_is_not_evicted()
+    print(f"\n✅ Todas las pruebas pasaron")
@@ -0,0 +1,161 @@
+"""
+Prueba del canal de instancia única (menú contextual -> aplicación abierta)
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+# Agregar módulos al path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'modules'))
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+def _server(on_add, folder, **kwargs):
+    from modules.instance_server import InstanceServer
+    address = os.path.join(folder, "instance.sock")
+    return InstanceServer(on_add, address=address, authkey=b"prueba", **kwargs), address
+
+
+def test_burst_is_coalesced():
+    """Una ráfaga de invocaciones llega como un solo lote sin repetidos"""
+    print("📨 PRUEBA DE AGRUPACIÓN")
+    print("=" * 40)
+
+    if sys.platform == "win32":
+        print("⚠️ Prueba con socket Unix, omitida en Windows")
+        return
+
+    from modules.instance_server import CMD_ADD, CMD_PING, send_command
+
+    folder = tempfile.mkdtemp()
+    batches = []
+    delivered = threading.Event()
+    server, address = _server(lambda paths: (batches.append(paths), delivered.set()), folder,
+                              coalesce_seconds=0.3)
+    assert server.start()
+    try:
+        assert send_command(CMD_PING, address=address, authkey=b"prueba") is True
+        threads = [threading.Thread(target=send_command,
+                                    args=(CMD_ADD, [f"/fotos/{i % 5}.jpg"]),
+                                    kwargs={"address": address, "authkey": b"prueba"})
+                   for i in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert delivered.wait(3)
+        time.sleep(0.4)
+        assert server.batches == 1
+        assert sorted(batches[0]) == [f"/fotos/{i}.jpg" for i in range(5)]
+
+        # Orden desconocida y clave incorrecta
+        assert send_command("nada", address=address, authkey=b"prueba") is None
+        assert send_command(CMD_PING, address=address, authkey=b"otra") is None
+    finally:
+        server.stop()
+    assert not os.path.exists(address)
+    print(f"✅ 20 invocaciones -> {server.batches} lote de {len(batches[0])} rutas")
+
+
+def test_single_instance_and_stale_socket():
+    """Una segunda instancia no roba el canal; un socket huérfano se reutiliza"""
+    print("\n🔒 PRUEBA DE INSTANCIA ÚNICA")
+    print("=" * 40)
+
+    if sys.platform == "win32":
+        print("⚠️ Prueba con socket Unix, omitida en Windows")
+        return
+
+    import socket
+
+    from modules.instance_server import CMD_SHOW, send_command
+
+    folder = tempfile.mkdtemp()
+    shown = []
+    first, address = _server(lambda paths: None, folder)
+    first.handlers[CMD_SHOW] = lambda payload: shown.append(True) or "visible"
+    assert first.start()
+    second, _ = _server(lambda paths: None, folder)
+    assert not second.start(), "Solo una instancia puede escuchar"
+    assert send_command(CMD_SHOW, address=address, authkey=b"prueba") == "visible"
+    assert shown == [True]
+    first.stop()
+    assert send_command(CMD_SHOW, address=address, authkey=b"prueba") is None
+
+    # Socket que quedó de una instancia que terminó de golpe
+    stale = socket.socket(socket.AF_UNIX)
+    stale.bind(address)
+    stale.close()
+    third, _ = _server(lambda paths: None, folder)
+    assert third.start()
+    third.stop()
+    print("✅ Canal exclusivo y recuperación de socket huérfano")
+
+
+def test_cli_forwards_to_running_instance():
+    """--add-wallpaper entrega las rutas a la aplicación abierta y no escribe la configuración"""
+    print("\n⚡ PRUEBA DE REENVÍO DESDE LA CLI")
+    print("=" * 40)
+
+    if sys.platform == "win32":
+        print("⚠️ Prueba con socket Unix, omitida en Windows")
+        return
+
+    from pathlib import Path
+
+    from modules.cli import add_wallpapers
+    from modules.config_manager import ConfigManager
+    from modules.instance_server import InstanceServer
+
+    home = tempfile.mkdtemp()
+    image = os.path.join(home, "a.jpg")
+    open(image, "wb").close()
+
+    # La "aplicación abierta": su ConfigManager es quien guarda
+    config = ConfigManager(Path(home) / "app_config.json")
+    results = []
+    delivered = threading.Event()
+
+    def on_add(paths):
+        results.append(add_wallpapers(paths, config))
+        delivered.set()
+
+    old_home = os.environ.get("HOME")
+    os.environ["HOME"] = home
+    try:
+        server = InstanceServer(on_add, coalesce_seconds=0.05)
+        assert server.start()
+    finally:
+        os.environ["HOME"] = old_home
+    try:
+        env = dict(os.environ, HOME=home)
+        env.pop("PYTHONPATH", None)
+        start = time.perf_counter()
+        result = subprocess.run([sys.executable, "main.py", "--add-wallpaper", image],
+                                cwd=ROOT, env=env, capture_output=True, text=True, timeout=30)
+        elapsed = time.perf_counter() - start
+        assert result.returncode == 0, result.stdout + result.stderr
+        assert delivered.wait(3)
+    finally:
+        server.stop()
+
+    assert results[0].added == [image]
+    assert not os.path.exists(os.path.join(home, "wallpaper_changer_config.json")), \
+        "La invocación no debe escribir su propia copia de la configuración"
+    config.flush()
+    with open(Path(home) / "app_config.json", encoding="utf-8") as f:
+        assert json.load(f)["wallpapers"] == [image]
+    print(f"✅ Reenviado en {elapsed * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    test_burst_is_coalesced()
+    test_single_instance_and_stale_socket()
+    test_cli_forwards_to_running_instance()
+    print(f"\n✅ Todas las pruebas pasaron")
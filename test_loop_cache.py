@@ -0,0 +1,112 @@
+"""
+Prueba de la caché de bucles de video (sin GUI)
+"""
+
+import os
+import sys
+import tempfile
+
+# Agregar módulos al path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'modules'))
+
+
+def _write_clip(folder, frames=8):
+    """Genera un video corto con un color distinto por fotograma"""
+    import cv2
+    import numpy as np
+
+    video_path = os.path.join(folder, "loop.avi")
+    writer = cv2.VideoWriter(video_path, cv2.VideoWriter_fourcc(*"MJPG"), 20.0, (64, 48))
+    for i in range(frames):
+        writer.write(np.full((48, 64, 3), i * 30, dtype=np.uint8))
+    writer.release()
+    return video_path
+
+
+def test_first_pass_is_recorded_and_reused():
+    """La primera vuelta se graba y las siguientes salen del memmap"""
+    print("💾 PRUEBA DE CACHÉ DE BUCLES")
+    print("=" * 40)
+
+    try:
+        import cv2  # noqa: F401
+        import numpy  # noqa: F401
+    except ImportError:
+        print("⚠️ OpenCV/NumPy no disponibles, prueba omitida")
+        return
+
+    from modules.loop_cache import LoopFrameCache
+    from modules.video_pipeline import FrameScaler, VideoPipeline
+
+    folder = tempfile.mkdtemp()
+    video_path = _write_clip(folder)
+    cache = LoopFrameCache(os.path.join(folder, "cache"), max_bytes=10 * 1024 * 1024)
+    size = (32, 24)
+
+    assert cache.open(video_path, size) is None
+    pipeline = VideoPipeline(
+        video_path, FrameScaler(size, buffers=8), queue_size=2,
+        recorder_factory=lambda fps, count: cache.recorder(video_path, size, fps, count))
+    try:
+        assert pipeline.start()
+        # Dos vueltas: la segunda ya sale de la caché
+        seen = [pipeline.frames.get(timeout=2) for _ in range(16)]
+        assert pipeline.decoder.transform is None
+        assert [f.index for f in seen] == list(range(16))
+        assert (seen[0].image == seen[8].image).all()
+    finally:
+        pipeline.stop()
+
+    clip = cache.open(video_path, size)
+    assert clip is not None and cache.hits == 1
+    assert clip.get(5) == 20.0 and clip.get(7) == 8
+    ok, frame = clip.read()
+    assert ok and frame.shape == (24, 32, 3)
+    print(f"✅ Bucle de {int(clip.get(7))} fotogramas reutilizado")
+
+
+def test_budget_and_eviction():
+    """Los videos que no caben no se graban y los viejos se expulsan"""
+    print("\n📏 PRUEBA DE LÍMITE DE TAMAÑO")
+    print("=" * 40)
+
+    try:
+        import numpy as np
+    except ImportError:
+        print("⚠️ NumPy no disponible, prueba omitida")
+        return
+
+    from modules.loop_cache import LoopFrameCache
+
+    folder = tempfile.mkdtemp()
+    videos = []
+    for name in ("a.mp4", "b.mp4"):
+        path = os.path.join(folder, name)
+        with open(path, "wb") as f:
+            f.write(name.encode())
+        videos.append(path)
+
+    size = (10, 10)
+    frame_bytes = 10 * 10 * 3
+    cache = LoopFrameCache(os.path.join(folder, "cache"), max_bytes=frame_bytes * 5)
+
+    # No cabe entero
+    assert cache.recorder(videos[0], size, 25.0, 6) is None
+
+    for path in videos:
+        recorder = cache.recorder(path, size, 25.0, 4)
+        for _ in range(3):  # Menos fotogramas de los anunciados
+            assert recorder.add(np.zeros((10, 10, 3), dtype=np.uint8))
+        assert recorder.finish() is not None
+
+    assert cache.evicted == 1
+    assert cache.open(videos[0], size) is None
+    clip = cache.open(videos[1], size)
+    assert clip is not None and clip.get(7) == 3
+    print("✅ Límite respetado")
+
+
+if __name__ == "__main__":
+    test_first_pass_is_recorded_and_reused()
+    test_budget_and_eviction()
+    print(f"\n✅ Todas las pruebas pasaron")
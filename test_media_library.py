@@ -0,0 +1,122 @@
+"""
+Prueba del índice incremental de medios por carpeta
+"""
+
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Agregar módulos al path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'modules'))
+
+
+def _touch(folder, name):
+    """Crea un archivo vacío"""
+    with open(os.path.join(folder, name), 'wb') as f:
+        f.write(b"x")
+
+
+def test_index_counts_and_rescan():
+    """El índice cuenta por tipo y solo reescanea si cambia la carpeta"""
+    print("📚 PRUEBA DE ÍNDICE DE MEDIOS")
+    print("=" * 40)
+
+    from modules.media_library import MediaLibrary
+
+    folder = tempfile.mkdtemp()
+    for name in ["b.jpg", "a.png", "clip.mp4", "notas.txt"]:
+        _touch(folder, name)
+
+    index_file = Path(tempfile.mkdtemp()) / "index.json"
+    library = MediaLibrary(index_file)
+
+    paths = library.get_paths(folder)
+    print(f"  Archivos: {[os.path.basename(p) for p in paths]}")
+    assert [os.path.basename(p) for p in paths] == ["a.png", "b.jpg", "clip.mp4"]
+    assert library.count(folder, "image") == 2
+    assert library.count(folder, "video") == 1
+    assert library.scans == 1
+
+    # Consultas repetidas no vuelven a leer la carpeta
+    library.get_paths(folder, kind="image")
+    library.count(folder)
+    assert library.scans == 1
+
+    # Un archivo nuevo cambia el mtime de la carpeta
+    time.sleep(0.01)
+    _touch(folder, "c.bmp")
+    assert library.count(folder, "image") == 3
+    assert library.scans == 2
+
+    # El índice persistido evita el escaneo en una instancia nueva
+    library.flush()
+    reloaded = MediaLibrary(index_file)
+    assert reloaded.count(folder) == 4
+    assert reloaded.scans == 0
+    print("  ✅ Índice correcto")
+
+
+def test_scan_outside_lock_and_batched_saves():
+    """Un escaneo lento no bloquea otras carpetas y las escrituras se agrupan"""
+    print("\n🔓 PRUEBA DE ESCANEO SIN CERROJO")
+    print("=" * 40)
+
+    import threading
+
+    from modules.media_library import MediaLibrary
+
+    slow_folder, fast_folder = tempfile.mkdtemp(), tempfile.mkdtemp()
+    _touch(slow_folder, "a.jpg")
+    _touch(fast_folder, "b.jpg")
+    index_file = Path(tempfile.mkdtemp()) / "index.json"
+    library = MediaLibrary(index_file)
+    assert library.count(fast_folder) == 1
+
+    scanning, release = threading.Event(), threading.Event()
+    scan = library._scan
+
+    def slow_scan(folder_path, dir_mtime, previous):
+        if folder_path == slow_folder:
+            scanning.set()
+            release.wait(5)
+        return scan(folder_path, dir_mtime, previous)
+
+    library._scan = slow_scan
+    worker = threading.Thread(target=library.count, args=(slow_folder,))
+    worker.start()
+    try:
+        assert scanning.wait(5)
+        start = time.monotonic()
+        assert library.count(fast_folder) == 1
+        assert time.monotonic() - start < 1.0
+    finally:
+        release.set()
+        worker.join(5)
+    assert library.count(slow_folder) == 1
+
+    # Una ráfaga de cambios se escribe una sola vez
+    for i in range(20):
+        _touch(fast_folder, f"{i}.png")
+        library.apply_changes(fast_folder, {f"{i}.png"})
+    assert library.writes == 0
+    assert library.flush() and library.writes == 1
+    assert MediaLibrary(index_file).count(fast_folder) == 21
+    print("  ✅ Consultas concurrentes y una sola escritura")
+
+
+def test_missing_folder():
+    """Una carpeta inexistente devuelve listas vacías"""
+    from modules.media_library import MediaLibrary
+
+    library = MediaLibrary(Path(tempfile.mkdtemp()) / "index.json")
+    assert library.get_paths(os.path.join(tempfile.gettempdir(), "no-existe-xyz")) == []
+    assert library.count(None) == 0
+
+
+if __name__ == "__main__":
+    test_index_counts_and_rescan()
+    test_scan_outside_lock_and_batched_saves()
+    test_missing_folder()
+    print(f"\n✅ Todas las pruebas pasaron")
@@ -0,0 +1,86 @@
+"""
+Prueba de la comprobación asíncrona de rutas (sin GUI)
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+
+# Agregar módulos al path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'modules'))
+
+
+def _collector():
+    """Devuelve (post, resultados, evento) para recibir lotes como lo haría root.after"""
+    results = {}
+    done = threading.Event()
+
+    def post(fn):
+        fn()
+
+    def callback(batch):
+        results.update(batch)
+        done.set()
+
+    return post, results, done, callback
+
+
+def test_batch_stat_and_ttl_cache():
+    """Las rutas se comprueban una vez y la caché evita repetir el stat"""
+    print("⏳ PRUEBA DE COMPROBACIÓN POR LOTES")
+    print("=" * 40)
+
+    from modules.path_status import PathStatusChecker
+
+    folder = tempfile.mkdtemp()
+    existing = os.path.join(folder, "a.jpg")
+    with open(existing, 'wb') as f:
+        f.write(b"x" * 10)
+    missing = os.path.join(folder, "no_existe.jpg")
+
+    post, results, done, callback = _collector()
+    checker = PathStatusChecker(post, ttl_seconds=60)
+    try:
+        assert checker.get(existing) is None
+        assert checker.request([existing, missing], callback) == 2
+        assert done.wait(2)
+        time.sleep(0.1)
+        assert results[existing].exists and results[existing].size == 10
+        assert not results[missing].exists
+
+        # Segunda petición: todo sale de la caché
+        assert checker.request([existing, missing], callback) == 0
+        assert checker.get(existing).exists
+        assert checker.stats == 2
+
+        checker.invalidate([existing])
+        assert checker.get(existing) is None
+    finally:
+        checker.shutdown()
+
+
+def test_expired_entries_are_rechecked():
+    """Pasado el TTL la ruta se vuelve a comprobar"""
+    print("⌛ PRUEBA DE EXPIRACIÓN")
+    print("=" * 40)
+
+    from modules.path_status import PathStatusChecker
+
+    post, results, done, callback = _collector()
+    checker = PathStatusChecker(post, ttl_seconds=0.05)
+    try:
+        checker.request([__file__], callback)
+        assert done.wait(2)
+        time.sleep(0.1)
+        assert checker.get(__file__) is None
+        assert checker.request([__file__], callback) == 1
+    finally:
+        checker.shutdown()
+
+
+if __name__ == "__main__":
+    test_batch_stat_and_ttl_cache()
+    test_expired_entries_are_rechecked()
+    print(f"\n✅ Todas las pruebas pasaron")
@@ -0,0 +1,162 @@
+"""
+Prueba de la política de reproducción de video (sin GUI)
+"""
+
+import os
+import sys
+import tempfile
+
+# Agregar módulos al path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'modules'))
+
+
+def _providers(**values):
+    from modules.playback_policy import StaticProvider
+
+    names = ("desktop_visible", "session_locked", "on_battery", "cpu_load")
+    return {name: StaticProvider(name, values.get(name)) for name in names}
+
+
+def test_decisions():
+    """Cada señal lleva a su acción y las desconocidas no restringen"""
+    print("🔋 PRUEBA DE DECISIONES")
+    print("=" * 40)
+
+    from modules.playback_policy import PlaybackPolicy
+
+    assert PlaybackPolicy(_providers()).decide().action == "play"
+    assert PlaybackPolicy(_providers(session_locked=True)).decide().action == "pause"
+    assert PlaybackPolicy(_providers(desktop_visible=False)).decide().action == "pause"
+
+    on_battery = PlaybackPolicy(_providers(on_battery=True), low_fps=12).decide()
+    assert on_battery.action == "low_fps" and on_battery.fps == 12
+    poster = PlaybackPolicy(_providers(on_battery=True), on_battery_action="poster").decide()
+    assert poster.action == "poster" and poster.fps is None
+
+    # Bloqueo gana a batería
+    both = PlaybackPolicy(_providers(session_locked=True, on_battery=True)).decide()
+    assert both.action == "pause"
+    print("✅ Decisiones correctas")
+
+
+def test_cpu_hysteresis():
+    """Tras bajar de FPS por CPU, solo se vuelve a la normalidad con margen"""
+    print("\n🧮 PRUEBA DE HISTÉRESIS DE CPU")
+    print("=" * 40)
+
+    from modules.playback_policy import PlaybackPolicy
+
+    policy = PlaybackPolicy(_providers(), cpu_threshold=0.8)
+    assert policy.decide({"cpu_load": 0.5}).action == "play"
+    assert policy.decide({"cpu_load": 0.9}).action == "low_fps"
+    assert policy.decide({"cpu_load": 0.75}).action == "low_fps"
+    assert policy.decide({"cpu_load": 0.6}).action == "play"
+
+    # Una lectura fallida (None) con la CPU limitada mantiene la decisión anterior
+    assert policy.decide({"cpu_load": 0.95}).action == "low_fps"
+    decision = policy.decide({"cpu_load": None})
+    assert decision.action == "low_fps" and "95%" in decision.reason
+    print("✅ Histéresis respetada")
+
+
+def test_linux_providers():
+    """Batería por /sys/class/power_supply y carga por /proc/stat"""
+    print("\n🐧 PRUEBA DE PROVEEDORES LINUX")
+    print("=" * 40)
+
+    from modules.playback_policy import CpuLoadProvider, LinuxBatteryProvider
+
+    root = tempfile.mkdtemp()
+
+    def supply(name, kind, online=None):
+        os.makedirs(os.path.join(root, name))
+        with open(os.path.join(root, name, "type"), "w") as f:
+            f.write(kind + "\n")
+        if online is not None:
+            with open(os.path.join(root, name, "online"), "w") as f:
+                f.write(online + "\n")
+
+    provider = LinuxBatteryProvider(root)
+    assert provider.read() is False  # Sin batería: sobremesa
+    supply("BAT0", "Battery")
+    supply("AC", "Mains", "0")
+    assert provider.read() is True
+    with open(os.path.join(root, "AC", "online"), "w") as f:
+        f.write("1\n")
+    assert provider.read() is False
+
+    stat_file = os.path.join(root, "stat")
+    cpu = CpuLoadProvider(stat_file)
+
+    def write_stat(user, idle):
+        with open(stat_file, "w") as f:
+            f.write(f"cpu  {user} 0 0 {idle} 0 0 0 0 0 0\n")
+
+    write_stat(100, 900)
+    assert cpu.read() is None  # Primera lectura: sin intervalo
+    write_stat(175, 925)
+    assert abs(cpu.read() - 0.75) < 1e-9
+    print("✅ Proveedores leídos")
+
+
+def test_timer_reports_changes_only():
+    """PolicyTimer respeta el intervalo y solo devuelve cambios"""
+    print("\n⏱️ PRUEBA DEL TEMPORIZADOR")
+    print("=" * 40)
+
+    from modules.playback_policy import PlaybackPolicy, PolicyTimer
+
+    providers = _providers()
+    now = [0.0]
+    timer = PolicyTimer(PlaybackPolicy(providers), interval_seconds=2, clock=lambda: now[0])
+
+    assert timer.poll().action == "play"
+    providers["on_battery"].value = True
+    now[0] = 1.0
+    assert timer.poll() is None  # Antes del intervalo
+    now[0] = 2.0
+    assert timer.poll().action == "low_fps"
+    now[0] = 4.0
+    assert timer.poll() is None  # Sin cambios
+    print("✅ Temporizador correcto")
+
+
+def test_decoder_frame_step():
+    """Con frame_step el decodificador salta fotogramas sin decodificarlos"""
+    print("\n⏩ PRUEBA DE LÍMITE DE FPS")
+    print("=" * 40)
+
+    try:
+        import cv2
+        import numpy as np
+    except ImportError:
+        print("⚠️ OpenCV no disponible, prueba omitida")
+        return
+
+    from modules.video_pipeline import VideoPipeline
+
+    video_path = os.path.join(tempfile.mkdtemp(), "clip.avi")
+    writer = cv2.VideoWriter(video_path, cv2.VideoWriter_fourcc(*"MJPG"), 30.0, (32, 24))
+    for i in range(30):
+        writer.write(np.full((24, 32, 3), i * 8, dtype=np.uint8))
+    writer.release()
+
+    pipeline = VideoPipeline(video_path, lambda f: f, queue_size=2)
+    pipeline.decoder.frame_step = 3
+    try:
+        assert pipeline.start()
+        indexes = [pipeline.frames.get(timeout=2).index for _ in range(4)]
+    finally:
+        pipeline.stop()
+    # El primer fotograma puede haberse leído antes de fijar el paso
+    assert indexes[-1] - indexes[-2] == 3
+    print(f"✅ Índices: {indexes}")
+
+
+if __name__ == "__main__":
+    test_decisions()
+    test_cpu_hysteresis()
+    test_linux_providers()
+    test_timer_reports_changes_only()
+    test_decoder_frame_step()
+    print(f"\n✅ Todas las pruebas pasaron")
@@ -0,0 +1,159 @@
+"""
+Prueba del almacén de playlists (backends JSON y SQLite)
+"""
+
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Agregar módulos al path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'modules'))
+
+
+def _write_config(folder: Path, **values) -> Path:
+    """Escribe un JSON de configuración y devuelve su ruta"""
+    config_file = folder / "config.json"
+    with open(config_file, 'w', encoding='utf-8') as f:
+        json.dump(values, f)
+    return config_file
+
+
+def test_json_backend_dedup():
+    """El backend JSON deduplica con un índice en memoria"""
+    print("📝 PRUEBA DE DEDUPLICACIÓN (JSON)")
+    print("=" * 40)
+
+    from modules.config_manager import ConfigManager
+
+    config = ConfigManager(_write_config(Path(tempfile.mkdtemp()), wallpapers=["a.jpg"]))
+    assert config.playlist_store is None
+    assert config.add_wallpapers(["a.jpg", "b.jpg", "b.jpg", "c.mp4"]) == ["b.jpg", "c.mp4"]
+    assert config.has_wallpaper("c.mp4")
+    assert config.remove_wallpapers(["b.jpg", "x.jpg"]) == ["b.jpg"]
+    assert config.get("wallpapers") == ["a.jpg", "c.mp4"]
+    assert config.get_wallpapers_page(1, 5) == ["c.mp4"]
+
+    # set() reemplaza la lista y reconstruye el índice
+    config.set("wallpapers", ["z.png"])
+    assert not config.has_wallpaper("a.jpg")
+    assert config.add_wallpapers(["a.jpg"]) == ["a.jpg"]
+
+
+def test_sqlite_backend_migrates_and_pages():
+    """El backend SQLite migra las listas del JSON y las pagina"""
+    print("🗄️ PRUEBA DE MIGRACIÓN Y PAGINADO (SQLITE)")
+    print("=" * 40)
+
+    from modules.config_manager import ConfigManager
+
+    folder = Path(tempfile.mkdtemp())
+    paths = [f"/fondos/img_{i:05d}.jpg" for i in range(2000)]
+    config_file = _write_config(
+        folder, storage_backend="sqlite", wallpapers=paths,
+        weekday_playlists={"2": {"use_folder": False, "folder": None, "images": ["lunes.jpg"]}})
+
+    config = ConfigManager(config_file)
+    assert config.playlist_store is not None
+    assert config.count_wallpapers() == 2000
+    assert config.get_wallpapers_page(1500, 3) == paths[1500:1503]
+    assert config.get("weekday_playlists")["2"]["images"] == ["lunes.jpg"]
+
+    assert config.add_wallpapers([paths[10], "/fondos/nuevo.mp4"]) == ["/fondos/nuevo.mp4"]
+    assert config.remove_wallpapers([paths[0]]) == [paths[0]]
+    assert config.get_wallpapers_page(0, 1) == [paths[1]]
+    assert config.get("wallpapers")[-1] == "/fondos/nuevo.mp4"
+    assert config.playlist_store.get_media_info("/fondos/nuevo.mp4").kind == "video"
+
+    # Las listas salen del JSON
+    assert config.flush()
+    with open(config_file, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    assert "wallpapers" not in data and "weekday_playlists" not in data
+
+    reloaded = ConfigManager(config_file)
+    assert reloaded.count_wallpapers() == 2000
+    assert reloaded.has_wallpaper("/fondos/nuevo.mp4")
+    print("  ✅ Listas persistidas en SQLite")
+
+
+def test_sqlite_positions_and_lazy_metadata():
+    """Quitar deja huecos que se compactan al paginar; los metadatos se leen al pedirlos"""
+    print("🔢 PRUEBA DE POSICIONES Y METADATOS DIFERIDOS (SQLITE)")
+    print("=" * 40)
+
+    import sqlite3
+
+    from modules.playlist_store import PlaylistStore
+
+    folder = Path(tempfile.mkdtemp())
+    image = folder / "real.jpg"
+    image.write_bytes(b"x" * 10)
+    paths = [f"/fondos/{i}.jpg" for i in range(10)] + [str(image)]
+
+    store = PlaylistStore(folder / "store.db")
+    store.set_items("main", paths)
+
+    def positions():
+        return [row[0] for row in store._conn.execute(
+            "SELECT position FROM playlist_items WHERE playlist = 'main' ORDER BY position")]
+
+    # Quitar no reescribe las filas posteriores: solo borra y anota el hueco
+    changes = store._conn.total_changes
+    assert store.remove_items("main", [paths[7], paths[2], "/no/esta.jpg"]) == [paths[7], paths[2]]
+    assert store._conn.total_changes - changes <= 4
+    remaining = [p for p in paths if p not in (paths[2], paths[7])]
+    assert positions() != list(range(len(remaining)))
+
+    # Las páginas anteriores al hueco (o que empiezan en él) no compactan
+    assert store.get_page("main", 0, 2) == remaining[:2]
+    assert store.get_page("main", 2, 1) == remaining[2:3]
+    assert store.get_items("main") == remaining
+    assert "main" in store._sparse
+
+    # Más allá del hueco se compacta una sola vez
+    assert [store.get_page("main", i, 1)[0] for i in range(len(remaining))] == remaining
+    assert positions() == list(range(len(remaining)))
+    assert "main" not in store._sparse and store.get_meta("sparse:main") is None
+    assert store.get_page("main", 3, 2) == remaining[3:5]
+
+    # El hueco sobrevive a reabrir la base
+    store.remove_items("main", [remaining.pop(0)])
+    store.close()
+    store = PlaylistStore(folder / "store.db")
+    assert store._sparse == {"main": 0}
+    assert store.get_page("main", 5, 2) == remaining[5:7]
+
+    plan = " ".join(str(row) for row in store._conn.execute(
+        "EXPLAIN QUERY PLAN SELECT path FROM playlist_items WHERE playlist = ? "
+        "AND position >= ? ORDER BY position LIMIT ?", ("main", 5, 1)))
+    assert "idx_playlist_position" in plan, plan
+
+    # Sin stat al insertar: el tamaño se completa la primera vez que se pide
+    row = store._conn.execute("SELECT size FROM media WHERE path = ?", (str(image),)).fetchone()
+    assert row[0] is None
+    assert store.get_media_info(str(image)).size == 10
+    row = store._conn.execute("SELECT size FROM media WHERE path = ?", (str(image),)).fetchone()
+    assert row[0] == 10
+    store.close()
+
+    # Una base de la versión 1 con huecos se compacta al paginarla
+    conn = sqlite3.connect(str(folder / "store.db"))
+    with conn:
+        conn.execute("UPDATE playlist_items SET position = -1 - position")
+        conn.execute("UPDATE playlist_items SET position = (-1 - position) * 3")
+        conn.execute("UPDATE meta SET value = '1' WHERE key = 'schema_version'")
+    conn.close()
+    store = PlaylistStore(folder / "store.db")
+    assert store.get_meta("schema_version") == str(PlaylistStore.SCHEMA_VERSION)
+    assert store.get_page("main", 4, 2) == remaining[4:6]
+    store.close()
+    print("  ✅ Huecos compactados bajo demanda y metadatos diferidos")
+
+
+if __name__ == "__main__":
+    test_json_backend_dedup()
+    test_sqlite_backend_migrates_and_pages()
+    test_sqlite_positions_and_lazy_metadata()
+    print(f"\n✅ Todas las pruebas pasaron")
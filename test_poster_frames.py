@@ -0,0 +1,95 @@
+"""
+Prueba de la caché de fotogramas de portada (sin GUI)
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+# Agregar módulos al path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'modules'))
+
+
+def _write_clip(folder):
+    """Video con fundido desde negro: solo el centro tiene contenido variado"""
+    import cv2
+    import numpy as np
+
+    video_path = os.path.join(folder, "clip.avi")
+    writer = cv2.VideoWriter(video_path, cv2.VideoWriter_fourcc(*"MJPG"), 10.0, (64, 48))
+    rng = np.random.default_rng(0)
+    for i in range(20):
+        if 6 <= i < 14:
+            frame = rng.integers(0, 255, (48, 64, 3), dtype=np.uint8)
+        else:
+            frame = np.zeros((48, 64, 3), dtype=np.uint8)
+        writer.write(frame)
+    writer.release()
+    return video_path
+
+
+def test_variance_picks_detailed_frame_and_caches():
+    """Se elige el fotograma más variado y la segunda vez no se abre el video"""
+    print("🖼️ PRUEBA DE PORTADAS")
+    print("=" * 40)
+
+    try:
+        import cv2
+    except ImportError:
+        print("⚠️ OpenCV no disponible, prueba omitida")
+        return
+
+    from modules.poster_frames import PosterFrameCache
+
+    folder = tempfile.mkdtemp()
+    video_path = _write_clip(folder)
+    cache = PosterFrameCache(os.path.join(folder, "posters"), strategy="variance", samples=4)
+
+    poster = cache.get(video_path)
+    assert poster and os.path.exists(poster)
+    assert cache.extracted == 1
+    assert cv2.imread(poster).std() > 20, "La portada no debe ser un fotograma negro"
+
+    assert cache.get(video_path) == poster
+    assert cache.hits == 1 and cache.extracted == 1
+
+    # Otra versión del archivo -> otra entrada
+    os.utime(video_path, (time.time() + 10, time.time() + 10))
+    assert cache.get(video_path) != poster
+    assert cache.extracted == 2
+
+    # No quedan temporales en la carpeta de la caché
+    assert all(name.endswith(".jpg") and len(name) == 44 for name in os.listdir(cache.cache_dir))
+    print(f"✅ Portada: {os.path.basename(poster)}")
+
+
+def test_position_strategy():
+    """La estrategia por posición toma el fotograma pedido"""
+    print("\n⏩ PRUEBA DE POSICIÓN")
+    print("=" * 40)
+
+    try:
+        import cv2
+    except ImportError:
+        print("⚠️ OpenCV no disponible, prueba omitida")
+        return
+
+    from modules.poster_frames import PosterFrameCache
+
+    folder = tempfile.mkdtemp()
+    video_path = _write_clip(folder)
+
+    black = PosterFrameCache(os.path.join(folder, "a"), strategy="position", position=0.0)
+    assert cv2.imread(black.get(video_path)).max() < 20
+
+    middle = PosterFrameCache(os.path.join(folder, "b"), strategy="position", position=0.5)
+    assert cv2.imread(middle.get(video_path)).std() > 20
+    assert middle.get(os.path.join(folder, "missing.mp4")) is None
+    print("✅ Posiciones respetadas")
+
+
+if __name__ == "__main__":
+    test_variance_picks_detailed_frame_and_caches()
+    test_position_strategy()
+    print(f"\n✅ Todas las pruebas pasaron")
@@ -0,0 +1,243 @@
+"""
+Prueba de la precarga del próximo fondo (sin GUI ni API de Windows)
+"""
+
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Agregar módulos al path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'modules'))
+
+
+def _make_engine(folder, screen_size=(64, 36)):
+    """Motor con un escritorio simulado y la precarga en una carpeta temporal"""
+    from modules.config_manager import ConfigManager
+    from modules.desktop_backend import RecordingBackend
+    from modules.image_normalizer import ImageNormalizer
+    from modules.poster_frames import PosterFrameCache
+    from modules.prefetch import WallpaperPrefetcher
+    from modules.wallpaper_engine import WallpaperEngine
+
+    config = ConfigManager(Path(folder) / "config.json")
+    config.set("desktop_backend", "recording")
+    engine = WallpaperEngine(config)
+    video_engine = engine.video_engine
+    video_engine.desktop = RecordingBackend(size=screen_size)
+    video_engine.poster_frames = PosterFrameCache(os.path.join(folder, "posters"))
+    engine.prefetcher = WallpaperPrefetcher(
+        video_engine.prepare_video_wallpaper, video_engine.is_video_file,
+        screen_size=video_engine.desktop.screen_size,
+        normalizer=ImageNormalizer(os.path.join(folder, "display")), keep=2)
+    return engine, config
+
+
+def _write_image(path, size, value=128):
+    from PIL import Image
+    Image.new("RGB", size, (value, value // 2, 255 - value)).save(path, "JPEG")
+
+
+def test_prefetch_then_apply():
+    """La fecha límite aplica la imagen ya reducida sin avanzar dos veces el índice"""
+    print("📦 PRUEBA DE PRECARGA")
+    print("=" * 40)
+
+    try:
+        from PIL import Image
+    except ImportError:
+        print("⚠️ PIL no disponible, prueba omitida")
+        return
+
+    folder = tempfile.mkdtemp()
+    images = [os.path.join(folder, f"{name}.jpg") for name in ("a", "b", "c")]
+    for i, image in enumerate(images):
+        _write_image(image, (640, 480), 60 * i)
+
+    engine, config = _make_engine(folder)
+    config.set("wallpapers", images)
+    config.set("current_index", 1)
+
+    # Consultar el próximo fondo no consume la rotación
+    assert engine.peek_next_wallpaper() == os.path.abspath(images[1])
+    assert engine.peek_next_wallpaper() == os.path.abspath(images[1])
+    assert config.get("current_index") == 1
+
+    assert engine.prefetch_next()
+    prepared = engine.prefetcher.take(images[1])
+    assert prepared is not None and prepared.startswith(os.path.join(folder, "display"))
+    with Image.open(prepared) as ready:
+        assert ready.size == (64, 36)
+
+    assert engine.change_wallpaper()
+    desktop = engine.video_engine.desktop
+    assert desktop.current == prepared
+    assert config.get("current_index") == 2
+
+    # Sin precarga el cambio normaliza en el momento
+    assert engine.change_wallpaper()
+    assert desktop.current != os.path.abspath(images[2])
+    assert desktop.current.startswith(os.path.join(folder, "display"))
+    assert engine.prefetcher.misses == 1
+    print(f"✅ Aciertos: {engine.prefetcher.hits}, fallos: {engine.prefetcher.misses}")
+
+
+def test_stale_and_missing():
+    """Un original modificado o borrado invalida lo preparado"""
+    print("\n🧹 PRUEBA DE INVALIDACIÓN")
+    print("=" * 40)
+
+    try:
+        from PIL import Image
+    except ImportError:
+        print("⚠️ PIL no disponible, prueba omitida")
+        return
+
+    folder = tempfile.mkdtemp()
+    engine, _config = _make_engine(folder)
+    prefetcher = engine.prefetcher
+
+    image = os.path.join(folder, "a.jpg")
+    _write_image(image, (320, 240))
+    assert prefetcher.prefetch(image) is not None
+    _write_image(image, (320, 200), 10)
+    st = os.stat(image)
+    os.utime(image, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+    assert prefetcher.take(image) is None, "Lo preparado debe seguir al original"
+
+    assert prefetcher.prefetch(os.path.join(folder, "missing.jpg")) is None
+
+    # Solo se recuerdan los `keep` últimos fondos preparados
+    for i in range(4):
+        small = os.path.join(folder, f"small{i}.jpg")
+        _write_image(small, (32, 16))
+        assert prefetcher.prefetch(small) is not None
+    assert prefetcher.take(os.path.join(folder, "small0.jpg")) is None
+    assert prefetcher.take(os.path.join(folder, "small3.jpg")) is not None
+    print("✅ Caché de precarga coherente")
+
+
+def test_scheduled_loop_prefetches_before_deadline():
+    """El hilo del motor despierta antes de la fecha límite para preparar el fondo"""
+    print("\n⏰ PRUEBA DE PRECARGA PROGRAMADA")
+    print("=" * 40)
+
+    try:
+        from PIL import Image
+    except ImportError:
+        print("⚠️ PIL no disponible, prueba omitida")
+        return
+
+    folder = tempfile.mkdtemp()
+    images = [os.path.join(folder, f"{name}.jpg") for name in ("a", "b")]
+    for image in images:
+        _write_image(image, (200, 100))
+
+    engine, config = _make_engine(folder)
+    config.set("wallpapers", images)
+    config.set("interval_minutes", 1)
+    config.set("prefetch_seconds", 59)
+    config.set("last_change", (datetime.now() - timedelta(seconds=58)).isoformat())
+
+    engine.start_monitoring()
+    try:
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline and engine.video_engine.desktop.current is None:
+            time.sleep(0.05)
+    finally:
+        engine.stop_monitoring()
+
+    desktop = engine.video_engine.desktop
+    assert desktop.current is not None, "El cambio no llegó"
+    assert engine.prefetcher.hits == 1
+    assert desktop.current.startswith(os.path.join(folder, "display"))
+    print(f"✅ Cambio aplicado desde la precarga en "
+          f"{desktop.latency_stats()['max_ms']:.1f} ms")
+
+
+def test_manual_change_overlapping_deadline():
+    """Un "cambiar ahora" que coincide con la fecha límite aplica un solo fondo"""
+    print("\n🔒 PRUEBA DE CAMBIO MANUAL EN LA FECHA LÍMITE")
+    print("=" * 40)
+
+    try:
+        from PIL import Image
+    except ImportError:
+        print("⚠️ PIL no disponible, prueba omitida")
+        return
+
+    import threading
+
+    folder = tempfile.mkdtemp()
+    images = [os.path.join(folder, f"{name}.jpg") for name in ("a", "b", "c")]
+    for image in images:
+        _write_image(image, (200, 100))
+
+    engine, config = _make_engine(folder)
+    config.set("wallpapers", images)
+    config.set("interval_minutes", 1)
+    config.set("prefetch_seconds", 0)
+    # La fecha límite vence mientras el cambio manual sigue aplicándose
+    config.set("last_change", (datetime.now() - timedelta(seconds=59.7)).isoformat())
+    desktop = engine.video_engine.desktop
+    desktop.delay = 0.6
+
+    engine.start_monitoring()
+    try:
+        manual = threading.Thread(target=engine.change_wallpaper)
+        manual.start()
+        manual.join(timeout=5)
+        # Tiempo para que el hilo del motor atienda la fecha límite ya vencida
+        time.sleep(1.0)
+    finally:
+        engine.stop_monitoring()
+
+    applies = [path for action, path in desktop.calls if action == "apply"]
+    assert len(applies) == 1, f"Se aplicaron {len(applies)} fondos"
+    assert config.get("current_index") == 1
+    next_change = engine.scheduler.compute_next_change()
+    assert next_change > datetime.now() + timedelta(seconds=50)
+    print("✅ Un solo cambio y la fecha límite se pospone")
+
+
+def test_screen_size_is_cached():
+    """La resolución se lee una vez y se renueva al caducar o cambiar de backend"""
+    print("\n🖥️ PRUEBA DE RESOLUCIÓN EN CACHÉ")
+    print("=" * 40)
+
+    from modules.desktop_backend import RecordingBackend
+
+    class CountingBackend(RecordingBackend):
+        reads = 0
+
+        def screen_size(self):
+            CountingBackend.reads += 1
+            return super().screen_size()
+
+    folder = tempfile.mkdtemp()
+    engine, _config = _make_engine(folder)
+    engine.video_engine.desktop = CountingBackend(size=(64, 36))
+    assert [engine.get_screen_size() for _ in range(5)] == [(64, 36)] * 5
+    assert CountingBackend.reads == 1
+
+    engine.invalidate_screen_size()
+    assert engine.get_screen_size() == (64, 36) and CountingBackend.reads == 2
+
+    engine.video_engine.desktop = CountingBackend(size=(128, 72))
+    assert engine.get_screen_size() == (128, 72) and CountingBackend.reads == 3
+
+    engine.SCREEN_SIZE_TTL = 0
+    engine.get_screen_size()
+    assert CountingBackend.reads == 4
+    print("✅ Una lectura por backend y periodo")
+
+
+if __name__ == "__main__":
+    test_prefetch_then_apply()
+    test_stale_and_missing()
+    test_scheduled_loop_prefetches_before_deadline()
+    test_manual_change_overlapping_deadline()
+    test_screen_size_is_cached()
+    print(f"\n✅ Todas las pruebas pasaron")
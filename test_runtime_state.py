@@ -0,0 +1,92 @@
+"""
+Prueba del almacén de estado de ejecución (índice actual y último cambio)
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Agregar módulos al path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'modules'))
+
+
+def test_rotation_does_not_rewrite_json():
+    """Rotar solo actualiza el registro binario, nunca el JSON"""
+    print("🔁 PRUEBA DE ROTACIÓN SIN REESCRIBIR EL JSON")
+    print("=" * 40)
+
+    from modules.config_manager import ConfigManager
+    from modules.runtime_state import RuntimeStateStore
+
+    config_file = Path(tempfile.mkdtemp()) / "config.json"
+    config = ConfigManager(config_file)
+
+    for index in range(50):
+        config.set("current_index", index)
+        config.set("last_change", f"2024-01-01T10:{index:02d}:00.123456")
+        config.save_config()
+    time.sleep(ConfigManager.WRITE_DELAY_SECONDS + 0.5)
+
+    print(f"  Escrituras JSON: {config.writes}")
+    assert config.writes == 0
+    state_file = config_file.with_suffix(".state")
+    assert state_file.stat().st_size == RuntimeStateStore.SIZE
+
+    reloaded = ConfigManager(config_file)
+    assert reloaded.get("current_index") == 49
+    assert reloaded.get("last_change") == "2024-01-01T10:49:00.123456"
+    print("  ✅ Estado persistido")
+
+
+def test_migrates_from_json():
+    """Los valores de un JSON antiguo pasan al almacén y salen del JSON"""
+    print("📦 PRUEBA DE MIGRACIÓN DESDE JSON")
+    print("=" * 40)
+
+    from modules.config_manager import ConfigManager
+
+    config_file = Path(tempfile.mkdtemp()) / "config.json"
+    with open(config_file, 'w', encoding='utf-8') as f:
+        json.dump({"interval_minutes": 10, "current_index": 4,
+                   "last_change": "2024-02-03T04:05:06"}, f)
+
+    config = ConfigManager(config_file)
+    assert config.get("current_index") == 4
+    assert config.get("last_change") == "2024-02-03T04:05:06"
+    assert config.get("interval_minutes") == 10
+
+    assert config.flush()
+    with open(config_file, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    assert "current_index" not in data and "last_change" not in data
+    assert data["interval_minutes"] == 10
+
+
+def test_corrupt_state_falls_back():
+    """Un registro dañado se ignora y se usan los valores por defecto"""
+    print("🧯 PRUEBA DE REGISTRO DAÑADO")
+    print("=" * 40)
+
+    from modules.runtime_state import RuntimeStateStore
+
+    state_file = Path(tempfile.mkdtemp()) / "state.bin"
+    store = RuntimeStateStore(state_file)
+    store.update({"current_index": 7, "last_change": None})
+    assert RuntimeStateStore(state_file).get("current_index") == 7
+
+    with open(state_file, 'r+b') as f:
+        f.seek(8)
+        f.write(b"\xff")
+    damaged = RuntimeStateStore(state_file)
+    assert not damaged.exists
+    assert damaged.get("current_index") == 0
+
+
+if __name__ == "__main__":
+    test_rotation_does_not_rewrite_json()
+    test_migrates_from_json()
+    test_corrupt_state_falls_back()
+    print(f"\n✅ Todas las pruebas pasaron")
@@ -0,0 +1,102 @@
+"""
+Prueba del planificador por eventos (sin GUI)
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Agregar módulos al path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'modules'))
+
+
+def _make_config(**values):
+    """Crea un ConfigManager sobre un archivo temporal"""
+    from modules.config_manager import ConfigManager
+
+    config_file = Path(tempfile.mkdtemp()) / "config.json"
+    config = ConfigManager(config_file)
+    for key, value in values.items():
+        config.set(key, value)
+    return config
+
+
+def test_next_change_time_mode():
+    """La fecha límite en modo tiempo es último cambio + intervalo"""
+    print("⏰ PRUEBA DE FECHA LÍMITE (MODO TIEMPO)")
+    print("=" * 40)
+
+    from modules.scheduler import ChangeScheduler
+
+    last = datetime(2024, 1, 1, 10, 0, 0)
+    config = _make_config(mode="time", interval_minutes=15, last_change=last.isoformat())
+    scheduler = ChangeScheduler(config, lambda day: [])
+
+    next_change = scheduler.compute_next_change(now=last + timedelta(minutes=1))
+    print(f"  Próximo cambio: {next_change}")
+    assert next_change == last + timedelta(minutes=15)
+
+    config.set("last_change", None)
+    now = datetime(2024, 1, 1, 12, 0, 0)
+    assert scheduler.compute_next_change(now=now) == now
+
+
+def test_next_change_weekday_mode():
+    """En modo días la fecha límite es el fin del slice actual o medianoche"""
+    print("📅 PRUEBA DE FECHA LÍMITE (MODO DÍAS)")
+    print("=" * 40)
+
+    from modules.scheduler import ChangeScheduler
+
+    now = datetime(2024, 1, 1, 10, 5, 0)
+    config = _make_config(mode="weekday", weekday_rotation_minutes=30,
+                          last_change=datetime(2024, 1, 1, 10, 1, 0).isoformat())
+
+    scheduler = ChangeScheduler(config, lambda day: ["a.jpg", "b.jpg"])
+    assert scheduler.compute_next_change(now=now) == datetime(2024, 1, 1, 10, 30, 0)
+
+    # Playlist vacía: comportamiento legacy, un cambio por día
+    scheduler = ChangeScheduler(config, lambda day: [])
+    assert scheduler.compute_next_change(now=now) == datetime(2024, 1, 2, 0, 0, 0)
+
+    # Último cambio de otro día: cambiar ya
+    config.set("last_change", datetime(2023, 12, 31, 23, 0, 0).isoformat())
+    assert scheduler.compute_next_change(now=now) == now
+    print("  ✅ Fechas límite correctas")
+
+
+def test_wait_wakes_on_signals():
+    """La espera termina por cambio de configuración o "cambiar ahora" sin sondeo"""
+    print("🔔 PRUEBA DE SEÑALES DEL PLANIFICADOR")
+    print("=" * 40)
+
+    from modules.scheduler import ChangeScheduler
+
+    config = _make_config()
+    scheduler = ChangeScheduler(config, lambda day: [])
+    config.add_listener(scheduler.notify_config_changed)
+    far_deadline = datetime.now() + timedelta(hours=1)
+
+    threading.Timer(0.1, config.save_config).start()
+    start = time.monotonic()
+    assert scheduler.wait(far_deadline) == ChangeScheduler.WAKE_CONFIG
+    assert time.monotonic() - start < 2
+
+    threading.Timer(0.1, scheduler.request_change).start()
+    assert scheduler.wait(far_deadline) == ChangeScheduler.WAKE_CHANGE_NOW
+
+    scheduler.stop()
+    assert scheduler.wait(far_deadline) == ChangeScheduler.WAKE_STOP
+    print(f"  Despertares: {scheduler.wakeups}")
+    assert scheduler.wakeups <= 2
+
+
+if __name__ == "__main__":
+    test_next_change_time_mode()
+    test_next_change_weekday_mode()
+    test_wait_wakes_on_signals()
+    print(f"\n✅ Todas las pruebas pasaron")
@@ -0,0 +1,135 @@
+"""
+Prueba de la caché de miniaturas (sin GUI)
+"""
+
+import os
+import sys
+import tempfile
+import threading
+from pathlib import Path
+
+# Agregar módulos al path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'modules'))
+
+
+def _make_image(path: str, size=(1600, 900), color=(200, 30, 30)) -> None:
+    from PIL import Image
+    Image.new("RGB", size, color).save(path, "JPEG")
+
+
+def _resolve(cache, paths):
+    """Pide miniaturas y espera a que lleguen todas"""
+    done = threading.Event()
+    results = {}
+
+    def callback(batch):
+        results.update(batch)
+        if len(results) == len(paths):
+            done.set()
+
+    cache.request(paths, callback)
+    assert done.wait(10)
+    return results
+
+
+def test_generates_and_reuses_thumbnails():
+    """La miniatura se genera una vez y se reutiliza entre sesiones"""
+    print("🖼️ PRUEBA DE GENERACIÓN DE MINIATURAS")
+    print("=" * 40)
+
+    from PIL import Image
+    from modules.thumbnail_cache import ThumbnailCache
+
+    folder = Path(tempfile.mkdtemp())
+    image_path = str(folder / "foto.jpg")
+    _make_image(image_path)
+
+    cache = ThumbnailCache(cache_dir=folder / "cache", size=(48, 27))
+    try:
+        thumb = _resolve(cache, [image_path])[image_path]
+        assert thumb and os.path.exists(thumb)
+        with Image.open(thumb) as img:
+            assert img.size == (48, 27)
+        assert cache.generated == 1
+        assert cache.get(image_path) == thumb
+    finally:
+        cache.shutdown()
+
+    # Nueva sesión: se encuentra en disco sin volver a generarla
+    cache = ThumbnailCache(cache_dir=folder / "cache", size=(48, 27))
+    try:
+        assert _resolve(cache, [image_path])[image_path] == thumb
+        assert cache.generated == 0 and cache.hits == 1
+    finally:
+        cache.shutdown()
+
+    # Si el archivo cambia, cambia la clave
+    _make_image(image_path, size=(800, 800), color=(0, 0, 200))
+    cache = ThumbnailCache(cache_dir=folder / "cache", size=(48, 27))
+    try:
+        assert _resolve(cache, [image_path])[image_path] != thumb
+    finally:
+        cache.shutdown()
+
+
+def test_lru_eviction_respects_size_cap():
+    """Con el límite superado se eliminan las miniaturas menos usadas"""
+    print("🧹 PRUEBA DE EXPULSIÓN LRU")
+    print("=" * 40)
+
+    from modules.thumbnail_cache import ThumbnailCache
+
+    folder = Path(tempfile.mkdtemp())
+    paths = []
+    for i in range(6):
+        path = str(folder / f"img_{i}.jpg")
+        _make_image(path, color=(i * 40, 255 - i * 40, 0))
+        paths.append(path)
+
+    cache = ThumbnailCache(cache_dir=folder / "cache", size=(48, 27), max_bytes=1, max_workers=1)
+    try:
+        results = _resolve(cache, paths)
+        assert all(results.values())
+        remaining = [name for name in os.listdir(folder / "cache") if name.endswith(".jpg")]
+        print(f"  Miniaturas en disco: {len(remaining)}, expulsadas: {cache.evicted}")
+        assert len(remaining) == 1
+        assert cache.evicted == 5
+    finally:
+        cache.shutdown()
+
+
+def test_palette_and_bilevel_images():
+    """PNG con paleta (y transparencia) y BMP de 1 bit también tienen miniatura"""
+    print("🎨 PRUEBA DE MODOS DE IMAGEN")
+    print("=" * 40)
+
+    from PIL import Image
+    from modules.thumbnail_cache import ThumbnailCache
+
+    folder = Path(tempfile.mkdtemp())
+    palette = str(folder / "paleta.png")
+    Image.new("RGB", (800, 600), (20, 160, 40)).convert("P").save(palette)
+    transparent = str(folder / "transparente.png")
+    Image.new("RGBA", (800, 600), (0, 0, 0, 0)).convert("P").save(transparent)
+    bilevel = str(folder / "bits.bmp")
+    Image.new("1", (800, 600), 1).save(bilevel)
+    paths = [palette, transparent, bilevel]
+
+    cache = ThumbnailCache(cache_dir=folder / "cache", size=(48, 27))
+    try:
+        results = _resolve(cache, paths)
+        for path in paths:
+            assert results[path] and os.path.exists(results[path]), path
+        with Image.open(results[palette]) as img:
+            pixel = img.getpixel((24, 13))
+            assert all(abs(a - b) <= 4 for a, b in zip(pixel, (20, 160, 40))), pixel
+    finally:
+        cache.shutdown()
+    print("  ✅ P, 1 y transparencia")
+
+
+if __name__ == "__main__":
+    test_generates_and_reuses_thumbnails()
+    test_lru_eviction_respects_size_cap()
+    test_palette_and_bilevel_images()
+    print(f"\n✅ Todas las pruebas pasaron")
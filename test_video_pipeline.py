@@ -0,0 +1,144 @@
+"""
+Prueba del reproductor de video por etapas (sin GUI)
+"""
+
+import os
+import queue
+import sys
+import tempfile
+import time
+
+# Agregar módulos al path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'modules'))
+
+
+def test_presenter_drops_late_frames():
+    """Si el presentador se retrasa, muestra el fotograma vigente y descarta los vencidos"""
+    print("🎞️ PRUEBA DEL PRESENTADOR")
+    print("=" * 40)
+
+    from modules.video_pipeline import FramePresenter, VideoFrame
+
+    frames = queue.Queue()
+    for i in range(10):
+        frames.put(VideoFrame(i, i / 10.0, f"frame{i}"))
+
+    presenter = FramePresenter(frames, fps=10.0, clock=lambda: 0.0)
+    presenter.start(now=100.0)
+
+    # A tiempo: solo el primero
+    assert presenter.next_frame(now=100.0).index == 0
+    # Todavía no toca el siguiente
+    assert presenter.next_frame(now=100.05) is None
+    assert abs(presenter.delay_until_next(now=100.05) - 0.05) < 1e-9
+
+    # Retraso de 0.35 s: se muestran el 3 y se descartan el 1 y el 2
+    frame = presenter.next_frame(now=100.35)
+    assert frame.index == 3
+    assert presenter.dropped == 2
+    assert presenter.presented == 2
+
+    print(f"✅ Presentados {presenter.presented}, descartados {presenter.dropped}")
+
+
+def test_decoder_fills_bounded_queue():
+    """El decodificador prepara fotogramas escalados sin superar el tamaño de la cola"""
+    print("\n🎬 PRUEBA DEL DECODIFICADOR")
+    print("=" * 40)
+
+    try:
+        import cv2
+        import numpy as np
+    except ImportError:
+        print("⚠️ OpenCV no disponible, prueba omitida")
+        return
+
+    from modules.video_pipeline import VideoPipeline
+
+    video_path = os.path.join(tempfile.mkdtemp(), "clip.avi")
+    writer = cv2.VideoWriter(video_path, cv2.VideoWriter_fourcc(*"MJPG"), 25.0, (64, 48))
+    for i in range(12):
+        writer.write(np.full((48, 64, 3), i * 20, dtype=np.uint8))
+    writer.release()
+
+    pipeline = VideoPipeline(video_path, lambda f: cv2.resize(f, (32, 24)), queue_size=3)
+    try:
+        assert pipeline.start()
+        time.sleep(0.3)
+        stats = pipeline.get_stats()
+        assert stats["target_fps"] == 25.0
+        assert stats["queued"] <= 3
+
+        frame = pipeline.frames.get(timeout=1)
+        assert frame.index == 0
+        assert frame.image.shape == (24, 32, 3)
+
+        # En bucle los tiempos de presentación siguen creciendo
+        last_pts = frame.pts
+        for _ in range(20):
+            frame = pipeline.frames.get(timeout=1)
+            assert frame.pts > last_pts
+            last_pts = frame.pts
+        assert pipeline.get_stats()["decoded"] >= 21
+        print(f"✅ Decodificados {pipeline.get_stats()['decoded']} fotogramas")
+    finally:
+        pipeline.stop()
+
+
+def test_geometry_modes():
+    """fill recorta, fit deja bandas y stretch deforma"""
+    print("\n📐 PRUEBA DE GEOMETRÍA")
+    print("=" * 40)
+
+    from modules.video_pipeline import compute_geometry
+
+    # Video 4:3 en pantalla 16:9
+    fill = compute_geometry((640, 480), (1920, 1080), "fill")
+    assert fill.crop == (0, 60, 640, 360)
+    assert fill.scaled == (1920, 1080)
+
+    fit = compute_geometry((640, 480), (1920, 1080), "fit")
+    assert fit.scaled == (1440, 1080)
+    assert fit.offset == (240, 0)
+
+    stretch = compute_geometry((640, 480), (1920, 1080), "stretch")
+    assert stretch.crop == (0, 0, 640, 480) and stretch.scaled == (1920, 1080)
+    print("✅ Geometrías correctas")
+
+
+def test_scaler_reuses_buffers():
+    """El escalador devuelve RGB del tamaño pedido rotando búferes preasignados"""
+    print("\n🖼️ PRUEBA DEL ESCALADOR")
+    print("=" * 40)
+
+    try:
+        import numpy as np
+    except ImportError:
+        print("⚠️ NumPy no disponible, prueba omitida")
+        return
+
+    from modules.video_pipeline import FrameScaler
+
+    frame = np.zeros((48, 64, 3), dtype=np.uint8)
+    frame[:, :, 0] = 255  # Azul en BGR
+
+    scaler = FrameScaler((32, 12), mode="fit", buffers=2)
+    first = scaler(frame)
+    second = scaler(frame)
+    third = scaler(frame)
+    assert first.shape == (12, 32, 3)
+    assert first is third and first is not second
+
+    # Bandas negras a los lados, contenido azul (RGB) en el centro
+    assert scaler.geometry.scaled == (16, 12)
+    assert first[:, :8].max() == 0
+    assert tuple(first[6, 16]) == (0, 0, 255)
+    print("✅ Búferes reutilizados y color convertido")
+
+
+if __name__ == "__main__":
+    test_presenter_drops_late_frames()
+    test_decoder_fills_bounded_queue()
+    test_geometry_modes()
+    test_scaler_reuses_buffers()
+    print(f"\n✅ Todas las pruebas pasaron")
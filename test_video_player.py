@@ -0,0 +1,95 @@
+"""
+Prueba del reproductor de video en proceso aparte (sin GUI)
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+# Agregar módulos al path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'modules'))
+
+
+def _write_clip(folder, name="clip.avi", frames=25):
+    """Video de un segundo con un gris distinto por fotograma"""
+    import cv2
+    import numpy as np
+
+    video_path = os.path.join(folder, name)
+    writer = cv2.VideoWriter(video_path, cv2.VideoWriter_fourcc(*"MJPG"), 25.0, (64, 48))
+    for i in range(frames):
+        writer.write(np.full((48, 64, 3), i * 10, dtype=np.uint8))
+    writer.release()
+    return video_path
+
+
+def _present_for(player, seconds, shown):
+    """Simula el bucle after() de la interfaz"""
+    end = time.monotonic() + seconds
+    while time.monotonic() < end:
+        player.present_latest(lambda frame: shown.append(int(frame[0, 0, 0])))
+        time.sleep(player.poll_interval_ms / 1000)
+
+
+def test_player_process_commands():
+    """El proceso reproduce, pausa, busca, cambia de video y se detiene"""
+    print("🎬 PRUEBA DEL REPRODUCTOR EN PROCESO APARTE")
+    print("=" * 40)
+
+    try:
+        import cv2  # noqa: F401
+    except ImportError:
+        print("⚠️ OpenCV no disponible, prueba omitida")
+        return
+
+    from modules.video_player import VideoPlayerProcess
+
+    folder = tempfile.mkdtemp()
+    first = _write_clip(folder)
+    second = _write_clip(folder, "second.avi", frames=5)
+    before = set(os.listdir(folder))
+
+    player = VideoPlayerProcess((32, 24))
+    try:
+        assert player.start()
+        assert player.swap(first, timeout=30)
+        assert player.fps == 25.0
+
+        shown = []
+        _present_for(player, 0.5, shown)
+        assert shown, "No llegaron fotogramas"
+        assert player.get_stats()["presented"] >= len(shown)
+
+        # En pausa no llegan fotogramas nuevos (salvo el que estaba en camino)
+        player.pause()
+        time.sleep(0.1)
+        _present_for(player, 0.1, [])
+        paused = []
+        _present_for(player, 0.3, paused)
+        assert paused == []
+
+        # Buscar a 0.8 s y reanudar
+        player.seek(0.8)
+        player.play()
+        shown = []
+        _present_for(player, 0.1, shown)
+        assert shown and shown[0] >= 190
+
+        # Cambiar de video sin reiniciar el proceso
+        pid = player.process.pid
+        assert player.swap(second, timeout=10)
+        assert player.process.pid == pid
+        assert not player.swap(os.path.join(folder, "missing.avi"), timeout=10)
+    finally:
+        player.stop()
+
+    assert not player.is_alive()
+    # No se escribe nada en la carpeta de los videos
+    assert set(os.listdir(folder)) == before
+    print("✅ Órdenes atendidas")
+
+
+if __name__ == "__main__":
+    test_player_process_commands()
+    print(f"\n✅ Todas las pruebas pasaron")
@@ -0,0 +1,59 @@
+"""
+Prueba del modelo de la lista virtualizada (sin GUI)
+"""
+
+import os
+import sys
+
+# Agregar módulos al path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'modules'))
+
+
+def _is_video(path: str) -> bool:
+    return path.endswith(".mp4")
+
+
+def test_rows_are_grouped_with_headers():
+    """Videos primero, luego imágenes, cada sección con su encabezado"""
+    print("📋 PRUEBA DE FILAS AGRUPADAS")
+    print("=" * 40)
+
+    from modules.wallpaper_list import ROW_HEADER, ROW_ITEM, WallpaperListModel
+
+    model = WallpaperListModel(_is_video)
+    model.set_items(["a.jpg", "b.mp4", "c.jpg"])
+
+    rows = [model.row(i) for i in range(len(model))]
+    assert rows == [
+        (ROW_HEADER, "video"), (ROW_ITEM, "b.mp4"),
+        (ROW_HEADER, "image"), (ROW_ITEM, "a.jpg"), (ROW_ITEM, "c.jpg"),
+    ]
+    assert model.row(len(model)) is None
+    assert model.counts() == (3, 2, 1)
+
+
+def test_incremental_diff():
+    """Las altas y bajas modifican solo las filas afectadas"""
+    print("➕ PRUEBA DE DIFERENCIAS INCREMENTALES")
+    print("=" * 40)
+
+    from modules.wallpaper_list import ROW_HEADER, ROW_ITEM, WallpaperListModel
+
+    model = WallpaperListModel(_is_video)
+    model.set_items([f"img_{i}.jpg" for i in range(10000)])
+    assert len(model) == 10001
+
+    assert model.add(["img_5.jpg", "nuevo.mp4"]) == ["nuevo.mp4"]
+    assert model.row(0) == (ROW_HEADER, "video")
+    assert model.row(1) == (ROW_ITEM, "nuevo.mp4")
+
+    assert model.remove(["nuevo.mp4", "no_existe.jpg"]) == ["nuevo.mp4"]
+    assert model.row(0) == (ROW_HEADER, "image")
+    assert model.row(10000) == (ROW_ITEM, "img_9999.jpg")
+    assert "img_0.jpg" in model and "nuevo.mp4" not in model
+
+
+if __name__ == "__main__":
+    test_rows_are_grouped_with_headers()
+    test_incremental_diff()
+    print(f"\n✅ Todas las pruebas pasaron")
@@ -0,0 +1,120 @@
+"""
+Prueba del cambio transaccional de fondo (sin GUI ni API de Windows)
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Agregar módulos al path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'modules'))
+
+
+def _make_engine(folder):
+    """Motor con la actualización del escritorio sustituida por un registro"""
+    from modules.config_manager import ConfigManager
+    from modules.poster_frames import PosterFrameCache
+    from modules.wallpaper_engine import WallpaperEngine
+
+    config = ConfigManager(Path(folder) / "config.json")
+    config.set("desktop_backend", "recording")
+    engine = WallpaperEngine(config)
+    video_engine = engine.video_engine
+    video_engine.poster_frames = PosterFrameCache(os.path.join(folder, "posters"))
+    return engine, video_engine.desktop
+
+
+def _calls(desktop, action):
+    return [path for kind, path in desktop.calls if kind == action]
+
+
+def test_one_desktop_update_per_swap():
+    """Cada cambio (imagen o video) hace exactamente una actualización del escritorio"""
+    print("🔁 PRUEBA DE CAMBIO SIN PARPADEO")
+    print("=" * 40)
+
+    try:
+        import cv2
+        import numpy as np
+    except ImportError:
+        print("⚠️ OpenCV no disponible, prueba omitida")
+        return
+
+    folder = tempfile.mkdtemp()
+    image = os.path.join(folder, "a.jpg")
+    cv2.imwrite(image, np.full((24, 32, 3), 128, dtype=np.uint8))
+    video = os.path.join(folder, "b.avi")
+    writer = cv2.VideoWriter(video, cv2.VideoWriter_fourcc(*"MJPG"), 10.0, (32, 24))
+    for i in range(10):
+        writer.write(np.full((24, 32, 3), 20 * i, dtype=np.uint8))
+    writer.release()
+
+    engine, desktop = _make_engine(folder)
+
+    for media in (image, video, video, image, video):
+        assert engine.set_wallpaper(media)
+    applied = _calls(desktop, "apply")
+    assert len(applied) == 5
+    assert _calls(desktop, "clear") == [], "Un cambio no debe pasar por el fondo por defecto"
+    # El video se aplica como su portada cacheada
+    assert applied[1] == applied[2] != video
+    assert engine.video_engine.is_playing()
+    assert engine.video_engine.current_video_path == os.path.abspath(video)
+
+    assert engine.set_wallpaper(image)
+    assert not engine.video_engine.is_playing()
+    assert engine.get_apply_stats()["count"] == 6
+    print(f"✅ {len(desktop.calls)} actualizaciones para {len(desktop.calls)} cambios")
+
+
+def test_failed_preparation_keeps_current_wallpaper():
+    """Si el nuevo medio no se puede preparar, el escritorio no se toca"""
+    print("\n🛡️ PRUEBA DE CAMBIO FALLIDO")
+    print("=" * 40)
+
+    folder = tempfile.mkdtemp()
+    engine, desktop = _make_engine(folder)
+
+    assert not engine.set_wallpaper(os.path.join(folder, "missing.mp4"))
+    assert desktop.calls == []
+    print("✅ Fondo actual conservado")
+
+
+def test_stop_cancels_scheduled_jobs():
+    """Detener el video cancela la presentación y la política programadas"""
+    print("\n⏹️ PRUEBA DE CANCELACIÓN AL DETENER")
+    print("=" * 40)
+
+    class FakeWindow:
+        def __init__(self):
+            self.cancelled = []
+            self.destroyed = False
+
+        def after_cancel(self, job):
+            self.cancelled.append(job)
+
+        def destroy(self):
+            self.destroyed = True
+
+    folder = tempfile.mkdtemp()
+    engine, desktop = _make_engine(folder)
+    video_engine = engine.video_engine
+    window = FakeWindow()
+    video_engine.video_window = window
+    video_engine.is_video_playing = True
+    video_engine._present_job = "after#1"
+    video_engine._policy_job = "after#2"
+
+    assert video_engine.stop_video_wallpaper(restore_default=False)
+    assert window.cancelled == ["after#1", "after#2"] and window.destroyed
+    assert video_engine._present_job is None and video_engine._policy_job is None
+    assert desktop.calls == []
+    print("✅ Sin bucles duplicados tras detener")
+
+
+if __name__ == "__main__":
+    test_one_desktop_update_per_swap()
+    test_failed_preparation_keeps_current_wallpaper()
+    test_stop_cancels_scheduled_jobs()
+    print(f"\n✅ Todas las pruebas pasaron")